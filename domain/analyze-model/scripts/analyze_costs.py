@@ -7,6 +7,7 @@ then produces a detailed cost breakdown per model.
 Usage:
     python scripts/analyze_costs.py usage.json --catalog catalog.json
     python scripts/analyze_costs.py usage.csv  --catalog catalog.json --output report.json
+    python scripts/analyze_costs.py llm_ledger.jsonl --catalog catalog.json
 
 Usage log format: see references/usage-format.md
 """
@@ -49,12 +50,35 @@ def _load_usage_csv(path: Path) -> list[dict]:
     return rows
 
 
+def _load_usage_jsonl(path: Path) -> list[dict]:
+    """One record per line (e.g. the gestionar-cursos llm_ledger.jsonl).
+
+    Records flagged ``cache_hit`` never reached the API and are skipped.
+    Truncated or malformed lines are ignored.
+    """
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(row, dict) and not row.get("cache_hit"):
+                rows.append(row)
+    return rows
+
+
 def load_usage(path: str) -> list[dict]:
     p = Path(path)
     if not p.exists():
         raise FileNotFoundError(f"Usage file not found: {path}")
     if p.suffix.lower() == ".csv":
         return _load_usage_csv(p)
+    if p.suffix.lower() == ".jsonl":
+        return _load_usage_jsonl(p)
     return _load_usage_json(p)
 
 
@@ -447,7 +471,7 @@ def _print_report(report: dict) -> None:
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Analyze LLM usage costs")
-    parser.add_argument("usage", help="Usage log file (.json or .csv)")
+    parser.add_argument("usage", help="Usage log file (.json, .jsonl or .csv)")
     parser.add_argument("--catalog", "-c", required=True, help="Model catalog JSON (from fetch_models.py)")
     parser.add_argument("--output", "-o", default=None, help="Save JSON report to this path")
     args = parser.parse_args()
@@ -49,11 +49,31 @@ def _load_usage_csv(path: Path) -> list[dict]:
     return rows
 
 
+def _load_usage_jsonl(path: Path) -> list[dict]:
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(row, dict) and not row.get("cache_hit"):
+                rows.append(row)
+    return rows
+
+
 def _load_usage(path: str) -> list[dict]:
     p = Path(path)
     if not p.exists():
         raise FileNotFoundError(f"Usage file not found: {path}")
-    return _load_usage_csv(p) if p.suffix.lower() == ".csv" else _load_usage_json(p)
+    if p.suffix.lower() == ".csv":
+        return _load_usage_csv(p)
+    if p.suffix.lower() == ".jsonl":
+        return _load_usage_jsonl(p)
+    return _load_usage_json(p)
 
 
 def _load_catalog(catalog_path: str) -> list[dict]:
@@ -548,7 +568,7 @@ def _print_forecast(report: dict, horizon: int) -> None:
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Forecast LLM usage costs")
-    parser.add_argument("usage", help="Usage log file (.json or .csv)")
+    parser.add_argument("usage", help="Usage log file (.json, .jsonl or .csv)")
     parser.add_argument("--catalog", "-c", required=True, help="Model catalog JSON (from fetch_models.py)")
     parser.add_argument("--days", "-d", type=int, default=30, help="Forecast horizon in days (default: 30)")
     parser.add_argument("--output", "-o", default=None, help="Save JSON report to this path")
@@ -1,19 +1,13 @@
 """
-Subproceso auxiliar: extrae fechas de quiz/assign de una unidad.
+Parser de fechas de apertura/cierre de quiz/assign/forum/lesson/workshop.
 
-Uso interno de cli_estado.py. Lee actividades JSON de stdin,
-visita cada quiz/assign via CDP, devuelve fechas en stdout.
+Uso interno de cli_estado.py, que descarga las páginas en paralelo con
+la sesión requests y pasa el HTML a extraer_fechas_pagina(). Solo las
+páginas que necesitan JS se abren con Chrome.
 """
 
-import argparse
-import json
-import os
 import re
-import sys
 
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-
-from browser_api import get_navegador, get_page_content, set_profile_dir
 from bs4 import BeautifulSoup
 
 # Mapping Spanish month names → number.
@@ -127,50 +121,3 @@ def extraer_fechas_pagina(html: str) -> dict[str, str]:
                 fechas["fecha_cierre"] = _es_a_iso(value) or value
 
     return fechas
-
-
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--profile-dir", "-p", default=None,
-                       help="Directorio de perfil Chrome")
-    args = parser.parse_args()
-
-    if args.profile_dir:
-        set_profile_dir(args.profile_dir)
-
-    payload = sys.stdin.read()
-    if not payload.strip():
-        json.dump({}, sys.stdout)
-        return
-
-    try:
-        actividades = json.loads(payload)
-    except json.JSONDecodeError:
-        json.dump({}, sys.stdout)
-        return
-
-    resultados = {}
-    navegador = get_navegador()
-
-    for act in actividades:
-        url = act.get("url", "")
-        if not url:
-            continue
-        try:
-            navegador(url)
-            html = get_page_content()
-            fechas = extraer_fechas_pagina(html)
-            # Extraer key de URL
-            from urllib.parse import urlparse
-            parsed = urlparse(url)
-            key = parsed.path + ("?" + parsed.query if parsed.query else "")
-            fechas["nombre"] = act.get("nombre", "")
-            resultados[key] = fechas
-        except Exception:
-            continue
-
-    json.dump(resultados, sys.stdout, ensure_ascii=False)
-
-
-if __name__ == "__main__":
-    main()
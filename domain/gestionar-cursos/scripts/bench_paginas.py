@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark del parseo de páginas Moodle guardadas (pagina_moodle.py).
+
+Compara, sobre los mismos archivos .html, los extractores de detalle de
+actividad (descripción, instrucciones, materiales, criterios y nombre de
+unidad):
+
+- bs4 x5:     un BeautifulSoup por extractor (comportamiento anterior)
+- bs4 x1:     PaginaMoodle con BeautifulSoup parseado una vez
+- lxml:       PaginaMoodle con lxml.html + XPath (default sin selectolax)
+- selectolax: PaginaMoodle con lexbor (si está instalado)
+
+Cada modo debe devolver lo mismo que "bs4 x5"; las diferencias se listan.
+
+Uso:
+    uv run python bench_paginas.py "C:/.../2026-2-B1/<curso>/_cache"
+    uv run python bench_paginas.py pagina1.html pagina2.html --repeticiones 20
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+import time
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pagina_moodle import PaginaMoodle
+
+console = Console()
+
+DEFAULT_REPETICIONES = 10
+_EXTRACTORES = ("descripcion", "instrucciones", "links_materiales", "criterios",
+                "nombre_unidad")
+
+
+def _extraer_x5(html: str) -> dict:
+    """Un parseo por extractor, como hacía navegador_requests."""
+    return {e: getattr(PaginaMoodle(html, parser="bs4"), e)() for e in _EXTRACTORES}
+
+
+def _extraer_x1(html: str, parser: str) -> dict:
+    pagina = PaginaMoodle(html, parser=parser)
+    return {e: getattr(pagina, e)() for e in _EXTRACTORES}
+
+
+def modos_disponibles() -> dict:
+    """{nombre: función(html) -> dict de extractores}."""
+    modos = {
+        "bs4 x5": _extraer_x5,
+        "bs4 x1": lambda html: _extraer_x1(html, "bs4"),
+        "lxml": lambda html: _extraer_x1(html, "lxml"),
+    }
+    if importlib.util.find_spec("selectolax"):
+        modos["selectolax"] = lambda html: _extraer_x1(html, "selectolax")
+    return modos
+
+
+def cargar_paginas(rutas: list[str]) -> dict[str, str]:
+    """{ruta: HTML} de los .html indicados (directorios: recursivo)."""
+    paginas = {}
+    for ruta in rutas:
+        p = Path(ruta)
+        archivos = sorted(p.rglob("*.html")) if p.is_dir() else [p]
+        for archivo in archivos:
+            paginas[str(archivo)] = archivo.read_text(encoding="utf-8", errors="replace")
+    return paginas
+
+
+def medir(paginas: dict[str, str], repeticiones: int = DEFAULT_REPETICIONES) -> list[dict]:
+    """Mejor tiempo de `repeticiones` pasadas por modo sobre todas las páginas.
+
+    Returns:
+        [{"modo", "segundos", "ms_pagina", "aceleracion", "diferencias": [rutas]}]
+    """
+    modos = modos_disponibles()
+    referencia = {ruta: _extraer_x5(html) for ruta, html in paginas.items()}
+    resultados = []
+    for nombre, funcion in modos.items():
+        mejor = float("inf")
+        for _ in range(max(1, repeticiones)):
+            inicio = time.perf_counter()
+            salidas = {ruta: funcion(html) for ruta, html in paginas.items()}
+            mejor = min(mejor, time.perf_counter() - inicio)
+        resultados.append({
+            "modo": nombre,
+            "segundos": mejor,
+            "ms_pagina": mejor * 1000 / max(1, len(paginas)),
+            "diferencias": [r for r in paginas if salidas[r] != referencia[r]],
+        })
+    base = resultados[0]["segundos"]
+    for r in resultados:
+        r["aceleracion"] = base / r["segundos"] if r["segundos"] else 0.0
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de parseo de páginas Moodle")
+    parser.add_argument("rutas", nargs="+", help="Archivos .html o carpetas con páginas guardadas")
+    parser.add_argument("--repeticiones", type=int, default=DEFAULT_REPETICIONES,
+                        help=f"Pasadas por modo; se reporta la mejor (default: {DEFAULT_REPETICIONES})")
+    args = parser.parse_args()
+
+    paginas = cargar_paginas(args.rutas)
+    if not paginas:
+        raise SystemExit("No se encontraron archivos .html")
+    mb = sum(len(h) for h in paginas.values()) / 1024 / 1024
+    console.print(f"[bold blue]Páginas:[/bold blue] {len(paginas)} ({mb:.1f} MB)")
+
+    tabla = Table(title="Extractores de detalle de actividad")
+    tabla.add_column("Modo")
+    tabla.add_column("Total", justify="right")
+    tabla.add_column("ms/página", justify="right")
+    tabla.add_column("vs bs4 x5", justify="right")
+    tabla.add_column("Diferencias", justify="right")
+    resultados = medir(paginas, args.repeticiones)
+    for r in resultados:
+        color = "red" if r["diferencias"] else "green"
+        tabla.add_row(r["modo"], f"{r['segundos'] * 1000:.1f} ms", f"{r['ms_pagina']:.2f}",
+                      f"{r['aceleracion']:.1f}x",
+                      f"[{color}]{len(r['diferencias'])}[/{color}]")
+    console.print(tabla)
+    for r in resultados:
+        for ruta in r["diferencias"]:
+            console.print(f"[yellow][WARN][/yellow] {r['modo']}: salida distinta en {ruta}")
+    sys.exit(1 if any(r["diferencias"] for r in resultados) else 0)
+
+
+if __name__ == "__main__":
+    main()
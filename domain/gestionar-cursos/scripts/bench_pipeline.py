@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Benchmark del pipeline en modo requests contra un Moodle local (moodle_falso.py).
+
+Corre las fases reales, en orden y sobre la misma carpeta de período
+temporal:
+
+- init:           cli_init._init_curso (scaffold, foros de inicio, actividades, materiales)
+- estado:         cli_estado.revisar_curso (sidebar, fechas, huellas, hilos nuevos)
+- foros:          cli_foros.procesar_curso (foros evaluables y primer post de cada hilo)
+- calificaciones: cli_calificaciones._sincronizar_curso_requests (gradebook)
+
+Por fase se mide el tiempo de pared, los requests que recibió el
+servidor (total y por tipo), los bytes servidos y el pico de RSS del
+proceso. El resultado se guarda como JSON (--guardar) y se compara contra
+un baseline anterior (--comparar): más requests que el baseline, o
+tiempo/RSS por encima de la tolerancia, es regresión (exit 1).
+
+Sin LLM (se ignora OPENROUTER_API_KEY) ni caché HTTP; materiales y
+curso viven en un directorio temporal nuevo por repetición. La cortesía
+por host va en 0 por defecto para medir el pipeline y no las pausas
+(--intervalo-host 0.25 reproduce la de cli_init).
+
+Uso:
+    uv run python bench_pipeline.py
+    uv run python bench_pipeline.py --unidades 8 --latencia 0.08 --guardar baseline.json
+    uv run python bench_pipeline.py --comparar baseline.json --tolerancia 0.25
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from rich.console import Console
+from rich.table import Table
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import moodle_falso
+
+console = Console()
+
+FASES = ("init", "estado", "foros", "calificaciones")
+DEFAULT_WORKERS = 4
+DEFAULT_LATENCIA = 0.05
+DEFAULT_TOLERANCIA = 0.2
+DEFAULT_REPETICIONES = 1
+# Diferencias absolutas por debajo de estas no cuentan como regresión (ruido)
+MIN_DIFERENCIA_SEGUNDOS = 0.05
+MIN_DIFERENCIA_RSS_MB = 5.0
+VERSION_RESULTADO = 1
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Pico de RSS
+# ─────────────────────────────────────────────────────────────────────
+
+def _reiniciar_pico_rss() -> bool:
+    """Reinicia el pico de RSS del proceso (solo Linux: /proc/self/clear_refs)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _rss_pico_mb() -> float | None:
+    """Pico de RSS del proceso en MB (VmHWM, psutil o getrusage; None si no hay forma)."""
+    try:
+        with open("/proc/self/status") as f:
+            for linea in f:
+                if linea.startswith("VmHWM:"):
+                    return int(linea.split()[1]) / 1024
+    except OSError:
+        pass
+    if importlib.util.find_spec("psutil"):
+        import psutil
+        info = psutil.Process().memory_info()
+        pico = getattr(info, "peak_wset", None)  # Windows
+        if pico:
+            return pico / 1024 / 1024
+    try:
+        import resource
+    except ImportError:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / 1024 / 1024 if sys.platform == "darwin" else maxrss / 1024
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Ejecución
+# ─────────────────────────────────────────────────────────────────────
+
+def _activar_backend(servidor: moodle_falso.ServidorMoodle, directorio: str,
+                     workers: int, intervalo_host: float) -> None:
+    """Modo requests con la sesión desviada al servidor local."""
+    import requests
+    from browser_api import set_request_mode
+    from navegador_requests import configurar_cache_http, configurar_cortesia
+    from store_materiales import configurar_store_materiales
+
+    session = requests.Session()
+    set_request_mode(session)
+    configurar_cortesia(workers, intervalo_host)
+    servidor.montar_en_sesion(session)  # prefijo más largo que el "https://" de la cortesía
+    configurar_cache_http(None)
+    configurar_store_materiales(os.path.join(directorio, ".materiales"))
+
+
+def _silenciar(silencio: bool) -> None:
+    for nombre in ("cli_init", "cli_estado", "cli_foros", "cli_calificaciones"):
+        modulo = sys.modules.get(nombre)
+        if modulo is not None and hasattr(modulo, "console"):
+            modulo.console.quiet = silencio
+
+
+def _fases(destino: str, url_curso: str, workers: int, intervalo_host: float) -> dict:
+    """{fase: función() -> error ("" si terminó bien)}."""
+    import cli_calificaciones
+    import cli_estado
+    import cli_foros
+    import cli_init
+
+    def _ruta_curso() -> str:
+        for nombre in sorted(os.listdir(destino)):
+            if os.path.isfile(os.path.join(destino, nombre, "AGENTS.md")):
+                return os.path.join(destino, nombre)
+        raise FileNotFoundError(f"Sin curso inicializado en {destino}")
+
+    def init():
+        cli_init._init_curso(url_curso, destino, use_requests=True, workers=workers,
+                             intervalo_host=intervalo_host, cache_http=False)
+        _ruta_curso()
+        return ""
+
+    def estado():
+        return cli_estado.revisar_curso(_ruta_curso(), workers=workers)["error"]
+
+    def foros():
+        cli_foros.procesar_curso(_ruta_curso())
+        return ""
+
+    def calificaciones():
+        return cli_calificaciones._sincronizar_curso_requests(_ruta_curso())["error"]
+
+    return {"init": init, "estado": estado, "foros": foros, "calificaciones": calificaciones}
+
+
+def ejecutar(parametros: dict, directorio: str, *, verbose: bool = False) -> dict:
+    """Una corrida de todas las fases contra un Moodle local nuevo.
+
+    Args:
+        parametros: unidades, actividades_por_unidad, hilos_por_foro,
+            hilos_por_pagina, kb_por_binario, latencia, workers, intervalo_host.
+        directorio: Carpeta vacía para el período y el store de materiales.
+
+    Returns:
+        {"fases": {fase: {"segundos", "requests", "por_tipo", "bytes",
+         "rss_pico_mb", "error"}}, "no_encontradas": {ruta: n}}
+    """
+    destino = os.path.join(directorio, "2026-2-B1")
+    os.makedirs(destino, exist_ok=True)
+    paginas = moodle_falso.generar_curso(
+        unidades=parametros["unidades"],
+        actividades_por_unidad=parametros["actividades_por_unidad"],
+        hilos_por_foro=parametros["hilos_por_foro"],
+        hilos_por_pagina=parametros["hilos_por_pagina"],
+        kb_por_binario=parametros["kb_por_binario"],
+    )
+    url_curso = f"{moodle_falso.BASE_URL}/course/view.php?id={moodle_falso.COURSE_ID}"
+
+    resultados = {}
+    with moodle_falso.ServidorMoodle(paginas, latencia=parametros["latencia"]) as servidor:
+        fases_fn = _fases(destino, url_curso, parametros["workers"],
+                          parametros["intervalo_host"])
+        os.environ.pop("OPENROUTER_API_KEY", None)  # cli_init carga .env al importarse
+        _activar_backend(servidor, directorio, parametros["workers"],
+                         parametros["intervalo_host"])
+        _silenciar(not verbose)
+        try:
+            for fase in FASES:
+                antes = servidor.stats()
+                _reiniciar_pico_rss()
+                inicio = time.perf_counter()
+                try:
+                    error = fases_fn[fase]()
+                except SystemExit as e:
+                    error = f"SystemExit({e.code})"
+                except Exception as e:  # noqa: BLE001
+                    error = f"{type(e).__name__}: {e}"
+                segundos = time.perf_counter() - inicio
+                despues = servidor.stats()
+                por_tipo = {t: n - antes["por_tipo"].get(t, 0)
+                            for t, n in despues["por_tipo"].items()
+                            if n - antes["por_tipo"].get(t, 0)}
+                rss = _rss_pico_mb()
+                resultados[fase] = {
+                    "segundos": round(segundos, 3),
+                    "requests": despues["requests"] - antes["requests"],
+                    "por_tipo": dict(sorted(por_tipo.items())),
+                    "bytes": despues["bytes"] - antes["bytes"],
+                    "rss_pico_mb": round(rss, 1) if rss is not None else None,
+                    "error": error or "",
+                }
+        finally:
+            _silenciar(False)
+        no_encontradas = servidor.stats()["no_encontradas"]
+    return {"fases": resultados, "no_encontradas": no_encontradas}
+
+
+def medir(parametros: dict, repeticiones: int = DEFAULT_REPETICIONES, *,
+          verbose: bool = False) -> dict:
+    """Corre `repeticiones` veces (directorio temporal nuevo cada una).
+
+    Por fase queda el mejor tiempo, el mayor pico de RSS y los requests de
+    la primera corrida (son deterministas).
+    """
+    corridas = []
+    for _ in range(max(1, repeticiones)):
+        with tempfile.TemporaryDirectory(prefix="bench_pipeline_") as directorio:
+            corridas.append(ejecutar(parametros, directorio, verbose=verbose))
+
+    fases = {}
+    for fase in FASES:
+        medidas = [c["fases"][fase] for c in corridas]
+        rss = [m["rss_pico_mb"] for m in medidas if m["rss_pico_mb"] is not None]
+        fases[fase] = {**medidas[0],
+                       "segundos": min(m["segundos"] for m in medidas),
+                       "rss_pico_mb": max(rss) if rss else None,
+                       "error": next((m["error"] for m in medidas if m["error"]), "")}
+    total = {
+        "segundos": round(sum(f["segundos"] for f in fases.values()), 3),
+        "requests": sum(f["requests"] for f in fases.values()),
+        "bytes": sum(f["bytes"] for f in fases.values()),
+    }
+    return {
+        "version": VERSION_RESULTADO,
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "parametros": parametros,
+        "repeticiones": max(1, repeticiones),
+        "fases": fases,
+        "total": total,
+        "no_encontradas": corridas[0]["no_encontradas"],
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Comparación contra baseline
+# ─────────────────────────────────────────────────────────────────────
+
+def comparar(actual: dict, baseline: dict, tolerancia: float = DEFAULT_TOLERANCIA) -> list[dict]:
+    """Filas fase × métrica con el cambio relativo y si es regresión.
+
+    Requests: cualquier aumento. Segundos y RSS: aumento relativo mayor
+    que `tolerancia` y absoluto mayor que MIN_DIFERENCIA_*.
+
+    Returns:
+        [{"fase", "metrica", "baseline", "actual", "cambio", "regresion"}]
+    """
+    filas = []
+    for fase in FASES:
+        base, act = baseline.get("fases", {}).get(fase), actual["fases"].get(fase)
+        if not base or not act:
+            continue
+        for metrica, minimo in (("segundos", MIN_DIFERENCIA_SEGUNDOS),
+                                ("requests", 0),
+                                ("rss_pico_mb", MIN_DIFERENCIA_RSS_MB)):
+            b, a = base.get(metrica), act.get(metrica)
+            if b is None or a is None:
+                continue
+            cambio = (a - b) / b if b else 0.0
+            regresion = (a > b if metrica == "requests"
+                         else cambio > tolerancia and a - b > minimo)
+            filas.append({"fase": fase, "metrica": metrica, "baseline": b, "actual": a,
+                          "cambio": round(cambio, 3), "regresion": regresion})
+    return filas
+
+
+def _imprimir_resultado(resultado: dict) -> None:
+    table = Table(title="Pipeline contra Moodle local")
+    table.add_column("Fase", style="cyan")
+    table.add_column("Segundos", justify="right")
+    table.add_column("Requests", justify="right")
+    table.add_column("KB", justify="right")
+    table.add_column("RSS pico MB", justify="right")
+    table.add_column("Por tipo", style="dim")
+    table.add_column("Error", style="red")
+    for fase, m in resultado["fases"].items():
+        rss = f"{m['rss_pico_mb']:.1f}" if m["rss_pico_mb"] is not None else "—"
+        tipos = ", ".join(f"{t} {n}" for t, n in m["por_tipo"].items())
+        table.add_row(fase, f"{m['segundos']:.2f}", str(m["requests"]),
+                      f"{m['bytes'] / 1024:.0f}", rss, tipos, m["error"][:60])
+    total = resultado["total"]
+    table.add_row("[bold]total[/bold]", f"{total['segundos']:.2f}", str(total["requests"]),
+                  f"{total['bytes'] / 1024:.0f}", "", "", "")
+    console.print(table)
+    if resultado["no_encontradas"]:
+        console.print(f"[yellow][WARN][/yellow] {len(resultado['no_encontradas'])} rutas "
+                      f"sin página en el Moodle local: "
+                      f"{', '.join(list(resultado['no_encontradas'])[:5])}")
+
+
+def _imprimir_comparacion(filas: list[dict], tolerancia: float) -> None:
+    table = Table(title=f"Contra baseline (tolerancia {tolerancia:.0%})")
+    table.add_column("Fase", style="cyan")
+    table.add_column("Métrica")
+    table.add_column("Baseline", justify="right")
+    table.add_column("Actual", justify="right")
+    table.add_column("Cambio", justify="right")
+    for f in filas:
+        estilo = "bold red" if f["regresion"] else ("green" if f["cambio"] < 0 else "")
+        table.add_row(f["fase"], f["metrica"], f"{f['baseline']:g}", f"{f['actual']:g}",
+                      f"[{estilo}]{f['cambio']:+.1%}[/{estilo}]" if estilo else f"{f['cambio']:+.1%}")
+    console.print(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark del pipeline (init, estado, foros, calificaciones) "
+                    "contra un Moodle local"
+    )
+    parser.add_argument("--unidades", type=int, default=4)
+    parser.add_argument("--actividades", type=int, default=5,
+                        help="Actividades por unidad (default: 5)")
+    parser.add_argument("--hilos", type=int, default=30, help="Hilos por foro (default: 30)")
+    parser.add_argument("--hilos-por-pagina", type=int, default=10)
+    parser.add_argument("--kb-binario", type=int, default=256,
+                        help="Tamaño de cada archivo de pluginfile.php (default: 256)")
+    parser.add_argument("--latencia", type=float, default=DEFAULT_LATENCIA,
+                        help=f"Segundos de latencia por request (default: {DEFAULT_LATENCIA})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--intervalo-host", type=float, default=0.0,
+                        help="Cortesía por host como en cli_init (default: 0)")
+    parser.add_argument("--repeticiones", type=int, default=DEFAULT_REPETICIONES)
+    parser.add_argument("--guardar", metavar="JSON", help="Escribir el resultado como baseline")
+    parser.add_argument("--comparar", metavar="JSON", help="Baseline contra el que comparar")
+    parser.add_argument("--tolerancia", type=float, default=DEFAULT_TOLERANCIA,
+                        help=f"Aumento relativo permitido en tiempo y RSS "
+                             f"(default: {DEFAULT_TOLERANCIA})")
+    parser.add_argument("--verbose", action="store_true", help="Mostrar la salida de cada fase")
+    args = parser.parse_args()
+
+    parametros = {
+        "unidades": args.unidades,
+        "actividades_por_unidad": args.actividades,
+        "hilos_por_foro": args.hilos,
+        "hilos_por_pagina": args.hilos_por_pagina,
+        "kb_por_binario": args.kb_binario,
+        "latencia": args.latencia,
+        "workers": args.workers,
+        "intervalo_host": args.intervalo_host,
+    }
+    resultado = medir(parametros, args.repeticiones, verbose=args.verbose)
+    _imprimir_resultado(resultado)
+
+    if args.guardar:
+        with open(args.guardar, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+        console.print(f"[dim]Resultado guardado en {args.guardar}[/dim]")
+
+    errores = [f for f, m in resultado["fases"].items() if m["error"]]
+    regresiones = []
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("parametros") != parametros:
+            console.print("[yellow][WARN][/yellow] Parámetros distintos a los del baseline: "
+                          "la comparación no es directa")
+        filas = comparar(resultado, baseline, args.tolerancia)
+        _imprimir_comparacion(filas, args.tolerancia)
+        regresiones = [f for f in filas if f["regresion"]]
+        if regresiones:
+            console.print(f"[bold red]{len(regresiones)} regresiones[/bold red]: " + ", ".join(
+                f"{f['fase']}.{f['metrica']}" for f in regresiones))
+    if errores:
+        console.print(f"[bold red]Fases con error:[/bold red] {', '.join(errores)}")
+    if errores or regresiones:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    with contextlib.suppress(KeyboardInterrupt):
+        main()
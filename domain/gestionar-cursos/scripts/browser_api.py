@@ -4,6 +4,11 @@ Browser API abstraction layer.
 Expone funciones que los scripts del skill usan para navegar.
 En entorno de agente (VS Code / OpenCode IDE) usa las tools inyectadas.
 En terminal fallback a Chrome DevTools Protocol via Selenium.
+
+Backends HTTP sin navegador (cookies de .moodle_session.json):
+  - set_request_mode(session): requests.Session síncrona.
+  - set_async_mode(session): httpx async con HTTP/2 y cientos de
+    requests en vuelo (navegador_async).
 """
 
 
@@ -26,7 +31,18 @@ def _agent_has_tool():
 
 _cdp_funcs = None
 _requests_funcs = None
+_async_funcs = None
 _use_requests = False
+_use_async = False
+
+# Claves comunes a todos los backends (mismo nombre de función en cada módulo)
+_FUNCIONES_HTTP = (
+    'navegar', 'obtener_url_actual', 'obtener_contenido', 'click', 'esperar_carga',
+    'encontrar_menus_cerrados', 'extraer_sidebar', 'extraer_texto_descripcion',
+    'extraer_instrucciones', 'extraer_links_materiales', 'extraer_criterios',
+    'extraer_nombre_unidad', 'hacer_get', 'extraer_filas_tabla', 'get_driver',
+    'abrir_popup_grid_y_obtener_html',
+)
 
 
 def set_request_mode(session):
@@ -37,6 +53,29 @@ def set_request_mode(session):
     _use_requests = True
 
 
+def set_async_mode(session, max_en_vuelo: int = 64):
+    """Activa el backend async (httpx) con las cookies de session.
+
+    Raises:
+        RuntimeError: si httpx no está instalado.
+    """
+    global _use_async
+    from navegador_async import configurar
+    configurar(session, max_en_vuelo=max_en_vuelo)
+    _use_async = True
+
+
+def _load_async():
+    global _async_funcs
+    if _async_funcs is not None:
+        return _async_funcs
+
+    import navegador_async
+    _async_funcs = {nombre: getattr(navegador_async, nombre) for nombre in _FUNCIONES_HTTP}
+    _async_funcs['obtener_cookies_browser'] = navegador_async.obtener_cookies
+    return _async_funcs
+
+
 def _load_requests():
     global _requests_funcs
     if _requests_funcs is not None:
@@ -137,7 +176,9 @@ def _load_cdp():
 
 
 def _get_func(name: str):
-    """Obtiene función de agente, requests o fallback CDP."""
+    """Obtiene función de agente, async, requests o fallback CDP."""
+    if _use_async:
+        return _load_async()[name]
     if _use_requests:
         return _load_requests()[name]
     if _agent_has_tool():
@@ -157,6 +198,8 @@ def _get_func(name: str):
 
 def get_navegador():
     """Retorna callable que navega a URL."""
+    if _use_async:
+        return _load_async()['navegar']
     if _use_requests:
         return _load_requests()['navegar']
     if _agent_has_tool():
@@ -227,15 +270,84 @@ def extraer_filas_tabla(html_content, header_text):
 
 def esta_usando_selenium():
     """True si estamos en modo terminal con CDP/Selenium."""
-    if _use_requests or _agent_has_tool():
+    if _use_requests or _use_async or _agent_has_tool():
         return False
     _load_cdp()
     return True
 
 
+def esta_usando_requests():
+    """True si hay un backend HTTP sin navegador activo (requests o async)."""
+    return _use_requests or _use_async
+
+
+def esta_usando_async():
+    """True si set_async_mode() activó el backend httpx async."""
+    return _use_async
+
+
+def obtener_pagina(url):
+    """Descarga una página sin cambiar la actual (solo backends HTTP).
+
+    Returns:
+        (url final, HTML)
+    """
+    if _use_async:
+        from navegador_async import obtener_pagina as _obtener
+    elif _use_requests:
+        from navegador_requests import obtener_pagina as _obtener
+    else:
+        raise RuntimeError("obtener_pagina solo disponible en modo requests/async")
+    return _obtener(url)
+
+
+def abrir_stream(url, headers=None):
+    """GET en streaming para descargar binarios por bloques (store_materiales).
+
+    Los backends HTTP usan la sesión requests (también en modo async);
+    CDP usa las cookies de Chrome.
+    """
+    if _use_async or _use_requests:
+        from navegador_requests import abrir_stream as _abrir
+    else:
+        from navegador_cdp import abrir_stream as _abrir
+    return _abrir(url, headers)
+
+
+def set_cdp_fast_mode(pestanas: int = 4):
+    """Activa el modo rápido de CDP: recursos pesados bloqueados, esperas por
+    eventos/selectores y `pestanas` pestañas simultáneas en obtener_paginas_cdp().
+    Debe llamarse antes de cualquier navegación. No aplica en otros modos.
+    """
+    if _use_requests or _use_async or _agent_has_tool():
+        return
+    from navegador_cdp import configurar_modo_rapido
+    configurar_modo_rapido(pestanas=pestanas)
+
+
+def cdp_fast_mode_activo() -> bool:
+    """True si set_cdp_fast_mode() está activo y el backend es CDP."""
+    if _use_requests or _use_async or _agent_has_tool():
+        return False
+    from navegador_cdp import modo_rapido_activo
+    return modo_rapido_activo()
+
+
+def obtener_paginas_cdp(urls):
+    """Carga varias URLs en pestañas simultáneas de Chrome (solo modo CDP).
+
+    Returns:
+        {url: (url final, HTML)} o {url: Exception} por pestaña fallida.
+    """
+    if _use_requests or _use_async or _agent_has_tool():
+        raise RuntimeError("obtener_paginas_cdp solo disponible en modo CDP/terminal")
+    from navegador_cdp import obtener_paginas
+    return obtener_paginas(list(urls))
+
+
 def get_driver():
     """Expone el driver Selenium directamente (solo modo CDP)."""
-    if _use_requests or _agent_has_tool():
+    if _use_requests or _use_async or _agent_has_tool():
         raise RuntimeError("get_driver solo disponible en modo CDP/terminal")
     return _load_cdp()['get_driver']()
 
@@ -245,7 +357,7 @@ def set_profile_dir(path: str):
     Configura directorio persistente para perfil de Chrome (solo modo CDP).
     Debe llamarse antes de cualquier navegación.
     """
-    if _use_requests or _agent_has_tool():
+    if _use_requests or _use_async or _agent_has_tool():
         return  # No aplica en modo requests o agente
     from navegador_cdp import set_profile_dir as _set
     _set(path)
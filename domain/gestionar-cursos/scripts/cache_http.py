@@ -0,0 +1,235 @@
+"""
+Caché HTTP persistente para las descargas de Moodle (modo requests).
+
+Un archivo SQLite en modo WAL, con clave = URL pedida:
+- `respuestas`: URL final, `ETag`, `Last-Modified`, tipo de contenido y
+  sha256 del cuerpo, con las horas de guardado y última validación.
+- `cuerpos`: cuerpos direccionados por sha256 (una página idéntica en
+  dos URLs se guarda una vez), zlib si reduce, expulsión LRU por tamaño.
+
+navegador_requests lo usa para enviar `If-None-Match`/`If-Modified-Since`
+y reutilizar el cuerpo guardado ante un 304; dentro del TTL (largo para
+`pluginfile.php`) ni siquiera pregunta al servidor.
+
+Uso:
+    from cache_http import abrir_cache_http
+
+    cache = abrir_cache_http(".http_cache")
+    entrada = cache.get(url)        # dict con etag, last_modified, body... o None
+    cache.put(url, url_final=..., etag=..., last_modified=..., body=b"...")
+    cache.stats()
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+DB_FILENAME = "http_cache.sqlite"
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS respuestas (
+    url TEXT PRIMARY KEY,
+    url_final TEXT NOT NULL,
+    etag TEXT NOT NULL DEFAULT '',
+    last_modified TEXT NOT NULL DEFAULT '',
+    content_type TEXT NOT NULL DEFAULT '',
+    encoding TEXT NOT NULL DEFAULT '',
+    sha256 TEXT NOT NULL,
+    guardado REAL NOT NULL,
+    validado REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_respuestas_sha ON respuestas(sha256);
+CREATE TABLE IF NOT EXISTS cuerpos (
+    sha256 TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    comprimido INTEGER NOT NULL DEFAULT 0,
+    bytes_original INTEGER NOT NULL,
+    bytes_guardado INTEGER NOT NULL,
+    ultimo_acceso REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cuerpos_acceso ON cuerpos(ultimo_acceso);
+CREATE TABLE IF NOT EXISTS contadores (
+    nombre TEXT PRIMARY KEY,
+    valor INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+_STORES: dict[str, "CacheHTTP"] = {}
+_STORES_LOCK = threading.Lock()
+
+
+class CacheHTTP:
+    """Store SQLite de respuestas HTTP con validadores y cuerpos por hash."""
+
+    def __init__(self, cache_dir: str, *, max_bytes: int = DEFAULT_MAX_BYTES):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, DB_FILENAME)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def get(self, url: str) -> dict | None:
+        """Entrada guardada para url (con `body` en bytes) o None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT r.url_final, r.etag, r.last_modified, r.content_type, r.encoding, "
+                "r.sha256, r.guardado, r.validado, c.body, c.comprimido "
+                "FROM respuestas r JOIN cuerpos c ON c.sha256 = r.sha256 WHERE r.url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        (url_final, etag, last_modified, content_type, encoding,
+         sha256, guardado, validado, blob, comprimido) = row
+        return {
+            "url": url, "url_final": url_final, "etag": etag,
+            "last_modified": last_modified, "content_type": content_type,
+            "encoding": encoding, "sha256": sha256, "guardado": guardado,
+            "validado": validado,
+            "body": zlib.decompress(blob) if comprimido else bytes(blob),
+        }
+
+    def put(
+        self,
+        url: str,
+        *,
+        url_final: str,
+        body: bytes,
+        etag: str = "",
+        last_modified: str = "",
+        content_type: str = "",
+        encoding: str = "",
+    ) -> str:
+        """Guarda (o reemplaza) la respuesta de url. Devuelve el sha256 del cuerpo."""
+        sha256 = hashlib.sha256(body).hexdigest()
+        blob, comprimido = _codificar(body)
+        ahora = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO cuerpos (sha256, body, comprimido, bytes_original, "
+                "bytes_guardado, ultimo_acceso) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(sha256) DO UPDATE SET ultimo_acceso = excluded.ultimo_acceso",
+                (sha256, blob, comprimido, len(body), len(blob), ahora),
+            )
+            anterior = self._conn.execute(
+                "SELECT sha256 FROM respuestas WHERE url = ?", (url,),
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO respuestas (url, url_final, etag, last_modified, "
+                "content_type, encoding, sha256, guardado, validado) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, url_final, etag, last_modified, content_type, encoding,
+                 sha256, ahora, ahora),
+            )
+            if anterior and anterior[0] != sha256:
+                self._borrar_huerfano(anterior[0])
+            self._expulsar()
+            self._conn.commit()
+        return sha256
+
+    def tocar(self, url: str) -> None:
+        """Marca la entrada como recién validada (tras un 304)."""
+        ahora = time.time()
+        with self._lock:
+            self._conn.execute("UPDATE respuestas SET validado = ? WHERE url = ?", (ahora, url))
+            self._conn.execute(
+                "UPDATE cuerpos SET ultimo_acceso = ? WHERE sha256 = "
+                "(SELECT sha256 FROM respuestas WHERE url = ?)",
+                (ahora, url),
+            )
+            self._conn.commit()
+
+    def contar(self, nombre: str, delta: int = 1) -> None:
+        """Suma a un contador (frescas, revalidadas, descargadas, bytes_ahorrados)."""
+        with self._lock:
+            self._incrementar(nombre, delta)
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """Entradas, tamaños y contadores de uso del store."""
+        with self._lock:
+            (respuestas,) = self._conn.execute("SELECT COUNT(*) FROM respuestas").fetchone()
+            cuerpos, original, guardado = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(bytes_original), 0), "
+                "COALESCE(SUM(bytes_guardado), 0) FROM cuerpos"
+            ).fetchone()
+            contadores = dict(self._conn.execute("SELECT nombre, valor FROM contadores"))
+        return {
+            "path": self.path,
+            "respuestas": respuestas,
+            "cuerpos": cuerpos,
+            "bytes_original": original,
+            "bytes_guardado": guardado,
+            "frescas": contadores.get("frescas", 0),
+            "revalidadas": contadores.get("revalidadas", 0),
+            "descargadas": contadores.get("descargadas", 0),
+            "bytes_ahorrados": contadores.get("bytes_ahorrados", 0),
+            "expulsadas": contadores.get("expulsadas", 0),
+            "max_bytes": self.max_bytes,
+        }
+
+    def close(self) -> None:
+        """Cierra la conexión (hace checkpoint del WAL)."""
+        with self._lock:
+            self._conn.close()
+
+    def _incrementar(self, nombre: str, delta: int) -> None:
+        self._conn.execute(
+            "INSERT INTO contadores (nombre, valor) VALUES (?, ?) "
+            "ON CONFLICT(nombre) DO UPDATE SET valor = valor + excluded.valor",
+            (nombre, delta),
+        )
+
+    def _borrar_huerfano(self, sha256: str) -> None:
+        (usos,) = self._conn.execute(
+            "SELECT COUNT(*) FROM respuestas WHERE sha256 = ?", (sha256,),
+        ).fetchone()
+        if not usos:
+            self._conn.execute("DELETE FROM cuerpos WHERE sha256 = ?", (sha256,))
+
+    def _expulsar(self) -> None:
+        """Expulsa cuerpos menos usados recientemente hasta caber en max_bytes."""
+        (total,) = self._conn.execute(
+            "SELECT COALESCE(SUM(bytes_guardado), 0) FROM cuerpos"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+        exceso = total - self.max_bytes
+        expulsados = []
+        for sha256, tam in self._conn.execute(
+            "SELECT sha256, bytes_guardado FROM cuerpos ORDER BY ultimo_acceso ASC"
+        ).fetchall():
+            if exceso <= 0:
+                break
+            expulsados.append((sha256,))
+            exceso -= tam
+        self._conn.executemany("DELETE FROM respuestas WHERE sha256 = ?", expulsados)
+        self._conn.executemany("DELETE FROM cuerpos WHERE sha256 = ?", expulsados)
+        self._incrementar("expulsadas", len(expulsados))
+
+
+def abrir_cache_http(cache_dir: str, **kwargs) -> CacheHTTP:
+    """Devuelve el store de cache_dir (uno por directorio y proceso)."""
+    key = os.path.abspath(cache_dir)
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            store = CacheHTTP(cache_dir, **kwargs)
+            _STORES[key] = store
+        return store
+
+
+def _codificar(body: bytes) -> tuple[bytes, int]:
+    """zlib solo si realmente reduce (los PDF/ZIP de pluginfile no comprimen)."""
+    comprimido = zlib.compress(body, 6)
+    if len(comprimido) < len(body):
+        return comprimido, 1
+    return body, 0
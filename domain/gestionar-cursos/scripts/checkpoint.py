@@ -2,31 +2,204 @@
 Checkpoint para extracción de cursos.
 
 Guarda progreso parcial en disco para poder reanudar si la sesión expira.
+
+Formato:
+- `.progress.json`: estado base (actividades pendientes, completadas,
+  info/PGA del curso). Se escribe al crear el checkpoint y al compactar,
+  de forma atómica.
+- `.progress.<worker>.journal`: una línea JSON por actividad completada o
+  fallida, solo agregando al final. Cada proceso escribe su propio
+  journal (los hilos comparten el del proceso), así varios workers
+  registran progreso del mismo curso sin pisarse. Las líneas se vacían
+  al SO en cada evento y el fsync se agrupa (FSYNC_CADA / FSYNC_SEGUNDOS).
+
+load_checkpoint() reconstruye el estado reproduciendo los journals sobre
+la base (una línea truncada por un corte se ignora) y compact_checkpoint()
+los funde en `.progress.json` al terminar.
 """
 
+import atexit
+import contextlib
 import json
+import os
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
+from file_lock import lockfile
+
 CHECKPOINT_FILENAME = ".progress.json"
+JOURNAL_GLOB = ".progress.*.journal"
+FSYNC_CADA = 32  # eventos entre fsync
+FSYNC_SEGUNDOS = 2.0  # máximo entre fsync con eventos pendientes
+
+_journals: dict[str, "Journal"] = {}
+_journals_lock = threading.Lock()
+_checkpoint_lock = threading.Lock()  # record_* modifican el dict compartido por hilos
+
+
+class Journal:
+    """Journal de progreso de un curso para este proceso (thread-safe)."""
+
+    def __init__(self, course_dir: str, worker: str = "", *,
+                 fsync_cada: int = FSYNC_CADA, fsync_segundos: float = FSYNC_SEGUNDOS):
+        self.path = Path(course_dir) / f".progress.{worker or os.getpid()}.journal"
+        self.fsync_cada = fsync_cada
+        self.fsync_segundos = fsync_segundos
+        self._lock = threading.Lock()
+        self._f = None
+        self._sin_fsync = 0
+        self._ultimo_fsync = time.monotonic()
+
+    def done(self, activity: dict, result_path: str) -> None:
+        """Registra una actividad completada."""
+        self._escribir({"evento": "done", "activity": activity, "result_path": result_path})
+
+    def failed(self, activity: dict, error: str) -> float:
+        """Registra un intento fallido (la actividad sigue pendiente)."""
+        return self._escribir({"evento": "failed", "activity": activity, "error": error})
+
+    def _escribir(self, evento: dict) -> float:
+        evento["t"] = time.time()
+        linea = json.dumps(evento, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._f is None:
+                self._f = open(self.path, "a", encoding="utf-8")  # noqa: SIM115
+            self._f.write(linea)
+            self._f.flush()
+            self._sin_fsync += 1
+            if (self._sin_fsync >= self.fsync_cada
+                    or time.monotonic() - self._ultimo_fsync >= self.fsync_segundos):
+                self._fsync()
+        return evento["t"]
+
+    def _fsync(self) -> None:
+        os.fsync(self._f.fileno())
+        self._sin_fsync = 0
+        self._ultimo_fsync = time.monotonic()
+
+    def close(self) -> None:
+        """Hace fsync de lo pendiente y cierra el archivo."""
+        with self._lock:
+            if self._f is not None:
+                self._f.flush()
+                if self._sin_fsync:
+                    self._fsync()
+                self._f.close()
+                self._f = None
+
+
+def open_journal(course_dir: str) -> Journal:
+    """Journal de este proceso para el curso (uno compartido por todos sus hilos)."""
+    clave = os.path.abspath(course_dir)
+    with _journals_lock:
+        journal = _journals.get(clave)
+        if journal is None:
+            journal = _journals[clave] = Journal(course_dir)
+        return journal
+
+
+def _close_journal(course_dir: str) -> None:
+    with _journals_lock:
+        journal = _journals.pop(os.path.abspath(course_dir), None)
+    if journal is not None:
+        journal.close()
+
+
+@atexit.register
+def _close_all() -> None:
+    for clave in list(_journals):
+        _close_journal(clave)
+
+
+def _leer_eventos(course_dir: str) -> list[dict]:
+    """Eventos de todos los journals del curso, en orden de tiempo."""
+    eventos = []
+    for path in Path(course_dir).glob(JOURNAL_GLOB):
+        with open(path, encoding="utf-8") as f:
+            for linea in f:
+                try:
+                    eventos.append(json.loads(linea))
+                except ValueError:
+                    continue  # línea a medio escribir por un corte
+    eventos.sort(key=lambda e: e.get("t", 0))
+    return eventos
 
 
 def load_checkpoint(course_dir: str) -> dict[str, Any] | None:
-    """Carga checkpoint si existe."""
+    """Carga checkpoint si existe, con los journals aplicados sobre la base.
+
+    Las actividades fallidas vuelven a pending para reintentarse.
+    """
     path = Path(course_dir) / CHECKPOINT_FILENAME
     if not path.exists():
         return None
     with open(path, encoding="utf-8") as f:
-        return json.load(f)
+        checkpoint = json.load(f)
+
+    completadas = {a.get("url") for a in checkpoint["completed"]}
+    fallidas = checkpoint.setdefault("failed", {})
+    for evento in _leer_eventos(course_dir):
+        activity = evento.get("activity") or {}
+        url = activity.get("url")
+        if url in completadas:
+            continue
+        if evento.get("evento") == "done":
+            completadas.add(url)
+            fallidas.pop(url, None)
+            checkpoint["completed"].append({
+                **activity,
+                "result_path": evento.get("result_path", ""),
+                "completed_at": datetime.fromtimestamp(evento.get("t", 0)).isoformat(),
+            })
+        elif evento.get("evento") == "failed":
+            fallo = fallidas.setdefault(url, {"activity": activity, "intentos": 0})
+            if evento.get("t", 0) > fallo.get("t", 0):  # ya contado si la base es posterior
+                fallo.update(intentos=fallo["intentos"] + 1, error=evento.get("error", ""),
+                             t=evento.get("t", 0))
+
+    pending = [a for a in checkpoint["pending"] if a.get("url") not in completadas]
+    en_pending = {a.get("url") for a in pending}
+    pending += [f["activity"] for url, f in fallidas.items()
+                if url not in en_pending and url not in completadas and f.get("activity")]
+    checkpoint["pending"] = pending
+    return checkpoint
 
 
 def save_checkpoint(course_dir: str, checkpoint: dict[str, Any]) -> None:
-    """Guarda checkpoint en disco."""
+    """Guarda el estado base en disco (atómico).
+
+    Los journals se conservan: reproducir un evento ya incluido en la base
+    no cambia nada, así que otro worker no pierde lo que registró.
+    """
     path = Path(course_dir) / CHECKPOINT_FILENAME
     checkpoint["timestamp"] = datetime.now().isoformat()
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(checkpoint, f, indent=2, ensure_ascii=False)
+    tmp = path.with_name(f"{CHECKPOINT_FILENAME}.{os.getpid()}.tmp")
+    with lockfile(str(path) + ".lock"):
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, path)
+
+
+def compact_checkpoint(course_dir: str) -> dict[str, Any] | None:
+    """Funde los journals en `.progress.json` y los borra.
+
+    Llamar al terminar, cuando ningún otro proceso sigue registrando
+    progreso del curso (el journal de este proceso se cierra antes).
+    """
+    _close_journal(course_dir)
+    path = Path(course_dir) / CHECKPOINT_FILENAME
+    with lockfile(str(path) + ".compact.lock"):
+        checkpoint = load_checkpoint(course_dir)
+        if checkpoint is None:
+            return None
+        save_checkpoint(course_dir, checkpoint)
+        for journal in Path(course_dir).glob(JOURNAL_GLOB):
+            with contextlib.suppress(OSError):
+                journal.unlink()
+    return checkpoint
 
 
 def create_checkpoint(course_url: str, course_code: str, activities: list[dict]) -> dict[str, Any]:
@@ -36,34 +209,61 @@ def create_checkpoint(course_url: str, course_code: str, activities: list[dict])
         "course_code": course_code,
         "phase": "detail_extraction",
         "completed": [],
-        "pending": activities,
+        "pending": list(activities),
+        "failed": {},
         "timestamp": datetime.now().isoformat(),
     }
 
 
-def mark_done(checkpoint: dict[str, Any], activity: dict, result_path: str) -> dict[str, Any]:
+def mark_done(checkpoint: dict[str, Any], activity: dict, result_path: str, *,
+              completed_at: str = "") -> dict[str, Any]:
     """Marca una actividad como completada y la mueve de pending a completed."""
-    # Remover de pending
-    checkpoint["pending"] = [
-        a for a in checkpoint["pending"]
-        if a.get("url") != activity.get("url")
-    ]
-    # Agregar a completed
+    pending = checkpoint["pending"]
+    # El caso normal es la primera pendiente: evitar recorrer toda la lista
+    if pending and pending[0].get("url") == activity.get("url"):
+        pending.pop(0)
+    else:
+        checkpoint["pending"] = [a for a in pending if a.get("url") != activity.get("url")]
     checkpoint["completed"].append({
         **activity,
         "result_path": result_path,
-        "completed_at": datetime.now().isoformat(),
+        "completed_at": completed_at or datetime.now().isoformat(),
     })
     return checkpoint
 
 
+def record_done(course_dir: str, checkpoint: dict[str, Any], activity: dict,
+                result_path: str) -> dict[str, Any]:
+    """mark_done() en memoria + una línea en el journal del proceso."""
+    open_journal(course_dir).done(activity, result_path)
+    with _checkpoint_lock:
+        checkpoint.get("failed", {}).pop(activity.get("url"), None)
+        return mark_done(checkpoint, activity, result_path)
+
+
+def record_failed(course_dir: str, checkpoint: dict[str, Any], activity: dict,
+                  error: str) -> dict[str, Any]:
+    """Registra un fallo: la actividad sale de pending en esta corrida y se
+    reintenta al reanudar (load_checkpoint la deja pendiente)."""
+    t = open_journal(course_dir).failed(activity, error)
+    with _checkpoint_lock:
+        fallo = checkpoint.setdefault("failed", {}).setdefault(
+            activity.get("url"), {"activity": activity, "intentos": 0})
+        fallo.update(intentos=fallo["intentos"] + 1, error=error, t=t)
+        checkpoint["pending"] = [a for a in checkpoint["pending"]
+                                 if a.get("url") != activity.get("url")]
+    return checkpoint
+
+
 def has_checkpoint(course_dir: str) -> bool:
     """Verifica si existe un checkpoint."""
     return (Path(course_dir) / CHECKPOINT_FILENAME).exists()
 
 
 def clear_checkpoint(course_dir: str) -> None:
-    """Elimina el checkpoint (ej: al finalizar exitosamente)."""
-    path = Path(course_dir) / CHECKPOINT_FILENAME
-    if path.exists():
-        path.unlink()
+    """Elimina el checkpoint y sus journals (ej: al finalizar exitosamente)."""
+    _close_journal(course_dir)
+    for path in [Path(course_dir) / CHECKPOINT_FILENAME,
+                 *Path(course_dir).glob(JOURNAL_GLOB)]:
+        if path.exists():
+            path.unlink()
@@ -0,0 +1,198 @@
+"""
+Fragmentación de textos largos por tokens estimados y fronteras naturales.
+
+Reemplaza el corte por offsets de caracteres: divide primero por headings
+markdown, luego por párrafos, oraciones y palabras, y empaqueta las piezas
+hasta el presupuesto de tokens del modelo. Como ningún chunk corta una
+palabra ni una tabla, no hace falta overlap (que se facturaba dos veces).
+
+El presupuesto sale del `context_length` del modelo en el catálogo de
+analyze-model (`fetch_models.py --output catalog.json`), configurado en
+openrouter.json como `model_catalog`.
+
+Uso:
+    from chunking import planear_chunks
+
+    plan = planear_chunks(texto, max_tokens=7000)
+    for chunk in plan["chunks"]:
+        ...
+"""
+
+import json
+import math
+import os
+import re
+
+CHARS_PER_TOKEN = 3.5  # español: algo menos que los ~4 del inglés
+MARGEN_CONTEXTO = 0.05  # reserva para formato de mensajes / error de estimación
+
+# Parámetros del splitter por caracteres anterior; solo para el reporte
+# de ahorro (requests y tokens de overlap que ya no se envían).
+MAX_CHARS_LEGADO = 8000
+OVERLAP_LEGADO_CHARS = 500
+
+_CONTEXT_LENGTHS: dict[str, dict[str, int]] = {}
+
+_HEADING_RE = re.compile(r"(?m)^(?=#{1,6}\s)")
+_PARRAFO_RE = re.compile(r".*?(?:\n[ \t]*\n\s*|$)", re.S)
+_ORACION_RE = re.compile(r".*?(?:[.!?…](?=\s)\s*|\n\s*|$)", re.S)
+_PALABRA_RE = re.compile(r"\S+\s*|\s+")
+
+
+def estimar_tokens(texto: str, chars_per_token: float = CHARS_PER_TOKEN) -> int:
+    """Estima tokens de un texto (heurística por caracteres, sin tokenizer)."""
+    if not texto:
+        return 0
+    return math.ceil(len(texto) / chars_per_token)
+
+
+def cargar_context_length(modelo: str, catalog_path: str) -> int | None:
+    """Busca el context_length de un modelo en el catálogo de analyze-model.
+
+    El catálogo se lee una sola vez por ruta. Los sufijos de variante
+    (`:free`, `:nitro`) se ignoran si el id exacto no aparece.
+
+    Returns:
+        Tokens de contexto, o None si no hay catálogo o el modelo no figura.
+    """
+    if not catalog_path or not modelo:
+        return None
+    if catalog_path not in _CONTEXT_LENGTHS:
+        indice: dict[str, int] = {}
+        if os.path.isfile(catalog_path):
+            try:
+                with open(catalog_path, encoding="utf-8") as f:
+                    modelos = json.load(f)
+                for m in modelos:
+                    if m.get("id") and m.get("context_length"):
+                        indice[m["id"]] = int(m["context_length"])
+            except (OSError, ValueError, TypeError, AttributeError) as e:
+                print(f"[WARN] Catálogo de modelos ilegible ({catalog_path}): {e}")
+        _CONTEXT_LENGTHS[catalog_path] = indice
+
+    indice = _CONTEXT_LENGTHS[catalog_path]
+    return indice.get(modelo) or indice.get(modelo.split(":")[0])
+
+
+def presupuesto_tokens(
+    context_length: int | None,
+    *,
+    max_output: int,
+    system_prompt: str = "",
+    max_chunk_tokens: int | None = None,
+) -> int:
+    """Tokens de entrada disponibles por chunk.
+
+    Descuenta del contexto la salida reservada (max_tokens), el system
+    prompt y un margen. max_chunk_tokens acota el resultado: para perfiles
+    que reescriben el texto completo, la salida debe caber en max_tokens.
+    """
+    limites = []
+    if context_length:
+        disponible = (
+            context_length * (1 - MARGEN_CONTEXTO)
+            - max_output
+            - estimar_tokens(system_prompt)
+        )
+        limites.append(int(disponible))
+    if max_chunk_tokens:
+        limites.append(int(max_chunk_tokens))
+    if not limites:
+        limites.append(math.floor(MAX_CHARS_LEGADO / CHARS_PER_TOKEN))
+    return max(1, min(limites))
+
+
+def dividir_texto(
+    texto: str,
+    max_tokens: int,
+    chars_per_token: float = CHARS_PER_TOKEN,
+) -> list[str]:
+    """Divide texto en chunks de hasta max_tokens sin cortar palabras.
+
+    Prefiere fronteras de mayor nivel: headings > párrafos > oraciones >
+    palabras. Solo corta por caracteres una "palabra" más larga que el
+    presupuesto completo (ej: una URL o base64 gigante).
+    """
+    if not texto:
+        return []
+    chunks = _empaquetar(texto, max_tokens, chars_per_token, nivel=0)
+    return [c for c in chunks if c.strip()]
+
+
+def planear_chunks(
+    texto: str,
+    *,
+    max_tokens: int,
+    chars_per_token: float = CHARS_PER_TOKEN,
+) -> dict:
+    """Divide texto y calcula el ahorro frente al splitter por caracteres.
+
+    Returns:
+        Dict con chunks, tokens_estimados, max_tokens, chunks_legado
+        (requests que habría hecho el splitter anterior) y
+        overlap_tokens_ahorrados.
+    """
+    chunks = dividir_texto(texto, max_tokens, chars_per_token)
+    paso_legado = MAX_CHARS_LEGADO - OVERLAP_LEGADO_CHARS
+    chunks_legado = max(1, math.ceil(len(texto) / paso_legado)) if texto else 0
+    overlap_legado = max(0, chunks_legado - 1) * estimar_tokens(
+        "x" * OVERLAP_LEGADO_CHARS, chars_per_token,
+    )
+    return {
+        "chunks": chunks,
+        "tokens_estimados": estimar_tokens(texto, chars_per_token),
+        "max_tokens": max_tokens,
+        "chunks_legado": chunks_legado,
+        "overlap_tokens_ahorrados": overlap_legado,
+    }
+
+
+def _segmentar(texto: str, nivel: int) -> list[str]:
+    """Parte texto en piezas contiguas (sin pérdida) según el nivel."""
+    if nivel == 0:
+        piezas = _HEADING_RE.split(texto)
+    elif nivel == 1:
+        piezas = _PARRAFO_RE.findall(texto)
+    elif nivel == 2:
+        piezas = _ORACION_RE.findall(texto)
+    else:
+        piezas = _PALABRA_RE.findall(texto)
+    return [p for p in piezas if p]
+
+
+def _empaquetar(
+    texto: str,
+    max_tokens: int,
+    chars_per_token: float,
+    nivel: int,
+) -> list[str]:
+    """Empaqueta piezas de un nivel hasta max_tokens; baja de nivel si no caben."""
+    if estimar_tokens(texto, chars_per_token) <= max_tokens:
+        return [texto]
+
+    if nivel > 3:
+        max_chars = max(1, int(max_tokens * chars_per_token))
+        return [texto[i:i + max_chars] for i in range(0, len(texto), max_chars)]
+
+    piezas = _segmentar(texto, nivel)
+    if len(piezas) <= 1:
+        return _empaquetar(texto, max_tokens, chars_per_token, nivel + 1)
+
+    chunks: list[str] = []
+    actual = ""
+    for pieza in piezas:
+        if estimar_tokens(actual + pieza, chars_per_token) <= max_tokens:
+            actual += pieza
+            continue
+        if actual:
+            chunks.append(actual)
+            actual = ""
+        if estimar_tokens(pieza, chars_per_token) <= max_tokens:
+            actual = pieza
+        else:
+            sub = _empaquetar(pieza, max_tokens, chars_per_token, nivel + 1)
+            chunks.extend(sub[:-1])
+            actual = sub[-1]
+    if actual:
+        chunks.append(actual)
+    return chunks
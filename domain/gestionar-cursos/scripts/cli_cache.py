@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+CLI cache: /gestionar-cursos cache stats <CARPETA>
+
+Muestra estadísticas del caché LLM (`_cache/llm_cache.sqlite`): entradas,
+tamaño, hit ratio, bytes servidos desde caché y ahorro por compresión.
+<CARPETA> puede ser un curso, su `_cache/` o un período completo (suma
+todos los cursos que encuentre). Con --global muestra el caché compartido
+entre cursos y qué documentos reutilizó cada curso.
+
+Solo lee: abre cada store en solo lectura (no importa los `.json`
+heredados ni expulsa entradas).
+
+Uso:
+    uv run python cli_cache.py stats "C:/.../2026-2-B1"
+    uv run python cli_cache.py stats "C:/.../2026-2-B1/<curso>"
+    uv run python cli_cache.py stats --global
+"""
+
+import argparse
+import os
+import sys
+
+from rich.console import Console
+from rich.table import Table
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from llm_cache import DB_FILENAME, LEGACY_RE, abrir_cache_lectura
+
+console = Console()
+
+
+def descubrir_caches(carpeta: str) -> list[str]:
+    """Directorios con llm_cache.sqlite o .json heredados bajo carpeta.
+
+    Busca en carpeta, carpeta/_cache y <curso>/_cache de cada subcarpeta.
+    """
+    candidatos = [carpeta, os.path.join(carpeta, "_cache")]
+    if os.path.isdir(carpeta):
+        for nombre in sorted(os.listdir(carpeta)):
+            candidatos.append(os.path.join(carpeta, nombre, "_cache"))
+
+    encontrados = []
+    for ruta in candidatos:
+        if not os.path.isdir(ruta) or ruta in encontrados:
+            continue
+        if os.path.isfile(os.path.join(ruta, DB_FILENAME)) or _tiene_legado(ruta):
+            encontrados.append(ruta)
+    return encontrados
+
+
+def _tiene_legado(ruta: str) -> bool:
+    return _contar_legado(ruta) > 0
+
+
+def _contar_legado(ruta: str) -> int:
+    return sum(1 for n in os.listdir(ruta) if LEGACY_RE.match(n))
+
+
+def _fmt_bytes(n: float) -> str:
+    for unidad in ("B", "KB", "MB"):
+        if abs(n) < 1024:
+            return f"{n:.0f} {unidad}" if unidad == "B" else f"{n:.1f} {unidad}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+
+def _etiqueta(ruta_cache: str) -> str:
+    """Nombre del curso dueño del _cache (o la ruta si no aplica)."""
+    ruta = os.path.abspath(ruta_cache)
+    if os.path.basename(ruta) == "_cache":
+        return os.path.basename(os.path.dirname(ruta))
+    return ruta
+
+
+def cmd_stats(carpeta: str) -> int:
+    """Imprime estadísticas por caché y totales."""
+    from openrouter_client import opciones_cache
+
+    caches = descubrir_caches(carpeta)
+    if not caches:
+        console.print(f"[yellow]Sin caché LLM en[/yellow] {carpeta}")
+        return 1
+
+    tabla = Table(title="Caché LLM")
+    for col in ("Curso", "Entradas", "Tamaño", "Hits", "Misses", "Hit ratio",
+                "Servido", "Ahorro zlib", "Expulsadas"):
+        tabla.add_column(col, justify="left" if col == "Curso" else "right")
+
+    totales = {"entradas": 0, "bytes_guardado": 0, "hits": 0, "misses": 0,
+               "bytes_servidos": 0, "bytes_ahorrados_compresion": 0, "expulsadas": 0}
+    legado = 0
+    opciones = opciones_cache()
+    for ruta in caches:
+        store = abrir_cache_lectura(ruta, **opciones)
+        try:
+            st = store.stats()
+        finally:
+            store.close()
+        legado += _contar_legado(ruta)
+        for k in totales:
+            totales[k] += st[k]
+        tabla.add_row(
+            _etiqueta(ruta), str(st["entradas"]), _fmt_bytes(st["bytes_guardado"]),
+            str(st["hits"]), str(st["misses"]), f"{st['hit_ratio']:.0%}",
+            _fmt_bytes(st["bytes_servidos"]), _fmt_bytes(st["bytes_ahorrados_compresion"]),
+            str(st["expulsadas"]),
+        )
+
+    if len(caches) > 1:
+        consultas = totales["hits"] + totales["misses"]
+        ratio = totales["hits"] / consultas if consultas else 0.0
+        tabla.add_row(
+            "[bold]Total[/bold]", str(totales["entradas"]),
+            _fmt_bytes(totales["bytes_guardado"]), str(totales["hits"]),
+            str(totales["misses"]), f"{ratio:.0%}", _fmt_bytes(totales["bytes_servidos"]),
+            _fmt_bytes(totales["bytes_ahorrados_compresion"]), str(totales["expulsadas"]),
+        )
+
+    console.print(tabla)
+    console.print("[dim]Servido = bytes de respuestas entregadas desde caché "
+                  "(no re-solicitadas al API).[/dim]")
+    if legado:
+        console.print(f"[dim]{legado} entradas .json heredadas sin importar "
+                      f"(se importan la próxima vez que se use el caché).[/dim]")
+    return 0
+
+
+def cmd_stats_global() -> int:
+    """Imprime estadísticas del caché global y las entradas compartidas."""
+    from openrouter_client import dir_cache_global, opciones_cache
+
+    global_dir = dir_cache_global()
+    if global_dir is None:
+        console.print("[yellow]Caché global desactivado[/yellow] "
+                      "(cache.global en openrouter.json)")
+        return 1
+
+    store = abrir_cache_lectura(global_dir, **opciones_cache(global_=True))
+    st = store.stats()
+    console.print(f"[bold]Caché global:[/bold] {st['path']}")
+    console.print(f"  Entradas: {st['entradas']} ({_fmt_bytes(st['bytes_guardado'])}), "
+                  f"hit ratio {st['hit_ratio']:.0%} ({st['hits']}/{st['hits'] + st['misses']})")
+    console.print(f"  Servido desde caché: {_fmt_bytes(st['bytes_servidos'])} · "
+                  f"compartidas entre cursos: {st['compartidas']}")
+
+    compartidas = store.reutilizadas()
+    if compartidas:
+        tabla = Table(title="Entradas reutilizadas entre cursos")
+        for col in ("Clave", "Cursos", "Reusos", "Tamaño", "Cursos que la usan"):
+            tabla.add_column(col)
+        for e in compartidas:
+            tabla.add_row(e["key"][:12], str(e["cursos"]), str(e["usos"]),
+                          _fmt_bytes(e["bytes"]), e["lista_cursos"])
+        console.print(tabla)
+    store.close()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Utilidades del caché LLM")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_stats = sub.add_parser("stats", help="Hit ratio, tamaño y bytes ahorrados")
+    p_stats.add_argument("carpeta", nargs="?",
+                         help="Curso, su _cache/ o carpeta de período")
+    p_stats.add_argument("--global", dest="global_", action="store_true",
+                         help="Caché compartido entre cursos y su procedencia")
+    args = parser.parse_args()
+
+    if args.comando == "stats":
+        if args.global_:
+            sys.exit(cmd_stats_global())
+        if not args.carpeta:
+            parser.error("stats requiere <carpeta> o --global")
+        sys.exit(cmd_stats(args.carpeta))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,14 @@ CLI calificaciones: extraer calificaciones del gradebook de Moodle.
 Uso:
     uv run python cli_calificaciones.py <CARPETA_CURSO>
     uv run python cli_calificaciones.py <CARPETA_CURSO> --dry-run
+    uv run python cli_calificaciones.py <CARPETA_CURSO> --cdp-rapido
+    uv run python cli_calificaciones.py <CARPETA_CURSO> --requests
+    uv run python cli_calificaciones.py <CARPETA_PERIODO> --workers 6
+
+Con `--requests` (o una carpeta de periodo, que lo implica) no abre Chrome:
+descarga los gradebooks con las cookies de `.moodle_session.json`, todos
+los cursos del periodo en paralelo, y al final imprime el tiempo de
+descarga y de proceso de cada curso.
 
 Hace:
 1. Verifica sesión Moodle (vía browser_api / navegador_cdp)
@@ -32,6 +40,8 @@ import json
 import os
 import re
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
@@ -44,13 +54,23 @@ from rich.table import Table
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from _parsing import _parse_porcentaje
-from navegador_cdp import get_driver
+from navegador_cdp import (
+    bloquear_recursos,
+    configurar_modo_rapido,
+    esperar_pagina,
+    get_driver,
+    modo_rapido_activo,
+)
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 
 console = Console()
 
+URL_MOODLE = "https://aulavirtual.uniremington.edu.co"
+URL_GRADEBOOK = URL_MOODLE + "/grade/report/user/index.php?id={courseid}"
+DEFAULT_WORKERS = 4  # cursos descargados a la vez en modo requests
+
 # Ruta al chromedriver cacheado por selenium-manager
 _CHROMEDRIVER = (
     "/Users/andres.rendon/.cache/selenium/chromedriver/"
@@ -94,16 +114,19 @@ def _abrir_driver_cdp() -> "webdriver.Chrome":
     opts = Options()
     opts.add_experimental_option("debuggerAddress", "localhost:9222")
     opts.add_argument("--disable-blink-features=AutomationControlled")
+    if modo_rapido_activo():
+        opts.page_load_strategy = "eager"
     service = Service(executable_path=_CHROMEDRIVER)
     from selenium import webdriver
-    return webdriver.Chrome(service=service, options=opts)
+    driver = webdriver.Chrome(service=service, options=opts)
+    bloquear_recursos(driver)
+    return driver
 
 
 def _verificar_sesion(driver) -> bool:
     """Verifica que la sesión Moodle esté activa."""
-    from time import sleep
     driver.get("https://aulavirtual.uniremington.edu.co/my/")
-    sleep(2)
+    esperar_pagina(driver)
     if "login/index.php" in driver.current_url:
         return False
     body = driver.find_element(By.TAG_NAME, "body").text
@@ -130,18 +153,31 @@ def _courseid_desde_sitemap(ruta_curso: str) -> str:
 
 def _descargar_gradebook(driver, courseid: str) -> str:
     """Navega al gradebook del usuario y devuelve HTML."""
-    from time import sleep
-    url = (
-        f"https://aulavirtual.uniremington.edu.co/grade/report/user/"
-        f"index.php?id={courseid}"
-    )
-    driver.get(url)
-    sleep(3)
+    inicio = time.monotonic()
+    driver.get(URL_GRADEBOOK.format(courseid=courseid))
+    esperar_pagina(driver, "table.user-grade")
+    console.print(f"[dim][CDP] gradebook en {time.monotonic() - inicio:.2f}s[/dim]")
     if "login/index.php" in driver.current_url:
         raise RuntimeError("Sesión expirada. Inicia sesión en Moodle primero.")
     return driver.page_source
 
 
+def _verificar_sesion_requests() -> bool:
+    """Verifica con las cookies guardadas que la sesión Moodle esté activa."""
+    from navegador_requests import obtener_pagina
+    url_final, html = obtener_pagina(URL_MOODLE + "/my/")
+    return "login/index.php" not in url_final and "Usted no se ha identificado" not in html
+
+
+def _descargar_gradebook_requests(courseid: str) -> str:
+    """Descarga el gradebook del usuario sin navegador y devuelve HTML."""
+    from navegador_requests import obtener_pagina
+    url_final, html = obtener_pagina(URL_GRADEBOOK.format(courseid=courseid))
+    if "login/index.php" in url_final:
+        raise RuntimeError("Sesión expirada. Inicia sesión en Moodle primero.")
+    return html
+
+
 def _parsear_gradebook(html: str) -> list[dict]:
     """Parsea el HTML del gradebook y devuelve lista de items."""
     soup = BeautifulSoup(html, "html.parser")
@@ -444,18 +480,205 @@ def _imprimir_resumen(items: list[dict]):
     )
 
 
+def _persistir_calificaciones(ruta_curso: str, courseid: str, html: str,
+                              items: list[dict]) -> tuple[int, list[str]]:
+    """Escribe el HTML crudo, el JSON, las secciones .md y el snapshot del curso.
+
+    Returns:
+        (archivos .md actualizados, nombres de items sin .md)
+    """
+    cache_dir = os.path.join(ruta_curso, "_cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    # Guardar HTML crudo para auditoría
+    with open(os.path.join(cache_dir, f"gradebook_{courseid}.html"), "w", encoding="utf-8") as f:
+        f.write(html)
+
+    json_path = os.path.join(cache_dir, f"calificaciones_{courseid}.json")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(items, f, indent=2, ensure_ascii=False)
+
+    # Actualizar .md de actividades
+    actualizados = 0
+    sin_md = []
+    for item in items:
+        md_path = _encontrar_md_para_item(ruta_curso, item)
+        if not md_path:
+            sin_md.append(item["nombre"])
+            continue
+        _actualizar_md_actividad(md_path, item, courseid)
+        actualizados += 1
+
+    # Actualizar snapshot
+    snap_path = os.path.join(cache_dir, "snapshot.json")
+    if os.path.isfile(snap_path):
+        _actualizar_snapshot(snap_path, items)
+    return actualizados, sin_md
+
+
+def _es_carpeta_curso(ruta: str) -> bool:
+    return any(os.path.isfile(os.path.join(ruta, f)) for f in ("AGENTS.md", "SITEMAP.md"))
+
+
+def _cursos_del_periodo(ruta_periodo: str) -> list[str]:
+    """Carpetas de curso (con AGENTS.md o SITEMAP.md) dentro del periodo."""
+    return sorted(e.path for e in os.scandir(ruta_periodo)
+                  if e.is_dir() and _es_carpeta_curso(e.path))
+
+
+def _sincronizar_curso_requests(ruta_curso: str, dry_run: bool = False) -> dict:
+    """Gradebook de un curso en modo requests: descarga, parseo y persistencia.
+
+    Returns:
+        {"curso", "courseid", "items", "md_actualizados", "sin_md",
+         "segundos_descarga", "segundos_proceso", "error"}
+    """
+    resultado = {"curso": os.path.basename(ruta_curso), "courseid": "", "items": [],
+                 "md_actualizados": 0, "sin_md": [], "segundos_descarga": 0.0,
+                 "segundos_proceso": 0.0, "error": ""}
+    try:
+        resultado["courseid"] = courseid = _courseid_desde_sitemap(ruta_curso)
+        inicio = time.monotonic()
+        html = _descargar_gradebook_requests(courseid)
+        resultado["segundos_descarga"] = time.monotonic() - inicio
+
+        inicio = time.monotonic()
+        resultado["items"] = items = _parsear_gradebook(html)
+        if not dry_run:
+            resultado["md_actualizados"], resultado["sin_md"] = _persistir_calificaciones(
+                ruta_curso, courseid, html, items)
+        resultado["segundos_proceso"] = time.monotonic() - inicio
+    except Exception as e:
+        resultado["error"] = str(e)
+    return resultado
+
+
+def sincronizar_calificaciones(rutas_cursos: list[str], *, workers: int = DEFAULT_WORKERS,
+                               dry_run: bool = False) -> list[dict]:
+    """Descarga y procesa los gradebooks de varios cursos en paralelo.
+
+    Requiere el modo requests activo (browser_api.set_request_mode). Cada
+    curso escribe solo en su carpeta, así que los hilos no comparten archivos.
+
+    Returns:
+        Un resultado por curso (ver _sincronizar_curso_requests), en el orden de entrada.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(rutas_cursos)))) as pool:
+        return list(pool.map(lambda r: _sincronizar_curso_requests(r, dry_run), rutas_cursos))
+
+
+def _imprimir_resumen_periodo(resultados: list[dict], segundos_total: float):
+    """Imprime tabla con notas y tiempos por curso."""
+    table = Table(title="Calificaciones por curso", show_lines=False)
+    table.add_column("Curso", style="cyan", no_wrap=True)
+    table.add_column("Course ID", style="dim")
+    table.add_column("Items", justify="right")
+    table.add_column("Calificados", justify="right")
+    table.add_column("Aporte total", justify="right", style="green")
+    table.add_column(".md", justify="right", style="dim")
+    table.add_column("Descarga", justify="right")
+    table.add_column("Proceso", justify="right")
+
+    for r in resultados:
+        if r["error"]:
+            table.add_row(r["curso"], r["courseid"] or "—",
+                          f"[red]{r['error'][:60]}[/red]", "", "", "", "", "")
+            continue
+        items = r["items"]
+        aporte_total = sum(_parse_porcentaje(it["aporte_curso"]) for it in items)
+        table.add_row(
+            r["curso"],
+            r["courseid"],
+            str(len(items)),
+            str(sum(1 for it in items if it["calificacion"])),
+            f"{aporte_total:.2f}%",
+            str(r["md_actualizados"]),
+            f"{r['segundos_descarga']:.2f}s",
+            f"{r['segundos_proceso']:.2f}s",
+        )
+    console.print(table)
+
+    secuencial = sum(r["segundos_descarga"] + r["segundos_proceso"] for r in resultados)
+    errores = sum(1 for r in resultados if r["error"])
+    console.print(
+        Panel(
+            f"[bold]{len(resultados) - errores} / {len(resultados)} cursos actualizados "
+            f"en {segundos_total:.2f}s[/bold]\n"
+            f"Suma de tiempos por curso: {secuencial:.2f}s",
+            title="Resumen",
+        )
+    )
+
+
+def _main_requests(rutas_cursos: list[str], workers: int, dry_run: bool):
+    """Flujo sin navegador: cookies guardadas + gradebooks en paralelo."""
+    from browser_api import set_request_mode
+    from moodle_session import cargar_session_requests
+    from navegador_requests import configurar_cortesia
+
+    session = cargar_session_requests()
+    if not session:
+        raise SystemExit("No hay sesión guardada (.moodle_session.json). "
+                         "Corre primero con navegador para hacer login.")
+    set_request_mode(session)
+    configurar_cortesia(workers)
+    if not _verificar_sesion_requests():
+        raise SystemExit("Sesión Moodle inactiva. Inicia sesión y reintenta.")
+    console.print(f"[green]✓[/green] Sesión Moodle verificada (requests, {workers} workers)")
+
+    inicio = time.monotonic()
+    resultados = sincronizar_calificaciones(rutas_cursos, workers=workers, dry_run=dry_run)
+    segundos_total = time.monotonic() - inicio
+
+    for r in resultados:
+        for nombre in r["sin_md"]:
+            console.print(f"  [yellow]⚠ {r['curso']}: no se encontró .md para:[/yellow] {nombre}")
+    if len(resultados) == 1 and not resultados[0]["error"]:
+        try:
+            _imprimir_resumen(resultados[0]["items"])
+        except Exception as e:
+            console.print(f"[yellow]⚠ Resumen no se pudo imprimir: {e}[/yellow]")
+    _imprimir_resumen_periodo(resultados, segundos_total)
+
+    if dry_run:
+        console.print("\n[yellow]DRY RUN: no se actualizaron archivos .md ni snapshot.json[/yellow]")
+    if any(r["error"] for r in resultados):
+        sys.exit(1)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Extraer calificaciones del gradebook de Moodle"
     )
-    parser.add_argument("ruta_curso", help="Carpeta del curso (ej: 2607B04G1-línea-de-énfasis-1)")
+    parser.add_argument("ruta_curso",
+                        help="Carpeta del curso (ej: 2607B04G1-línea-de-énfasis-1) o del "
+                             "periodo (todos sus cursos; implica --requests)")
     parser.add_argument("--dry-run", action="store_true", help="Solo mostrar, no escribir")
+    parser.add_argument("--cdp-rapido", action="store_true",
+                        help="Sin imágenes/fuentes/CSS y esperas por selector en vez de sleeps")
+    parser.add_argument("--requests", action="store_true",
+                        help="Sin navegador: usa las cookies guardadas (.moodle_session.json)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Cursos descargados a la vez en modo requests (default: {DEFAULT_WORKERS})")
     args = parser.parse_args()
+    if args.cdp_rapido:
+        configurar_modo_rapido()
 
     ruta_curso = os.path.abspath(args.ruta_curso)
     if not os.path.isdir(ruta_curso):
         raise SystemExit(f"Carpeta no existe: {ruta_curso}")
 
+    if not _es_carpeta_curso(ruta_curso):
+        rutas = _cursos_del_periodo(ruta_curso)
+        if not rutas:
+            raise SystemExit(f"No hay cursos (AGENTS.md/SITEMAP.md) en: {ruta_curso}")
+        console.print(f"[bold blue]Periodo:[/bold blue] {ruta_curso} ({len(rutas)} cursos)")
+        _main_requests(rutas, args.workers, args.dry_run)
+        return
+    if args.requests:
+        console.print(f"[bold blue]Curso:[/bold blue] {ruta_curso}")
+        _main_requests([ruta_curso], args.workers, args.dry_run)
+        return
+
     courseid = _courseid_desde_sitemap(ruta_curso)
     console.print(f"[bold blue]Curso:[/bold blue] {ruta_curso}")
     console.print(f"[bold blue]Course ID:[/bold blue] {courseid}")
@@ -469,46 +692,22 @@ def main():
         html = _descargar_gradebook(driver, courseid)
         console.print(f"[green]✓[/green] Gradebook descargado ({len(html):,} chars)")
 
-        # Guardar HTML crudo para auditoría
-        cache_dir = os.path.join(ruta_curso, "_cache")
-        os.makedirs(cache_dir, exist_ok=True)
-        html_path = os.path.join(cache_dir, f"gradebook_{courseid}.html")
-        if not args.dry_run:
-            with open(html_path, "w", encoding="utf-8") as f:
-                f.write(html)
-
         items = _parsear_gradebook(html)
         console.print(f"[green]✓[/green] {len(items)} items extraídos")
 
-        # Persistir JSON + .md + snapshot SOLO si no es dry-run.
+        # Persistir HTML + JSON + .md + snapshot SOLO si no es dry-run.
         # El resumen se imprime SIEMPRE (incluso en dry-run), envuelto en
         # try/except para que un valor raro del gradebook (ej. "-" en un
         # campo que la tabla espera float) no tumbe la persistencia.
         if not args.dry_run:
-            json_path = os.path.join(cache_dir, f"calificaciones_{courseid}.json")
-            with open(json_path, "w", encoding="utf-8") as f:
-                json.dump(items, f, indent=2, ensure_ascii=False)
-
-            # Actualizar .md de actividades
-            actualizados = 0
-            for item in items:
-                md_path = _encontrar_md_para_item(ruta_curso, item)
-                if not md_path:
-                    console.print(
-                        f"  [yellow]⚠ No se encontró .md para:[/yellow] {item['nombre']}"
-                    )
-                    continue
-                _actualizar_md_actividad(md_path, item, courseid)
-                actualizados += 1
+            actualizados, sin_md = _persistir_calificaciones(ruta_curso, courseid, html, items)
+            for nombre in sin_md:
+                console.print(f"  [yellow]⚠ No se encontró .md para:[/yellow] {nombre}")
             console.print(f"\n[green]✓[/green] {actualizados} archivos .md actualizados")
-
-            # Actualizar snapshot
-            snap_path = os.path.join(cache_dir, "snapshot.json")
-            if os.path.isfile(snap_path):
-                _actualizar_snapshot(snap_path, items)
-                console.print(f"[green]✓[/green] snapshot.json actualizado")
+            if os.path.isfile(os.path.join(ruta_curso, "_cache", "snapshot.json")):
+                console.print("[green]✓[/green] snapshot.json actualizado")
             else:
-                console.print(f"[yellow]⚠ No se encontró snapshot.json[/yellow]")
+                console.print("[yellow]⚠ No se encontró snapshot.json[/yellow]")
 
         try:
             _imprimir_resumen(items)
@@ -1,18 +1,27 @@
 #!/usr/bin/env python3
 """
 CLI estado: /gestionar-cursos estado <CARPETA_CURSO>
+            /gestionar-cursos estado --periodo <CARPETA_PERIODO>
 
 Compara _cache/snapshot.json contra el estado actual en Moodle.
-Detecta: actividades nuevas, fechas modificadas, actividades eliminadas.
-Usa paralelismo por unidad para extraer fechas de quiz/assign/forum/lesson/workshop.
+Detecta: actividades nuevas, fechas modificadas, contenido modificado
+(huella distinta a la del último sync) y actividades eliminadas.
+Las fechas de quiz/assign/forum/lesson/workshop se extraen de todas las
+unidades a la vez con la sesión requests (pool de descargas); Chrome solo
+abre las páginas que necesitan JS. Con --requests no se abre Chrome.
+
+Con --periodo se revisan todos los cursos del periodo a la vez sobre una
+misma sesión requests (sin Chrome) y se imprime un reporte consolidado.
 """
 
 import argparse
 import json
 import os
 import re
-import subprocess
 import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from rich.console import Console
@@ -21,6 +30,7 @@ from rich.panel import Panel
 # Asegurar que scripts/ esté en path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from _extraer_fechas_unidad import extraer_fechas_pagina
 from browser_api import (
     esta_usando_selenium,
     extraer_sidebar,
@@ -28,16 +38,21 @@ from browser_api import (
     get_navegador,
     set_profile_dir,
 )
-from cli_init import _url_key
+from cli_init import INTERVALO_HOST, _url_key
 from extractor_foro_evaluable import (
     cargar_cache_foros,
     es_evaluable,
     extraer_datos_foro,
 )
+from sincronizar_curso import huella_html
 
 console = Console()
 BASE_URL = "https://aulavirtual.uniremington.edu.co"
 
+TIPOS_CON_FECHA = ("quiz", "assign", "forum", "lesson", "workshop")
+DEFAULT_WORKERS = 8
+MAX_CURSOS_PARALELO = 8  # cursos revisados a la vez con --periodo
+
 
 def cargar_snapshot(ruta_curso: str) -> dict:
     """Carga _cache/snapshot.json o retorna vacío."""
@@ -52,9 +67,9 @@ def guardar_snapshot(ruta_curso: str, snapshot: dict):
     """Guarda snapshot actualizado.
 
     Preserva campos extra que no controla `estado` (ej: `calificacion`,
-    `calificaciones_capturadas` que escribe `cli_calificaciones.py`).
-    Sin esta preservación, re-ejecutar `estado` borraría las notas
-    recién capturadas.
+    `calificaciones_capturadas` que escribe `cli_calificaciones.py`, y la
+    huella/segundos/archivo del último sync). Sin esta preservación,
+    re-ejecutar `estado` borraría las notas recién capturadas.
     """
     cache_dir = os.path.join(ruta_curso, "_cache")
     os.makedirs(cache_dir, exist_ok=True)
@@ -82,6 +97,10 @@ def guardar_snapshot(ruta_curso: str, snapshot: dict):
     actividades_viejas = snapshot_anterior.get("actividades", {})
     for key, nueva in actividades_nuevas.items():
         vieja = actividades_viejas.get(key, {})
+        # La huella la escribe el sync: `estado` solo detecta, no marca como sincronizado
+        for campo in ("huella", "segundos", "archivo"):
+            if campo in vieja:
+                nueva[campo] = vieja[campo]
         if "calificacion" in vieja and "calificacion" not in nueva:
             nueva["calificacion"] = vieja["calificacion"]
         # No pisar si la nueva ya tiene `calificacion` (re-fetch)
@@ -170,43 +189,82 @@ def comparar_snapshots(snapshot_ant: dict, sidebar_actual: list[dict]) -> dict:
     }
 
 
-def extraer_fechas_paralelo(actividades_por_unidad: dict[str, list[dict]],
-                            profile_dir: str) -> dict[str, dict]:
-    """Lanza subprocesos por unidad para extraer fechas de quiz/assign.
+def _necesita_navegador(url_final: str, html: str) -> bool:
+    """True si la página descargada no trae el contenido renderizado por el servidor."""
+    return "login" in url_final.lower() or "region-main" not in html
 
-    Cada subproceso recibe la lista de actividades de su unidad,
-    visita cada quiz/assign, y devuelve {key: {fecha_apertura, fecha_cierre}}.
-    """
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    fechas = {}
 
-    for unidad, acts in actividades_por_unidad.items():
-        if not acts:
-            continue
-        quiz_assign = [a for a in acts if a["tipo"] in ("quiz", "assign", "forum", "lesson", "workshop")]
-        if not quiz_assign:
-            continue
+def _fechas_requests(act: dict) -> dict | None:
+    """Fechas y huella de una actividad vía requests (None si hace falta Chrome)."""
+    from navegador_requests import obtener_pagina
+    try:
+        url_final, html = obtener_pagina(act["url"])
+    except Exception:
+        return None
+    if _necesita_navegador(url_final, html):
+        return None
+    return {**extraer_fechas_pagina(html), "huella": huella_html(html)}
 
-        payload = json.dumps(quiz_assign, ensure_ascii=False)
-        proceso_script = os.path.join(script_dir, "_extraer_fechas_unidad.py")
 
-        console.print(f"  [dim]Unidad: {unidad} ({len(quiz_assign)} quiz/assign)[/dim]")
-        try:
-            p = subprocess.run(
-                [sys.executable, proceso_script,
-                 "--profile-dir", profile_dir],
-                input=payload, capture_output=True, text=True,
-                encoding="utf-8", timeout=120,
-            )
-            if p.returncode == 0 and p.stdout.strip():
-                fechas_unidad = json.loads(p.stdout)
-                fechas.update(fechas_unidad)
-                console.print(f"    [green]✓ {len(fechas_unidad)} fechas extraídas[/green]")
-            else:
-                console.print(f"    [yellow]Error: {p.stderr[:200] if p.stderr else 'sin output'}[/yellow]")
-        except Exception as e:
-            console.print(f"    [yellow]Error subproceso: {e}[/yellow]")
+def _fechas_navegador(act: dict) -> dict | None:
+    """Fechas y huella de una actividad abriéndola en Chrome (None si falla)."""
+    from browser_api import get_page_content
+    try:
+        get_navegador()(act["url"])
+        html = get_page_content()
+        return {**extraer_fechas_pagina(html), "huella": huella_html(html)}
+    except Exception:
+        return None
+
+
+def extraer_fechas_paralelo(actividades: list[dict], *, workers: int = DEFAULT_WORKERS,
+                            usar_requests: bool = True,
+                            usar_navegador: bool = True,
+                            mostrar_progreso: bool = True) -> dict[str, dict]:
+    """Extrae fechas de quiz/assign/forum/lesson/workshop de todas las unidades.
 
+    Las páginas se descargan con un pool de `workers` sobre la sesión
+    requests (navegador_requests, con su cortesía por host). Las que
+    fallan o llegan sin contenido del servidor (redirect a login, sin
+    #region-main) se reintentan en serie con Chrome si `usar_navegador`.
+    `mostrar_progreso=False` no imprime nada (varios cursos a la vez).
+
+    Returns:
+        {key: {fecha_apertura, fecha_cierre, huella, nombre}}
+    """
+    con_fecha = [a for a in actividades if a.get("tipo") in TIPOS_CON_FECHA]
+    if not con_fecha:
+        return {}
+
+    por_unidad = Counter(a.get("seccion") or "General" for a in con_fecha)
+    for unidad, n in por_unidad.items():
+        if mostrar_progreso:
+            console.print(f"  [dim]Unidad: {unidad} ({n} con fechas)[/dim]")
+
+    resultados: list[dict | None] = [None] * len(con_fecha)
+    if usar_requests:
+        n = max(1, min(workers, len(con_fecha)))
+        with ThreadPoolExecutor(max_workers=n, thread_name_prefix="fechas") as pool:
+            resultados = list(pool.map(_fechas_requests, con_fecha))
+        ok = sum(1 for r in resultados if r is not None)
+        if mostrar_progreso:
+            console.print(f"    [green]✓ {ok}/{len(con_fecha)} páginas vía requests "
+                          f"({n} workers)[/green]")
+
+    pendientes = [i for i, r in enumerate(resultados) if r is None]
+    if pendientes and usar_navegador:
+        if mostrar_progreso:
+            console.print(f"    [dim]{len(pendientes)} páginas con Chrome (necesitan JS)...[/dim]")
+        for i in pendientes:
+            resultados[i] = _fechas_navegador(con_fecha[i])
+    elif pendientes and mostrar_progreso:
+        console.print(f"    [yellow]{len(pendientes)} páginas sin fechas "
+                      f"(requieren navegador)[/yellow]")
+
+    fechas = {}
+    for act, r in zip(con_fecha, resultados, strict=True):
+        if r is not None:
+            fechas[_url_key(act["url"])] = {**r, "nombre": act.get("nombre", "")}
     return fechas
 
 
@@ -236,19 +294,51 @@ def diff_fechas(snapshot_ant: dict, fechas_actuales: dict[str, dict]) -> list[di
     return cambios
 
 
+def diff_contenido(snapshot_ant: dict, fechas_actuales: dict[str, dict],
+                   cambios_fecha: list[dict]) -> list[dict]:
+    """Actividades cuya huella difiere de la guardada en el último sync.
+
+    Solo cuenta las que ya tienen huella en la snapshot; las que además
+    cambiaron de fecha ya aparecen en `cambios_fecha`.
+    """
+    con_fecha = {c["key"] for c in cambios_fecha}
+    cambios = []
+    act_anteriores = snapshot_ant.get("actividades", {})
+    for key, actual in fechas_actuales.items():
+        ant = act_anteriores.get(key, {})
+        if (ant.get("huella") and actual.get("huella")
+                and actual["huella"] != ant["huella"] and key not in con_fecha):
+            cambios.append({
+                "key": key,
+                "nombre": ant.get("nombre", actual.get("nombre", "")),
+                "tipo": ant.get("tipo", ""),
+                "seccion": ant.get("seccion", ""),
+            })
+    return cambios
+
+
 def revisar_hilos_foros_evaluables(
     sidebar_actual: list[dict], ruta_curso: str
 ) -> list[str]:
     """
     Para cada foro en una sección de unidad, lo visita, extrae su
     listado de hilos, y compara contra el cache local. Devuelve una
-    lista de bloques markdown (uno por foro con cambios).
+    lista de bloques markdown (uno por foro con hilos nuevos, más uno con
+    los hilos cacheados que ya no aparecen en ningún foro).
+
+    El cache (`foros_cache.json`) no guarda a qué foro pertenece cada
+    hilo, así que los removidos se calculan contra todos los foros
+    revisados y solo si ninguno falló.
     """
     import re
 
     _RE_UNIDAD = re.compile(r"^Unidad\s+(\d+)", re.IGNORECASE)
     cache = cargar_cache_foros(ruta_curso)
+    ids_cacheados = {k for k, v in cache.items() if v.get("url")}
+    ids_vistos: set[str] = set()
     bloques: list[str] = []
+    revisados = 0
+    errores = 0
 
     seccion_actual = ""
     for item in sidebar_actual:
@@ -257,7 +347,8 @@ def revisar_hilos_foros_evaluables(
             continue
         if item.get("tipo") != "forum":
             continue
-        if not _RE_UNIDAD.match((seccion_actual or "").strip()):
+        # extraer_sidebar_actual() no trae filas de sección: cada item la lleva
+        if not _RE_UNIDAD.match((item.get("seccion") or seccion_actual or "").strip()):
             continue
         if not es_evaluable(item.get("nombre", ""))[0]:
             continue
@@ -266,29 +357,54 @@ def revisar_hilos_foros_evaluables(
             datos = extraer_datos_foro(item["url"])
         except Exception as e:  # noqa: BLE001
             bloques.append(f"### ⚠ {nombre_foro}\n- Error al revisar: {e}")
+            errores += 1
             continue
-        ids_cacheados = {k for k, v in cache.items() if v.get("url")}
+        revisados += 1
         ids_actuales = {h["discuss_id"] for h in datos["hilos"]}
+        ids_vistos |= ids_actuales
         nuevos = sorted(ids_actuales - ids_cacheados)
-        removidos = sorted(ids_cacheados - ids_actuales)
-        if not nuevos and not removidos:
-            continue
-        partes = [f"### {nombre_foro}"]
         if nuevos:
-            partes.append(f"- **Hilos nuevos ({len(nuevos)}):** {', '.join(nuevos)}")
-        if removidos:
-            partes.append(f"- **Hilos removidos ({len(removidos)}):** {', '.join(removidos)}")
-        bloques.append("\n".join(partes))
+            bloques.append(f"### {nombre_foro}\n"
+                           f"- **Hilos nuevos ({len(nuevos)}):** {', '.join(nuevos)}")
 
+    removidos = sorted(ids_cacheados - ids_vistos)
+    if revisados and not errores and removidos:
+        bloques.append(f"### Foros evaluables\n"
+                       f"- **Hilos removidos ({len(removidos)}):** {', '.join(removidos)}")
     return bloques
 
 
-def generar_reporte(diff: dict, cambios_fecha: list[dict]) -> str:
+def _snapshot_desde_sidebar(sidebar_actual: list[dict], fechas_actuales: dict[str, dict]) -> dict:
+    """Snapshot nueva: actividades de la sidebar con las fechas extraídas."""
+    for item in sidebar_actual:
+        key = _url_key(item["url"])
+        fechas = fechas_actuales.get(key, {})
+        if item["tipo"] in TIPOS_CON_FECHA and fechas:
+            item["fecha_apertura"] = fechas.get("fecha_apertura", "")
+            item["fecha_cierre"] = fechas.get("fecha_cierre", "")
+
+    return {
+        "actividades": {
+            _url_key(item["url"]): {
+                "nombre": item["nombre"],
+                "tipo": item["tipo"],
+                "seccion": item["seccion"],
+                "fecha_apertura": item.get("fecha_apertura", ""),
+                "fecha_cierre": item.get("fecha_cierre", ""),
+            }
+            for item in sidebar_actual
+        }
+    }
+
+
+def generar_reporte(diff: dict, cambios_fecha: list[dict],
+                    cambios_contenido: list[dict] | None = None) -> str:
     """Genera reporte markdown del diff."""
     nuevas = diff["nuevas"]
     eliminadas = diff["eliminadas"]
+    cambios_contenido = cambios_contenido or []
 
-    if not nuevas and not eliminadas and not cambios_fecha:
+    if not nuevas and not eliminadas and not cambios_fecha and not cambios_contenido:
         return "✅ Sin cambios detectados."
 
     partes = []
@@ -307,6 +423,11 @@ def generar_reporte(diff: dict, cambios_fecha: list[dict]) -> str:
                 detalle += f"\n  - Apertura: {c['fecha_apertura_ant']} → **{c['fecha_apertura_nueva']}**"
             partes.append(detalle)
 
+    if cambios_contenido:
+        partes.append(f"### ✏️ Contenido modificado ({len(cambios_contenido)})")
+        for c in cambios_contenido:
+            partes.append(f"- **{c['nombre']}** ({c['tipo']}) — {c['seccion']}")
+
     if eliminadas:
         partes.append(f"### 🗑️ Actividades eliminadas/ocultas ({len(eliminadas)})")
         for a in eliminadas:
@@ -315,11 +436,166 @@ def generar_reporte(diff: dict, cambios_fecha: list[dict]) -> str:
     return "\n\n".join(partes)
 
 
+# ─────────────────────────────────────────────────────────────────────
+# Periodo completo (--periodo)
+# ─────────────────────────────────────────────────────────────────────
+
+def cursos_del_periodo(ruta_periodo: str) -> list[str]:
+    """Carpetas de curso (con AGENTS.md) dentro de la carpeta del periodo."""
+    return sorted(e.path for e in os.scandir(ruta_periodo)
+                  if e.is_dir() and os.path.isfile(os.path.join(e.path, "AGENTS.md")))
+
+
+def revisar_curso(ruta_curso: str, *, workers: int = DEFAULT_WORKERS) -> dict:
+    """Estado de un curso sin imprimir nada: sidebar, fechas, huellas y foros.
+
+    Usa el backend requests (thread-safe: cada hilo tiene su página actual),
+    así que varios cursos pueden revisarse a la vez. Actualiza la snapshot.
+
+    Returns:
+        {"curso", "ruta", "url", "diff", "cambios_fecha", "cambios_contenido",
+         "foros", "segundos", "error"}
+    """
+    inicio = time.monotonic()
+    resultado = {"curso": os.path.basename(ruta_curso), "ruta": ruta_curso, "url": "",
+                 "diff": None, "cambios_fecha": [], "cambios_contenido": [], "foros": [],
+                 "segundos": 0.0, "error": ""}
+    try:
+        snapshot_ant = cargar_snapshot(ruta_curso)
+        if not snapshot_ant.get("actividades"):
+            raise ValueError("Sin snapshot (_cache/snapshot.json): corre primero cli_init.py")
+        resultado["url"] = extraer_url_curso(ruta_curso)
+        sidebar_actual = extraer_sidebar_actual(resultado["url"])
+        resultado["diff"] = comparar_snapshots(snapshot_ant, sidebar_actual)
+
+        fechas_actuales = extraer_fechas_paralelo(
+            sidebar_actual, workers=workers, usar_navegador=False, mostrar_progreso=False)
+        resultado["cambios_fecha"] = diff_fechas(snapshot_ant, fechas_actuales)
+        resultado["cambios_contenido"] = diff_contenido(
+            snapshot_ant, fechas_actuales, resultado["cambios_fecha"])
+        guardar_snapshot(ruta_curso, _snapshot_desde_sidebar(sidebar_actual, fechas_actuales))
+
+        resultado["foros"] = revisar_hilos_foros_evaluables(sidebar_actual, ruta_curso)
+    except Exception as e:  # noqa: BLE001
+        resultado["error"] = str(e)
+    resultado["segundos"] = time.monotonic() - inicio
+    return resultado
+
+
+def revisar_periodo(rutas_cursos: list[str], *, workers: int = DEFAULT_WORKERS,
+                    cursos_paralelo: int = MAX_CURSOS_PARALELO) -> list[dict]:
+    """revisar_curso() de todos los cursos a la vez (requests), en orden de entrada.
+
+    Cada curso descarga sus páginas con `workers` hilos; la cortesía por
+    host de navegador_requests sigue acotando el total contra Moodle.
+    """
+    if not rutas_cursos:
+        return []
+    n = max(1, min(cursos_paralelo, len(rutas_cursos)))
+    with ThreadPoolExecutor(max_workers=n, thread_name_prefix="curso") as pool:
+        return list(pool.map(lambda r: revisar_curso(r, workers=workers), rutas_cursos))
+
+
+def reporte_periodo(resultados: list[dict], segundos_total: float) -> None:
+    """Imprime la tabla consolidada y el diff de cada curso con cambios."""
+    from rich.table import Table
+
+    table = Table(title="Estado del periodo", show_lines=False)
+    table.add_column("Curso", style="cyan", no_wrap=True)
+    table.add_column("Nuevas", justify="right")
+    table.add_column("Fechas", justify="right")
+    table.add_column("Contenido", justify="right")
+    table.add_column("Eliminadas", justify="right")
+    table.add_column("Foros", justify="right")
+    table.add_column("Tiempo", justify="right", style="dim")
+    for r in resultados:
+        if r["error"]:
+            table.add_row(r["curso"], f"[red]{r['error'][:60]}[/red]", "", "", "", "",
+                          f"{r['segundos']:.1f}s")
+            continue
+        table.add_row(
+            r["curso"],
+            str(len(r["diff"]["nuevas"])),
+            str(len(r["cambios_fecha"])),
+            str(len(r["cambios_contenido"])),
+            str(len(r["diff"]["eliminadas"])),
+            str(len(r["foros"])),
+            f"{r['segundos']:.1f}s",
+        )
+    console.print(table)
+
+    for r in resultados:
+        if r["error"]:
+            continue
+        reporte = generar_reporte(r["diff"], r["cambios_fecha"], r["cambios_contenido"])
+        bloques = ([reporte] if not reporte.startswith("✅") else []) + r["foros"]
+        if bloques:
+            console.print(Panel("\n\n".join(bloques), title=f"[bold]{r['curso']}[/bold]",
+                                border_style="green"))
+
+    mas_lento = max((r["segundos"] for r in resultados), default=0.0)
+    suma = sum(r["segundos"] for r in resultados)
+    console.print(f"\n[dim]{len(resultados)} cursos en {segundos_total:.1f}s "
+                  f"(curso más lento: {mas_lento:.1f}s, suma: {suma:.1f}s)[/dim]")
+
+
+def _main_periodo(args) -> None:
+    """--periodo: una sesión requests compartida por todos los cursos."""
+    from browser_api import set_request_mode
+    from moodle_session import cargar_session_requests
+    from navegador_requests import configurar_cortesia, resumen_cache_http
+
+    ruta_periodo = os.path.abspath(args.periodo)
+    rutas = cursos_del_periodo(ruta_periodo) if os.path.isdir(ruta_periodo) else []
+    if not rutas:
+        console.print(f"[bold red]ERROR:[/bold red] No hay cursos (AGENTS.md) en: {ruta_periodo}")
+        sys.exit(1)
+
+    session = cargar_session_requests()
+    if not session and not args.requests:
+        # Una sola vez: exportar las cookies del Chrome con sesión iniciada
+        from moodle_session import guardar_cookies_selenium
+        set_profile_dir(args.profile_dir or os.path.join(os.getcwd(), ".browserdata"))
+        if esta_usando_selenium() and guardar_cookies_selenium():
+            session = cargar_session_requests()
+    if not session:
+        console.print(
+            "[bold red]ERROR:[/bold red] No hay sesión guardada "
+            "(.moodle_session.json). Corre primero con navegador para hacer login."
+        )
+        sys.exit(1)
+    set_request_mode(session)
+    configurar_cortesia(args.workers, args.intervalo_host)
+
+    console.print(f"[bold blue]Periodo:[/bold blue] {ruta_periodo} ({len(rutas)} cursos)")
+    inicio = time.monotonic()
+    resultados = revisar_periodo(rutas, workers=args.workers,
+                                 cursos_paralelo=args.cursos_paralelo)
+    reporte_periodo(resultados, time.monotonic() - inicio)
+
+    if args.sync:
+        for r in resultados:
+            if r["diff"] and (r["diff"]["nuevas"] or r["cambios_fecha"] or r["cambios_contenido"]):
+                console.print(f"  uv run python cli_init.py {r['url']} --destino {ruta_periodo}")
+            if any("Hilos nuevos" in b for b in r["foros"]):
+                console.print(f"  uv run python cli_foros.py {r['ruta']}")
+
+    resumen_http = resumen_cache_http()
+    if resumen_http:
+        console.print(f"\n[dim]{resumen_http}[/dim]")
+    if any(r["error"] for r in resultados):
+        sys.exit(1)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Verificar estado de curso local vs Moodle"
     )
-    parser.add_argument("carpeta", help="Ruta a la carpeta del curso")
+    parser.add_argument("carpeta", nargs="?", help="Ruta a la carpeta del curso")
+    parser.add_argument(
+        "--periodo", metavar="DIR",
+        help="Revisar todos los cursos de la carpeta del periodo a la vez (sin Chrome)"
+    )
     parser.add_argument(
         "--sync", action="store_true",
         help="Sincronizar automáticamente si hay cambios"
@@ -332,7 +608,39 @@ def main():
         "--profile-dir", "-p", default=None,
         help="Directorio para perfil persistente de Chrome"
     )
+    parser.add_argument(
+        "--requests", action="store_true",
+        help="Sin navegador: todo vía requests.Session (.moodle_session.json)"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=DEFAULT_WORKERS,
+        help=f"Descargas simultáneas de páginas de actividades (default: {DEFAULT_WORKERS})"
+    )
+    parser.add_argument(
+        "--cursos-paralelo", type=int, default=MAX_CURSOS_PARALELO,
+        help=f"Con --periodo: cursos revisados a la vez (default: {MAX_CURSOS_PARALELO})"
+    )
+    parser.add_argument(
+        "--intervalo-host", type=float, default=INTERVALO_HOST,
+        help=f"Segundos mínimos entre requests al mismo host (default: {INTERVALO_HOST})"
+    )
+    parser.add_argument(
+        "--sin-cache-http", action="store_true",
+        help="No usar la caché HTTP condicional (.http_cache/)"
+    )
     args = parser.parse_args()
+    if not args.carpeta and not args.periodo:
+        parser.error("indica la carpeta del curso o --periodo <DIR>")
+
+    if args.periodo:
+        console.print(Panel.fit(
+            "[bold]GESTIONAR-CURSOS[/bold] :: ESTADO DEL PERIODO",
+            style="bold cyan", border_style="cyan"
+        ))
+        from navegador_requests import configurar_cache_http
+        configurar_cache_http(None if args.sin_cache_http else "")
+        _main_periodo(args)
+        return
 
     ruta_curso = os.path.abspath(args.carpeta)
     if not os.path.isdir(ruta_curso):
@@ -344,13 +652,34 @@ def main():
         style="bold cyan", border_style="cyan"
     ))
 
-    # Configurar Chrome
-    profile = args.profile_dir or os.path.join(os.getcwd(), ".browserdata")
-    set_profile_dir(profile)
+    from moodle_session import cargar_session_requests
+    from navegador_requests import (
+        configurar_cache_http,
+        configurar_cortesia,
+        resumen_cache_http,
+        set_session,
+    )
+    configurar_cache_http(None if args.sin_cache_http else "")
+
+    if args.requests:
+        session = cargar_session_requests()
+        if not session:
+            console.print(
+                "[bold red]ERROR:[/bold red] No hay sesión guardada "
+                "(.moodle_session.json). Corre primero con navegador para hacer login."
+            )
+            sys.exit(1)
+        from browser_api import set_request_mode
+        set_request_mode(session)
+        configurar_cortesia(args.workers, args.intervalo_host)
+    else:
+        # Configurar Chrome
+        profile = args.profile_dir or os.path.join(os.getcwd(), ".browserdata")
+        set_profile_dir(profile)
 
-    if not esta_usando_selenium():
-        console.print("[bold red]ERROR:[/bold red] No se detectó modo CDP/Selenium.")
-        sys.exit(1)
+        if not esta_usando_selenium():
+            console.print("[bold red]ERROR:[/bold red] No se detectó modo CDP/Selenium.")
+            sys.exit(1)
 
     # Cargar snapshot anterior
     snapshot_ant = cargar_snapshot(ruta_curso)
@@ -391,43 +720,35 @@ def main():
         f"Existentes: {len(diff['existentes'])}"
     )
 
-    # Extraer fechas en paralelo por unidad
-    console.print("[bold cyan][3/4][/bold cyan] Extrayendo fechas (paralelo por unidad)...")
-    actividades_por_unidad = {}
-    for item in sidebar_actual:
-        seccion = item.get("seccion", "General")
-        actividades_por_unidad.setdefault(seccion, []).append(item)
+    # Extraer fechas: requests en paralelo, Chrome solo para páginas con JS
+    console.print("[bold cyan][3/4][/bold cyan] Extrayendo fechas (requests en paralelo)...")
+    usar_requests = True
+    if not args.requests:
+        # Las cookies del Chrome recién verificado alimentan la sesión requests
+        from moodle_session import guardar_cookies_selenium
+        session = cargar_session_requests() if guardar_cookies_selenium() else None
+        if session:
+            set_session(session)
+            configurar_cortesia(args.workers, args.intervalo_host)
+        else:
+            console.print("    [yellow]Sin cookies exportables: fechas con Chrome[/yellow]")
+            usar_requests = False
 
-    fechas_actuales = extraer_fechas_paralelo(actividades_por_unidad, profile)
+    fechas_actuales = extraer_fechas_paralelo(
+        sidebar_actual, workers=args.workers, usar_requests=usar_requests,
+        usar_navegador=not args.requests,
+    )
 
-    # Diff de fechas
+    # Diff de fechas y de contenido (huella del último sync)
     cambios_fecha = diff_fechas(snapshot_ant, fechas_actuales)
+    cambios_contenido = diff_contenido(snapshot_ant, fechas_actuales, cambios_fecha)
 
     # Actualizar snapshot con fechas extraídas
-    for item in sidebar_actual:
-        key = _url_key(item["url"])
-        fechas = fechas_actuales.get(key, {})
-        if item["tipo"] in ("quiz", "assign", "forum", "lesson", "workshop") and fechas:
-            item["fecha_apertura"] = fechas.get("fecha_apertura", "")
-            item["fecha_cierre"] = fechas.get("fecha_cierre", "")
-
-    nueva_snapshot = {
-        "actividades": {
-            _url_key(item["url"]): {
-                "nombre": item["nombre"],
-                "tipo": item["tipo"],
-                "seccion": item["seccion"],
-                "fecha_apertura": item.get("fecha_apertura", ""),
-                "fecha_cierre": item.get("fecha_cierre", ""),
-            }
-            for item in sidebar_actual
-        }
-    }
-    guardar_snapshot(ruta_curso, nueva_snapshot)
+    guardar_snapshot(ruta_curso, _snapshot_desde_sidebar(sidebar_actual, fechas_actuales))
 
     # Reporte
     console.print("\n[bold cyan][4/4][/bold cyan] Resultado:")
-    reporte = generar_reporte(diff, cambios_fecha)
+    reporte = generar_reporte(diff, cambios_fecha, cambios_contenido)
     console.print(Panel(reporte, title="[bold]Diff[/bold]", border_style="green"))
 
     # Diff de hilos en foros evaluables
@@ -439,7 +760,7 @@ def main():
     else:
         console.print("    [dim]Sin foros evaluables en unidades.[/dim]")
 
-    if args.sync and (diff["nuevas"] or cambios_fecha):
+    if args.sync and (diff["nuevas"] or cambios_fecha or cambios_contenido):
         console.print("\n[bold yellow]Sincronización pendiente:[/bold yellow]")
         console.print(f"  uv run python cli_init.py {url_curso} --destino "
                       f"{os.path.dirname(ruta_curso)}")
@@ -447,6 +768,10 @@ def main():
         console.print("\n[bold magenta]Hilos nuevos detectados.[/bold magenta]")
         console.print(f"  uv run python cli_foros.py {ruta_curso}")
 
+    resumen_http = resumen_cache_http()
+    if resumen_http:
+        console.print(f"\n[dim]{resumen_http}[/dim]")
+
 
 if __name__ == "__main__":
     main()
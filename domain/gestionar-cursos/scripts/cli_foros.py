@@ -23,6 +23,7 @@ from rich.console import Console
 from rich.panel import Panel
 
 from browser_api import (
+    esta_usando_requests,
     esta_usando_selenium,
     extraer_sidebar,
     get_current_url,
@@ -155,10 +156,10 @@ def procesar_curso(ruta_curso: str, dry_run: bool = False) -> None:
         style="bold cyan", border_style="cyan",
     ))
 
-    # Configurar Chrome
+    # Configurar Chrome (no aplica si ya hay un backend requests activo)
     profile = os.path.join(os.getcwd(), ".browserdata")
     set_profile_dir(profile)
-    if not esta_usando_selenium():
+    if not esta_usando_requests() and not esta_usando_selenium():
         console.print("[bold red]ERROR:[/bold red] No se detectó modo CDP/Selenium.")
         sys.exit(1)
 
@@ -14,10 +14,13 @@ Flujo:
 
 import argparse
 import contextlib
+import contextvars
 import os
 import re
-import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from rich.console import Console
@@ -34,24 +37,45 @@ from browser_api import (
     get_driver,
     get_navegador,
     get_page_content,
+    set_cdp_fast_mode,
     set_profile_dir,
 )
 from checkpoint import (
     clear_checkpoint,
+    compact_checkpoint,
     create_checkpoint,
     load_checkpoint,
-    mark_done,
+    record_done,
+    record_failed,
     save_checkpoint,
 )
 from parsear_pga import parsear_pga
 from parsear_sesiones import parsear_sesiones
 from scaffold_curso import crear_estructura_curso, nombre_carpeta_curso
+from sincronizar_curso import huella_html, leer_snapshot, planear_sync, registrar_extracciones
 from verificar_sesion import verificar_pagina_actual
 
 console = Console()
 
 BASE_URL = "https://aulavirtual.uniremington.edu.co"
 
+# Pipeline de actividades en modo requests
+DEFAULT_WORKERS = 4
+INTERVALO_HOST = 0.25  # segundos entre inicios de requests al mismo host
+MAX_EN_VUELO = 64  # requests simultáneos del backend async (--async-http)
+MAX_CURSOS = 3  # cursos simultáneos con --parallel
+DEFAULT_PESTANAS = 4  # pestañas simultáneas de Chrome con --cdp-rapido
+HUELLAS_POR_ESCRITURA = 32  # extracciones entre escrituras de la snapshot
+
+# Líneas de progreso que la tabla de --parallel muestra como fase del curso
+_RE_FASE = re.compile(r"\[(?:\d+(?:\.\d+)?/6|SYNC)\]")
+# clickup.json es compartido por todos los cursos del período
+_CLICKUP_LOCK = threading.Lock()
+
+# Videos de YouTube del curso en proceso: se resumen en un lote al final (_lote_youtube)
+_videos_youtube: contextvars.ContextVar[list | None] = contextvars.ContextVar(
+    "videos_youtube", default=None)
+
 
 def _cargar_env(path: str = ".env") -> None:
     """Carga variables de entorno desde archivo .env."""
@@ -207,6 +231,108 @@ def _extraer_info_basica(contenido_html: str, url: str) -> dict:
     }
 
 
+def _plan_sync_incremental(checkpoint: dict, ruta_curso: str) -> tuple[dict, dict, float]:
+    """Salta las actividades pendientes cuyo contenido no cambió desde la última extracción.
+
+    Descarga la página de cada actividad pendiente (concurrente en modo
+    requests), calcula su huella y la compara con la de la snapshot. Las
+    que no cambiaron se marcan como completadas con su archivo anterior;
+    las cambiadas y nuevas quedan pendientes con su HTML ya descargado.
+
+    Returns:
+        (HTML por URL, huella por URL, segundos ahorrados estimados)
+    """
+    candidatas = [
+        act for act in checkpoint["pending"]
+        if act.get("tipo") == "forum" or act.get("tipo") in _GUARDAR_POR_TIPO
+    ]
+    # redirects de Teams: el extractor navega por su cuenta
+    candidatas = [act for act in candidatas
+                  if "/l/meetup-join/" not in act["url"] and "/l/channel/" not in act["url"]]
+    if not candidatas:
+        return {}, {}, 0.0
+
+    paginas = _descargar_paginas_sync([act["url"] for act in candidatas])
+    huellas = {url: huella_html(html) for url, html in paginas.items()}
+    snapshot = leer_snapshot(ruta_curso)
+    plan = planear_sync(
+        [{**act, "key": _url_key(act["url"]), "huella": huellas.get(act["url"], "")}
+         for act in candidatas],
+        snapshot,
+    )
+    previas = snapshot.get("actividades", {})
+    for act in plan["sin_cambios"]:
+        archivo = previas[act["key"]].get("archivo", "")
+        checkpoint = record_done(ruta_curso, checkpoint, act, archivo)
+        paginas.pop(act["url"], None)
+
+    console.print(
+        f"[bold cyan][SYNC][/bold cyan] Plan: {len(plan['sin_cambios'])} sin cambios · "
+        f"{len(plan['cambiadas'])} cambiadas · {len(plan['nuevas'])} nuevas"
+    )
+    for act in plan["cambiadas"]:
+        console.print(f"      [yellow]~[/yellow] {act['nombre'][:60]}")
+    for act in plan["nuevas"]:
+        console.print(f"      [green]+[/green] {act['nombre'][:60]}")
+    # los foros se re-extraen navegando sus discusiones: no se reutiliza la portada
+    for act in candidatas:
+        if act.get("tipo") == "forum":
+            paginas.pop(act["url"], None)
+    return paginas, huellas, plan["segundos_ahorrados"]
+
+
+def _descargar_paginas_sync(urls: list[str]) -> dict[str, str]:
+    """HTML actual de cada URL (sin las que fallan). Concurrente en modo requests
+    y en pestañas simultáneas con el modo rápido de CDP."""
+    from browser_api import (
+        cdp_fast_mode_activo,
+        esta_usando_requests,
+        obtener_pagina,
+        obtener_paginas_cdp,
+    )
+
+    def _una(url: str) -> str:
+        if esta_usando_requests():
+            url_final, html = obtener_pagina(url)
+        else:
+            get_navegador()(url)
+            esperar_carga()
+            url_final, html = get_current_url(), get_page_content()
+        if "login" in url_final.lower():
+            raise SessionExpiredError("Moodle redirigió a login. Sesión expirada.")
+        return html
+
+    paginas = {}
+    if esta_usando_requests():
+        with ThreadPoolExecutor(max_workers=DEFAULT_WORKERS) as pool:
+            futuros = {url: pool.submit(contextvars.copy_context().run, _una, url)
+                       for url in urls}
+        resultados = {url: f.exception() or f.result() for url, f in futuros.items()}
+    elif cdp_fast_mode_activo():
+        resultados = {}
+        for url, r in obtener_paginas_cdp(urls).items():
+            if not isinstance(r, Exception) and "login" in r[0].lower():
+                r = SessionExpiredError("Moodle redirigió a login. Sesión expirada.")
+            resultados[url] = r if isinstance(r, Exception) else r[1]
+    else:
+        resultados = {}
+        for url in urls:
+            try:
+                resultados[url] = _una(url)
+            except SessionExpiredError:
+                raise
+            except Exception as e:
+                resultados[url] = e
+    for url, resultado in resultados.items():
+        if isinstance(resultado, SessionExpiredError):
+            raise resultado
+        if isinstance(resultado, Exception):
+            console.print(f"      [yellow]WARN:[/yellow] sin huella para {url}: {resultado}")
+            continue
+        paginas[url] = resultado
+    return paginas
+
+
 def _verificar_sesion_activa():
     """Verifica que no hayamos sido redirigidos a login. Si sí, lanza SessionExpiredError."""
     if "login" in get_current_url().lower():
@@ -272,91 +398,114 @@ def _sync_curso(url: str, ruta_curso: str):
     pga = checkpoint.get("pga", [])
     sesiones = checkpoint.get("sesiones", [])
 
-    while checkpoint["pending"]:
-        act = checkpoint["pending"][0]
-        console.print(f"[dim]Procesando:[/dim] {act['nombre'][:50]}...")
+    paginas, huellas, segundos_ahorrados = _plan_sync_incremental(checkpoint, ruta_curso)
+    segundos_extraccion = 0.0
+    extraidas: list[tuple] = []  # huellas pendientes de escribir en la snapshot
 
-        try:
-            # Determinar tipo de módulo y extraer
-            tipo = act.get("tipo", "unknown")
-            result_path = ""
+    with _lote_youtube(), _volcar_huellas(ruta_curso, extraidas):
+        while checkpoint["pending"]:
+            act = checkpoint["pending"][0]
+            console.print(f"[dim]Procesando:[/dim] {act['nombre'][:50]}...")
 
-            if tipo == "page":
-                from extractor_modulos import extraer_modulo_page
-                data = extraer_modulo_page(act["url"])
-                result_path = _guardar_page(act, data, ruta_curso)
-            elif tipo == "quiz":
-                from extractor_modulos import extraer_modulo_quiz
-                data = extraer_modulo_quiz(act["url"])
-                result_path = _guardar_quiz(act, data, ruta_curso)
-            elif tipo == "forum":
-                # Foros evaluables (>0% en título) → flujo nuevo:
-                # metadata + hilos principales de compañeros → Unidad-X/Foros/<slug>.md
-                # Foros introductorios (Avisos, Consultas, Presentación) → flujo viejo (COMUNICACION/).
-                from extractor_foro_evaluable import es_evaluable
-                from _procesar_foro_evaluable import procesar_foro_en_unidad
-                evaluable, _pct = es_evaluable(act.get("nombre", ""))
-                if evaluable:
-                    result_path = procesar_foro_en_unidad(act, ruta_curso, console)
-                else:
-                    from extractor_foro import extraer_discusiones_foro
-                    nombre_profesor = checkpoint.get("nombre_profesor")
-                    if not nombre_profesor:
-                        nombre_profesor = _detectar_profesor(act["url"])
-                    if nombre_profesor:
-                        discusiones = extraer_discusiones_foro(act["url"], nombre_profesor)
-                        result_path = _guardar_foro(act, discusiones, ruta_curso)
-                    else:
-                        console.print(f"      [yellow]Saltando foro (no se detectó profesor):[/yellow] {act['nombre']}")
-                        result_path = ""
-            elif tipo == "resource":
-                from extractor_modulos import extraer_modulo_resource
-                data = extraer_modulo_resource(act["url"])
-                result_path = _guardar_resource(act, data, ruta_curso)
-            elif tipo == "folder":
-                from extractor_modulos import extraer_modulo_folder
-                data = extraer_modulo_folder(act["url"])
-                result_path = _guardar_folder(act, data, ruta_curso)
-            elif tipo == "hvp":
-                from extractor_modulos import extraer_modulo_hvp
-                data = extraer_modulo_hvp(act["url"])
-                result_path = _guardar_hvp(act, data, ruta_curso)
-            elif tipo == "assign":
-                from extractor_modulos import extraer_modulo_assign
-                data = extraer_modulo_assign(act["url"])
-                result_path = _guardar_assign(act, data, ruta_curso)
-            elif tipo == "url":
-                from extractor_modulos import extraer_modulo_url
-                data = extraer_modulo_url(act["url"])
-                result_path = _guardar_url(act, data, ruta_curso)
-            elif tipo == "choice":
-                from extractor_modulos import extraer_modulo_choice
-                data = extraer_modulo_choice(act["url"])
-                result_path = _guardar_choice(act, data, ruta_curso)
-            elif tipo == "lesson":
-                from extractor_modulos import extraer_modulo_lesson
-                data = extraer_modulo_lesson(act["url"])
-                result_path = _guardar_lesson(act, data, ruta_curso)
-            elif tipo == "workshop":
-                from extractor_modulos import extraer_modulo_workshop
-                data = extraer_modulo_workshop(act["url"])
-                result_path = _guardar_workshop(act, data, ruta_curso)
-            else:
-                console.print(f"      [dim]Tipo no soportado:[/dim] {tipo} — {act['nombre']}")
+            try:
+                # Determinar tipo de módulo y extraer
+                tipo = act.get("tipo", "unknown")
                 result_path = ""
-
-            checkpoint = mark_done(checkpoint, act, result_path)
-            save_checkpoint(ruta_curso, checkpoint)
-
-        except SessionExpiredError:
-            console.print(Panel(
-                "[yellow]Sesión expirada durante extracción.[/yellow]\n"
-                f"Progreso guardado: {len(checkpoint['completed'])} actividades.\n"
-                "Por favor haz re-login en Chrome y vuelve a ejecutar init.",
-                title="[bold yellow]Pausa para re-login[/bold yellow]",
-                border_style="yellow"
-            ))
-            raise  # Propagar para que main() maneje re-login
+                html = paginas.pop(act["url"], None)
+                inicio = time.monotonic()
+
+                if tipo == "page":
+                    from extractor_modulos import extraer_modulo_page
+                    data = extraer_modulo_page(act["url"], html=html)
+                    result_path = _guardar_page(act, data, ruta_curso)
+                elif tipo == "quiz":
+                    from extractor_modulos import extraer_modulo_quiz
+                    data = extraer_modulo_quiz(act["url"], html=html)
+                    result_path = _guardar_quiz(act, data, ruta_curso)
+                elif tipo == "forum":
+                    # Foros evaluables (>0% en título) → flujo nuevo:
+                    # metadata + hilos principales de compañeros → Unidad-X/Foros/<slug>.md
+                    # Foros introductorios (Avisos, Consultas, Presentación) → flujo viejo (COMUNICACION/).
+                    from extractor_foro_evaluable import es_evaluable
+                    from _procesar_foro_evaluable import procesar_foro_en_unidad
+                    evaluable, _pct = es_evaluable(act.get("nombre", ""))
+                    if evaluable:
+                        result_path = procesar_foro_en_unidad(act, ruta_curso, console)
+                    else:
+                        from extractor_foro import extraer_discusiones_foro_incremental
+                        nombre_profesor = checkpoint.get("nombre_profesor")
+                        if not nombre_profesor:
+                            nombre_profesor = _detectar_profesor(act["url"])
+                        if nombre_profesor:
+                            # Solo abre las discusiones posteriores a la marca de agua
+                            discusiones = extraer_discusiones_foro_incremental(
+                                act["url"], nombre_profesor, ruta_curso)
+                            result_path = _guardar_foro(act, discusiones, ruta_curso)
+                        else:
+                            console.print(f"      [yellow]Saltando foro (no se detectó profesor):[/yellow] {act['nombre']}")
+                            result_path = ""
+                elif tipo == "resource":
+                    from extractor_modulos import extraer_modulo_resource
+                    data = extraer_modulo_resource(act["url"], html=html)
+                    result_path = _guardar_resource(act, data, ruta_curso)
+                elif tipo == "folder":
+                    from extractor_modulos import extraer_modulo_folder
+                    data = extraer_modulo_folder(act["url"], html=html)
+                    result_path = _guardar_folder(act, data, ruta_curso)
+                elif tipo == "hvp":
+                    from extractor_modulos import extraer_modulo_hvp
+                    data = extraer_modulo_hvp(act["url"], html=html)
+                    result_path = _guardar_hvp(act, data, ruta_curso)
+                elif tipo == "assign":
+                    from extractor_modulos import extraer_modulo_assign
+                    data = extraer_modulo_assign(act["url"], html=html)
+                    result_path = _guardar_assign(act, data, ruta_curso)
+                elif tipo == "url":
+                    from extractor_modulos import extraer_modulo_url
+                    data = extraer_modulo_url(act["url"], html=html)
+                    result_path = _guardar_url(act, data, ruta_curso)
+                elif tipo == "choice":
+                    from extractor_modulos import extraer_modulo_choice
+                    data = extraer_modulo_choice(act["url"], html=html)
+                    result_path = _guardar_choice(act, data, ruta_curso)
+                elif tipo == "lesson":
+                    from extractor_modulos import extraer_modulo_lesson
+                    data = extraer_modulo_lesson(act["url"], html=html)
+                    result_path = _guardar_lesson(act, data, ruta_curso)
+                elif tipo == "workshop":
+                    from extractor_modulos import extraer_modulo_workshop
+                    data = extraer_modulo_workshop(act["url"], html=html)
+                    result_path = _guardar_workshop(act, data, ruta_curso)
+                else:
+                    console.print(f"      [dim]Tipo no soportado:[/dim] {tipo} — {act['nombre']}")
+                    result_path = ""
+
+                segundos = time.monotonic() - inicio
+                segundos_extraccion += segundos
+                checkpoint = record_done(ruta_curso, checkpoint, act, result_path)
+                if act["url"] in huellas:
+                    extraidas.append(({**act, "key": _url_key(act["url"])},
+                                      huellas[act["url"]], segundos, result_path))
+                    if len(extraidas) >= HUELLAS_POR_ESCRITURA:
+                        registrar_extracciones(ruta_curso, extraidas)
+                        extraidas.clear()
+
+            except SessionExpiredError:
+                console.print(Panel(
+                    "[yellow]Sesión expirada durante extracción.[/yellow]\n"
+                    f"Progreso guardado: {len(checkpoint['completed'])} actividades.\n"
+                    "Por favor haz re-login en Chrome y vuelve a ejecutar init.",
+                    title="[bold yellow]Pausa para re-login[/bold yellow]",
+                    border_style="yellow"
+                ))
+                raise  # Propagar para que main() maneje re-login
+            except Exception as e:
+                console.print(f"      [yellow]WARN:[/yellow] {act['nombre'][:50]}: {e}")
+                checkpoint = record_failed(ruta_curso, checkpoint, act, str(e))
+
+    if huellas:
+        console.print(f"[dim]Extracción: {segundos_extraccion:.1f}s · ahorro estimado por "
+                      f"actividades sin cambios: ~{segundos_ahorrados:.1f}s[/dim]")
 
     # 3. Merge AGENTS.md (preservar manuales)
     agents_path = os.path.join(ruta_curso, "AGENTS.md")
@@ -406,8 +555,12 @@ def _sync_curso(url: str, ruta_curso: str):
     generar_pga_md(ruta_curso, pga)
     generar_context_md(ruta_curso, datos_curso)
 
-    # 5. Limpiar checkpoint al completar
-    clear_checkpoint(ruta_curso)
+    # 5. Limpiar checkpoint al completar (las fallidas quedan para la próxima corrida)
+    fallidas = checkpoint.get("failed", {})
+    if fallidas:
+        compact_checkpoint(ruta_curso)
+    else:
+        clear_checkpoint(ruta_curso)
 
     console.print(Panel(
         f"[bold]{info.get('nombre', 'Curso')}[/bold]\n"
@@ -416,13 +569,65 @@ def _sync_curso(url: str, ruta_curso: str):
         title="[bold green]Sincronización completada[/bold green]",
         border_style="green"
     ))
-    console.print("[dim]Secciones manuales preservadas. Checkpoint eliminado.[/dim]")
+    if fallidas:
+        console.print(f"[yellow]{len(fallidas)} actividades fallaron; quedan en el checkpoint "
+                      "y se reintentan en la próxima ejecución.[/yellow]")
+    else:
+        console.print("[dim]Secciones manuales preservadas. Checkpoint eliminado.[/dim]")
+
+
+def _activar_modo_http(workers: int, intervalo_host: float, *,
+                       use_async: bool = False, max_en_vuelo: int = MAX_EN_VUELO,
+                       max_por_host: int = 0, cache_http: bool = True) -> bool:
+    """Activa el backend requests (o async) con la sesión de .moodle_session.json.
+
+    Args:
+        workers: Descargas simultáneas de actividades por curso.
+        intervalo_host: Segundos mínimos entre requests al mismo host.
+        use_async: Activar además el backend httpx async.
+        max_en_vuelo: Requests simultáneos del backend async.
+        max_por_host: Conexiones simultáneas por host (default: workers).
+        cache_http: Caché HTTP condicional (ETag/Last-Modified) en .http_cache/.
+
+    Returns:
+        False si no hay sesión guardada o falta httpx.
+    """
+    from moodle_session import cargar_session_requests
+    session = cargar_session_requests()
+    if not session:
+        console.print(
+            "[bold red]ERROR:[/bold red] No hay sesión guardada "
+            "(.moodle_session.json). Corre primero con navegador para hacer login."
+        )
+        return False
+    from browser_api import set_request_mode
+    set_request_mode(session)
+    from navegador_requests import configurar_cache_http, configurar_cortesia
+    configurar_cortesia(max_por_host or workers, intervalo_host)
+    configurar_cache_http("" if cache_http else None)
+    if use_async:
+        from browser_api import set_async_mode
+        try:
+            set_async_mode(session, max_en_vuelo=max_en_vuelo)
+        except RuntimeError as e:
+            console.print(f"[bold red]ERROR:[/bold red] {e}")
+            return False
+        console.print(f"[dim]Modo async activado (sin navegador, "
+                      f"{max_en_vuelo} requests en vuelo)[/dim]")
+    else:
+        console.print(f"[dim]Modo requests activado (sin navegador, {workers} workers)[/dim]")
+    return True
 
 
 def _init_curso(url: str, destino: str, profile_dir: str | None = None,
                 reset_profile: bool = False, no_browser: bool = False,
                 use_requests: bool = False,
-                periodo: str = "", bloque: str = ""):
+                periodo: str = "", bloque: str = "",
+                workers: int = DEFAULT_WORKERS,
+                intervalo_host: float = INTERVALO_HOST,
+                use_async: bool = False,
+                max_en_vuelo: int = MAX_EN_VUELO,
+                cache_http: bool = True):
     """Inicializa UN curso desde Moodle. Llamable directamente o via subproceso.
 
     Args:
@@ -434,19 +639,24 @@ def _init_curso(url: str, destino: str, profile_dir: str | None = None,
         use_requests: Usar requests.Session en vez de Selenium/CDP.
         periodo: Período académico (ej: 2026-2). Se infiere de --destino si vacío.
         bloque: Bloque académico (ej: B1). Se infiere de --destino si vacío.
+        workers: Descargas simultáneas de actividades (solo modo requests).
+        intervalo_host: Segundos mínimos entre requests al mismo host.
+        use_async: Backend httpx async (HTTP/2) sobre la misma sesión; implica use_requests.
+        max_en_vuelo: Requests simultáneos del backend async.
+        cache_http: Caché HTTP condicional en modo requests (--sin-cache-http la apaga).
     """
+    from browser_api import esta_usando_requests
+    from formatear_llm import obtener_metadatos
+    obtener_metadatos()  # descarta metadatos de un curso anterior
+
+    use_requests = use_requests or use_async
     if use_requests:
-        from moodle_session import cargar_session_requests
-        session = cargar_session_requests()
-        if not session:
-            console.print(
-                "[bold red]ERROR:[/bold red] No hay sesión guardada "
-                "(.moodle_session.json). Corre primero con navegador para hacer login."
-            )
+        # Con --parallel el backend ya está activo y lo comparten todos los cursos
+        if not esta_usando_requests() and not _activar_modo_http(
+            workers, intervalo_host, use_async=use_async, max_en_vuelo=max_en_vuelo,
+            cache_http=cache_http,
+        ):
             sys.exit(1)
-        from browser_api import set_request_mode
-        set_request_mode(session)
-        console.print("[dim]Modo requests activado (sin navegador)[/dim]")
     elif not no_browser:
         profile = profile_dir or os.path.join(os.getcwd(), ".browserdata")
         if reset_profile and os.path.isdir(profile):
@@ -610,7 +820,6 @@ def _init_curso(url: str, destino: str, profile_dir: str | None = None,
     docs_intro = _procesar_documentos_intro(actividades_intro, ruta_curso)
 
     datos_curso["docs_introductorios"] = docs_intro
-    from formatear_llm import obtener_metadatos
     metadatos_llm = obtener_metadatos()
     datos_curso["metadatos_llm"] = _fusionar_metadatos(metadatos_llm) if metadatos_llm else {}
 
@@ -623,14 +832,17 @@ def _init_curso(url: str, destino: str, profile_dir: str | None = None,
     _extraer_y_guardar_foros(actividades_intro, ruta_curso, nombre_profesor)
 
     # Phase 2: actividades de unidades
-    _procesar_actividades_unidades(sidebar, ruta_curso, nombre_profesor)
+    with _lote_youtube():
+        _procesar_actividades_unidades(sidebar, ruta_curso, nombre_profesor,
+                                       workers=workers if use_requests else 1)
 
     # Crear snapshot inicial para futuros diffs
     _crear_snapshot_inicial(sidebar, ruta_curso)
 
     # Escribir/actualizar clickup.json en la raíz del período
-    _escribir_clickup_json(destino, datos_curso["codigo"], datos_curso["nombre"],
-                           periodo, bloque, url)
+    with _CLICKUP_LOCK:
+        _escribir_clickup_json(destino, datos_curso["codigo"], datos_curso["nombre"],
+                               periodo, bloque, url)
 
     # 11. Resumen
     console.print(f"\n[bold green]Inicialización completa:[/bold green] {datos_curso['nombre']}")
@@ -714,12 +926,18 @@ def _mejorar_vision_general(info: dict, actividades_intro: list[dict]):
 
 
 def _procesar_documentos_intro(actividades_intro: list[dict], ruta_curso: str) -> list[dict]:
-    """Descarga y formatea documentos introductorios (PDF, DOCX, etc.)."""
-    from extractor_documentos import extraer_texto_documento
+    """Descarga y formatea documentos introductorios (PDF, DOCX, etc.).
+
+    La descarga es secuencial; la extracción de texto de todos los archivos
+    corre en un pool de procesos (con caché por contenido) y el formateo LLM
+    va en streams concurrentes: cada documento escribe su `.md` junto al
+    archivo descargado a medida que llega la respuesta.
+    """
+    from extractor_documentos import extraer_textos_archivos
     from extractor_modulos import extraer_modulo_resource
-    from formatear_llm import formatear_texto_llm
+    from formatear_llm import formatear_textos_llm_stream
 
-    docs = []
+    descargados = []
     for act in actividades_intro:
         if act.get("tipo") != "resource" or not act.get("url"):
             continue
@@ -734,26 +952,52 @@ def _procesar_documentos_intro(actividades_intro: list[dict], ruta_curso: str) -
             ruta_archivo = os.path.join(ruta_materia, filename)
             _descargar_binario(download_url, ruta_archivo)
             console.print(f"    [green]Descargado:[/green] {ruta_archivo}")
-            texto = extraer_texto_documento(download_url)
-            if texto:
-                texto_formateado = formatear_texto_llm(
-                    texto,
-                    instruccion="Limpia y estructura este documento introductorio académico.",
-                )
-                docs.append({"nombre": act["nombre"], "texto": texto_formateado})
-                console.print(f"    [green]{act['nombre'][:40]}:[/green] "
-                             f"Texto extraído ({len(texto_formateado)} chars)")
-            else:
-                console.print(f"    [yellow]{act['nombre'][:40]}:[/yellow] No se pudo extraer texto")
+            descargados.append((act["nombre"], ruta_archivo))
         except Exception as e:
             console.print(f"    [yellow]{act['nombre'][:40]}:[/yellow] Error: {e}")
+
+    textos = extraer_textos_archivos([ruta for _, ruta in descargados])
+    extraidos = []
+    for (nombre, ruta_archivo), texto in zip(descargados, textos, strict=True):
+        if texto:
+            extraidos.append((nombre, texto, _ruta_markdown(ruta_archivo)))
+        else:
+            console.print(f"    [yellow]{nombre[:40]}:[/yellow] No se pudo extraer texto")
+
+    if not extraidos:
+        return []
+
+    try:
+        formateados = formatear_textos_llm_stream(
+            [texto for _, texto, _ in extraidos],
+            [ruta_md for _, _, ruta_md in extraidos],
+            instruccion="Limpia y estructura este documento introductorio académico.",
+        )
+    except Exception as e:
+        console.print(f"    [yellow]Formateo LLM falló, usando texto crudo:[/yellow] {e}")
+        formateados = [(texto, None) for _, texto, _ in extraidos]
+
+    docs = []
+    for (nombre, _, ruta_md), (texto_formateado, ttft) in zip(extraidos, formateados,
+                                                             strict=True):
+        docs.append({"nombre": nombre, "texto": texto_formateado})
+        primer_token = f", primer token {ttft:.2f}s" if ttft is not None else ""
+        console.print(f"    [green]{nombre[:40]}:[/green] "
+                      f"Texto extraído ({len(texto_formateado)} chars{primer_token}) "
+                      f"[dim]→ {os.path.basename(ruta_md)}[/dim]")
     return docs
 
 
+def _ruta_markdown(ruta_archivo: str) -> str:
+    """MATERIA/guia.pdf → MATERIA/guia.md (sin pisar un .md descargado)."""
+    base, ext = os.path.splitext(ruta_archivo)
+    return f"{base}.formateado.md" if ext.lower() == ".md" else f"{base}.md"
+
+
 def _extraer_y_guardar_foros(actividades_intro: list[dict], ruta_curso: str,
                              nombre_profesor: str | None):
     """Extrae y guarda discusiones de foros introductorios."""
-    from extractor_foro import extraer_discusiones_foro
+    from extractor_foro import extraer_discusiones_foro_incremental
 
     if not nombre_profesor:
         console.print("    [yellow]No se pudo identificar al profesor, omitiendo foros[/yellow]")
@@ -764,7 +1008,7 @@ def _extraer_y_guardar_foros(actividades_intro: list[dict], ruta_curso: str,
         if act.get("tipo") != "forum":
             continue
         console.print(f"    Procesando foro: {act['nombre']}...")
-        discusiones = extraer_discusiones_foro(act["url"], nombre_profesor)
+        discusiones = extraer_discusiones_foro_incremental(act["url"], nombre_profesor, ruta_curso)
         if discusiones:
             foros_extraidos.append({
                 "nombre": act["nombre"], "url": act["url"], "discusiones": discusiones,
@@ -803,7 +1047,7 @@ def main():
     )
     parser.add_argument(
         "--parallel", action="store_true",
-        help="Procesar múltiples URLs en paralelo via subprocesos"
+        help="Procesar múltiples URLs en paralelo (hilos en este proceso, ver --max-cursos)"
     )
     parser.add_argument(
         "--no-browser", action="store_true",
@@ -829,7 +1073,51 @@ def main():
         "--bloque", default="",
         help="Bloque académico (ej: B1). Si no, se infiere del --destino."
     )
+    parser.add_argument(
+        "--workers", type=int, default=DEFAULT_WORKERS,
+        help=f"Descargas simultáneas de actividades en modo requests (default: {DEFAULT_WORKERS})"
+    )
+    parser.add_argument(
+        "--intervalo-host", type=float, default=INTERVALO_HOST,
+        help=f"Segundos mínimos entre requests al mismo host (default: {INTERVALO_HOST})"
+    )
+    parser.add_argument(
+        "--async-http", action="store_true",
+        help="Backend httpx async con HTTP/2 (implica --requests). Requiere httpx[http2]."
+    )
+    parser.add_argument(
+        "--max-en-vuelo", type=int, default=MAX_EN_VUELO,
+        help=f"Requests simultáneos del backend async (default: {MAX_EN_VUELO})"
+    )
+    parser.add_argument(
+        "--max-cursos", type=int, default=MAX_CURSOS,
+        help=f"Cursos simultáneos con --parallel (default: {MAX_CURSOS})"
+    )
+    parser.add_argument(
+        "--sin-cache-http", action="store_true",
+        help="No usar la caché HTTP condicional (.http_cache/) en modo requests"
+    )
+    parser.add_argument(
+        "--store-materiales", default="",
+        help="Carpeta del store de materiales compartido (default: .materiales/ del skill; "
+             "en el mismo volumen que los cursos para usar hardlinks)"
+    )
+    parser.add_argument(
+        "--cdp-rapido", action="store_true",
+        help="Modo rápido de Chrome CDP: sin imágenes/fuentes/CSS, esperas por eventos "
+             "en vez de sleeps y pestañas simultáneas"
+    )
+    parser.add_argument(
+        "--pestanas", type=int, default=DEFAULT_PESTANAS,
+        help=f"Pestañas simultáneas con --cdp-rapido (default: {DEFAULT_PESTANAS})"
+    )
     args = parser.parse_args()
+    if args.async_http:
+        args.requests = True
+    from store_materiales import configurar_store_materiales
+    configurar_store_materiales(args.store_materiales)
+    if args.cdp_rapido:
+        set_cdp_fast_mode(args.pestanas)
 
     console.print(Panel.fit(
         "[bold]GESTIONAR-CURSOS[/bold] :: CLI INIT",
@@ -847,9 +1135,12 @@ def main():
 
     # Múltiples URLs con --parallel
     if len(args.urls) > 1 and args.parallel:
-        console.print(f"\n[bold cyan]PARALELO:[/bold cyan] {len(args.urls)} cursos en simultáneo")
+        console.print(f"\n[bold cyan]PARALELO:[/bold cyan] {len(args.urls)} cursos, máx. {args.max_cursos} a la vez")
         _init_parallel(args.urls, args.destino, profile, periodo=args.periodo,
-                       bloque=args.bloque)
+                       bloque=args.bloque, workers=args.workers,
+                       intervalo_host=args.intervalo_host,
+                       use_async=args.async_http, max_en_vuelo=args.max_en_vuelo,
+                       max_cursos=args.max_cursos, cache_http=not args.sin_cache_http)
         return
 
     # Modo secuencial (1 URL o múltiples sin --parallel)
@@ -858,7 +1149,15 @@ def main():
         _init_curso(url, args.destino, profile_dir=profile,
                     reset_profile=args.reset_profile, no_browser=args.no_browser,
                     use_requests=args.requests,
-                    periodo=args.periodo, bloque=args.bloque)
+                    periodo=args.periodo, bloque=args.bloque,
+                    workers=args.workers, intervalo_host=args.intervalo_host,
+                    use_async=args.async_http, max_en_vuelo=args.max_en_vuelo,
+                    cache_http=not args.sin_cache_http)
+    if args.requests:
+        _imprimir_resumen_cache_http()
+    else:
+        _imprimir_resumen_cargas_cdp()
+    _imprimir_resumen_materiales()
 
 
 def _crear_snapshot_inicial(sidebar: list[dict], ruta_curso: str):
@@ -882,6 +1181,8 @@ def _crear_snapshot_inicial(sidebar: list[dict], ruta_curso: str):
             "fecha_apertura": "",
             "fecha_cierre": "",
         }
+        if item.get("huella"):
+            actividades[key]["huella"] = item["huella"]
 
     cache_dir = os.path.join(ruta_curso, "_cache")
     os.makedirs(cache_dir, exist_ok=True)
@@ -983,19 +1284,30 @@ def _escribir_clickup_json(destino: str, codigo: str, nombre_curso: str,
 
 
 def _init_parallel(urls: list[str], destino: str, profile_dir: str,
-                   periodo: str = "", bloque: str = ""):
-    """Lanza subprocesos independientes para cada URL usando requests.
+                   periodo: str = "", bloque: str = "",
+                   workers: int = DEFAULT_WORKERS,
+                   intervalo_host: float = INTERVALO_HOST,
+                   use_async: bool = False,
+                   max_en_vuelo: int = MAX_EN_VUELO,
+                   max_cursos: int = MAX_CURSOS,
+                   cache_http: bool = True):
+    """Inicializa varios cursos a la vez en este proceso (scheduler_cursos).
 
     Flujo:
-    1. Padre hace login via Chrome CDP.
+    1. Login via Chrome CDP.
     2. Exporta cookies a .moodle_session.json.
     3. Cierra Chrome/desconecta driver.
-    4. Lanza N subprocesos, cada uno con --requests.
-    5. Cada subproceso carga cookies y usa requests.Session sin navegador.
+    4. Activa el backend requests (o async) una sola vez: todos los
+       cursos comparten la sesión, el pool de conexiones y la cortesía
+       por host.
+    5. Corre hasta max_cursos cursos simultáneos en hilos, con una tabla
+       de progreso; al final imprime el log de cada curso y los tiempos.
     """
-    import shlex
+    from rich.live import Live
+    from rich.markup import escape
+    from scheduler_cursos import ejecutar_cursos, resumen_tiempos
 
-    # 1. Login via Chrome CDP (padre)
+    # 1. Login via Chrome CDP
     set_profile_dir(profile_dir)
     navegador = get_navegador()
     navegador(BASE_URL + "/my/")
@@ -1004,56 +1316,108 @@ def _init_parallel(urls: list[str], destino: str, profile_dir: str,
         console.print("[bold red]ERROR:[/bold red] No se pudo autenticar.")
         return
 
-    # 2. Exportar cookies para subprocesos
+    # 2. Exportar cookies para el backend HTTP
     console.print("[dim]Exportando cookies de sesión...[/dim]")
     from moodle_session import guardar_cookies_selenium
     if not guardar_cookies_selenium():
         console.print("[bold red]ERROR:[/bold red] No se pudieron exportar cookies.")
         return
 
-    # 3. Desconectar driver del padre (libera Chrome)
+    # 3. Desconectar driver (libera Chrome)
     try:
         driver = get_driver()
         driver.quit()
     except Exception:
         pass
 
-    # 4. Lanzar subprocesos (cada uno con --requests)
-    console.print(f"\n[dim]Lanzando {len(urls)} subprocesos (modo requests)...[/dim]")
-    proceso_script = os.path.join(os.path.dirname(os.path.abspath(__file__)),
-                                  "cli_init.py")
-
-    procesos = []
-    for i, url in enumerate(urls, 1):
-        cmd = [
-            sys.executable, proceso_script,
-            url,
-            "--destino", destino,
-            "--requests",
-        ]
-        if periodo:
-            cmd.extend(["--periodo", periodo])
-        if bloque:
-            cmd.extend(["--bloque", bloque])
-        console.print(f"  [{i}/{len(urls)}] {' '.join(shlex.quote(a) for a in cmd[:3])}...")
-        env = os.environ.copy()
-        env.setdefault("PYTHONIOENCODING", "utf-8")
-        p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
-                             text=True, encoding="utf-8", errors="replace", env=env)
-        procesos.append((url, p))
-
-    # 5. Esperar y recolectar resultados
-    for url, p in procesos:
-        console.print(f"\n[bold]--- Resultado: {url} ---[/bold]")
-        for line in p.stdout:
-            console.print(f"  {line.rstrip()}", markup=False, highlight=False)
-        p.wait()
-        if p.returncode == 0:
+    # 4. Backend HTTP compartido
+    max_cursos = max(1, min(max_cursos, len(urls)))
+    if not _activar_modo_http(workers, intervalo_host, use_async=use_async,
+                              max_en_vuelo=max_en_vuelo,
+                              max_por_host=workers * max_cursos, cache_http=cache_http):
+        return
+
+    # 5. Scheduler
+    console.print(f"\n[dim]{len(urls)} cursos, {max_cursos} simultáneos (un proceso)...[/dim]")
+
+    def _correr(url: str):
+        _init_curso(url, destino, use_requests=True, periodo=periodo, bloque=bloque,
+                    workers=workers, intervalo_host=intervalo_host)
+
+    estados: list[dict] = []
+    inicio = time.monotonic()
+    with Live(get_renderable=lambda: _tabla_cursos(estados), console=console,
+              refresh_per_second=2, transient=True,
+              redirect_stdout=False, redirect_stderr=False):
+        estados = ejecutar_cursos(urls, _correr, max_concurrentes=max_cursos,
+                                  patron_fase=_RE_FASE, al_iniciar=estados.extend)
+    resumen = resumen_tiempos(estados, time.monotonic() - inicio)
+
+    for e in estados:
+        console.print(f"\n[bold]--- Resultado: {e['url']} ---[/bold]")
+        console.file.write(e["log"])
+        console.file.flush()
+        if e["estado"] == "ok":
             console.print("  [green]OK[/green]")
         else:
-            console.print(f"  [yellow]Código salida: {p.returncode}[/yellow]")
+            console.print(f"  [yellow]Error:[/yellow] {escape(e['error'])}")
+
+    console.print()
+    console.print(_tabla_cursos(estados, titulo="Tiempos por curso"))
+    console.print(
+        f"[bold green]Paralelo completado:[/bold green] {resumen['ok']}/{resumen['cursos']} "
+        f"cursos en {resumen['segundos_total']:.1f}s "
+        f"(suma {resumen['segundos_suma']:.1f}s, {resumen['aceleracion']:.1f}x)"
+    )
+    _imprimir_resumen_cache_http()
+    _imprimir_resumen_materiales()
 
-    console.print(f"\n[bold green]Paralelo completado:[/bold green] {len(urls)} cursos")
+
+def _imprimir_resumen_cache_http():
+    from navegador_requests import resumen_cache_http
+    resumen = resumen_cache_http()
+    if resumen:
+        console.print(f"[dim]{resumen}[/dim]")
+
+
+def _imprimir_resumen_cargas_cdp():
+    if not esta_usando_selenium():
+        return
+    from navegador_cdp import resumen_cargas
+    resumen = resumen_cargas()
+    if resumen:
+        console.print(f"[dim]{resumen}[/dim]")
+
+
+def _imprimir_resumen_materiales():
+    from store_materiales import resumen_materiales
+    resumen = resumen_materiales()
+    if resumen:
+        console.print(f"[dim]{resumen}[/dim]")
+
+
+def _tabla_cursos(estados: list[dict], titulo: str = "Cursos en paralelo"):
+    """Tabla de estado, fase y tiempo por curso (en vivo y resumen final)."""
+    from rich.markup import escape
+    from rich.table import Table
+
+    colores = {"en cola": "dim", "corriendo": "cyan", "ok": "green", "error": "red"}
+    tabla = Table(title=titulo)
+    tabla.add_column("Curso")
+    tabla.add_column("Estado")
+    tabla.add_column("Fase / error")
+    tabla.add_column("Tiempo", justify="right")
+    for e in estados:
+        corriendo = e["estado"] == "corriendo"
+        segundos = time.monotonic() - e["inicio"] if corriendo else e["segundos"]
+        color = colores.get(e["estado"], "white")
+        tabla.add_row(
+            _url_key(e["url"]),
+            f"[{color}]{e['estado']}[/{color}]",
+            escape(e["error"] or e["fase"]),
+            f"{segundos:.0f}s" if e["estado"] != "en cola" else "",
+        )
+    return tabla
 
 
 def _detectar_profesor(url_foro: str) -> str | None:
@@ -1069,11 +1433,9 @@ def _detectar_profesor(url_foro: str) -> str | None:
 
 
 def _descargar_binario(url: str, ruta_destino: str) -> str:
-    """Descarga archivo binario usando hacer_get y lo guarda en disco."""
-    from browser_api import hacer_get
-    contenido = hacer_get(url)
-    with open(ruta_destino, "wb") as f:
-        f.write(contenido)
+    """Descarga un binario en streaming al store de materiales y lo enlaza en ruta_destino."""
+    from store_materiales import abrir_store_materiales
+    abrir_store_materiales().descargar(url, ruta_destino)
     return ruta_destino
 
 
@@ -1536,14 +1898,66 @@ def _guardar_workshop(act: dict, data: dict, ruta_curso: str) -> str:
 
 
 def _procesar_youtube_video(url: str, ruta_destino: str, nombre_actividad: str):
-    """Extrae subtítulos y resume video YouTube si yt-dlp disponible."""
+    """Extrae subtítulos y resume video YouTube si yt-dlp disponible.
+
+    Dentro de _lote_youtube() solo lo anota; el lote se procesa al final.
+    """
+    pendientes = _videos_youtube.get()
+    if pendientes is not None:
+        pendientes.append((url, ruta_destino, nombre_actividad))
+        return
+    _procesar_videos_youtube([(url, ruta_destino, nombre_actividad)])
+
+
+@contextlib.contextmanager
+def _lote_youtube():
+    """Acumula los videos de YouTube del bloque y los procesa juntos al salir.
+
+    Transcripciones concurrentes (con caché por id de video) y resúmenes
+    en un solo batch LLM. Si el bloque falla (ej: sesión expirada) los
+    videos ya anotados se procesan igual: sus páginas quedaron guardadas y
+    no se reprocesan al reanudar.
+    """
+    token = _videos_youtube.set([])
+    procesar = False
+    try:
+        yield
+        procesar = True
+    except Exception:
+        procesar = True
+        raise
+    finally:
+        pendientes = _videos_youtube.get()
+        _videos_youtube.reset(token)
+        if procesar and pendientes:
+            console.print(f"    [dim]YouTube: {len(pendientes)} videos en lote...[/dim]")
+            _procesar_videos_youtube(pendientes)
+
+
+@contextlib.contextmanager
+def _volcar_huellas(ruta_curso: str, extraidas: list[tuple]):
+    """Escribe en la snapshot las huellas que queden en extraidas al salir.
+
+    El bucle de extracción las acumula y vuelca cada HUELLAS_POR_ESCRITURA;
+    aquí se escriben las últimas, también si el bloque se corta (ej: sesión
+    expirada), porque esas actividades ya quedaron hechas en el checkpoint.
+    """
+    try:
+        yield
+    finally:
+        registrar_extracciones(ruta_curso, extraidas)
+        extraidas.clear()
+
+
+def _procesar_videos_youtube(videos: list[tuple[str, str, str]]):
     try:
-        from extractor_youtube import procesar_video_youtube
-        procesar_video_youtube(url, ruta_destino, nombre_actividad)
+        from extractor_youtube import procesar_videos_youtube
+        procesar_videos_youtube(videos)
     except ImportError:
-        console.print(f"      [dim]yt-dlp no instalado, omitiendo YouTube:[/dim] {url}")
+        for url, _, _ in videos:
+            console.print(f"      [dim]yt-dlp no instalado, omitiendo YouTube:[/dim] {url}")
     except Exception as e:
-        console.print(f"      [yellow]Error procesando YouTube {url}:[/yellow] {e}")
+        console.print(f"      [yellow]Error procesando YouTube:[/yellow] {e}")
 
 
 def _fusionar_metadatos(metadatos_list: list[dict]) -> dict:
@@ -1566,13 +1980,27 @@ def _fusionar_metadatos(metadatos_list: list[dict]) -> dict:
     return resultado
 
 
-def _procesar_actividades_unidades(
-    sidebar: list[dict],
-    ruta_curso: str,
-    nombre_profesor: str | None,
-):
-    """Phase 2: extrae y guarda cada actividad de cada unidad."""
-    console.print("\n[bold cyan][5.75/6][/bold cyan] Extrayendo actividades de unidades...")
+# Guardado por tipo de actividad (extractor: extractor_modulos.extraer_modulo_<tipo>)
+_GUARDAR_POR_TIPO = {
+    "page": _guardar_page,
+    "quiz": _guardar_quiz,
+    "resource": _guardar_resource,
+    "folder": _guardar_folder,
+    "hvp": _guardar_hvp,
+    "assign": _guardar_assign,
+    "url": _guardar_url,
+    "choice": _guardar_choice,
+    "lesson": _guardar_lesson,
+    "workshop": _guardar_workshop,
+}
+
+
+def _tareas_actividades(sidebar: list[dict]) -> list[dict]:
+    """Actividades con URL del sidebar, cada una con su sección propagada.
+
+    La sección actual se copia en item["seccion"] para el routing de _guardar_*().
+    """
+    tareas = []
     unidad_actual = None
     for item in sidebar:
         if item.get("tipo") == "seccion":
@@ -1580,81 +2008,147 @@ def _procesar_actividades_unidades(
             continue
         if not item.get("url"):
             continue
+        item["seccion"] = unidad_actual or ""
+        tareas.append(item)
+    return tareas
 
-        tipo = item.get("tipo", "unknown")
-        nombre = item.get("nombre", "")
-        url = item["url"]
 
-        # Propagar sección actual para routing en _guardar_*()
-        item["seccion"] = unidad_actual or ""
+def _extraer_actividad(item: dict, nombre_profesor: str | None, ruta_curso: str,
+                       html: str | None = None):
+    """Extrae los datos de una actividad (navega si html es None).
 
-        # Determinar ruta destino basada en unidad actual
-        ruta_destino = _ruta_unidad_por_nombre(nombre, ruta_curso)
-        # Si la heurística fallback no funciona bien, intentar usar unidad_actual
-        if unidad_actual and unidad_actual.lower() not in ruta_destino.lower():
-            # Construir nombre de carpeta desde unidad_actual
-            import re
-            safe = re.sub(r'[<>"/\\|?*]', '-', unidad_actual).strip().replace(" ", "-")
-            fallback = os.path.join(ruta_curso, safe)
-            if os.path.isdir(fallback):
-                ruta_destino = fallback
+    Los foros usan la marca de agua del curso (`_cache/foros_profesor.json`),
+    igual que los foros introductorios.
 
-        console.print(f"    [dim]{tipo}:[/dim] {nombre[:50]}...")
+    Returns:
+        Datos del extractor, lista de discusiones para foros, o None si
+        el tipo no se soporta o el foro no aplica.
+    """
+    tipo = item.get("tipo", "unknown")
+    if tipo == "forum":
+        if not nombre_profesor:
+            return None
+        from extractor_foro import extraer_discusiones_foro_incremental
+        return extraer_discusiones_foro_incremental(item["url"], nombre_profesor, ruta_curso)
+    if tipo not in _GUARDAR_POR_TIPO:
+        return None
+    import extractor_modulos
+    return getattr(extractor_modulos, f"extraer_modulo_{tipo}")(item["url"], html=html)
 
+
+def _log_actividad(item: dict):
+    console.print(f"    [dim]{item.get('tipo', 'unknown')}:[/dim] {item.get('nombre', '')[:50]}...")
+
+
+def _guardar_actividad(item: dict, data, ruta_curso: str):
+    """Escribe la actividad extraída con el _guardar_* de su tipo."""
+    tipo = item.get("tipo", "unknown")
+    if tipo == "forum":
+        if data:
+            _guardar_foro(item, data, ruta_curso)
+    elif tipo in _GUARDAR_POR_TIPO:
+        _GUARDAR_POR_TIPO[tipo](item, data, ruta_curso)
+    else:
+        console.print(f"      [dim]Tipo no soportado:[/dim] {tipo}")
+
+
+def _procesar_actividades_unidades(
+    sidebar: list[dict],
+    ruta_curso: str,
+    nombre_profesor: str | None,
+    workers: int = 1,
+):
+    """Phase 2: extrae y guarda cada actividad de cada unidad.
+
+    En modo requests con workers > 1 usa el pipeline concurrente
+    (descarga → parseo → escritura); los archivos resultantes son los
+    mismos que en el recorrido secuencial.
+    """
+    console.print("\n[bold cyan][5.75/6][/bold cyan] Extrayendo actividades de unidades...")
+    tareas = _tareas_actividades(sidebar)
+
+    from browser_api import esta_usando_requests
+    if workers > 1 and esta_usando_requests():
+        _procesar_actividades_pipeline(tareas, ruta_curso, nombre_profesor, workers)
+        return
+
+    for item in tareas:
+        _log_actividad(item)
         try:
-            if tipo == "page":
-                from extractor_modulos import extraer_modulo_page
-                data = extraer_modulo_page(url)
-                _guardar_page(item, data, ruta_curso)
-            elif tipo == "quiz":
-                from extractor_modulos import extraer_modulo_quiz
-                data = extraer_modulo_quiz(url)
-                _guardar_quiz(item, data, ruta_curso)
-            elif tipo == "forum":
-                from extractor_foro import extraer_discusiones_foro
-                if nombre_profesor:
-                    discusiones = extraer_discusiones_foro(url, nombre_profesor)
-                    if discusiones:
-                        _guardar_foro(item, discusiones, ruta_curso)
-            elif tipo == "resource":
-                from extractor_modulos import extraer_modulo_resource
-                data = extraer_modulo_resource(url)
-                _guardar_resource(item, data, ruta_curso)
-            elif tipo == "folder":
-                from extractor_modulos import extraer_modulo_folder
-                data = extraer_modulo_folder(url)
-                _guardar_folder(item, data, ruta_curso)
-            elif tipo == "hvp":
-                from extractor_modulos import extraer_modulo_hvp
-                data = extraer_modulo_hvp(url)
-                _guardar_hvp(item, data, ruta_curso)
-            elif tipo == "assign":
-                from extractor_modulos import extraer_modulo_assign
-                data = extraer_modulo_assign(url)
-                _guardar_assign(item, data, ruta_curso)
-            elif tipo == "url":
-                from extractor_modulos import extraer_modulo_url
-                data = extraer_modulo_url(url)
-                _guardar_url(item, data, ruta_curso)
-            elif tipo == "choice":
-                from extractor_modulos import extraer_modulo_choice
-                data = extraer_modulo_choice(url)
-                _guardar_choice(item, data, ruta_curso)
-            elif tipo == "lesson":
-                from extractor_modulos import extraer_modulo_lesson
-                data = extraer_modulo_lesson(url)
-                _guardar_lesson(item, data, ruta_curso)
-            elif tipo == "workshop":
-                from extractor_modulos import extraer_modulo_workshop
-                data = extraer_modulo_workshop(url)
-                _guardar_workshop(item, data, ruta_curso)
-            else:
-                console.print(f"      [dim]Tipo no soportado:[/dim] {tipo}")
+            _guardar_actividad(item, _extraer_actividad(item, nombre_profesor, ruta_curso),
+                              ruta_curso)
         except SessionExpiredError:
             raise
         except Exception as e:
             console.print(f"      [yellow]Error:[/yellow] {e}")
 
 
+def _procesar_actividades_pipeline(
+    tareas: list[dict],
+    ruta_curso: str,
+    nombre_profesor: str | None,
+    workers: int,
+):
+    """Extracción concurrente de actividades sobre la sesión requests.
+
+    Los foros recorren varias páginas, así que su extracción completa
+    corre en la etapa de descarga; el resto descarga una sola página y la
+    parsea en la etapa de CPU. Con el backend async esas páginas se
+    descargan todas de una vez (acotadas por --max-en-vuelo) antes de
+    arrancar el pipeline.
+    """
+    from browser_api import esta_usando_async, obtener_pagina
+    from pipeline_actividades import ejecutar_pipeline
+
+    def _una_pagina(item: dict) -> bool:
+        if item.get("tipo") == "forum" or item.get("tipo") not in _GUARDAR_POR_TIPO:
+            return False
+        # redirect de Teams: el extractor navega por su cuenta
+        return not (item.get("tipo") == "url" and ("/l/meetup-join/" in item["url"]
+                                                    or "/l/channel/" in item["url"]))
+
+    prefetch: dict[str, object] = {}
+    if esta_usando_async():
+        from navegador_async import obtener_paginas
+        urls = list(dict.fromkeys(t["url"] for t in tareas if _una_pagina(t)))
+        prefetch = dict(zip(urls, obtener_paginas(urls), strict=True))
+
+    def descargar(item: dict):
+        if item.get("tipo") == "forum":
+            return _extraer_actividad(item, nombre_profesor, ruta_curso)
+        if not _una_pagina(item):
+            return None
+        if item["url"] in prefetch:
+            resultado = prefetch[item["url"]]
+            if isinstance(resultado, Exception):
+                raise resultado
+            return resultado[1]
+        return obtener_pagina(item["url"])[1]
+
+    def parsear(item: dict, descargado):
+        tipo = item.get("tipo")
+        if tipo == "forum" or tipo not in _GUARDAR_POR_TIPO:
+            return descargado
+        if descargado is not None:
+            # huella para el sync incremental (la recoge _crear_snapshot_inicial)
+            item["huella"] = huella_html(descargado)
+        return _extraer_actividad(item, nombre_profesor, ruta_curso, html=descargado)
+
+    def escribir(item: dict, data):
+        _log_actividad(item)
+        _guardar_actividad(item, data, ruta_curso)
+
+    def al_fallar(item: dict, e: Exception):
+        _log_actividad(item)
+        console.print(f"      [yellow]Error:[/yellow] {e}")
+
+    stats = ejecutar_pipeline(
+        tareas, descargar=descargar, parsear=parsear, escribir=escribir,
+        workers=workers, al_fallar=al_fallar, abortar_en=(SessionExpiredError,),
+    )
+    console.print(f"    [dim]Pipeline: {stats['ok']}/{stats['tareas']} actividades "
+                  f"en {stats['segundos']:.1f}s ({stats['workers']} workers, "
+                  f"{stats['fallidas']} con error)[/dim]")
+
 if __name__ == "__main__":
     main()
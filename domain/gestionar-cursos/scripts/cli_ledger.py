@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+CLI ledger: /gestionar-cursos ledger stats [--por profile|course|model_id|backend]
+
+Resume el ledger de telemetría LLM (`llm_ledger.jsonl` en la raíz del
+skill): llamadas, aciertos de caché, reintentos, fallbacks, tokens y
+latencia p50/p95 agrupados por perfil, curso, modelo o backend. Para el
+costo en USD con precios del catálogo, el mismo archivo se pasa a
+analyze-model:
+
+    python ../analyze-model/scripts/analyze_costs.py llm_ledger.jsonl --catalog catalog.json
+
+Uso:
+    uv run python cli_ledger.py stats
+    uv run python cli_ledger.py stats --por course
+    uv run python cli_ledger.py stats --ledger "C:/.../llm_ledger.jsonl"
+"""
+
+import argparse
+import os
+import sys
+
+from rich.console import Console
+from rich.table import Table
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from llm_ledger import leer, resumir
+
+console = Console()
+
+AGRUPACIONES = ("profile", "course", "model_id", "backend")
+
+
+def cmd_stats(ruta: str, por: str) -> int:
+    """Imprime el resumen del ledger agrupado por `por`."""
+    registros = leer(ruta)
+    if not registros:
+        console.print(f"[yellow]Ledger LLM vacío o inexistente:[/yellow] {ruta}")
+        return 1
+
+    filas = resumir(registros, por=por)
+    tabla = Table(title=f"Ledger LLM por {por} ({len(registros)} registros)")
+    for col in (por, "Llamadas", "Caché", "Fallidas", "Reintentos", "Fallback",
+                "Tokens in", "Tokens out", "p50", "p95", "Tiempo total"):
+        tabla.add_column(col, justify="left" if col == por else "right")
+
+    for f in filas:
+        tabla.add_row(
+            str(f["grupo"]), str(f["llamadas"]), str(f["cache_hits"]),
+            str(f["fallidas"]), str(f["reintentos"]), str(f["fallbacks"]),
+            f"{f['input_tokens']:,}", f"{f['output_tokens']:,}",
+            f"{f['p50_s']:.1f}s", f"{f['p95_s']:.1f}s", f"{f['segundos_total']:.0f}s",
+        )
+    console.print(tabla)
+
+    costo = sum(f["costo_usd"] for f in filas)
+    if costo:
+        console.print(f"Costo informado por OpenRouter: ${costo:.4f} USD")
+    console.print("[dim]Latencias solo de llamadas reales (sin aciertos de caché). "
+                  "Costo con precios del catálogo: analyze_costs.py <ledger>.[/dim]")
+    return 0
+
+
+def main():
+    from openrouter_client import _get_ledger_path
+
+    parser = argparse.ArgumentParser(description="Telemetría de llamadas LLM")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_stats = sub.add_parser("stats", help="Tokens, latencia y caché por grupo")
+    p_stats.add_argument("--por", choices=AGRUPACIONES, default="profile",
+                         help="Clave de agrupación (default: profile)")
+    p_stats.add_argument("--ledger", default="",
+                         help="Ruta del ledger (default: el de openrouter.json)")
+    args = parser.parse_args()
+
+    if args.comando == "stats":
+        ruta = args.ledger or _get_ledger_path()
+        if not ruta:
+            console.print("[yellow]Ledger desactivado[/yellow] (ledger.enabled en openrouter.json)")
+            sys.exit(1)
+        sys.exit(cmd_stats(ruta, args.por))
+
+
+if __name__ == "__main__":
+    main()
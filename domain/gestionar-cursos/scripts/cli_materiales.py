@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+CLI materiales: /gestionar-cursos materiales stats|gc
+
+Administra el store de materiales compartido entre cursos
+(`.materiales/`, ver store_materiales.py): archivos únicos, hardlinks y
+copias por curso, y recolección de los blobs que ya ningún curso usa
+(tras borrar una carpeta de curso o reemplazar un material).
+
+Uso:
+    uv run python cli_materiales.py stats
+    uv run python cli_materiales.py gc --dry-run
+    uv run python cli_materiales.py gc --store "D:/Universidad/.materiales"
+"""
+
+import argparse
+import os
+import sys
+
+from rich.console import Console
+from rich.table import Table
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from store_materiales import abrir_store_materiales
+
+console = Console()
+
+
+def _fmt_bytes(n: float) -> str:
+    for unidad in ("B", "KB", "MB"):
+        if abs(n) < 1024:
+            return f"{n:.0f} {unidad}" if unidad == "B" else f"{n:.1f} {unidad}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+
+def cmd_stats(directorio: str) -> int:
+    """Imprime tamaño del store, enlaces y contadores de descargas."""
+    st = abrir_store_materiales(directorio).stats()
+    tabla = Table(title=f"Store de materiales ({st['raiz']})")
+    tabla.add_column("Métrica")
+    tabla.add_column("Valor", justify="right")
+    filas = [
+        ("Archivos únicos", str(st["blobs"])),
+        ("Tamaño en disco", _fmt_bytes(st["bytes"])),
+        ("URLs conocidas", str(st["urls"])),
+        ("Hardlinks en cursos", str(st["hardlinks"])),
+        ("Copias (sin hardlink)", str(st["copias"])),
+        ("Descargas", str(st["descargadas"])),
+        ("Reanudadas", str(st["reanudadas"])),
+        ("Sin request (TTL)", str(st["frescas"])),
+        ("Revalidadas (304)", str(st["revalidadas"])),
+        ("Contenido repetido", str(st["dedup"])),
+        ("Descargado", _fmt_bytes(st["bytes_descargados"])),
+        ("No transferido", _fmt_bytes(st["bytes_ahorrados"])),
+    ]
+    for fila in filas:
+        tabla.add_row(*fila)
+    console.print(tabla)
+    return 0
+
+
+def cmd_gc(directorio: str, dry_run: bool) -> int:
+    """Borra blobs sin enlaces ni copias vivas y parciales abandonados."""
+    r = abrir_store_materiales(directorio).gc(dry_run=dry_run)
+    verbo = "Se borrarían" if dry_run else "Borrados"
+    console.print(f"[bold]{verbo}:[/bold] {r['borrados']}/{r['blobs']} archivos "
+                  f"({_fmt_bytes(r['bytes_liberados'])}), {r['parciales']} parciales; "
+                  f"{r['referencias_podadas']} copias ya no existen")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Store de materiales compartido entre cursos")
+    parser.add_argument("--store", default="",
+                        help="Carpeta del store (default: .materiales/ del skill)")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    sub.add_parser("stats", help="Archivos únicos, enlaces y bytes ahorrados")
+    p_gc = sub.add_parser("gc", help="Borrar archivos que ningún curso referencia")
+    p_gc.add_argument("--dry-run", action="store_true", help="Solo reportar")
+    args = parser.parse_args()
+
+    if args.comando == "stats":
+        sys.exit(cmd_stats(args.store))
+    if args.comando == "gc":
+        sys.exit(cmd_gc(args.store, args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+Plan y ejecución por lotes de la sincronización calificaciones → ClickUp.
+
+El flujo anterior de sync_calificaciones_clickup hacía, por cada actividad
+calificada y en serie, GET /task/{id}, GET /task/{id}/comment y luego PUT
+y POST: 1 + 2n llamadas más las mutaciones. Aquí se separa en tres fases:
+
+1. Prefetch: las tareas de la lista del curso en páginas de 100
+   (GET /list/{id}/task, incluye cerradas). Los comentarios se piden solo
+   para las tareas que no están en el registro local de comentarios ya
+   dejados (`_cache/clickup_comentarios.json`), en paralelo. ClickUp no
+   tiene un endpoint de comentarios por lista.
+2. planear_sync(): diff local, sin red.
+3. aplicar_plan(): solo las mutaciones necesarias, en paralelo y bajo un
+   RateLimiter (token bucket + AIMD de rate_limiter.py) con el límite de
+   la API de ClickUp.
+
+ClienteContado cuenta las llamadas que salen a la red (las respuestas de
+la caché del cliente no cuentan) para compararlas con el flujo anterior
+(llamadas_flujo_anterior()).
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from rate_limiter import STATE_DIRNAME, RateLimiter, segundos_hasta_reset
+
+CLICKUP_RPM = 100  # requests por minuto por token (planes Free/Unlimited/Business)
+CLICKUP_BURST = 10
+DEFAULT_WORKERS = 4
+TAREAS_POR_PAGINA = 100  # fijo en GET /list/{id}/task
+REGISTRO_FILENAME = "clickup_comentarios.json"
+REINTENTOS_429 = 3
+ESPERA_BASE_429 = 2.0  # segundos, si el 429 no trae Retry-After/X-RateLimit-Reset
+
+
+class ClienteContado:
+    """Envuelve el ClickUpClient: pasa cada llamada por el limiter y la cuenta.
+
+    Un 429 se reintenta hasta REINTENTOS_429 veces, esperando fuera del slot
+    lo que indique el servidor (o un backoff exponencial).
+    """
+
+    def __init__(self, client, limiter: RateLimiter | None = None):
+        self._client = client
+        self._limiter = limiter
+        self._lock = threading.Lock()
+        self.llamadas: Counter = Counter()
+
+    def _llamar(self, metodo: str, endpoint: str, **kwargs):
+        for intento in range(1, REINTENTOS_429 + 2):
+            with self._limiter.slot() if self._limiter else contextlib.nullcontext():
+                resp = getattr(self._client, metodo.lower())(endpoint, **kwargs)
+            headers = getattr(resp, "headers", None)
+            if headers is None:  # CachedResponse no tiene headers: no salió a la red
+                return resp
+            with self._lock:
+                self.llamadas[metodo] += 1
+            if self._limiter:
+                espera = self._limiter.registrar_respuesta(resp.status_code, headers)
+            else:
+                espera = segundos_hasta_reset(headers, status=resp.status_code)
+            if resp.status_code != 429 or intento > REINTENTOS_429:
+                return resp
+            espera = espera or ESPERA_BASE_429 * (2 ** (intento - 1))
+            print(f"[RETRY] ClickUp {metodo} {endpoint} devolvió 429, "
+                  f"reintento {intento}/{REINTENTOS_429} en {espera:.1f}s")
+            time.sleep(espera)
+        return resp
+
+    def get(self, endpoint: str, **kwargs):
+        return self._llamar("GET", endpoint, **kwargs)
+
+    def put(self, endpoint: str, **kwargs):
+        return self._llamar("PUT", endpoint, **kwargs)
+
+    def post(self, endpoint: str, **kwargs):
+        return self._llamar("POST", endpoint, **kwargs)
+
+    @property
+    def total(self) -> int:
+        return sum(self.llamadas.values())
+
+
+def crear_limiter(workers: int = DEFAULT_WORKERS) -> RateLimiter:
+    """Limiter de la API de ClickUp, compartido entre procesos en `.ratelimit/`."""
+    skill_dir = Path(__file__).resolve().parent.parent
+    return RateLimiter(
+        "clickup",
+        state_dir=str(skill_dir / STATE_DIRNAME),
+        requests_per_minute=CLICKUP_RPM,
+        burst=CLICKUP_BURST,
+        max_concurrency=workers,
+    )
+
+
+def _en_paralelo(funcion, items: list, workers: int) -> list:
+    if not items:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(items)))) as pool:
+        return list(pool.map(funcion, items))
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Registro local de comentarios ya dejados
+# ─────────────────────────────────────────────────────────────────────
+
+def cargar_registro(ruta_curso: str) -> dict:
+    """Lee `_cache/clickup_comentarios.json` ({task_id: {...}}) o {}."""
+    path = os.path.join(ruta_curso, "_cache", REGISTRO_FILENAME)
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def guardar_registro(ruta_curso: str, registro: dict) -> None:
+    cache_dir = os.path.join(ruta_curso, "_cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, REGISTRO_FILENAME)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(registro, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Prefetch
+# ─────────────────────────────────────────────────────────────────────
+
+def prefetch_tareas(cliente, list_id: str) -> dict[str, dict]:
+    """Todas las tareas de la lista (abiertas y cerradas) por id."""
+    tareas: dict[str, dict] = {}
+    pagina = 0
+    while True:
+        resp = cliente.get(f"/list/{list_id}/task",
+                           params={"page": pagina, "include_closed": "true", "subtasks": "true"})
+        if resp.status_code != 200:
+            raise RuntimeError(f"Error listando tareas de {list_id}: {resp.status_code}")
+        data = resp.json()
+        lote = data.get("tasks", [])
+        for tarea in lote:
+            tareas[tarea["id"]] = tarea
+        if data.get("last_page") or len(lote) < TAREAS_POR_PAGINA:
+            return tareas
+        pagina += 1
+
+
+def prefetch_tareas_sueltas(cliente, task_ids: list[str],
+                            workers: int = DEFAULT_WORKERS) -> dict[str, dict]:
+    """GET /task/{id} en paralelo para tareas que no vinieron en la lista."""
+    def _una(task_id):
+        resp = cliente.get(f"/task/{task_id}")
+        return resp.json() if resp.status_code == 200 else None
+    return {t: r for t, r in zip(task_ids, _en_paralelo(_una, task_ids, workers), strict=True)
+            if r is not None}
+
+
+def prefetch_comentarios(cliente, task_ids: list[str], tag: str,
+                         workers: int = DEFAULT_WORKERS) -> dict[str, bool | None]:
+    """{task_id: True si ya tiene un comentario con `tag`}, en paralelo.
+
+    None si no se pudieron leer los comentarios (respuesta distinta de
+    200): no se sabe si ya está comentada.
+    """
+    def _una(task_id):
+        resp = cliente.get(f"/task/{task_id}/comment")
+        if resp.status_code != 200:
+            print(f"[WARN] Comentarios de {task_id}: HTTP {resp.status_code}; "
+                  f"no se comentará en esta corrida")
+            return None
+        comments = resp.json().get("comments", [])
+        return any(tag in (c.get("comment_text", "") or "") for c in comments)
+    return dict(zip(task_ids, _en_paralelo(_una, task_ids, workers), strict=True))
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Plan local y ejecución
+# ─────────────────────────────────────────────────────────────────────
+
+def planear_sync(candidatas: list[dict], tareas: dict[str, dict],
+                 comentarios: dict[str, bool | None], registro: dict,
+                 status_name: str) -> list[dict]:
+    """Diff local: qué mutaciones necesita cada tarea calificada.
+
+    Args:
+        candidatas: [{"nombre", "task_id", ...}] actividades con nota.
+        tareas: Tareas prefetcheadas por id (las ausentes se tratan como
+            no calificadas).
+        comentarios: Resultado de prefetch_comentarios(). Una tarea con
+            None (comentarios no leídos) no se comenta.
+        registro: Comentarios ya dejados según el registro local.
+
+    Returns:
+        Las candidatas con "cambiar_status", "comentar" y
+        "comentarios_desconocidos" (bool).
+    """
+    plan = []
+    for c in candidatas:
+        task_id = c["task_id"]
+        tarea = tareas.get(task_id, {})
+        status = (tarea.get("status") or {}).get("status", "")
+        desconocidos = task_id not in registro and comentarios.get(task_id, False) is None
+        plan.append({
+            **c,
+            "cambiar_status": status.lower() != status_name.lower(),
+            "comentar": not (task_id in registro or desconocidos
+                             or comentarios.get(task_id, False)),
+            "comentarios_desconocidos": desconocidos,
+        })
+    return plan
+
+
+def aplicar_plan(cliente, plan: list[dict], status_name: str,
+                 workers: int = DEFAULT_WORKERS) -> list[dict]:
+    """Ejecuta las mutaciones del plan en paralelo (status antes que comentario).
+
+    Cada entrada con "comentar" debe traer "texto".
+
+    Returns:
+        [{"nombre", "task_id", "status", "comentario", "error"}] por entrada con cambios.
+    """
+    def _una(entrada):
+        r = {"nombre": entrada["nombre"], "task_id": entrada["task_id"],
+             "status": False, "comentario": False, "error": ""}
+        try:
+            if entrada["cambiar_status"]:
+                resp = cliente.put(f"/task/{entrada['task_id']}", json={"status": status_name})
+                if resp.status_code != 200:
+                    raise RuntimeError(f"status {resp.status_code} {resp.text[:200]}")
+                r["status"] = True
+            if entrada["comentar"]:
+                resp = cliente.post(f"/task/{entrada['task_id']}/comment",
+                                    json={"comment_text": entrada["texto"], "notify_all": False})
+                if resp.status_code not in (200, 201):
+                    raise RuntimeError(f"comentario {resp.status_code} {resp.text[:200]}")
+                r["comentario"] = True
+        except Exception as e:
+            r["error"] = str(e)
+        return r
+
+    cambios = [e for e in plan if e["cambiar_status"] or e["comentar"]]
+    return _en_paralelo(_una, cambios, workers)
+
+
+def registrar_comentarios(registro: dict, plan: list[dict], comentarios: dict[str, bool | None],
+                          resultados: list[dict]) -> dict:
+    """Agrega al registro las tareas con comentario encontrado o recién dejado."""
+    ahora = datetime.now().isoformat(timespec="seconds")
+    comentadas = {r["task_id"] for r in resultados if r["comentario"]}
+    for e in plan:
+        if e["task_id"] in comentadas or comentarios.get(e["task_id"]):
+            registro.setdefault(e["task_id"], {"nombre": e["nombre"], "registrado": ahora})
+    return registro
+
+
+def llamadas_flujo_anterior(plan: list[dict]) -> int:
+    """Llamadas que habría hecho el flujo en serie para el mismo plan.
+
+    GET /space + (GET /task + GET /comment) por candidata, PUT si no estaba
+    calificada y POST en toda tarea no saltada.
+    """
+    mutaciones = sum(e["cambiar_status"] + (e["cambiar_status"] or e["comentar"]) for e in plan)
+    return 1 + 2 * len(plan) + mutaciones
@@ -1,16 +1,18 @@
 """
-Descarga materiales de Moodle aplicando forcedownload=1.
+Descarga materiales de Moodle aplicando forcedownload=1 (vía store_materiales).
 """
 
 import os
 
-from browser_api import hacer_get, obtener_cookies_browser
-
 
 def descargar_material(url: str, ruta_destino: str) -> bool:
     """
     Descarga material de Moodle.
 
+    El archivo se descarga en streaming (reanudable) al store de
+    materiales compartido entre cursos y ruta_destino queda como hardlink
+    (o copia) del blob; ver store_materiales.py.
+
     Args:
         url: URL del material (puede ser pluginfile.php)
         ruta_destino: Ruta local donde guardar el archivo
@@ -18,19 +20,14 @@ def descargar_material(url: str, ruta_destino: str) -> bool:
     Returns:
         True si descarga exitosa, False si falló
     """
+    from store_materiales import abrir_store_materiales
+
     # Aplicar forcedownload si es URL de archivo
     url_final = agregar_forcedownload(url)
 
     # Realizar descarga
     try:
-        contenido = hacer_get(url_final, headers=generar_headers())
-
-        # Crear directorio si no existe
-        os.makedirs(os.path.dirname(ruta_destino), exist_ok=True)
-
-        # Guardar archivo
-        with open(ruta_destino, 'wb') as f:
-            f.write(contenido)
+        abrir_store_materiales().descargar(url_final, ruta_destino)
 
         # Verificar que el archivo no esté vacío
         return os.path.getsize(ruta_destino) > 0
@@ -53,17 +50,6 @@ def agregar_forcedownload(url: str) -> str:
         return url + "?forcedownload=1"
 
 
-def generar_headers() -> dict:
-    """Genera headers para request con cookie de sesión."""
-    # Obtener cookies del navegador para autenticación
-    cookies = obtener_cookies_browser()
-
-    return {
-        "User-Agent": "Mozilla/5.0",
-        "Cookie": cookies
-    }
-
-
 def es_tipo_descargable(tipo_mime: str) -> bool:
     """Determina si el tipo MIME es descargable."""
     tipos_validos = [
@@ -1,47 +1,217 @@
 """
 Extractor universal de documentos: PDF, Word, Excel, PowerPoint.
 
-Detecta el tipo de archivo por extensión o MIME type y extrae texto plano
-o markdown para integración en AGENTS.md, README.md y context.md.
+Detecta el tipo de archivo por sus magic bytes (`%PDF`, o el contenido
+del ZIP de Office: word/, xl/, ppt/) y extrae texto plano o markdown para
+integración en AGENTS.md, README.md y context.md.
+
+- `extraer_textos_archivos(rutas)`: lote sobre archivos ya descargados.
+  La extracción corre en un pool de procesos (es CPU pura) y los PDF
+  grandes se reparten por rangos de páginas entre los procesos.
+- Resultados cacheados por sha256 del archivo en `.documentos_cache/`
+  (raíz del skill): un documento sin cambios nunca se vuelve a parsear,
+  aunque esté en otro curso o con otro nombre.
+- `extraer_texto_documento(url)`: un documento descargado en memoria
+  (misma caché, sin pool).
 """
 
+import hashlib
 import io
+import json
+import os
 import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+CACHE_TEXTOS_DIRNAME = ".documentos_cache"
+# Subir al cambiar la extracción: invalida los textos cacheados
+VERSION_EXTRACTOR = 1
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+PAGINAS_POR_TAREA = 20
+
+_TIPOS_OFFICE = {"word/": "docx", "xl/": "xlsx", "ppt/": "pptx"}
 
-from browser_api import hacer_get
+
+def detectar_tipo(cabecera: bytes, ruta_o_stream=None) -> str | None:
+    """Tipo de documento por magic bytes: pdf, docx, xlsx, pptx o None.
+
+    Args:
+        cabecera: Primeros bytes del archivo.
+        ruta_o_stream: Archivo completo, para mirar dentro de un ZIP de Office.
+    """
+    if cabecera.startswith(b"%PDF"):
+        return "pdf"
+    if cabecera.startswith(b"PK\x03\x04") and ruta_o_stream is not None:
+        try:
+            with zipfile.ZipFile(ruta_o_stream) as z:
+                nombres = z.namelist()
+        except zipfile.BadZipFile:
+            return None
+        for prefijo, tipo in _TIPOS_OFFICE.items():
+            if any(n.startswith(prefijo) for n in nombres):
+                return tipo
+    # .doc/.xls/.ppt binarios (OLE, D0 CF 11 E0) y cualquier otro: no soportados
+    return None
 
 
-def extraer_texto_documento(url: str) -> str | None:
+def extraer_texto_documento(url: str, *, cache_dir: str | None = "") -> str | None:
     """
     Extrae texto de cualquier documento soportado (PDF, DOCX, XLSX, PPTX).
 
     Args:
         url: URL del documento en Moodle (pluginfile.php)
+        cache_dir: Caché de textos ("" = `.documentos_cache/`, None = sin caché).
 
     Returns:
         Texto extraído formateado, o None si falló / no soportado.
     """
+    from browser_api import hacer_get
     try:
         contenido = hacer_get(url)
+        sha256 = hashlib.sha256(contenido).hexdigest()
+        cache = _dir_cache(cache_dir)
+        if cache and (cacheado := _leer_cache(cache, sha256)) is not None:
+            return cacheado["texto"]
+
         stream = io.BytesIO(contenido)
+        tipo = detectar_tipo(contenido[:8], stream)
+        texto = _EXTRACTORES[tipo](io.BytesIO(contenido)) if tipo else None
+        if cache:
+            _escribir_cache(cache, sha256, tipo, texto)
+        return texto
+
+    except Exception as e:
+        print(f"[WARN] Error extrayendo {url}: {e}")
+        return None
 
-        # Detectar tipo por extensión en URL
-        url_lower = url.lower()
-        if ".pdf" in url_lower:
-            return _extraer_pdf(stream)
-        elif ".docx" in url_lower or ".doc" in url_lower:
-            return _extraer_word(stream)
-        elif ".xlsx" in url_lower or ".xls" in url_lower:
-            return _extraer_excel(stream)
-        elif ".pptx" in url_lower or ".ppt" in url_lower:
-            return _extraer_ppt(stream)
+
+def extraer_textos_archivos(rutas: list[str], *, workers: int = DEFAULT_WORKERS,
+                            cache_dir: str | None = "") -> list[str | None]:
+    """Extrae el texto de varios documentos locales en un pool de procesos.
+
+    Cada archivo se identifica por su sha256: los ya cacheados (o
+    repetidos dentro del lote) no se parsean. Los PDF de más de
+    PAGINAS_POR_TAREA páginas se reparten por rangos entre los procesos.
+    Con workers <= 1 o una sola tarea todo corre en este proceso.
+
+    Returns:
+        Texto por ruta, en el mismo orden (None si falló o no se soporta).
+    """
+    cache = _dir_cache(cache_dir)
+    resultados: list[str | None] = [None] * len(rutas)
+    pendientes: dict[str, dict] = {}  # sha256 → {ruta, tipo, indices}
+    for i, ruta in enumerate(rutas):
+        try:
+            sha256, cabecera = _hash_archivo(ruta)
+        except OSError as e:
+            print(f"[WARN] Error leyendo {ruta}: {e}")
+            continue
+        if sha256 in pendientes:
+            pendientes[sha256]["indices"].append(i)
+            continue
+        if cache and (cacheado := _leer_cache(cache, sha256)) is not None:
+            resultados[i] = cacheado["texto"]
+            continue
+        tipo = detectar_tipo(cabecera, ruta)
+        if tipo is None:
+            if cache:
+                _escribir_cache(cache, sha256, None, None)
+            continue
+        pendientes[sha256] = {"ruta": ruta, "tipo": tipo, "indices": [i]}
+
+    tareas = []  # (sha256, ruta, tipo, desde, hasta)
+    por_doc: dict[str, list] = {}
+    for sha256, doc in pendientes.items():
+        if doc["tipo"] == "pdf":
+            try:
+                paginas = _contar_paginas_pdf(doc["ruta"])
+            except Exception as e:  # PDF corrupto: falla como cualquier extracción
+                por_doc[sha256] = [RuntimeError(f"{type(e).__name__}: {e}")]
+                continue
+            for desde in range(0, max(paginas, 1), PAGINAS_POR_TAREA):
+                tareas.append((sha256, doc["ruta"], "pdf", desde,
+                               min(desde + PAGINAS_POR_TAREA, paginas)))
         else:
-            # Fallback: intentar como PDF (algunos URLs no tienen extensión)
-            return _extraer_pdf(stream)
+            tareas.append((sha256, doc["ruta"], doc["tipo"], 0, 0))
 
+    if workers > 1 and len(tareas) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tareas))) as pool:
+            partes = list(pool.map(_ejecutar_tarea, tareas))
+    else:
+        partes = [_ejecutar_tarea(t) for t in tareas]
+
+    for (sha256, *_), parte in zip(tareas, partes, strict=True):
+        por_doc.setdefault(sha256, []).append(parte)
+    for sha256, doc in pendientes.items():
+        texto = _unir_partes(doc["tipo"], por_doc.get(sha256, []), doc["ruta"])
+        if cache and not any(isinstance(p, Exception) for p in por_doc.get(sha256, [])):
+            _escribir_cache(cache, sha256, doc["tipo"], texto)
+        for i in doc["indices"]:
+            resultados[i] = texto
+    return resultados
+
+
+def _ejecutar_tarea(tarea: tuple) -> object:
+    """Corre en el proceso hijo: páginas de un PDF o un documento completo."""
+    _sha256, ruta, tipo, desde, hasta = tarea
+    try:
+        if tipo == "pdf":
+            return _textos_paginas_pdf(ruta, desde, hasta)
+        with open(ruta, "rb") as f:
+            return _EXTRACTORES[tipo](io.BytesIO(f.read()))
     except Exception as e:
-        print(f"[WARN] Error extrayendo {url}: {e}")
+        return RuntimeError(f"{type(e).__name__}: {e}")
+
+
+def _unir_partes(tipo: str, partes: list, ruta: str) -> str | None:
+    errores = [p for p in partes if isinstance(p, Exception)]
+    if errores:
+        print(f"[WARN] Error extrayendo {ruta}: {errores[0]}")
+        return None
+    if tipo != "pdf":
+        return partes[0] if partes else None
+    paginas = [txt for parte in partes for txt in parte]
+    return _limpiar_texto("\n\n".join(paginas)) if paginas else None
+
+
+def _hash_archivo(ruta: str) -> tuple[str, bytes]:
+    hasher = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        cabecera = f.read(8)
+        hasher.update(cabecera)
+        for bloque in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(bloque)
+    return hasher.hexdigest(), cabecera
+
+
+def _dir_cache(cache_dir: str | None) -> str | None:
+    if cache_dir is None:
         return None
+    return cache_dir or str(Path(__file__).resolve().parent.parent / CACHE_TEXTOS_DIRNAME)
+
+
+def _ruta_cache(cache_dir: str, sha256: str) -> str:
+    return os.path.join(cache_dir, sha256[:2], f"{sha256}.json")
+
+
+def _leer_cache(cache_dir: str, sha256: str) -> dict | None:
+    try:
+        with open(_ruta_cache(cache_dir, sha256), encoding="utf-8") as f:
+            entrada = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    return entrada if entrada.get("version") == VERSION_EXTRACTOR else None
+
+
+def _escribir_cache(cache_dir: str, sha256: str, tipo: str | None, texto: str | None):
+    path = _ruta_cache(cache_dir, sha256)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": VERSION_EXTRACTOR, "tipo": tipo, "texto": texto}, f,
+                  ensure_ascii=False)
+    os.replace(tmp, path)
 
 
 def _limpiar_texto(texto: str) -> str:
@@ -63,6 +233,20 @@ def _extraer_pdf(stream: io.BytesIO) -> str | None:
     return _limpiar_texto("\n\n".join(partes)) if partes else None
 
 
+def _contar_paginas_pdf(ruta: str) -> int:
+    import fitz
+    with fitz.open(ruta) as doc:
+        return doc.page_count
+
+
+def _textos_paginas_pdf(ruta: str, desde: int, hasta: int) -> list[str]:
+    """Texto de las páginas [desde, hasta) con contenido (mismo orden que _extraer_pdf)."""
+    import fitz
+    with fitz.open(ruta) as doc:
+        textos = (doc[i].get_text() for i in range(desde, min(hasta, doc.page_count)))
+        return [txt for txt in textos if txt.strip()]
+
+
 def _extraer_word(stream: io.BytesIO) -> str | None:
     from docx import Document
     doc = Document(stream)
@@ -103,3 +287,11 @@ def _extraer_ppt(stream: io.BytesIO) -> str | None:
         if textos:
             diapositivas.append(f"### Diapositiva {i}\n\n" + "\n\n".join(textos))
     return _limpiar_texto("\n\n".join(diapositivas)) if diapositivas else None
+
+
+_EXTRACTORES = {
+    "pdf": _extraer_pdf,
+    "docx": _extraer_word,
+    "xlsx": _extraer_excel,
+    "pptx": _extraer_ppt,
+}
@@ -3,11 +3,42 @@ Extractor de foros de Moodle.
 
 Extrae discusiones de primer nivel (root) iniciadas por el profesor del curso.
 Solo el contenido original de la discusión, no las respuestas.
-"""
 
+El listado se recorre completo siguiendo la paginación del foro (`p=N`),
+filtrando por autor en cada fila; solo se abren las discusiones del
+profesor, en paralelo (hilos en modo requests, pestañas con el modo
+rápido de CDP). Con una marca de agua (id de la discusión más nueva ya
+extraída) el listado se pide ordenado por creación y se deja de paginar
+al llegar a discusiones anteriores: ver extraer_discusiones_foro_incremental().
+"""
 
-from browser_api import get_navegador, get_page_content
+import contextvars
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import parse_qs, urlencode, urljoin, urlparse, urlunparse
+
+from browser_api import (
+    cdp_fast_mode_activo,
+    esta_usando_requests,
+    get_navegador,
+    get_page_content,
+    obtener_pagina,
+    obtener_paginas_cdp,
+)
 from bs4 import BeautifulSoup
+from file_lock import lockfile
+
+DEFAULT_WORKERS = 4
+MAX_PAGINAS_LISTADO = 50  # tope de páginas del listado por foro
+ORDEN_CREACION_DESC = 3  # view.php?o=3: más nuevas primero por fecha de creación
+ESTADO_FOROS = "foros_profesor.json"  # en _cache/: marca de agua y discusiones por foro
+
+_SELECTOR_FILAS = 'table.forumheaderlist tr, .discussion-list tr, [data-region="discussion-list"] tr'
+_SELECTOR_PAGINACION = '.paging a[href], .pagination a[href], [data-region="paging-bar"] a[href]'
+_RE_DISCUSS_ID = re.compile(r"discuss\.php\?d=(\d+)")
 
 
 def extraer_nombre_profesor(html_pagina: str) -> str | None:
@@ -116,58 +147,232 @@ def _extraer_autor_y_fecha(autor_el) -> tuple[str, str]:
     return texto, ""
 
 
-def extraer_discusiones_foro(url_foro: str, nombre_profesor: str) -> list[dict]:
+def _descargar(url: str) -> str:
+    """HTML de una URL; en modo requests sin tocar la página actual del hilo."""
+    if esta_usando_requests():
+        return obtener_pagina(url)[1]
+    get_navegador()(url)
+    return get_page_content()
+
+
+def _descargar_varias(urls: list[str], workers: int) -> dict[str, str | Exception]:
+    """{url: HTML o excepción}. Concurrente en modo requests y con el modo
+    rápido de CDP; en los demás backends, una tras otra."""
+    if not urls:
+        return {}
+    if esta_usando_requests() and workers > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, len(urls))) as pool:
+            futuros = {url: pool.submit(contextvars.copy_context().run, _descargar, url)
+                       for url in urls}
+        return {url: f.exception() or f.result() for url, f in futuros.items()}
+    if cdp_fast_mode_activo():
+        return {url: r if isinstance(r, Exception) else r[1]
+                for url, r in obtener_paginas_cdp(urls).items()}
+    resultados = {}
+    for url in urls:
+        try:
+            resultados[url] = _descargar(url)
+        except Exception as e:
+            resultados[url] = e
+    return resultados
+
+
+def _con_parametros(url: str, **parametros) -> str:
+    """URL con los parámetros de query dados agregados o reemplazados."""
+    partes = urlparse(url)
+    query = parse_qs(partes.query)
+    query.update({k: [str(v)] for k, v in parametros.items()})
+    return urlunparse(partes._replace(query=urlencode(query, doseq=True)))
+
+
+def _numero_pagina(url: str) -> int:
+    """Página del listado (`p` en Moodle 3.7+, `page` antes); 0 si no tiene."""
+    query = parse_qs(urlparse(url).query)
+    valor = (query.get("p") or query.get("page") or ["0"])[0]
+    return int(valor) if valor.isdigit() else 0
+
+
+def _siguiente_pagina(soup: BeautifulSoup, url_actual: str) -> str | None:
+    """Link de la barra de paginación a la página siguiente a la actual."""
+    actual = _numero_pagina(url_actual)
+    candidatas = {}
+    for a in soup.select(_SELECTOR_PAGINACION):
+        url = urljoin(url_actual, a["href"])
+        if "/mod/forum/view.php" in url and _numero_pagina(url) > actual:
+            candidatas.setdefault(_numero_pagina(url), url)
+    return candidatas[min(candidatas)] if candidatas else None
+
+
+def _filas_listado(soup: BeautifulSoup, url_pagina: str) -> list[dict]:
+    """Discusiones de una página del listado: titulo, autor, fecha, url, id, fijada."""
+    filas = []
+    for fila in soup.select(_SELECTOR_FILAS):
+        celdas = fila.find_all(['td', 'th'])
+        if len(celdas) < 3:
+            continue
+
+        # Cada fila tiene: título, autor, réplicas, último mensaje
+        titulo_el = fila.select_one('a[href*="/mod/forum/discuss.php"], .discussion-title a')
+        autor_el = fila.select_one('.author, .starter, td:nth-child(3)')
+        if not titulo_el or not autor_el:
+            continue
+
+        url_disc = urljoin(url_pagina, titulo_el.get('href', ''))
+        m = _RE_DISCUSS_ID.search(url_disc)
+        autor, fecha = _extraer_autor_y_fecha(autor_el)
+        filas.append({
+            "titulo": titulo_el.get_text(strip=True),
+            "autor": autor,
+            "fecha": fecha,
+            "url": url_disc,
+            "id": int(m.group(1)) if m else 0,
+            "fijada": "pinned" in (fila.get("class") or []),
+        })
+    return filas
+
+
+def listar_discusiones(url_foro: str, *, marca_agua: int = 0,
+                       max_paginas: int = MAX_PAGINAS_LISTADO) -> list[dict]:
+    """
+    Recorre todas las páginas del listado del foro.
+
+    Con `marca_agua` el listado se pide ordenado por creación (más nuevas
+    primero) y se deja de paginar en la primera discusión no fijada con
+    id <= marca_agua; solo se devuelven las posteriores a la marca. Si el
+    orden recibido no es decreciente (Moodle ignoró `o`), no se corta.
+
+    Returns:
+        Filas sin duplicados, en orden del listado (ver _filas_listado).
     """
-    Navega al foro, lista las discusiones y extrae solo las del profesor.
+    url = _con_parametros(url_foro, o=ORDEN_CREACION_DESC) if marca_agua else url_foro
+    filas, vistas = [], set()
+    ultimo_id, ordenado = None, True
+    for _ in range(max_paginas):
+        soup = BeautifulSoup(_descargar(url), 'lxml')
+        parar = False
+        for fila in _filas_listado(soup, url):
+            clave = fila["id"] or fila["url"]
+            if clave in vistas:
+                continue  # una discusión nueva desplazó el listado entre páginas
+            vistas.add(clave)
+            if marca_agua and not fila["fijada"]:
+                ordenado = ordenado and (ultimo_id is None or fila["id"] <= ultimo_id)
+                ultimo_id = fila["id"]
+                if ordenado and fila["id"] <= marca_agua:
+                    parar = True
+                    break
+            if not marca_agua or fila["id"] > marca_agua:
+                filas.append(fila)
+        url = None if parar else _siguiente_pagina(soup, url)
+        if not url:
+            break
+        if marca_agua:
+            url = _con_parametros(url, o=ORDEN_CREACION_DESC)
+    return filas
+
+
+def _extraer_discusiones(url_foro: str, nombre_profesor: str, *, marca_agua: int,
+                         workers: int) -> tuple[list[dict], list[int]]:
+    """(discusiones con contenido, ids de las que no se pudieron leer)."""
+    del_profesor = [f for f in listar_discusiones(url_foro, marca_agua=marca_agua)
+                    if _es_autor_profesor(f["autor"], nombre_profesor)]
+    paginas = _descargar_varias(list(dict.fromkeys(f["url"] for f in del_profesor)), workers)
+
+    discusiones, fallidas = [], []
+    for fila in del_profesor:
+        html = paginas.get(fila["url"])
+        if isinstance(html, Exception):
+            print(f"[WARN] Error extrayendo post de {fila['url']}: {html}")
+            fallidas.append(fila["id"])
+            continue
+        contenido = _primer_post_de_html(html)
+        if contenido:
+            discusiones.append({
+                "titulo": fila["titulo"],
+                "autor": fila["autor"],
+                "fecha": fila["fecha"],
+                "url": fila["url"],
+                "id": fila["id"],
+                "contenido": contenido,
+            })
+    return discusiones, fallidas
+
+
+def extraer_discusiones_foro(url_foro: str, nombre_profesor: str, *, marca_agua: int = 0,
+                             workers: int = DEFAULT_WORKERS) -> list[dict]:
+    """
+    Recorre el listado del foro y extrae solo las discusiones del profesor.
 
     Args:
         url_foro: URL del foro en Moodle.
         nombre_profesor: Nombre completo del profesor para filtrar.
+        marca_agua: id de discusión ya extraído; solo se devuelven las
+            posteriores y se deja de paginar al alcanzarlo (0 = todas).
+        workers: Discusiones descargadas en paralelo (modo requests).
 
     Returns:
-        Lista de dicts: {"titulo": str, "autor": str, "fecha": str, "contenido": str}
+        Lista de dicts: {"titulo", "autor", "fecha", "url", "id", "contenido"}
     """
-    get_navegador()(url_foro)
-    soup = BeautifulSoup(get_page_content(), 'lxml')
+    return _extraer_discusiones(url_foro, nombre_profesor, marca_agua=marca_agua,
+                                workers=workers)[0]
 
-    discusiones = []
 
-    # Moodle muestra discusiones en una tabla con clase 'forumheaderlist' o similar
-    # Cada fila tiene: título, autor, réplicas, último mensaje
-    filas = soup.select('table.forumheaderlist tr, .discussion-list tr, [data-region="discussion-list"] tr')
+def _ruta_estado(ruta_curso: str) -> str:
+    return os.path.join(ruta_curso, "_cache", ESTADO_FOROS)
 
-    for fila in filas:
-        celdas = fila.find_all(['td', 'th'])
-        if len(celdas) < 3:
-            continue
 
-        # Extraer datos de la fila
-        titulo_el = fila.select_one('a[href*="/mod/forum/discuss.php"], .discussion-title a')
-        autor_el = fila.select_one('.author, .starter, td:nth-child(3)')
+def cargar_estado_foros(ruta_curso: str) -> dict:
+    """Lee `_cache/foros_profesor.json` o {} si no existe."""
+    try:
+        with open(_ruta_estado(ruta_curso), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError, OSError):
+        return {}
 
-        if not titulo_el or not autor_el:
-            continue
 
-        titulo = titulo_el.get_text(strip=True)
-        url_disc = titulo_el.get('href', '')
-        autor, fecha = _extraer_autor_y_fecha(autor_el)
+def _guardar_estado_foros(ruta_curso: str, estado: dict) -> None:
+    path = _ruta_estado(ruta_curso)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(estado, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
 
-        # Filtrar: solo discusiones del profesor
-        if not _es_autor_profesor(autor, nombre_profesor):
-            continue
 
-        # Navegar a la discusión y extraer contenido del primer post
-        contenido = _extraer_primer_post(url_disc)
+def extraer_discusiones_foro_incremental(url_foro: str, nombre_profesor: str, ruta_curso: str,
+                                         *, workers: int = DEFAULT_WORKERS) -> list[dict]:
+    """
+    extraer_discusiones_foro() desde la marca de agua de la corrida anterior.
 
-        if contenido:
-            discusiones.append({
-                "titulo": titulo,
-                "autor": autor,
-                "fecha": fecha,
-                "url": url_disc,
-                "contenido": contenido,
-            })
+    Las discusiones nuevas se suman a las guardadas en `_cache/foros_profesor.json`
+    y se devuelve la lista completa (nuevas primero). Las ediciones a
+    discusiones ya extraídas no se vuelven a leer. Si alguna discusión
+    nueva falla, la marca no la sobrepasa y se reintenta en la próxima.
 
+    Varios foros del mismo curso pueden extraerse a la vez (pipeline de
+    actividades): el estado se relee y se guarda bajo un lockfile.
+    """
+    marca_previa = cargar_estado_foros(ruta_curso).get(url_foro, {}).get("marca_agua", 0)
+    nuevas, fallidas = _extraer_discusiones(url_foro, nombre_profesor,
+                                            marca_agua=marca_previa, workers=workers)
+
+    path = _ruta_estado(ruta_curso)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with lockfile(path + ".lock"):
+        estado = cargar_estado_foros(ruta_curso)
+        previo = estado.get(url_foro, {})
+        ids_nuevos = {d["id"] for d in nuevas}
+        discusiones = nuevas + [d for d in previo.get("discusiones", [])
+                                if d.get("id") not in ids_nuevos]
+        marca = max([marca_previa, *ids_nuevos])
+        if fallidas:
+            marca = max(marca_previa, min(marca, min(fallidas) - 1))
+        estado[url_foro] = {
+            "marca_agua": marca,
+            "actualizado": datetime.now().isoformat(timespec="seconds"),
+            "discusiones": discusiones,
+        }
+        _guardar_estado_foros(ruta_curso, estado)
     return discusiones
 
 
@@ -191,34 +396,25 @@ def _normalizar_nombre(nombre: str) -> str:
     return nombre.lower().strip().replace("  ", " ")
 
 
-def _extraer_primer_post(url_discusion: str) -> str | None:
-    """
-    Navega a la página de la discusión y extrae solo el contenido del primer post.
-    Ignora replies.
-    """
-    try:
-        get_navegador()(url_discusion)
-        soup = BeautifulSoup(get_page_content(), 'lxml')
+def _primer_post_de_html(html: str) -> str | None:
+    """Contenido del primer post de una página de discusión (ignora replies)."""
+    soup = BeautifulSoup(html, 'lxml')
 
-        # Moodle tiene varios formatos de foro
-        # Formato moderno: div.firstpost, article.forum-post-container
-        primer_post = soup.select_one('.firstpost, article.forum-post-container, #p1')
+    # Moodle tiene varios formatos de foro
+    # Formato moderno: div.firstpost, article.forum-post-container
+    primer_post = soup.select_one('.firstpost, article.forum-post-container, #p1')
 
-        if not primer_post:
-            # Fallbacks adicionales
-            primer_post = soup.select_one('.forumpost, [data-region="post-content"]')
+    if not primer_post:
+        # Fallbacks adicionales
+        primer_post = soup.select_one('.forumpost, [data-region="post-content"]')
 
-        if not primer_post:
-            return None
-
-        # Extraer contenido del post
-        contenido_el = primer_post.select_one('.post-message, .content, .post-content, [data-region="post-content"]')
-        if contenido_el:
-            return contenido_el.get_text(separator='\n', strip=True)
+    if not primer_post:
+        return None
 
-        # Fallback: texto del post completo
-        return primer_post.get_text(separator='\n', strip=True)
+    # Extraer contenido del post
+    contenido_el = primer_post.select_one('.post-message, .content, .post-content, [data-region="post-content"]')
+    if contenido_el:
+        return contenido_el.get_text(separator='\n', strip=True)
 
-    except Exception as e:
-        print(f"[WARN] Error extrayendo post de {url_discusion}: {e}")
-        return None
+    # Fallback: texto del post completo
+    return primer_post.get_text(separator='\n', strip=True)
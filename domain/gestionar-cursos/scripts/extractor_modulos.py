@@ -2,7 +2,8 @@
 Extractores por tipo de módulo Moodle.
 
 Cada función visita la URL del módulo y extrae datos estructurados
-según el tipo de actividad.
+según el tipo de actividad. Con html= parsea una página ya descargada
+sin navegar (etapa de parseo del pipeline concurrente de cli_init).
 """
 
 
@@ -10,15 +11,22 @@ from browser_api import get_navegador, get_page_content
 from bs4 import BeautifulSoup
 
 
-def extraer_modulo_page(url: str) -> dict:
+def _cargar_html(url: str, html: str | None) -> str:
+    """HTML del módulo: el recibido o, si no hay, el de navegar a url."""
+    if html is not None:
+        return html
+    get_navegador()(url)
+    return get_page_content()
+
+
+def extraer_modulo_page(url: str, html: str | None = None) -> dict:
     """
     Extrae contenido de un módulo tipo 'page'.
 
     Returns:
         {"titulo": str, "contenido_html": str, "contenido_texto": str}
     """
-    get_navegador()(url)
-    soup = BeautifulSoup(get_page_content(), 'lxml')
+    soup = BeautifulSoup(_cargar_html(url, html), 'lxml')
 
     # Título
     titulo = soup.select_one('h1, .page-header-headings h1')
@@ -42,7 +50,7 @@ def extraer_modulo_page(url: str) -> dict:
     }
 
 
-def extraer_modulo_quiz(url: str) -> dict:
+def extraer_modulo_quiz(url: str, html: str | None = None) -> dict:
     """
     Extrae datos de un cuestionario (quiz).
 
@@ -51,8 +59,7 @@ def extraer_modulo_quiz(url: str) -> dict:
          "fecha_cierre": str, "intentos": str, "tiempo_limite": str,
          "nota_aprobacion": str}
     """
-    get_navegador()(url)
-    soup = BeautifulSoup(get_page_content(), 'lxml')
+    soup = BeautifulSoup(_cargar_html(url, html), 'lxml')
 
     titulo = soup.select_one('h1, .page-header-headings h1')
     titulo = titulo.get_text(strip=True) if titulo else "Sin título"
@@ -100,15 +107,14 @@ def extraer_modulo_quiz(url: str) -> dict:
     }
 
 
-def extraer_modulo_hvp(url: str) -> dict:
+def extraer_modulo_hvp(url: str, html: str | None = None) -> dict:
     """
     Extrae datos de un módulo H5P (interactive content).
 
     Returns:
         {"titulo": str, "embed_url": str}
     """
-    get_navegador()(url)
-    soup = BeautifulSoup(get_page_content(), 'lxml')
+    soup = BeautifulSoup(_cargar_html(url, html), 'lxml')
 
     titulo = soup.select_one('h1, .page-header-headings h1')
     titulo = titulo.get_text(strip=True) if titulo else "Sin título"
@@ -134,15 +140,14 @@ def extraer_modulo_hvp(url: str) -> dict:
     }
 
 
-def extraer_modulo_folder(url: str) -> dict:
+def extraer_modulo_folder(url: str, html: str | None = None) -> dict:
     """
     Extrae lista de archivos de un módulo tipo carpeta (folder).
 
     Returns:
         {"titulo": str, "archivos": [{"nombre": str, "url": str}]}
     """
-    get_navegador()(url)
-    soup = BeautifulSoup(get_page_content(), 'lxml')
+    soup = BeautifulSoup(_cargar_html(url, html), 'lxml')
 
     titulo = soup.select_one('h1, .page-header-headings h1')
     titulo = titulo.get_text(strip=True) if titulo else "Sin título"
@@ -162,15 +167,14 @@ def extraer_modulo_folder(url: str) -> dict:
     }
 
 
-def extraer_modulo_resource(url: str) -> dict:
+def extraer_modulo_resource(url: str, html: str | None = None) -> dict:
     """
     Extrae URL de descarga de un recurso (resource).
 
     Returns:
         {"titulo": str, "download_url": str, "filename": str}
     """
-    get_navegador()(url)
-    soup = BeautifulSoup(get_page_content(), 'lxml')
+    soup = BeautifulSoup(_cargar_html(url, html), 'lxml')
 
     titulo = soup.select_one('h1, .page-header-headings h1')
     titulo = titulo.get_text(strip=True) if titulo else "Sin título"
@@ -196,7 +200,7 @@ def extraer_modulo_resource(url: str) -> dict:
     }
 
 
-def extraer_modulo_choice(url: str) -> dict:
+def extraer_modulo_choice(url: str, html: str | None = None) -> dict:
     """
     Extrae datos de una encuesta/consulta (choice).
 
@@ -204,8 +208,7 @@ def extraer_modulo_choice(url: str) -> dict:
         {"titulo": str, "pregunta": str, "opciones": [str], "fecha_apertura": str,
          "fecha_cierre": str}
     """
-    get_navegador()(url)
-    soup = BeautifulSoup(get_page_content(), 'lxml')
+    soup = BeautifulSoup(_cargar_html(url, html), 'lxml')
 
     titulo = soup.select_one('h1, .page-header-headings h1')
     titulo = titulo.get_text(strip=True) if titulo else "Sin título"
@@ -244,7 +247,7 @@ def extraer_modulo_choice(url: str) -> dict:
     }
 
 
-def extraer_modulo_lesson(url: str) -> dict:
+def extraer_modulo_lesson(url: str, html: str | None = None) -> dict:
     """
     Extrae datos de una lección (lesson).
 
@@ -252,8 +255,7 @@ def extraer_modulo_lesson(url: str) -> dict:
         {"titulo": str, "contenido_html": str, "contenido_texto": str,
          "fecha_apertura": str, "fecha_cierre": str, "nota_maxima": str}
     """
-    get_navegador()(url)
-    soup = BeautifulSoup(get_page_content(), 'lxml')
+    soup = BeautifulSoup(_cargar_html(url, html), 'lxml')
 
     titulo = soup.select_one('h1, .page-header-headings h1')
     titulo = titulo.get_text(strip=True) if titulo else "Sin título"
@@ -289,7 +291,7 @@ def extraer_modulo_lesson(url: str) -> dict:
     }
 
 
-def extraer_modulo_assign(url: str) -> dict:
+def extraer_modulo_assign(url: str, html: str | None = None) -> dict:
     """
     Extrae datos de una tarea (assign).
 
@@ -297,8 +299,7 @@ def extraer_modulo_assign(url: str) -> dict:
         {"titulo": str, "instrucciones": str, "fecha_apertura": str,
          "fecha_cierre": str, "nota_aprobacion": str}
     """
-    get_navegador()(url)
-    soup = BeautifulSoup(get_page_content(), 'lxml')
+    soup = BeautifulSoup(_cargar_html(url, html), 'lxml')
 
     titulo = soup.select_one('h1, .page-header-headings h1')
     titulo = titulo.get_text(strip=True) if titulo else "Sin título"
@@ -335,7 +336,7 @@ def extraer_modulo_assign(url: str) -> dict:
     }
 
 
-def extraer_modulo_url(url: str) -> dict:
+def extraer_modulo_url(url: str, html: str | None = None) -> dict:
     """
     Extrae datos de un link externo (url), incluyendo redirects de Teams.
 
@@ -350,8 +351,7 @@ def extraer_modulo_url(url: str) -> dict:
         titulo = "Teams"
         # Intentar obtener título desde la página de redirect
         try:
-            get_navegador()(url)
-            soup = BeautifulSoup(get_page_content(), 'lxml')
+            soup = BeautifulSoup(_cargar_html(url, html), 'lxml')
             h1 = soup.select_one('h1, .page-header-headings h1')
             if h1:
                 titulo = h1.get_text(strip=True)
@@ -364,8 +364,7 @@ def extraer_modulo_url(url: str) -> dict:
             "external_url": external_url,
         }
 
-    get_navegador()(url)
-    soup = BeautifulSoup(get_page_content(), 'lxml')
+    soup = BeautifulSoup(_cargar_html(url, html), 'lxml')
 
     titulo = soup.select_one('h1, .page-header-headings h1')
     titulo = titulo.get_text(strip=True) if titulo else "Sin título"
@@ -383,7 +382,7 @@ def extraer_modulo_url(url: str) -> dict:
     }
 
 
-def extraer_modulo_workshop(url: str) -> dict:
+def extraer_modulo_workshop(url: str, html: str | None = None) -> dict:
     """
     Extrae datos de un taller (workshop).
 
@@ -391,8 +390,7 @@ def extraer_modulo_workshop(url: str) -> dict:
         {"titulo": str, "instrucciones": str, "fecha_apertura": str,
          "fecha_cierre": str, "nota_maxima": str}
     """
-    get_navegador()(url)
-    soup = BeautifulSoup(get_page_content(), 'lxml')
+    soup = BeautifulSoup(_cargar_html(url, html), 'lxml')
 
     titulo = soup.select_one('h1, .page-header-headings h1')
     titulo = titulo.get_text(strip=True) if titulo else "Sin título"
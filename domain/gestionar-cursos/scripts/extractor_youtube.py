@@ -1,6 +1,20 @@
 """
 Extractor de subtítulos y resúmenes de videos YouTube via yt-dlp + LLM.
 
+yt-dlp se usa como librería en el mismo proceso: una sola llamada
+`extract_info` por video da el idioma original y las pistas de
+subtítulos, y la pista elegida se descarga en memoria (json3 o vtt), sin
+subprocesos ni archivos temporales.
+
+Modo lote (`procesar_videos_youtube`): todos los videos de un curso se
+resuelven de una vez:
+1. Se deduplican por id de video.
+2. Metadatos + subtítulos se obtienen concurrentemente (un YoutubeDL por hilo).
+3. Las transcripciones se cachean por id en `.youtube_cache/` (raíz del
+   skill): un video ya visto no vuelve a consultarse en otra corrida ni
+   en otro curso. Los videos sin subtítulos se recuerdan 7 días.
+4. Los resúmenes van en un solo `completar_batch` (perfil 'youtube_summarizer').
+
 Requisitos:
     pip install yt-dlp
     Variable OPENROUTER_API_KEY en .env para resúmenes LLM.
@@ -8,160 +22,223 @@ Requisitos:
 Configuración LLM centralizada en openrouter.json (perfil 'youtube_summarizer').
 """
 
-import contextlib
+import contextvars
 import json
 import os
 import re
-import subprocess
-import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
 YOUTUBE_URL_PATTERN = re.compile(
     r'(?:https?://)?(?:www\.)?(?:youtube\.com/watch\?v=|youtu\.be/)([\w-]{11})'
 )
 
+CACHE_DIRNAME = ".youtube_cache"
+TTL_SIN_SUBTITULOS = 7 * 24 * 3600.0
+DEFAULT_WORKERS = 4
+MAX_CHARS_RESUMEN = 12000
+
+_FORMATOS_PREFERIDOS = ("json3", "vtt", "srv1")
+_config = {"cache_dir": ""}
+
 
-def _check_ytdlp() -> bool:
-    """Verifica que yt-dlp esté instalado."""
+def _yt_dlp():
+    """Módulo yt_dlp o None si no está instalado."""
     try:
-        subprocess.run(
-            ["yt-dlp", "--version"], capture_output=True, timeout=5, check=True
-        )
-        return True
-    except (FileNotFoundError, subprocess.CalledProcessError):
-        return False
+        import yt_dlp
+    except ImportError:
+        return None
+    return yt_dlp
 
 
-def _detectar_idioma_original(url: str) -> str:
-    """Detecta idioma original del video via yt-dlp --dump-json.
+def configurar_cache_youtube(directorio: str | None = "") -> None:
+    """Carpeta de la caché de transcripciones ("" = `.youtube_cache/`, None = sin caché)."""
+    _config["cache_dir"] = directorio
 
-    Returns:
-        Código de idioma (ej: 'es', 'en') o 'en' como fallback.
-    """
-    try:
-        result = subprocess.run(
-            ["yt-dlp", "--dump-json", "--no-playlist", url],
-            capture_output=True, timeout=30, check=True,
-        )
-        info = json.loads(result.stdout)
-        # YouTube expone el idioma en 'language' o 'original_language'
-        lang = info.get("language") or info.get("original_language") or ""
-        if lang and lang != "unknown":
-            return lang
-    except Exception:
-        pass
+
+def video_id(url: str) -> str | None:
+    m = YOUTUBE_URL_PATTERN.search(url)
+    return m.group(1) if m else None
+
+
+def _idioma_original(info: dict) -> str:
+    """Idioma original del video según sus metadatos ('en' como fallback)."""
+    # YouTube expone el idioma en 'language' o 'original_language'
+    lang = info.get("language") or info.get("original_language") or ""
+    if lang and lang != "unknown":
+        return lang
     return "en"
 
 
-def extraer_subtitulos(url: str, lang: str = "") -> str | None:
-    """Extrae subtítulos de video YouTube como texto plano.
+def _elegir_pista(info: dict, lang: str) -> tuple[str, dict] | None:
+    """Pista de subtítulos a usar: manuales antes que automáticos, idioma
+    original, luego inglés y luego el idioma base (es-419 → es)."""
+    idiomas = [lang]
+    if lang != "en":
+        idiomas.append("en")
+    if "-" in lang:
+        idiomas.append(lang.split("-")[0])
+    for fuente in ("subtitles", "automatic_captions"):
+        pistas = info.get(fuente) or {}
+        for idioma in idiomas:
+            formatos = pistas.get(idioma) or []
+            for ext in _FORMATOS_PREFERIDOS:
+                for fmt in formatos:
+                    if fmt.get("ext") == ext and fmt.get("url"):
+                        return idioma, fmt
+    return None
+
+
+def _texto_json3(contenido: str) -> str:
+    eventos = json.loads(contenido).get("events", [])
+    partes = []
+    for ev in eventos:
+        texto = "".join(seg.get("utf8", "") for seg in ev.get("segs") or [])
+        if texto.strip():
+            partes.append(texto.strip())
+    return " ".join(partes)
+
+
+def _texto_vtt(contenido: str) -> str:
+    """VTT/SRT a texto plano, eliminando timestamps, números y encabezados."""
+    lineas = []
+    for linea in contenido.splitlines():
+        linea = linea.strip()
+        if not linea or linea.isdigit() or "-->" in linea:
+            continue
+        if linea.startswith(("WEBVTT", "Kind:", "Language:", "NOTE")):
+            continue
+        if not lineas or lineas[-1] != linea:  # los automáticos repiten líneas
+            lineas.append(linea)
+    return " ".join(lineas)
 
-    Usa el idioma original del video (detectado automáticamente).
 
-    Args:
-        url: URL del video YouTube.
-        lang: Código de idioma (si se omite, se detecta automáticamente).
+def _limpiar_transcripcion(texto: str) -> str:
+    texto = re.sub(r'<[^>]+>', '', texto)
+    texto = re.sub(r'♪.*?♪', '', texto)
+    texto = re.sub(r'\[.*?\]', '', texto)
+    return re.sub(r'\s{2,}', ' ', texto).strip()
+
+
+def _obtener_transcripcion(url: str, lang: str = "", ydl=None) -> dict:
+    """Metadatos + subtítulos de un video con yt-dlp en proceso.
 
     Returns:
-        Texto de subtítulos o None si falla.
+        {video_id, titulo, idioma, texto (None si no hay subtítulos), obtenido}
     """
-    if not _check_ytdlp():
+    vid = video_id(url)
+    resultado = {"video_id": vid, "titulo": "", "idioma": "", "texto": None,
+                 "obtenido": time.time()}
+    yt_dlp = _yt_dlp()
+    if yt_dlp is None or vid is None:
+        return resultado
+    if ydl is None:
+        ydl = yt_dlp.YoutubeDL({"quiet": True, "no_warnings": True, "skip_download": True,
+                                "noplaylist": True})
+    info = ydl.extract_info(f"https://www.youtube.com/watch?v={vid}", download=False)
+    resultado["titulo"] = info.get("title", "")
+    pista = _elegir_pista(info, lang or _idioma_original(info))
+    if pista is None:
+        return resultado
+    idioma, fmt = pista
+    contenido = ydl.urlopen(fmt["url"]).read().decode("utf-8", errors="replace")
+    texto = _texto_json3(contenido) if fmt["ext"] == "json3" else _texto_vtt(contenido)
+    resultado["idioma"] = idioma
+    resultado["texto"] = _limpiar_transcripcion(texto) or None
+    return resultado
+
+
+def _dir_cache() -> str | None:
+    directorio = _config["cache_dir"]
+    if directorio is None:
         return None
+    return directorio or str(Path(__file__).resolve().parent.parent / CACHE_DIRNAME)
+
 
-    video_id_match = YOUTUBE_URL_PATTERN.search(url)
-    if not video_id_match:
+def _leer_cache(vid: str) -> dict | None:
+    cache = _dir_cache()
+    if not cache:
+        return None
+    try:
+        with open(os.path.join(cache, f"{vid}.json"), encoding="utf-8") as f:
+            entrada = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if entrada.get("texto") is None and time.time() - entrada.get("obtenido", 0) > TTL_SIN_SUBTITULOS:
         return None
-    video_id = video_id_match.group(1)
+    return entrada
 
-    if not lang:
-        lang = _detectar_idioma_original(url)
 
-    output_template = os.path.join(
-        tempfile.gettempdir(), f"yt_sub_{video_id}"
-    )
+def _escribir_cache(entrada: dict) -> None:
+    cache = _dir_cache()
+    if not cache or not entrada.get("video_id"):
+        return
+    os.makedirs(cache, exist_ok=True)
+    path = os.path.join(cache, f"{entrada['video_id']}.json")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(entrada, f, ensure_ascii=False)
+    os.replace(tmp, path)
 
-    try:
-        result = subprocess.run(
-            [
-                "yt-dlp",
-                "--skip-download",
-                "--write-auto-sub",
-                "--sub-lang", lang,
-                "--convert-subs", "srt",
-                "--output", output_template,
-                url,
-            ],
-            capture_output=True,
-            timeout=60,
-        )
-        if result.returncode != 0:
-            fallbacks = []
-            if lang != "en":
-                fallbacks.append("en")
-            if "-" in lang:
-                fallbacks.append(lang.split("-")[0])
-            for fb in fallbacks:
-                result2 = subprocess.run(
-                    [
-                        "yt-dlp",
-                        "--skip-download",
-                        "--write-auto-sub",
-                        "--sub-lang", fb,
-                        "--convert-subs", "srt",
-                        "--output", output_template,
-                        url,
-                    ],
-                    capture_output=True,
-                    timeout=60,
-                )
-                if result2.returncode == 0:
-                    lang = fb
-                    break
-            else:
-                return None
-
-        srt_path = f"{output_template}.{lang}.srt"
-        if not os.path.isfile(srt_path):
-            import glob as _glob
-            candidates = _glob.glob(f"{output_template}*.srt")
-            if candidates:
-                srt_path = candidates[0]
-            else:
-                return None
-
-        texto = _parsear_srt(srt_path)
-        _limpiar_temp(output_template)
-        return texto
-    except Exception:
-        _limpiar_temp(output_template)
-        return None
 
+def obtener_transcripciones(urls: list[str], *, workers: int = DEFAULT_WORKERS) -> dict[str, dict]:
+    """Transcripciones de varios videos: caché por id y el resto concurrente.
 
-def _parsear_srt(srt_path: str) -> str:
-    """Convierte archivo SRT a texto plano, eliminando timestamps y números."""
-    lineas = []
-    with open(srt_path, encoding="utf-8") as f:
-        for linea in f:
-            linea = linea.strip()
-            if not linea:
-                continue
-            if linea.isdigit():
-                continue
-            if "-->" in linea:
-                continue
-            lineas.append(linea)
-    texto = " ".join(lineas)
-    texto = re.sub(r'<[^>]+>', '', texto)
-    texto = re.sub(r'♪.*?♪', '', texto)
-    texto = re.sub(r'\[.*?\]', '', texto)
-    return texto.strip()
+    Returns:
+        {video_id: {video_id, titulo, idioma, texto, obtenido}}
+    """
+    ids = list(dict.fromkeys(v for v in (video_id(u) for u in urls) if v))
+    resultados = {}
+    faltantes = []
+    for vid in ids:
+        entrada = _leer_cache(vid)
+        if entrada is not None:
+            resultados[vid] = entrada
+        else:
+            faltantes.append(vid)
+    if not faltantes or _yt_dlp() is None:
+        return resultados
+
+    def _una(vid: str) -> dict:
+        try:
+            entrada = _obtener_transcripcion(f"https://www.youtube.com/watch?v={vid}")
+        except Exception as e:
+            print(f"[WARN] yt-dlp falló para {vid}: {e}")
+            return {"video_id": vid, "titulo": "", "idioma": "", "texto": None,
+                    "obtenido": time.time(), "error": True}
+        _escribir_cache(entrada)
+        return entrada
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(faltantes))),
+                            thread_name_prefix="youtube") as pool:
+        futuros = [pool.submit(contextvars.copy_context().run, _una, vid) for vid in faltantes]
+        for futuro in futuros:
+            entrada = futuro.result()
+            resultados[entrada["video_id"]] = entrada
+    return resultados
 
 
-def _limpiar_temp(base_path: str):
-    """Elimina archivos temporales de subtítulos."""
-    import glob as _glob
-    for f in _glob.glob(f"{base_path}*"):
-        with contextlib.suppress(OSError):
-            os.remove(f)
+def extraer_subtitulos(url: str, lang: str = "") -> str | None:
+    """Extrae subtítulos de video YouTube como texto plano.
+
+    Usa el idioma original del video (detectado automáticamente) y la
+    caché de transcripciones por id.
+
+    Args:
+        url: URL del video YouTube.
+        lang: Código de idioma (si se omite, se detecta automáticamente).
+
+    Returns:
+        Texto de subtítulos o None si falla.
+    """
+    if lang:
+        try:
+            return _obtener_transcripcion(url, lang)["texto"]
+        except Exception:
+            return None
+    vid = video_id(url)
+    return obtener_transcripciones([url]).get(vid, {}).get("texto") if vid else None
 
 
 def resumir_subtitulos(texto: str, modelo: str = "") -> str | None:
@@ -178,7 +255,7 @@ def resumir_subtitulos(texto: str, modelo: str = "") -> str | None:
     """
     from llm_api import completar
 
-    texto_truncado = texto[:12000]
+    texto_truncado = texto[:MAX_CHARS_RESUMEN]
     return completar(
         "youtube_summarizer",
         texto_truncado,
@@ -191,6 +268,74 @@ def detectar_youtube_en_texto(texto: str) -> list[str]:
     return [m.group(0) for m in YOUTUBE_URL_PATTERN.finditer(texto)]
 
 
+def _escribir_resumen(url: str, ruta_salida: str, nombre_actividad: str,
+                      subtitulos: str, resumen: str) -> str:
+    safe_name = re.sub(r'[<>"/\\|?*:]', '-', nombre_actividad).strip()
+    safe_name = safe_name.replace(" ", "_")[:80]
+    ruta_md = os.path.join(ruta_salida, f"{safe_name}_YouTube.md")
+
+    os.makedirs(ruta_salida, exist_ok=True)
+    with open(ruta_md, "w", encoding="utf-8") as f:
+        f.write(f"# Resumen: {nombre_actividad}\n\n")
+        f.write(f"**Video:** {url}\n\n")
+        f.write("## Resumen (LLM)\n\n")
+        f.write(resumen)
+        f.write("\n\n---\n\n")
+        f.write("## Subtítulos completos\n\n")
+        f.write(subtitulos[:10000])
+    return ruta_md
+
+
+def procesar_videos_youtube(
+    videos: list[tuple[str, str, str]],
+    *,
+    workers: int = DEFAULT_WORKERS,
+    modelo: str = "",
+) -> list[str | None]:
+    """Pipeline en lote: transcripciones concurrentes, resúmenes en un batch LLM.
+
+    Args:
+        videos: (url, ruta_salida, nombre_actividad) por video; un mismo
+            video en varias actividades se consulta y resume una sola vez.
+        workers: Videos consultados a la vez con yt-dlp.
+        modelo: Anula el modelo del perfil 'youtube_summarizer'.
+
+    Returns:
+        Ruta del .md generado por entrada (None si no hubo subtítulos).
+    """
+    if not videos:
+        return []
+    if _yt_dlp() is None:
+        raise ImportError("yt-dlp no instalado")
+    transcripciones = obtener_transcripciones([url for url, _, _ in videos], workers=workers)
+
+    con_texto = [vid for vid, t in transcripciones.items() if t.get("texto")]
+    resumenes: dict[str, str | None] = {}
+    if con_texto:
+        from llm_api import completar_batch
+        respuestas = completar_batch(
+            "youtube_summarizer",
+            [transcripciones[vid]["texto"][:MAX_CHARS_RESUMEN] for vid in con_texto],
+            max_concurrency=workers,
+            modelo=modelo,
+        )
+        resumenes = dict(zip(con_texto, respuestas, strict=True))
+
+    rutas = []
+    for url, ruta_salida, nombre_actividad in videos:
+        vid = video_id(url)
+        subtitulos = transcripciones.get(vid, {}).get("texto") if vid else None
+        if not subtitulos:
+            print(f"    [yellow]No se pudieron extraer subtítulos de:[/yellow] {url}")
+            rutas.append(None)
+            continue
+        resumen = resumenes.get(vid) or subtitulos[:4000]
+        ruta_md = _escribir_resumen(url, ruta_salida, nombre_actividad, subtitulos, resumen)
+        print(f"  [green]Resumen YouTube guardado:[/green] {ruta_md}")
+        rutas.append(ruta_md)
+    return rutas
+
+
 def procesar_video_youtube(
     url: str,
     ruta_salida: str,
@@ -206,28 +351,4 @@ def procesar_video_youtube(
     Returns:
         Ruta del archivo .md generado o None.
     """
-    subtitulos = extraer_subtitulos(url)
-    if not subtitulos:
-        print(f"    [yellow]No se pudieron extraer subtítulos de:[/yellow] {url}")
-        return None
-
-    resumen = resumir_subtitulos(subtitulos)
-    if not resumen:
-        resumen = subtitulos[:4000]
-
-    safe_name = re.sub(r'[<>"/\\|?*:]', '-', nombre_actividad).strip()
-    safe_name = safe_name.replace(" ", "_")[:80]
-    ruta_md = os.path.join(ruta_salida, f"{safe_name}_YouTube.md")
-
-    os.makedirs(ruta_salida, exist_ok=True)
-    with open(ruta_md, "w", encoding="utf-8") as f:
-        f.write(f"# Resumen: {nombre_actividad}\n\n")
-        f.write(f"**Video:** {url}\n\n")
-        f.write("## Resumen (LLM)\n\n")
-        f.write(resumen)
-        f.write("\n\n---\n\n")
-        f.write("## Subtítulos completos\n\n")
-        f.write(subtitulos[:10000])
-
-    print(f"  [green]Resumen YouTube guardado:[/green] {ruta_md}")
-    return ruta_md
+    return procesar_videos_youtube([(url, ruta_salida, nombre_actividad)])[0]
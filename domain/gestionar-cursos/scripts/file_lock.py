@@ -0,0 +1,39 @@
+"""
+Lock exclusivo entre procesos basado en un archivo creado con O_EXCL.
+
+Lo comparten rate_limiter.py (estado del token bucket) y checkpoint.py
+(`.progress.json` y su compactación). Portable Windows/POSIX, sin fcntl.
+"""
+
+import contextlib
+import os
+import time
+
+LOCK_STALE_SECONDS = 10.0
+
+
+@contextlib.contextmanager
+def lockfile(path: str):
+    """Lock exclusivo entre procesos vía O_EXCL (portable Windows/POSIX).
+
+    Un lock más viejo que LOCK_STALE_SECONDS se considera abandonado
+    (proceso muerto) y se roba.
+    """
+    while True:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            os.close(fd)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(path) > LOCK_STALE_SECONDS:
+                    os.remove(path)
+                    continue
+            except OSError:
+                continue
+            time.sleep(0.005)
+    try:
+        yield
+    finally:
+        with contextlib.suppress(OSError):
+            os.remove(path)
@@ -6,11 +6,18 @@ El LLM devuelve JSON con clean_text + metadata estructurados.
 Los metadatos se acumulan para que el caller los recupere.
 """
 
+import contextvars
 import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-from llm_api import completar
+from llm_api import completar, completar_batch
 
-_metadatos: list[dict] = []
+# Por contexto (un curso por hilo en cli_init --parallel)
+_metadatos: contextvars.ContextVar[list[dict] | None] = contextvars.ContextVar(
+    "metadatos_llm", default=None,
+)
 
 
 def formatear_texto_llm(
@@ -37,6 +44,278 @@ def formatear_texto_llm(
         instruccion=instruccion,
         modelo=modelo,
     )
+    return _procesar_respuesta(texto_crudo, result)
+
+
+def formatear_textos_llm(
+    textos_crudos: list[str],
+    instruccion: str = "",
+    modelo: str = "",
+    max_concurrency: int = 4,
+) -> list[str]:
+    """Versión en lote de formatear_texto_llm (llamadas LLM concurrentes).
+
+    Los metadatos se acumulan en el mismo orden que textos_crudos.
+
+    Returns:
+        Textos formateados, alineados con textos_crudos.
+    """
+    results = completar_batch(
+        "document_formatter",
+        textos_crudos,
+        max_concurrency=max_concurrency,
+        instruccion=instruccion,
+        modelo=modelo,
+    )
+    return [
+        _procesar_respuesta(texto, result)
+        for texto, result in zip(textos_crudos, results, strict=True)
+    ]
+
+
+def formatear_texto_llm_stream(
+    texto_crudo: str,
+    ruta_salida: str,
+    instruccion: str = "",
+    modelo: str = "",
+) -> str:
+    """Como formatear_texto_llm, pero escribe el markdown a disco mientras llega.
+
+    Decodifica `clean_text` del sobre JSON de forma incremental y lo va
+    agregando a ruta_salida. Si la respuesta no empieza como el objeto JSON
+    esperado, corta el stream de inmediato (no se pagan más tokens) y deja
+    el texto crudo en ruta_salida.
+
+    Returns:
+        Texto formateado (clean_text), o el original si falla.
+    """
+    respuesta, _ttft = _stream_a_disco(texto_crudo, ruta_salida, instruccion, modelo)
+    return _cerrar_markdown(texto_crudo, ruta_salida, respuesta)
+
+
+def formatear_textos_llm_stream(
+    textos_crudos: list[str],
+    rutas_salida: list[str],
+    instruccion: str = "",
+    modelo: str = "",
+    max_concurrency: int = 4,
+) -> list[tuple[str, float | None]]:
+    """Versión en lote de formatear_texto_llm_stream: un stream por documento,
+    concurrentes, cada uno escribiendo su markdown.
+
+    Los metadatos se acumulan en el mismo orden que textos_crudos.
+
+    Returns:
+        (texto formateado, segundos al primer token o None) por documento,
+        alineados con textos_crudos.
+    """
+    def _uno(i: int):
+        return _stream_a_disco(textos_crudos[i], rutas_salida[i], instruccion, modelo)
+
+    indices = range(len(textos_crudos))
+    if max_concurrency > 1 and len(textos_crudos) > 1:
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(textos_crudos))) as pool:
+            futuros = [pool.submit(contextvars.copy_context().run, _uno, i) for i in indices]
+            streams = [f.result() for f in futuros]
+    else:
+        streams = [_uno(i) for i in indices]
+
+    return [
+        (_cerrar_markdown(texto, ruta, respuesta), ttft)
+        for texto, ruta, (respuesta, ttft)
+        in zip(textos_crudos, rutas_salida, streams, strict=True)
+    ]
+
+
+def _stream_a_disco(texto_crudo: str, ruta_salida: str, instruccion: str,
+                    modelo: str) -> tuple[str | None, float | None]:
+    """Escribe el clean_text en ruta_salida mientras llega.
+
+    Returns:
+        (respuesta completa, o None si falló o el sobre es inválido —en ese
+        caso ruta_salida queda con el texto crudo—; segundos al primer token).
+    """
+    stream = completar(
+        "document_formatter",
+        texto_crudo,
+        instruccion=instruccion,
+        modelo=modelo,
+        stream=True,
+    )
+
+    inicio = time.monotonic()
+    extractor = _ExtractorCleanText()
+    partes: list[str] = []
+    os.makedirs(os.path.dirname(os.path.abspath(ruta_salida)), exist_ok=True)
+    with open(ruta_salida, "w", encoding="utf-8") as f:
+        try:
+            for delta in stream:
+                partes.append(delta)
+                texto = extractor.feed(delta)
+                if texto:
+                    f.write(texto)
+                    f.flush()
+                if extractor.malformado:
+                    print(f"[WARN] Sobre JSON inválido tras {len(''.join(partes))} chars; "
+                          f"stream abortado ({os.path.basename(ruta_salida)})")
+                    break
+        finally:
+            close = getattr(stream, "close", None)
+            if close:
+                close()
+
+    ttft = getattr(stream, "ttft", None)
+    print(f"[STREAM] {os.path.basename(ruta_salida)}: "
+          f"{len(''.join(partes))} chars en {time.monotonic() - inicio:.1f}s"
+          + (f" (primer token {ttft:.2f}s)" if ttft is not None else ""))
+
+    if extractor.malformado or not partes:
+        _escribir(ruta_salida, texto_crudo)
+        return None, ttft
+    return "".join(partes), ttft
+
+
+def _cerrar_markdown(texto_crudo: str, ruta_salida: str, respuesta: str | None) -> str:
+    """Procesa la respuesta completa (metadatos) y deja el markdown definitivo."""
+    if respuesta is None:
+        return texto_crudo
+    texto = _procesar_respuesta(texto_crudo, respuesta)
+    # Reescribir con el resultado definitivo (parseo completo del JSON)
+    _escribir(ruta_salida, texto)
+    return texto
+
+
+def _escribir(ruta: str, texto: str):
+    os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write(texto)
+
+
+class _ExtractorCleanText:
+    """Decodifica incrementalmente el valor de "clean_text" de un JSON en stream.
+
+    Espera `{"clean_text": "..."` al inicio (tolera un fence ```json).
+    Marca malformado si el primer carácter útil no es `{` o el objeto no
+    abre con una clave string. Si la primera clave no es clean_text no
+    produce texto incremental (se usa el parseo completo al final).
+    """
+
+    _ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f",
+                "n": "\n", "r": "\r", "t": "\t"}
+
+    def __init__(self):
+        self.malformado = False
+        self._estado = "inicio"
+        self._buf = ""
+
+    def feed(self, delta: str) -> str:
+        """Agrega un delta; devuelve el texto de clean_text decodificado en él."""
+        if self.malformado or self._estado == "fin":
+            return ""
+        self._buf += delta
+        salida = []
+        while self._buf and not self.malformado and self._estado != "fin":
+            if not self._avanzar(salida):
+                break
+        return "".join(salida)
+
+    def _avanzar(self, salida: list[str]) -> bool:
+        """Procesa lo que se pueda del buffer; False si necesita más datos."""
+        buf = self._buf
+        if self._estado == "inicio":
+            sin_ws = buf.lstrip()
+            if not sin_ws:
+                self._buf = ""
+                return False
+            if sin_ws.startswith("`"):
+                if "\n" not in sin_ws:
+                    return False  # esperar fin de la línea del fence
+                self._buf = sin_ws.split("\n", 1)[1]
+                return True
+            if sin_ws[0] != "{":
+                self.malformado = True
+                return False
+            self._buf = sin_ws[1:]
+            self._estado = "clave"
+            return True
+
+        if self._estado == "clave":
+            sin_ws = buf.lstrip()
+            if not sin_ws:
+                self._buf = ""
+                return False
+            if sin_ws[0] != '"':
+                self.malformado = True
+                return False
+            prefijo = '"clean_text"'
+            if len(sin_ws) < len(prefijo):
+                self._buf = sin_ws
+                return False
+            if not sin_ws.startswith(prefijo):
+                self._estado = "fin"  # otra clave primero: sin texto incremental
+                return False
+            resto = sin_ws[len(prefijo):].lstrip()
+            if not resto:
+                self._buf = sin_ws
+                return False
+            if not resto.startswith(":"):
+                self.malformado = True
+                return False
+            resto = resto[1:].lstrip()
+            if not resto:
+                self._buf = sin_ws
+                return False
+            if not resto.startswith('"'):
+                self.malformado = True
+                return False
+            self._buf = resto[1:]
+            self._estado = "valor"
+            return True
+
+        # estado "valor": decodificar string JSON hasta la comilla de cierre
+        i = 0
+        while i < len(buf):
+            c = buf[i]
+            if c == '"':
+                self._estado = "fin"
+                self._buf = ""
+                return False
+            if c != "\\":
+                salida.append(c)
+                i += 1
+                continue
+            if i + 1 >= len(buf):
+                break
+            esc = buf[i + 1]
+            if esc in self._ESCAPES:
+                salida.append(self._ESCAPES[esc])
+                i += 2
+                continue
+            if esc != "u":
+                self.malformado = True
+                return False
+            if i + 6 > len(buf):
+                break
+            try:
+                codigo = int(buf[i + 2:i + 6], 16)
+                if 0xD800 <= codigo <= 0xDBFF:
+                    if i + 12 > len(buf):
+                        break
+                    bajo = int(buf[i + 8:i + 12], 16)
+                    salida.append(chr(0x10000 + ((codigo - 0xD800) << 10) + (bajo - 0xDC00)))
+                    i += 12
+                else:
+                    salida.append(chr(codigo))
+                    i += 6
+            except ValueError:
+                self.malformado = True
+                return False
+        self._buf = buf[i:]
+        return False
+
+
+def _procesar_respuesta(texto_crudo: str, result: str | None) -> str:
+    """Extrae clean_text de la respuesta y acumula metadata."""
     if result is None:
         return texto_crudo
 
@@ -45,17 +324,29 @@ def formatear_texto_llm(
         texto = parsed.get("clean_text", "")
         meta = parsed.get("metadata", {})
         if meta:
-            _metadatos.append(meta)
+            _lista_metadatos().append(meta)
         return texto if texto else texto_crudo
 
     return result  # fallback: devolver respuesta cruda si no es JSON
 
 
+def _lista_metadatos() -> list[dict]:
+    lista = _metadatos.get()
+    if lista is None:
+        lista = []
+        _metadatos.set(lista)
+    return lista
+
+
 def obtener_metadatos() -> list[dict]:
-    """Retorna y limpia los metadatos acumulados de documentos procesados."""
-    global _metadatos
-    datos = list(_metadatos)
-    _metadatos = []
+    """Retorna y limpia los metadatos acumulados de documentos procesados.
+
+    También abre una lista nueva en el contexto actual: llamarla al
+    iniciar un curso hace que los pools que copien el contexto después
+    acumulen en la misma lista.
+    """
+    datos = list(_metadatos.get() or [])
+    _metadatos.set([])
     return datos
 
 
@@ -11,6 +11,8 @@ Jerarquía:
 """
 
 import builtins
+import time
+from collections.abc import Iterator
 
 
 def _agent_has_llm() -> bool:
@@ -34,16 +36,22 @@ def completar(
     temperature: float | None = None,
     max_tokens: int | None = None,
     timeout: int | None = None,
-) -> str | None:
+    stream: bool = False,
+) -> str | Iterator[str] | None:
     """Envía mensaje al LLM (agente nativo si disponible, sino OpenRouter).
 
     Misma firma que openrouter_client.completar() para drop-in replacement.
+    Con stream=True el agente nativo entrega la respuesta como un único delta.
     """
     if _agent_has_llm():
-        return _completar_agente(
+        result = _completar_agente(
             profile_name, user_message,
             instruccion=instruccion, modelo=modelo,
         )
+        if stream:
+            from openrouter_client import StreamLLM
+            return StreamLLM([result] if result else [])
+        return result
 
     from openrouter_client import completar as _or_completar
     return _or_completar(
@@ -53,6 +61,34 @@ def completar(
         temperature=temperature if temperature is not None else None,
         max_tokens=max_tokens,
         timeout=timeout,
+        stream=stream,
+    )
+
+
+def completar_batch(
+    profile_name: str,
+    messages: list[str],
+    *,
+    max_concurrency: int = 4,
+    instruccion: str = "",
+    modelo: str = "",
+) -> list[str | None]:
+    """Envía varios mensajes con el mismo perfil; respuestas en orden de entrada.
+
+    Con agente nativo se procesan en serie (la tool no garantiza ser
+    thread-safe). Con OpenRouter se delega a completar_batch concurrente.
+    """
+    if _agent_has_llm():
+        return [
+            _completar_agente(profile_name, m, instruccion=instruccion, modelo=modelo)
+            for m in messages
+        ]
+
+    from openrouter_client import completar_batch as _or_completar_batch
+    return _or_completar_batch(
+        profile_name, messages,
+        max_concurrency=max_concurrency,
+        instruccion=instruccion, modelo=modelo,
     )
 
 
@@ -63,8 +99,12 @@ def _completar_agente(
     instruccion: str = "",
     modelo: str = "",
 ) -> str | None:
-    """Usa la tool llm_complete inyectada por el agente."""
-    from openrouter_client import get_profile
+    """Usa la tool llm_complete inyectada por el agente.
+
+    El agente no informa `usage`: el ledger registra tokens estimados.
+    """
+    from chunking import estimar_tokens
+    from openrouter_client import _registrar_ledger, get_profile
     profile = get_profile(profile_name)
     system = profile.get("system_prompt", "")
 
@@ -72,7 +112,15 @@ def _completar_agente(
 
     try:
         fn = builtins.llm_complete
-        return fn(system_prompt=system, user_message=user_msg)
+        inicio = time.monotonic()
+        result = fn(system_prompt=system, user_message=user_msg)
+        _registrar_ledger(
+            profile_name, modelo or "agent", backend="agent",
+            segundos=time.monotonic() - inicio, ok=result is not None,
+            input_tokens=estimar_tokens(system) + estimar_tokens(user_msg),
+            output_tokens=estimar_tokens(result or ""), tokens_estimados=True,
+        )
+        return result
     except Exception as e:
         print(f"[WARN] Agente LLM falló ({profile_name}): {e}")
         from openrouter_client import completar as _or_completar
@@ -0,0 +1,395 @@
+"""
+Caché de respuestas LLM en un único archivo SQLite indexado.
+
+Reemplaza los `<sha256>.json` sueltos en `_cache/`: una tabla con clave
+primaria `_cache_key`, modo WAL (lecturas concurrentes entre hilos y
+procesos), compresión zlib de resultados grandes y expulsión LRU cuando
+el archivo supera el tamaño máximo. Los `.json` heredados se importan
+al abrir el store y se eliminan tras importarlos.
+
+Las lecturas no escriben en cada acierto: el LRU, los contadores y la
+procedencia se acumulan en memoria y se guardan en una sola transacción
+cada LECTURAS_POR_COMMIT consultas, antes de cada put() o reporte, al
+cerrar y al salir del proceso. `abrir_cache_lectura()` abre el archivo
+en solo lectura para reportes (sin importar heredados ni expulsar).
+
+El mismo store sirve como caché global entre cursos (direccionado por
+contenido normalizado): con `origen=<curso>` registra qué cursos
+crearon y reutilizaron cada entrada.
+
+Uso:
+    from llm_cache import abrir_cache
+
+    cache = abrir_cache("curso/_cache")
+    cache.get(key)
+    cache.put(key, resultado)
+    cache.stats()
+"""
+
+import atexit
+import contextlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import zlib
+from collections import Counter
+
+DB_FILENAME = "llm_cache.sqlite"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_COMPRESS_MIN_BYTES = 4096
+LECTURAS_POR_COMMIT = 64
+LEGACY_RE = re.compile(r"^[0-9a-f]{64}\.json$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entradas (
+    key TEXT PRIMARY KEY,
+    result BLOB NOT NULL,
+    comprimido INTEGER NOT NULL DEFAULT 0,
+    bytes_original INTEGER NOT NULL,
+    bytes_guardado INTEGER NOT NULL,
+    creado REAL NOT NULL,
+    ultimo_acceso REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_entradas_acceso ON entradas(ultimo_acceso);
+CREATE TABLE IF NOT EXISTS procedencia (
+    key TEXT NOT NULL,
+    curso TEXT NOT NULL,
+    primer_uso REAL NOT NULL,
+    ultimo_uso REAL NOT NULL,
+    usos INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (key, curso)
+);
+CREATE TABLE IF NOT EXISTS contadores (
+    nombre TEXT PRIMARY KEY,
+    valor INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+_STORES: dict[str, "CacheLLM"] = {}
+_STORES_LOCK = threading.Lock()
+
+
+class CacheLLM:
+    """Store SQLite de respuestas LLM con LRU por tamaño y estadísticas."""
+
+    def __init__(
+        self,
+        cache_dir: str,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        compress_min_bytes: int = DEFAULT_COMPRESS_MIN_BYTES,
+        solo_lectura: bool = False,
+    ):
+        self.cache_dir = cache_dir
+        self.path = os.path.join(cache_dir, DB_FILENAME)
+        self.max_bytes = max_bytes
+        self.compress_min_bytes = compress_min_bytes
+        self.solo_lectura = solo_lectura
+        self._lock = threading.Lock()
+        self._accesos: dict[str, float] = {}  # key → último acceso pendiente
+        self._hits: Counter = Counter()
+        self._contadores: Counter = Counter()
+        self._usos: Counter = Counter()  # (key, curso) → usos
+        self._lecturas = 0
+        if solo_lectura:
+            self._abrir_solo_lectura()
+            return
+        os.makedirs(cache_dir, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        self._importar_legado()
+
+    def get(self, key: str, origen: str = "") -> str | None:
+        """Devuelve el resultado cacheado (y actualiza LRU/contadores) o None.
+
+        Con origen, un acierto suma un uso del curso en la procedencia.
+        Las actualizaciones quedan pendientes hasta el próximo guardado.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, comprimido, bytes_original FROM entradas WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if not self.solo_lectura:
+                if row is None:
+                    self._contadores["misses"] += 1
+                else:
+                    self._accesos[key] = time.time()
+                    self._hits[key] += 1
+                    self._contadores["hits"] += 1
+                    self._contadores["bytes_servidos"] += row[2]
+                    if origen:
+                        self._usos[(key, origen)] += 1
+                self._lecturas += 1
+                if self._lecturas >= LECTURAS_POR_COMMIT:
+                    self._guardar_lecturas()
+                    self._conn.commit()
+        if row is None:
+            return None
+        blob, comprimido, _ = row
+        return _decodificar(blob, comprimido)
+
+    def put(self, key: str, result: str, origen: str = "") -> None:
+        """Guarda un resultado; comprime si supera compress_min_bytes.
+
+        Con origen, registra al curso que generó la entrada.
+        """
+        blob, comprimido = _codificar(result, self.compress_min_bytes)
+        ahora = time.time()
+        with self._lock:
+            self._guardar_lecturas()  # el LRU de _expulsar() debe ver las lecturas
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entradas "
+                "(key, result, comprimido, bytes_original, bytes_guardado, creado, ultimo_acceso) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, blob, comprimido, len(result.encode("utf-8")), len(blob), ahora, ahora),
+            )
+            if origen:
+                self._registrar_procedencia(key, origen, usos=0)
+            self._expulsar()
+            self._conn.commit()
+
+    def procedencia(self, key: str) -> list[dict]:
+        """Cursos que generaron o reutilizaron una entrada."""
+        self.guardar()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT curso, primer_uso, ultimo_uso, usos FROM procedencia "
+                "WHERE key = ? ORDER BY primer_uso",
+                (key,),
+            ).fetchall()
+        return [
+            {"curso": c, "primer_uso": p, "ultimo_uso": u, "usos": n}
+            for c, p, u, n in rows
+        ]
+
+    def reutilizadas(self, limite: int = 20) -> list[dict]:
+        """Entradas usadas por más de un curso, las más compartidas primero."""
+        self.guardar()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT p.key, COUNT(*) AS cursos, SUM(p.usos), e.bytes_original, "
+                "GROUP_CONCAT(p.curso, ', ') "
+                "FROM procedencia p JOIN entradas e ON e.key = p.key "
+                "GROUP BY p.key HAVING cursos > 1 "
+                "ORDER BY cursos DESC, SUM(p.usos) DESC LIMIT ?",
+                (limite,),
+            ).fetchall()
+        return [
+            {"key": k, "cursos": n, "usos": u, "bytes": b, "lista_cursos": lista}
+            for k, n, u, b, lista in rows
+        ]
+
+    def stats(self) -> dict:
+        """Estadísticas del store: entradas, tamaños, hit ratio, bytes ahorrados."""
+        self.guardar()
+        with self._lock:
+            entradas, original, guardado = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(bytes_original), 0), "
+                "COALESCE(SUM(bytes_guardado), 0) FROM entradas"
+            ).fetchone()
+            contadores = dict(self._conn.execute("SELECT nombre, valor FROM contadores"))
+            (compartidas,) = self._conn.execute(
+                "SELECT COUNT(*) FROM (SELECT key FROM procedencia "
+                "GROUP BY key HAVING COUNT(*) > 1)"
+            ).fetchone()
+        hits = contadores.get("hits", 0)
+        misses = contadores.get("misses", 0)
+        consultas = hits + misses
+        return {
+            "path": self.path,
+            "entradas": entradas,
+            "bytes_original": original,
+            "bytes_guardado": guardado,
+            "bytes_ahorrados_compresion": original - guardado,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / consultas if consultas else 0.0,
+            "bytes_servidos": contadores.get("bytes_servidos", 0),
+            "expulsadas": contadores.get("expulsadas", 0),
+            "compartidas": compartidas,
+            "max_bytes": self.max_bytes,
+        }
+
+    def guardar(self) -> None:
+        """Escribe las lecturas pendientes (LRU, contadores, procedencia)."""
+        with self._lock:
+            if self._guardar_lecturas():
+                self._conn.commit()
+
+    def close(self) -> None:
+        """Guarda lo pendiente y cierra la conexión (hace checkpoint del WAL)."""
+        self.guardar()
+        with self._lock:
+            self._conn.close()
+
+    def _abrir_solo_lectura(self) -> None:
+        if os.path.isfile(self.path):
+            uri = f"file:{os.path.abspath(self.path)}?mode=ro"
+            self._conn = sqlite3.connect(uri, uri=True, timeout=30, check_same_thread=False)
+        else:  # solo .json heredados: un store vacío en memoria
+            self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+            self._conn.executescript(_SCHEMA)
+
+    def _guardar_lecturas(self) -> bool:
+        """Vuelca las lecturas pendientes (con el lock tomado; sin commit)."""
+        if self.solo_lectura or not self._lecturas:
+            return False
+        self._conn.executemany(
+            "UPDATE entradas SET ultimo_acceso = MAX(ultimo_acceso, ?), hits = hits + ? "
+            "WHERE key = ?",
+            [(acceso, self._hits[key], key) for key, acceso in self._accesos.items()],
+        )
+        for nombre, delta in self._contadores.items():
+            self._incrementar(nombre, delta)
+        for (key, curso), usos in self._usos.items():
+            self._registrar_procedencia(key, curso, usos)
+        self._accesos.clear()
+        self._hits.clear()
+        self._contadores.clear()
+        self._usos.clear()
+        self._lecturas = 0
+        return True
+
+    def _incrementar(self, nombre: str, delta: int) -> None:
+        self._conn.execute(
+            "INSERT INTO contadores (nombre, valor) VALUES (?, ?) "
+            "ON CONFLICT(nombre) DO UPDATE SET valor = valor + excluded.valor",
+            (nombre, delta),
+        )
+
+    def _registrar_procedencia(self, key: str, curso: str, usos: int) -> None:
+        ahora = time.time()
+        self._conn.execute(
+            "INSERT INTO procedencia (key, curso, primer_uso, ultimo_uso, usos) "
+            "VALUES (?, ?, ?, ?, ?) ON CONFLICT(key, curso) DO UPDATE SET "
+            "ultimo_uso = excluded.ultimo_uso, usos = usos + excluded.usos",
+            (key, curso, ahora, ahora, usos),
+        )
+
+    def _expulsar(self) -> None:
+        """Expulsa entradas menos usadas recientemente hasta caber en max_bytes."""
+        (total,) = self._conn.execute(
+            "SELECT COALESCE(SUM(bytes_guardado), 0) FROM entradas"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+        exceso = total - self.max_bytes
+        expulsadas = []
+        for key, tam in self._conn.execute(
+            "SELECT key, bytes_guardado FROM entradas ORDER BY ultimo_acceso ASC"
+        ).fetchall():
+            if exceso <= 0:
+                break
+            expulsadas.append((key,))
+            exceso -= tam
+        self._conn.executemany("DELETE FROM entradas WHERE key = ?", expulsadas)
+        self._conn.executemany("DELETE FROM procedencia WHERE key = ?", expulsadas)
+        self._incrementar("expulsadas", len(expulsadas))
+
+    def _importar_legado(self) -> None:
+        """Importa `<sha256>.json` del formato anterior y borra los archivos."""
+        try:
+            nombres = [n for n in os.listdir(self.cache_dir) if LEGACY_RE.match(n)]
+        except OSError:
+            return
+        if not nombres:
+            return
+
+        importados = []
+        for nombre in nombres:
+            ruta = os.path.join(self.cache_dir, nombre)
+            try:
+                with open(ruta, encoding="utf-8") as f:
+                    result = json.load(f).get("result")
+            except (OSError, ValueError, AttributeError):
+                continue
+            if not isinstance(result, str):
+                continue
+            blob, comprimido = _codificar(result, self.compress_min_bytes)
+            ahora = os.path.getmtime(ruta)
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO entradas "
+                    "(key, result, comprimido, bytes_original, bytes_guardado, "
+                    "creado, ultimo_acceso) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (nombre[:-5], blob, comprimido, len(result.encode("utf-8")),
+                     len(blob), ahora, ahora),
+                )
+            importados.append(ruta)
+
+        with self._lock:
+            self._expulsar()
+            self._conn.commit()
+        for ruta in importados:
+            with contextlib.suppress(OSError):
+                os.remove(ruta)
+        if importados:
+            print(f"[CACHE] Importadas {len(importados)} entradas .json a {DB_FILENAME}")
+
+
+def abrir_cache(cache_dir: str, **kwargs) -> CacheLLM:
+    """Devuelve el store de cache_dir (uno por directorio y proceso)."""
+    key = os.path.abspath(cache_dir)
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            store = CacheLLM(cache_dir, **kwargs)
+            _STORES[key] = store
+        return store
+
+
+def abrir_cache_lectura(cache_dir: str, **kwargs) -> CacheLLM:
+    """Store de cache_dir en solo lectura, para reportes.
+
+    No importa `.json` heredados, no expulsa ni registra las consultas; no
+    se comparte con abrir_cache().
+    """
+    return CacheLLM(cache_dir, solo_lectura=True, **kwargs)
+
+
+@atexit.register
+def _guardar_stores() -> None:
+    with _STORES_LOCK:
+        stores = list(_STORES.values())
+    for store in stores:
+        with contextlib.suppress(sqlite3.Error):
+            store.guardar()
+
+
+def normalizar_contenido(texto: str) -> str:
+    """Normaliza texto para direccionar por contenido.
+
+    Unicode NFC, saltos de línea unificados, espacios colapsados y líneas
+    en blanco repetidas reducidas: el mismo PDF extraído en dos cursos
+    produce la misma clave aunque difiera en espaciado.
+    """
+    texto = unicodedata.normalize("NFC", texto).replace("\r\n", "\n").replace("\r", "\n")
+    texto = re.sub(r"[ \t\u00a0]+", " ", texto)
+    texto = re.sub(r" *\n *", "\n", texto)
+    texto = re.sub(r"\n{3,}", "\n\n", texto)
+    return texto.strip()
+
+
+def _codificar(result: str, compress_min_bytes: int) -> tuple[bytes, int]:
+    """Serializa un resultado; zlib solo si es grande y realmente reduce."""
+    raw = result.encode("utf-8")
+    if compress_min_bytes and len(raw) >= compress_min_bytes:
+        comprimido = zlib.compress(raw, 6)
+        if len(comprimido) < len(raw):
+            return comprimido, 1
+    return raw, 0
+
+
+def _decodificar(blob: bytes, comprimido: int) -> str:
+    if comprimido:
+        blob = zlib.decompress(blob)
+    return bytes(blob).decode("utf-8")
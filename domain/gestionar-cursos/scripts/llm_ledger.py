@@ -0,0 +1,156 @@
+"""
+Ledger de telemetría LLM: una línea JSON por llamada en `llm_ledger.jsonl`.
+
+Cada request al API (y cada acierto de caché que la evitó) agrega un
+registro con perfil, modelo, tokens de `usage`, tiempo de pared,
+reintentos, si se usó el fallback y si vino de caché. Las claves base
+(`timestamp`, `model_id`, `input_tokens`, `output_tokens`, `session_id`,
+`task_id`) siguen el formato de uso de analyze-model, así el archivo se
+analiza directamente:
+
+    python ../analyze-model/scripts/analyze_costs.py llm_ledger.jsonl --catalog catalog.json
+
+Las líneas se escriben con una sola llamada en modo append: hilos y
+subprocesos de `cli_init --parallel` comparten el archivo sin lockfile.
+
+Uso:
+    from llm_ledger import registrar
+
+    registrar("llm_ledger.jsonl", perfil="document_formatter",
+              modelo="google/gemma-4-31b-it", input_tokens=1200,
+              output_tokens=800, segundos=4.2)
+"""
+
+import json
+import math
+import os
+import threading
+from datetime import UTC, datetime
+
+LEDGER_FILENAME = "llm_ledger.jsonl"
+
+_LOCK = threading.Lock()
+
+
+def registrar(
+    ruta: str,
+    *,
+    perfil: str,
+    modelo: str,
+    input_tokens: int = 0,
+    output_tokens: int = 0,
+    segundos: float = 0.0,
+    reintentos: int = 0,
+    fallback: bool = False,
+    cache_hit: bool = False,
+    ok: bool = True,
+    curso: str = "",
+    backend: str = "openrouter",
+    costo_usd: float | None = None,
+    tokens_estimados: bool = False,
+) -> dict:
+    """Agrega un registro al ledger y lo devuelve.
+
+    Un error de escritura solo se informa: la telemetría nunca interrumpe
+    el procesamiento de un curso.
+    """
+    registro = {
+        "timestamp": datetime.now(UTC).strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+        "model_id": modelo,
+        "input_tokens": int(input_tokens or 0),
+        "output_tokens": int(output_tokens or 0),
+        "session_id": curso,
+        "task_id": perfil,
+        "profile": perfil,
+        "course": curso,
+        "backend": backend,
+        "wall_s": round(segundos, 3),
+        "retries": reintentos,
+        "fallback": fallback,
+        "cache_hit": cache_hit,
+        "ok": ok,
+    }
+    if costo_usd is not None:
+        registro["cost_usd"] = costo_usd
+    if tokens_estimados:
+        registro["tokens_estimated"] = True
+
+    linea = json.dumps(registro, ensure_ascii=False) + "\n"
+    try:
+        with _LOCK:
+            directorio = os.path.dirname(ruta)
+            if directorio:
+                os.makedirs(directorio, exist_ok=True)
+            with open(ruta, "a", encoding="utf-8") as f:
+                f.write(linea)
+    except OSError as e:
+        print(f"[WARN] No se pudo escribir el ledger LLM ({ruta}): {e}")
+    return registro
+
+
+def leer(ruta: str) -> list[dict]:
+    """Registros del ledger (ignora líneas truncadas o ilegibles)."""
+    registros = []
+    try:
+        with open(ruta, encoding="utf-8") as f:
+            for linea in f:
+                linea = linea.strip()
+                if not linea:
+                    continue
+                try:
+                    registros.append(json.loads(linea))
+                except json.JSONDecodeError:
+                    continue
+    except FileNotFoundError:
+        return []
+    return registros
+
+
+def resumir(registros: list[dict], por: str = "profile") -> list[dict]:
+    """Agrupa registros por una clave (profile, course, model_id, backend).
+
+    Returns:
+        Una fila por grupo con llamadas, aciertos de caché, fallos,
+        reintentos, fallbacks, tokens, costo reportado y latencia
+        p50/p95 de las llamadas reales, ordenadas por tokens.
+    """
+    grupos: dict[str, dict] = {}
+    for r in registros:
+        nombre = r.get(por) or "(sin dato)"
+        g = grupos.setdefault(nombre, {
+            "grupo": nombre, "llamadas": 0, "cache_hits": 0, "fallidas": 0,
+            "reintentos": 0, "fallbacks": 0, "input_tokens": 0,
+            "output_tokens": 0, "costo_usd": 0.0, "_tiempos": [],
+        })
+        g["llamadas"] += 1
+        if r.get("cache_hit"):
+            g["cache_hits"] += 1
+            continue
+        if not r.get("ok", True):
+            g["fallidas"] += 1
+        g["reintentos"] += int(r.get("retries", 0) or 0)
+        g["fallbacks"] += 1 if r.get("fallback") else 0
+        g["input_tokens"] += int(r.get("input_tokens", 0) or 0)
+        g["output_tokens"] += int(r.get("output_tokens", 0) or 0)
+        g["costo_usd"] += float(r.get("cost_usd", 0) or 0)
+        g["_tiempos"].append(float(r.get("wall_s", 0) or 0))
+
+    filas = []
+    for g in grupos.values():
+        tiempos = sorted(g.pop("_tiempos"))
+        g["segundos_total"] = round(sum(tiempos), 3)
+        g["p50_s"] = _percentil(tiempos, 0.50)
+        g["p95_s"] = _percentil(tiempos, 0.95)
+        filas.append(g)
+    return sorted(
+        filas, key=lambda g: (g["input_tokens"] + g["output_tokens"], g["llamadas"]),
+        reverse=True,
+    )
+
+
+def _percentil(valores: list[float], q: float) -> float:
+    """Percentil por rango más cercano sobre una lista ordenada."""
+    if not valores:
+        return 0.0
+    i = min(len(valores) - 1, max(0, math.ceil(q * len(valores)) - 1))
+    return valores[i]
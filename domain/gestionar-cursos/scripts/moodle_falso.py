@@ -0,0 +1,295 @@
+"""
+Moodle local de mentira para benchmarks y pruebas sin red.
+
+generar_curso() arma un curso sintético con el mismo HTML que esperan los
+extractores (mismo estilo que las páginas fake de tests/): área personal,
+página del curso con sección de inicio y N unidades, páginas, tareas,
+cuestionarios, recursos con binario en pluginfile.php, foros paginados
+con sus discusiones y el gradebook del usuario.
+
+ServidorMoodle sirve esas páginas desde un ThreadingHTTPServer en
+127.0.0.1 con latencia configurable y cuenta requests y bytes por tipo.
+montar_en_sesion() monta un adaptador en la requests.Session que desvía
+las URLs de BASE_URL al servidor local: el pipeline corre con las URLs
+reales (las regex de `aulavirtual` siguen funcionando), por HTTP de
+verdad, sin tocar el código de extracción.
+
+Uso:
+    with ServidorMoodle(generar_curso(unidades=4), latencia=0.05) as servidor:
+        session = requests.Session()
+        servidor.montar_en_sesion(session)
+        ...
+        servidor.stats()  # {"requests": ..., "por_tipo": {...}, "bytes": ...}
+"""
+
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from requests.adapters import HTTPAdapter
+
+BASE_URL = "https://aulavirtual.uniremington.edu.co"
+COURSE_ID = 4242
+PROFESOR = "Ana María Rojas"
+CODIGO = "2607B04G1"
+NOMBRE_CURSO = "Arquitectura de Software"
+_HTML = "text/html; charset=utf-8"
+# Parámetros que no cambian la respuesta del stand-in: el listado de foros
+# ya viene por creación descendente, la sección muestra el curso completo.
+_PARAMS_IGNORADOS = {"o", "forcedownload", "section"}
+
+
+def clave_ruta(ruta: str) -> str:
+    """Ruta con query normalizada (orden fijo, sin _PARAMS_IGNORADOS)."""
+    partes = urlsplit(ruta.replace("&amp;", "&"))
+    params = sorted((k, v) for k, v in parse_qsl(partes.query) if k not in _PARAMS_IGNORADOS)
+    return partes.path + (f"?{urlencode(params)}" if params else "")
+
+
+def _pagina(titulo: str, cuerpo: str) -> str:
+    return (f"<!DOCTYPE html><html><head><title>{titulo}</title></head><body>"
+            f'<div class="page-header-headings"><h1>{titulo}</h1></div>'
+            f'<div id="region-main">{cuerpo}</div></body></html>')
+
+
+def _actividad_sidebar(mod: str, cmid: int, nombre: str) -> str:
+    return (f'<li class="activity {mod} modtype_{mod}" id="module-{cmid}">'
+            f'<a href="{BASE_URL}/mod/{mod}/view.php?id={cmid}">'
+            f'<span class="instancename">{nombre}</span></a></li>')
+
+
+def _seccion(num: int, nombre: str, actividades: list[str]) -> str:
+    return (f'<li class="section main" id="section-{num}" data-sectionid="{num}">'
+            f'<h3 class="sectionname">{nombre}</h3><ul class="section">'
+            f'{"".join(actividades)}</ul></li>')
+
+
+def _listado_foro(cmid: int, hilos: list[tuple[int, str, str]], pagina: int,
+                  total_paginas: int) -> str:
+    filas = "".join(
+        f'<tr class="discussion"><td class="topic">'
+        f'<a href="{BASE_URL}/mod/forum/discuss.php?d={d}">{titulo}</a></td>'
+        f'<td class="author">{autor} <time datetime="2026-03-01">1 mar 2026</time></td>'
+        f'<td class="lastpost">{autor} <time datetime="2026-03-02">2 mar 2026</time></td>'
+        f'<td class="replies">{d % 7}</td></tr>'
+        for d, titulo, autor in hilos
+    )
+    paginas = "".join(
+        f'<li><a href="{BASE_URL}/mod/forum/view.php?id={cmid}&amp;p={n}">{n + 1}</a></li>'
+        for n in range(total_paginas) if n != pagina
+    )
+    return (f'<table class="forumheaderlist">{filas}</table>'
+            f'<nav class="pagination"><ul>{paginas}</ul></nav>')
+
+
+def generar_curso(*, unidades: int = 4, actividades_por_unidad: int = 5,
+                  hilos_por_foro: int = 30, hilos_por_pagina: int = 10,
+                  kb_por_binario: int = 256, course_id: int = COURSE_ID) -> dict[str, tuple]:
+    """Páginas de un curso sintético.
+
+    Cada unidad rota entre page, assign, resource, quiz y un foro
+    evaluable (con `(10%)` en el título); la sección de inicio tiene la
+    página del profesor, un foro de avisos y un documento introductorio.
+
+    Returns:
+        {clave_ruta(): (content_type, cuerpo bytes)}
+    """
+    paginas: dict[str, tuple[str, bytes]] = {}
+
+    def html(ruta: str, titulo: str, cuerpo: str):
+        paginas[clave_ruta(ruta)] = (_HTML, _pagina(titulo, cuerpo).encode("utf-8"))
+
+    def binario(ruta: str, semilla: int):
+        bloque = f"Material {semilla} — {NOMBRE_CURSO}\n".encode()
+        datos = bloque * (kb_por_binario * 1024 // len(bloque) + 1)
+        paginas[clave_ruta(ruta)] = ("text/plain", datos[:kb_por_binario * 1024])
+
+    siguiente = iter(range(course_id * 100, course_id * 100 + 100_000))
+    hilo_ids = iter(range(1, 1_000_000))
+
+    def foro(cmid: int, titulo: str, autores: list[str], intro: str = ""):
+        hilos = [(d, f"Tema {d}", autores[d % len(autores)])
+                 for d in sorted((next(hilo_ids) for _ in range(hilos_por_foro)), reverse=True)]
+        bloques = [hilos[i:i + hilos_por_pagina]
+                   for i in range(0, len(hilos), hilos_por_pagina)] or [[]]
+        fechas = ('<div data-region="activity-dates"><strong>Vencimiento:</strong> '
+                  'domingo, 15 de marzo de 2026, 23:59</div>')
+        for n, bloque in enumerate(bloques):
+            cuerpo = fechas + intro + _listado_foro(cmid, bloque, n, len(bloques))
+            ruta = f"/mod/forum/view.php?id={cmid}"
+            html(ruta if n == 0 else f"{ruta}&p={n}", titulo, cuerpo)
+        for d, tema, autor in hilos:
+            html(f"/mod/forum/discuss.php?d={d}", tema,
+                 f'<article class="forum-post-container firstpost"><div class="post-message">'
+                 f'<p>{tema} abierto por {autor}.</p><p>Texto del primer mensaje.</p></div>'
+                 f'</article><div class="forumpost">réplica</div>')
+
+    # Inicio
+    intro = []
+    cmid = next(siguiente)
+    intro.append(_actividad_sidebar("page", cmid, "Conoce tu profesor"))
+    html(f"/mod/page/view.php?id={cmid}", "Conoce tu profesor",
+         f"<table><tr><td>Nombre completo</td><td>{PROFESOR}</td></tr></table>")
+    cmid = next(siguiente)
+    intro.append(_actividad_sidebar("forum", cmid, "Avisos"))
+    foro(cmid, "Avisos", [PROFESOR, "Estudiante 1"])
+    cmid = next(siguiente)
+    intro.append(_actividad_sidebar("resource", cmid, "Guía del curso"))
+    html(f"/mod/resource/view.php?id={cmid}", "Guía del curso",
+         f'<div class="resourceworkaround"><a href="{BASE_URL}/pluginfile.php/{cmid}/'
+         f'mod_resource/content/1/guia.txt">guia.txt</a></div>')
+    binario(f"/pluginfile.php/{cmid}/mod_resource/content/1/guia.txt", cmid)
+    secciones = [_seccion(0, "Inicio", intro)]
+
+    # Unidades
+    filas_notas = []
+    tipos = ("page", "assign", "resource", "quiz", "forum")
+    for u in range(1, unidades + 1):
+        acts = []
+        for a in range(actividades_por_unidad):
+            cmid = next(siguiente)
+            tipo = tipos[a % len(tipos)]
+            nombre = f"U{u} {tipo.capitalize()} {a + 1}"
+            ruta = f"/mod/{tipo}/view.php?id={cmid}"
+            fechas = (f'<div data-region="activity-dates"><div><strong>Apertura:</strong> '
+                      f'lunes, {u} de marzo de 2026, 00:00</div><div><strong>Cierre:</strong> '
+                      f'domingo, {u + 7} de marzo de 2026, 23:59</div></div>')
+            if tipo == "page":
+                html(ruta, nombre, f"<p>Lectura de la unidad {u}.</p>" * 40)
+            elif tipo == "assign":
+                html(ruta, nombre, fechas + f'<div class="activity-description"><p>'
+                     f'Entregar el informe {a + 1}.</p></div><table class="assigninfo">'
+                     f'<tr><th>Nota para aprobar</th><td>3,0</td></tr></table>')
+            elif tipo == "resource":
+                archivo = f"/pluginfile.php/{cmid}/mod_resource/content/1/material-{cmid}.txt"
+                html(ruta, nombre, f'<div class="resourceworkaround">'
+                     f'<a href="{BASE_URL}{archivo}">material-{cmid}.txt</a></div>')
+                binario(archivo, cmid)
+            elif tipo == "quiz":
+                html(ruta, nombre, fechas + "<p>Cuestionario de la unidad.</p>"
+                     "<table><tr><th>Intentos permitidos</th><td>2</td></tr></table>")
+            else:
+                nombre = f"Foro {u}.{a + 1} debate de la unidad (10%)"
+                foro(cmid, nombre, [f"Estudiante {i}" for i in range(1, 6)],
+                     intro="<div><p>Para participar siga las instrucciones.</p></div>"
+                           "<div><p>Pregunta orientadora: ¿por qué?</p></div>")
+            acts.append(_actividad_sidebar(tipo, cmid, nombre))
+            if tipo in ("assign", "quiz", "forum"):
+                filas_notas.append(
+                    f'<tr><th class="level2 item b1b column-itemname">'
+                    f'<a class="gradeitemheader" href="{BASE_URL}{ruta}">{nombre}</a></th>'
+                    f'<td class="column-weight">5,00 %</td><td class="column-grade">'
+                    f'<div class="d-flex">4,00<i class="fa fa-check text-success"></i></div></td>'
+                    f'<td class="column-range">0&ndash;5</td>'
+                    f'<td class="column-percentage">80,00 %</td>'
+                    f'<td class="column-contributiontocoursetotal">4,00 %</td>'
+                    f'<td class="column-feedback"></td></tr>')
+        secciones.append(_seccion(u, f"Unidad {u}", acts))
+
+    html("/my/", "Área personal", f"<p>Área personal de {PROFESOR}</p>")
+    html(f"/course/view.php?id={course_id}", f"{NOMBRE_CURSO} - {CODIGO}",
+         f'<div id="course-summary"><p>Curso {CODIGO} de {NOMBRE_CURSO}: diseño, '
+         f'patrones y atributos de calidad en sistemas distribuidos.</p></div>'
+         f'<ul class="topics">{"".join(secciones)}</ul>')
+    html(f"/grade/report/user/index.php?id={course_id}", "Calificaciones",
+         f'<table class="user-grade">{"".join(filas_notas)}</table>')
+    return paginas
+
+
+def _tipo_request(ruta: str) -> str:
+    if ruta.startswith("/pluginfile.php"):
+        return "binario"
+    if ruta.startswith("/mod/forum/discuss.php"):
+        return "discusion"
+    if ruta.startswith("/mod/"):
+        return ruta.split("/")[2]
+    return ruta.strip("/").split("/")[0].split(".")[0] or "raiz"
+
+
+class ServidorMoodle:
+    """Servidor HTTP local que sirve las páginas de generar_curso()."""
+
+    def __init__(self, paginas: dict[str, tuple], *, latencia: float = 0.0):
+        self.paginas = paginas
+        self.latencia = latencia
+        self._lock = threading.Lock()
+        self._conteo: Counter = Counter()
+        self._bytes = 0
+        self._no_encontradas: Counter = Counter()
+        self._httpd: ThreadingHTTPServer | None = None
+        self._hilo: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, puerto = self._httpd.server_address[:2]
+        return f"http://{host}:{puerto}"
+
+    def __enter__(self):
+        servidor = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, como Moodle
+
+            def do_GET(self):  # noqa: N802
+                servidor._responder(self)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._httpd.daemon_threads = True
+        self._hilo = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._hilo.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _responder(self, handler: BaseHTTPRequestHandler):
+        if self.latencia:
+            time.sleep(self.latencia)
+        ruta = clave_ruta(handler.path)
+        encontrada = self.paginas.get(ruta)
+        if encontrada is None:
+            with self._lock:
+                self._no_encontradas[ruta] += 1
+            content_type, cuerpo, status = _HTML, b"<html>No encontrada</html>", 404
+        else:
+            (content_type, cuerpo), status = encontrada, 200
+        with self._lock:
+            self._conteo[_tipo_request(urlsplit(ruta).path)] += 1
+            self._bytes += len(cuerpo)
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(cuerpo)))
+        handler.end_headers()
+        handler.wfile.write(cuerpo)
+
+    def stats(self) -> dict:
+        """{"requests", "por_tipo": {tipo: n}, "bytes", "no_encontradas": {ruta: n}}."""
+        with self._lock:
+            return {"requests": sum(self._conteo.values()), "por_tipo": dict(self._conteo),
+                    "bytes": self._bytes, "no_encontradas": dict(self._no_encontradas)}
+
+    def montar_en_sesion(self, session, base_url: str = BASE_URL) -> None:
+        """Desvía las requests de session a base_url hacia este servidor."""
+        session.mount(base_url, _AdaptadorLocal(base_url, self.url))
+
+
+class _AdaptadorLocal(HTTPAdapter):
+    """Reescribe base_url → servidor local y devuelve la respuesta con la URL original."""
+
+    def __init__(self, base_url: str, url_local: str):
+        super().__init__(pool_maxsize=64)
+        self.base_url = base_url.rstrip("/")
+        self.url_local = url_local
+
+    def send(self, request, **kwargs):
+        original = request.url
+        request.url = self.url_local + original[len(self.base_url):]
+        resp = super().send(request, **kwargs)
+        request.url = resp.url = original
+        return resp
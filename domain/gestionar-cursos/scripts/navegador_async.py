@@ -0,0 +1,260 @@
+"""
+Navegador HTTP asíncrono (httpx + asyncio) para crawls grandes.
+
+Tercer backend de browser_api, junto a CDP/Selenium y requests. Usa un
+`httpx.AsyncClient` con pool keep-alive, HTTP/2 cuando el paquete `h2`
+está instalado (Moodle lo negocia vía ALPN) y un semáforo que acota los
+requests en vuelo, así un curso grande se recorre con cientos de
+requests simultáneos sin un hilo por request.
+
+El cliente vive en un event loop propio en un hilo de fondo:
+- API async: `await obtener_pagina_async(url)`, `await hacer_get_async(url)`.
+- API por lotes desde código síncrono: `obtener_paginas(urls)`.
+- Superficie síncrona compatible con navegador_requests (`navegar`,
+  `obtener_contenido`, `extraer_sidebar`, ...) para browser_api. La
+  página actual es estado por hilo.
+
+Los extractores reciben el HTML como argumento (`extraer_sidebar(html)`,
+`extraer_instrucciones(html)`, `extraer_filas_tabla(html, header)`):
+son los parsers BS4 de navegador_requests, sin estado de navegación.
+
+Requiere: pip install "httpx[http2]"
+
+Uso:
+    from navegador_async import configurar, obtener_paginas, extraer_sidebar
+
+    configurar(session_requests, max_en_vuelo=200)
+    for url_final, html in obtener_paginas(urls):
+        items = extraer_sidebar(html)
+"""
+
+import asyncio
+import importlib.util
+import threading
+
+import navegador_requests as _parsers
+import requests
+
+DEFAULT_MAX_EN_VUELO = 64
+TIMEOUT = 60.0
+USER_AGENT = "Mozilla/5.0"
+
+_cliente = None  # httpx.AsyncClient
+_semaforo: asyncio.Semaphore | None = None
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_thread: threading.Thread | None = None
+_lock = threading.Lock()
+_estado = threading.local()
+_config = {"max_en_vuelo": DEFAULT_MAX_EN_VUELO, "http2": False}
+
+
+def disponible() -> bool:
+    """True si httpx está instalado."""
+    return importlib.util.find_spec("httpx") is not None
+
+
+def configurar(session: requests.Session, max_en_vuelo: int = DEFAULT_MAX_EN_VUELO):
+    """Crea el cliente async con las cookies de la sesión requests de Moodle.
+
+    Raises:
+        RuntimeError: si httpx no está instalado.
+    """
+    global _cliente, _semaforo
+    if not disponible():
+        raise RuntimeError(
+            "Backend async requiere httpx. Instala:\n  pip install \"httpx[http2]\""
+        )
+    cerrar()
+    _config["max_en_vuelo"] = max(1, int(max_en_vuelo))
+    _config["http2"] = importlib.util.find_spec("h2") is not None
+    if not _config["http2"]:
+        print("[WARN] Paquete h2 no instalado: backend async usará HTTP/1.1")
+
+    loop = _obtener_loop()
+
+    async def _crear():
+        import httpx
+
+        cookies = httpx.Cookies()
+        for c in session.cookies:
+            cookies.set(c.name, c.value, domain=c.domain or "", path=c.path or "/")
+        n = _config["max_en_vuelo"]
+        cliente = httpx.AsyncClient(
+            http2=_config["http2"],
+            limits=httpx.Limits(max_connections=n, max_keepalive_connections=n),
+            timeout=TIMEOUT,
+            cookies=cookies,
+            headers={"User-Agent": USER_AGENT},
+            follow_redirects=True,
+            verify=False,
+        )
+        return cliente, asyncio.Semaphore(n)
+
+    _cliente, _semaforo = asyncio.run_coroutine_threadsafe(_crear(), loop).result()
+
+
+def cerrar():
+    """Cierra el cliente async (si existe)."""
+    global _cliente, _semaforo
+    if _cliente is None or _loop is None:
+        return
+    cliente, _cliente, _semaforo = _cliente, None, None
+    asyncio.run_coroutine_threadsafe(cliente.aclose(), _loop).result()
+
+
+def _obtener_loop() -> asyncio.AbstractEventLoop:
+    """Event loop dedicado en un hilo daemon (uno por proceso)."""
+    global _loop, _loop_thread
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(
+                target=_loop.run_forever, name="navegador-async", daemon=True,
+            )
+            _loop_thread.start()
+        return _loop
+
+
+def _check_cliente():
+    if _cliente is None:
+        raise RuntimeError("Cliente async no configurado. Llama configurar() primero.")
+
+
+def _correr(coro):
+    """Ejecuta una corrutina en el loop de fondo y espera su resultado."""
+    return asyncio.run_coroutine_threadsafe(coro, _obtener_loop()).result()
+
+
+# ---------------------------------------------------------------------------
+# API async
+# ---------------------------------------------------------------------------
+
+async def obtener_pagina_async(url: str) -> tuple[str, str]:
+    """Descarga una página. Returns: (url final, HTML)."""
+    _check_cliente()
+    async with _semaforo:
+        resp = await _cliente.get(url)
+    resp.raise_for_status()
+    return str(resp.url), resp.text
+
+
+async def hacer_get_async(url: str, headers: dict | None = None) -> bytes:
+    """Descarga binaria (pluginfile.php, etc.)."""
+    _check_cliente()
+    async with _semaforo:
+        resp = await _cliente.get(url, headers=headers)
+    resp.raise_for_status()
+    return resp.content
+
+
+async def obtener_paginas_async(urls: list[str]) -> list[tuple[str, str] | Exception]:
+    """Descarga todas las URLs concurrentemente (acotado por el semáforo).
+
+    Returns:
+        Un elemento por URL, en el mismo orden: (url final, HTML) o la
+        excepción de esa descarga.
+    """
+    return await asyncio.gather(
+        *(obtener_pagina_async(u) for u in urls), return_exceptions=True,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Puente síncrono
+# ---------------------------------------------------------------------------
+
+def obtener_paginas(urls: list[str]) -> list[tuple[str, str] | Exception]:
+    """Versión síncrona de obtener_paginas_async (para cli_init)."""
+    return _correr(obtener_paginas_async(urls))
+
+
+def obtener_pagina(url: str) -> tuple[str, str]:
+    return _correr(obtener_pagina_async(url))
+
+
+def navegar(url: str):
+    """Navega a URL; guarda la página como actual del hilo llamador."""
+    _estado.url, _estado.contenido = obtener_pagina(url)
+
+
+def obtener_url_actual() -> str:
+    return getattr(_estado, "url", "")
+
+
+def obtener_contenido() -> str:
+    return getattr(_estado, "contenido", "")
+
+
+def obtener_cookies() -> str:
+    _check_cliente()
+    return "; ".join(f"{c.name}={c.value}" for c in _cliente.cookies.jar)
+
+
+def hacer_get(url: str, headers: dict | None = None) -> bytes:
+    return _correr(hacer_get_async(url, headers))
+
+
+def en_vuelo_maximo() -> int:
+    return _config["max_en_vuelo"]
+
+
+def usa_http2() -> bool:
+    return _config["http2"]
+
+
+# ---------------------------------------------------------------------------
+# Extractores (HTML como argumento; por defecto la página actual del hilo)
+# ---------------------------------------------------------------------------
+
+def _html(html: str | None) -> str:
+    return obtener_contenido() if html is None else html
+
+
+def click(selector):
+    """No-op: no hay navegador."""
+    pass
+
+
+def esperar_carga(timeout: int = 15):
+    """No-op: no hay carga asíncrona del lado del cliente."""
+    pass
+
+
+def encontrar_menus_cerrados(html: str | None = None) -> list:
+    return _parsers.encontrar_menus_cerrados(_html(html))
+
+
+def extraer_sidebar(html: str | None = None) -> list[dict]:
+    return _parsers.extraer_sidebar(_html(html))
+
+
+def abrir_popup_grid_y_obtener_html(nombre_seccion: str, html: str | None = None) -> str:
+    return _parsers.abrir_popup_grid_y_obtener_html(nombre_seccion, _html(html))
+
+
+def extraer_texto_descripcion(html: str | None = None) -> str:
+    return _parsers.extraer_texto_descripcion(_html(html))
+
+
+def extraer_instrucciones(html: str | None = None) -> str:
+    return _parsers.extraer_instrucciones(_html(html))
+
+
+def extraer_links_materiales(html: str | None = None) -> list[str]:
+    return _parsers.extraer_links_materiales(_html(html))
+
+
+def extraer_criterios(html: str | None = None) -> str:
+    return _parsers.extraer_criterios(_html(html))
+
+
+def extraer_nombre_unidad(html: str | None = None) -> str:
+    return _parsers.extraer_nombre_unidad(_html(html))
+
+
+def extraer_filas_tabla(html_content: str, header_text: str) -> list[dict]:
+    return _parsers.extraer_filas_tabla(html_content, header_text)
+
+
+def get_driver():
+    raise RuntimeError("get_driver no disponible en modo async")
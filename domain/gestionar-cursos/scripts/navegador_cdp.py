@@ -8,6 +8,13 @@ Estrategia:
 
 Ventaja: el usuario puede tener sesión activa en Chrome.
 El script se conecta a esa instancia y navega automáticamente.
+
+Modo rápido (configurar_modo_rapido): bloquea imágenes, fuentes, hojas de
+estilo y media con Network.setBlockedURLs, navega con pageLoadStrategy
+"eager" (DOMContentLoaded) y espera a que Moodle termine su JS
+(M.util.pending_js) o a un selector en vez de sleeps fijos. Con
+obtener_paginas() carga varias URLs en pestañas simultáneas. Cada carga
+queda registrada (resumen_cargas) para comparar contra el modo normal.
 """
 
 import atexit
@@ -20,7 +27,11 @@ import time
 
 from rich.console import Console
 from selenium import webdriver
-from selenium.common.exceptions import NoSuchElementException, WebDriverException
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    TimeoutException,
+    WebDriverException,
+)
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as ec
@@ -40,6 +51,67 @@ _driver = None
 _cdp_launched_by_us = False
 _profile_dir = None  # Se configura antes de _launch_chrome_cdp()
 
+# Recursos que el scraping no necesita: Moodle sirve íconos, fuentes y CSS del
+# tema por theme/image.php, theme/font.php y theme/styles.php
+PATRONES_BLOQUEADOS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.webp", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot", "*.css",
+    "*.mp4", "*.webm", "*.mp3", "*.ogg",
+    "*/theme/image.php/*", "*/theme/font.php/*", "*/theme/styles.php/*",
+    "*/theme/yui_combo.php?*.css*",
+    "*google-analytics.com*", "*googletagmanager.com*",
+]
+DEFAULT_PESTANAS = 4
+SELECTOR_CONTENIDO = "#region-main, #page-content, #page-login-index"
+
+_modo_rapido = False
+_patrones_bloqueados: list[str] = []
+_pestanas = 1
+_cargas: list[dict] = []  # {"url", "segundos", "dcl"} por página cargada
+
+# Moodle registra cada JS pendiente (AJAX, animaciones de secciones) en
+# M.util.pending_js; es la misma señal que usa Behat para esperar
+_JS_INACTIVO = (
+    "return document.readyState !== 'loading'"
+    " && !(window.M && M.util && M.util.pending_js && M.util.pending_js.length)"
+    " && !(window.jQuery && jQuery.active);"
+)
+
+
+def configurar_modo_rapido(activo: bool = True, *, bloquear: list[str] | None = None,
+                           pestanas: int = DEFAULT_PESTANAS):
+    """Activa el modo rápido. Llamar antes de la primera navegación: la
+    estrategia "eager" se fija al conectar el driver.
+
+    Args:
+        bloquear: patrones para Network.setBlockedURLs (default PATRONES_BLOQUEADOS).
+        pestanas: pestañas simultáneas de obtener_paginas().
+    """
+    global _modo_rapido, _patrones_bloqueados, _pestanas
+    _modo_rapido = activo
+    _patrones_bloqueados = list(PATRONES_BLOQUEADOS if bloquear is None else bloquear)
+    _pestanas = max(1, pestanas) if activo else 1
+    if _driver is not None:
+        bloquear_recursos(_driver)
+
+
+def modo_rapido_activo() -> bool:
+    return _modo_rapido
+
+
+def bloquear_recursos(driver):
+    """Aplica los patrones bloqueados a la pestaña actual del driver.
+
+    El bloqueo de CDP es por target: cada pestaña nueva necesita su llamada.
+    """
+    if not _modo_rapido:
+        return
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": _patrones_bloqueados})
+    except WebDriverException as e:
+        console.print(f"[yellow][WARN][/yellow] CDP: no se pudo bloquear recursos: {e}")
+
 
 def set_profile_dir(path: str):
     """Establece directorio persistente para perfil de Chrome (cookies, sesiones)."""
@@ -101,7 +173,6 @@ def _launch_chrome_cdp() -> str:
     console.print(f"[dim][CDP] Perfil persistente:[/dim] {user_data_dir}")
     subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
     _cdp_launched_by_us = True
-    time.sleep(3)  # Esperar arranque
     return chrome_path
 
 
@@ -124,23 +195,26 @@ def _conectar_driver():
 
     if not _is_port_open("localhost", CDP_PORT):
         _launch_chrome_cdp()
-        # Esperar a que el puerto esté disponible
-        for _ in range(10):
+        # Esperar a que el puerto esté disponible (hasta 10s)
+        for _ in range(50):
             if _is_port_open("localhost", CDP_PORT):
                 break
-            time.sleep(1)
+            time.sleep(0.2)
         else:
             raise RuntimeError("Chrome no abrió el puerto de debugging.")
 
     opts = Options()
     opts.add_experimental_option("debuggerAddress", "localhost:9222")
     opts.add_argument("--disable-blink-features=AutomationControlled")
+    if _modo_rapido:
+        opts.page_load_strategy = "eager"
 
     try:
         _driver = webdriver.Chrome(options=opts)
     except WebDriverException as e:
         raise RuntimeError(f"No se pudo conectar a Chrome CDP: {e}") from e
 
+    bloquear_recursos(_driver)
     atexit.register(_cerrar)
     return _driver
 
@@ -161,8 +235,52 @@ def get_driver():
 
 def navegar(url: str):
     driver = get_driver()
+    inicio = time.monotonic()
     driver.get(url)
     esperar_carga()
+    _registrar_carga(driver, url, time.monotonic() - inicio)
+
+
+def _registrar_carga(driver, url: str, segundos: float):
+    """Guarda y muestra el tiempo de carga (y el DOMContentLoaded que mide Chrome)."""
+    try:
+        dcl = driver.execute_script(
+            "const n = performance.getEntriesByType('navigation')[0];"
+            " return n ? n.domContentLoadedEventEnd / 1000 : null;"
+        )
+    except WebDriverException:
+        dcl = None
+    _cargas.append({"url": url, "segundos": segundos, "dcl": dcl})
+    detalle = f" (DOMContentLoaded {dcl:.2f}s)" if dcl else ""
+    console.print(f"[dim][CDP] {segundos:.2f}s{detalle} {url}[/dim]")
+
+
+def stats_cargas() -> dict:
+    """Páginas cargadas y tiempos (segundos) desde el inicio del proceso."""
+    if not _cargas:
+        return {}
+    tiempos = sorted(c["segundos"] for c in _cargas)
+    dcls = [c["dcl"] for c in _cargas if c["dcl"]]
+    return {
+        "paginas": len(tiempos),
+        "total": sum(tiempos),
+        "media": sum(tiempos) / len(tiempos),
+        "p50": tiempos[len(tiempos) // 2],
+        "max": tiempos[-1],
+        "dcl_media": sum(dcls) / len(dcls) if dcls else None,
+        "modo_rapido": _modo_rapido,
+    }
+
+
+def resumen_cargas() -> str:
+    """Línea de resumen para la consola ("" si no se cargó ninguna página)."""
+    st = stats_cargas()
+    if not st:
+        return ""
+    dcl = f", DOMContentLoaded medio {st['dcl_media']:.2f}s" if st["dcl_media"] else ""
+    modo = "rápido" if st["modo_rapido"] else "normal"
+    return (f"CDP ({modo}): {st['paginas']} páginas, media {st['media']:.2f}s, "
+            f"p50 {st['p50']:.2f}s, máx {st['max']:.2f}s{dcl}")
 
 
 def obtener_url_actual() -> str:
@@ -184,13 +302,86 @@ def click(selector):
         except NoSuchElementException:
             el = driver.find_element(By.XPATH, selector)
         el.click()
-    time.sleep(0.5)
+    if _modo_rapido:
+        esperar_js_moodle()
+    else:
+        time.sleep(0.5)
 
 
-def esperar_carga(timeout: int = 15):
+def esperar_carga(timeout: int = 15, selector: str = ""):
+    """Espera el documento listo: "complete" en modo normal; en modo rápido
+    basta DOMContentLoaded ("interactive"), ya que no se esperan imágenes ni CSS."""
+    listos = ("interactive", "complete") if _modo_rapido else ("complete",)
     WebDriverWait(get_driver(), timeout).until(
-        lambda d: d.execute_script("return document.readyState") == "complete"
+        lambda d: d.execute_script("return document.readyState") in listos
     )
+    if selector:
+        esperar_selector(selector, timeout)
+
+
+def esperar_js_moodle(timeout: float = 5):
+    """Espera a que Moodle no tenga JS/AJAX pendiente (sin fallar si no ocurre)."""
+    with contextlib.suppress(TimeoutException):
+        WebDriverWait(get_driver(), timeout, poll_frequency=0.1).until(
+            lambda d: d.execute_script(_JS_INACTIVO)
+        )
+
+
+def esperar_pagina(driver=None, selector: str = SELECTOR_CONTENIDO, timeout: int = 15):
+    """Espera el selector de contenido o una redirección a login, lo que ocurra
+    primero. Reemplaza los sleep() tras driver.get(); no falla si expira."""
+    driver = driver or get_driver()
+    with contextlib.suppress(TimeoutException):
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+            lambda d: "login/index.php" in d.current_url
+            or d.find_elements(By.CSS_SELECTOR, selector)
+        )
+
+
+def obtener_paginas(urls: list[str], pestanas: int | None = None,
+                    timeout: int = 20) -> dict:
+    """Carga varias URLs en pestañas simultáneas sin tocar la pestaña actual.
+
+    Abre hasta `pestanas` pestañas a la vez (default: las del modo rápido),
+    bloquea recursos en cada una y lanza la navegación sin esperar; después
+    recoge cada pestaña cuando su documento está listo y la cierra.
+
+    Returns:
+        {url: (url final, HTML)} o {url: Exception} si esa pestaña falló.
+    """
+    driver = get_driver()
+    original = driver.current_window_handle
+    n = max(1, pestanas or _pestanas)
+    listos = ("interactive", "complete") if _modo_rapido else ("complete",)
+    resultados: dict = {}
+    try:
+        for i in range(0, len(urls), n):
+            abiertas = []
+            for url in urls[i:i + n]:
+                driver.switch_to.new_window("tab")
+                bloquear_recursos(driver)
+                driver.execute_script("window.location.href = arguments[0];", url)
+                abiertas.append((url, driver.current_window_handle, time.monotonic()))
+            for url, handle, inicio in abiertas:
+                driver.switch_to.window(handle)
+                try:
+                    WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+                        lambda d: d.execute_script(
+                            "return location.href !== 'about:blank' && document.readyState;"
+                        ) in listos
+                    )
+                    _registrar_carga(driver, url, time.monotonic() - inicio)
+                    resultados[url] = (driver.current_url, driver.page_source)
+                except WebDriverException as e:
+                    resultados[url] = e
+                finally:
+                    with contextlib.suppress(WebDriverException):
+                        driver.close()
+            # La pestaña actual quedó cerrada: new_window() desde ahí falla
+            driver.switch_to.window(original)
+    finally:
+        driver.switch_to.window(original)
+    return resultados
 
 
 def esperar_selector(selector: str, timeout: int = 10):
@@ -361,7 +552,15 @@ def abrir_popup_grid_y_obtener_html(nombre_seccion: str) -> str:
                 continue
             try:
                 click(f'#{sec_id}')
-                time.sleep(2)
+                if _modo_rapido:
+                    # el popup ya está en el DOM (oculto): esperar a que se vea
+                    popup = f'#{sec_id.replace("section-", "gridpopupsection-")}'
+                    with contextlib.suppress(TimeoutException):
+                        WebDriverWait(driver, 5, poll_frequency=0.1).until(
+                            ec.visibility_of_element_located((By.CSS_SELECTOR, popup))
+                        )
+                else:
+                    time.sleep(2)
                 return obtener_contenido()
             except Exception:
                 pass
@@ -458,6 +657,18 @@ def hacer_get(url: str, headers: dict | None = None) -> bytes:
     return resp.content
 
 
+def abrir_stream(url: str, headers: dict | None = None):
+    """GET en streaming con las cookies de Chrome (ver navegador_requests.abrir_stream)."""
+    import requests
+    import urllib3
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+    req_headers = {"User-Agent": "Mozilla/5.0"}
+    if headers:
+        req_headers.update(headers)
+    req_headers["Cookie"] = obtener_cookies()
+    return requests.get(url, headers=req_headers, verify=False, timeout=60, stream=True)
+
+
 def _normalizar_header(texto: str) -> str:
     """Normaliza texto de header para usar como clave de dict."""
     import unicodedata
@@ -3,22 +3,53 @@ Navegador via requests.Session + BeautifulSoup.
 Backend alternativo a navegador_cdp.py para extracción sin navegador real.
 
 La sesión (cookies, headers) se inyecta con set_session() antes de usar.
-Todas las funciones de extracción usan BS4 sobre response.text.
+Todas las funciones de extracción usan BS4 sobre response.text, parseado
+una sola vez por página (pagina_actual / pagina_moodle.PaginaMoodle).
+
+La "página actual" (última URL navegada y su HTML) es estado por hilo:
+varios workers pueden navegar en paralelo sobre la misma sesión sin
+pisarse el contenido. obtener_pagina() descarga sin tocar ese estado, y
+los extractores aceptan html= para parsear una página ya descargada
+(navegador_async reutiliza estas funciones como parsers puros).
+configurar_cortesia() limita requests simultáneos y ritmo por host.
+configurar_cache_http() activa la caché HTTP persistente (cache_http):
+requests condicionales con ETag/Last-Modified y cuerpo guardado ante 304.
+Los binarios grandes van por abrir_stream() (store_materiales), fuera de esa caché.
 """
 
+import contextlib
 import re
+import threading
 import time
 import unicodedata
+from pathlib import Path
+from urllib.parse import urlparse
 
 import requests
 import urllib3
 from bs4 import BeautifulSoup
+from cache_http import abrir_cache_http
+from pagina_moodle import PaginaMoodle
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 _session: requests.Session | None = None
-_ultimo_url: str = ""
-_ultimo_contenido: str = ""
+_estado = threading.local()
+
+# Cortesía por host: 0 = sin límite (comportamiento secuencial de siempre)
+_cortesia = {"max_por_host": 0, "intervalo": 0.0}
+_hosts: dict[str, dict] = {}
+_hosts_lock = threading.Lock()
+
+# Caché HTTP: las páginas se revalidan siempre (TTL 0); los binarios de
+# pluginfile.php cambian poco y se sirven sin preguntar durante su TTL.
+CACHE_HTTP_DIRNAME = ".http_cache"
+TTL_PAGINAS = 0.0
+TTL_PLUGINFILE = 7 * 24 * 3600.0
+_cache_http = {"store": None, "ttl_paginas": TTL_PAGINAS, "ttl_pluginfile": TTL_PLUGINFILE,
+               "inicial": {}}
 
 
 def set_session(session: requests.Session):
@@ -34,26 +65,193 @@ def _check_session():
         )
 
 
+def configurar_cortesia(max_por_host: int, intervalo: float = 0.0):
+    """Limita requests en vuelo por host y el intervalo mínimo entre inicios.
+
+    Ajusta también el pool de conexiones de la sesión para que los
+    workers reutilicen conexiones keep-alive en vez de abrir nuevas.
+    """
+    _cortesia["max_por_host"] = max(0, int(max_por_host))
+    _cortesia["intervalo"] = max(0.0, float(intervalo))
+    with _hosts_lock:
+        _hosts.clear()
+    if _session is not None and max_por_host > 1:
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(10, max_por_host))
+        _session.mount("https://", adapter)
+        _session.mount("http://", adapter)
+
+
+@contextlib.contextmanager
+def _turno_host(url: str):
+    """Espera cupo y ritmo del host de url según configurar_cortesia()."""
+    if not _cortesia["max_por_host"] and not _cortesia["intervalo"]:
+        yield
+        return
+    host = urlparse(url).netloc
+    with _hosts_lock:
+        h = _hosts.get(host)
+        if h is None:
+            limite = _cortesia["max_por_host"] or 1_000_000
+            h = {"sem": threading.BoundedSemaphore(limite),
+                 "lock": threading.Lock(), "proximo": 0.0}
+            _hosts[host] = h
+    with h["sem"]:
+        with h["lock"]:
+            ahora = time.monotonic()
+            inicio = max(ahora, h["proximo"])
+            h["proximo"] = inicio + _cortesia["intervalo"]
+        if inicio > ahora:
+            time.sleep(inicio - ahora)
+        yield
+
+
+def configurar_cache_http(directorio: str | None = "", *,
+                          ttl_paginas: float = TTL_PAGINAS,
+                          ttl_pluginfile: float = TTL_PLUGINFILE):
+    """Activa la caché HTTP persistente (directorio None la desactiva).
+
+    Args:
+        directorio: Carpeta del store; "" = `.http_cache/` en la raíz del skill.
+        ttl_paginas: Segundos que una página se sirve sin revalidar.
+        ttl_pluginfile: Lo mismo para binarios de pluginfile.php.
+    """
+    if directorio is None:
+        _cache_http["store"] = None
+        return
+    if not directorio:
+        directorio = str(Path(__file__).resolve().parent.parent / CACHE_HTTP_DIRNAME)
+    store = abrir_cache_http(directorio)
+    _cache_http.update(store=store, ttl_paginas=ttl_paginas, ttl_pluginfile=ttl_pluginfile,
+                       inicial=store.stats())
+
+
+def stats_cache_http() -> dict | None:
+    """Contadores de la caché HTTP en esta ejecución (None si está desactivada)."""
+    store = _cache_http["store"]
+    if store is None:
+        return None
+    stats = store.stats()
+    for nombre in ("frescas", "revalidadas", "descargadas", "bytes_ahorrados"):
+        stats[nombre] -= _cache_http["inicial"].get(nombre, 0)
+    return stats
+
+
+def resumen_cache_http() -> str:
+    """Línea de resumen para la consola ("" si la caché está desactivada)."""
+    stats = stats_cache_http()
+    if not stats:
+        return ""
+    return (f"Caché HTTP: {stats['frescas']} sin request, {stats['revalidadas']} con 304, "
+            f"{stats['descargadas']} descargas, "
+            f"{stats['bytes_ahorrados'] / 1024 / 1024:.1f} MB no transferidos")
+
+
+def _respuesta_cacheada(entrada: dict) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = 200
+    resp.url = entrada["url_final"]
+    resp._content = entrada["body"]
+    resp.encoding = entrada["encoding"] or None
+    resp.headers = CaseInsensitiveDict({"Content-Type": entrada["content_type"]})
+    resp.from_cache = True
+    return resp
+
+
+def _get(url: str, **kwargs) -> requests.Response:
+    _check_session()
+    store = _cache_http["store"]
+    headers = dict(kwargs.pop("headers", None) or {})
+    if store is None or "Range" in headers:
+        with _turno_host(url):
+            resp = _session.get(url, headers=headers or None, **kwargs)
+        resp.raise_for_status()
+        return resp
+
+    entrada = store.get(url)
+    es_binario = "pluginfile.php" in url
+    ttl = _cache_http["ttl_pluginfile"] if es_binario else _cache_http["ttl_paginas"]
+    if entrada and time.time() - entrada["validado"] < ttl:
+        store.contar("frescas")
+        store.contar("bytes_ahorrados", len(entrada["body"]))
+        return _respuesta_cacheada(entrada)
+    if entrada and entrada["etag"]:
+        headers["If-None-Match"] = entrada["etag"]
+    if entrada and entrada["last_modified"]:
+        headers["If-Modified-Since"] = entrada["last_modified"]
+
+    with _turno_host(url):
+        resp = _session.get(url, headers=headers, **kwargs)
+    if resp.status_code == 304 and entrada:
+        store.tocar(url)
+        store.contar("revalidadas")
+        store.contar("bytes_ahorrados", len(entrada["body"]))
+        return _respuesta_cacheada(entrada)
+    resp.raise_for_status()
+    store.contar("descargadas")
+
+    etag = resp.headers.get("ETag", "")
+    last_modified = resp.headers.get("Last-Modified", "")
+    guardable = (
+        resp.status_code == 200
+        and "login" not in resp.url.lower()
+        and "no-store" not in resp.headers.get("Cache-Control", "").lower()
+        and (etag or last_modified or es_binario)
+    )
+    if guardable:
+        store.put(url, url_final=resp.url, body=resp.content, etag=etag,
+                  last_modified=last_modified,
+                  content_type=resp.headers.get("Content-Type", ""),
+                  encoding=resp.encoding or "")
+    return resp
+
+
+def _contenido(html: str | None = None) -> str:
+    """HTML recibido o, si es None, el de la página actual del hilo."""
+    if html is not None:
+        return html
+    return getattr(_estado, "contenido", "")
+
+
+def pagina_actual(html: str | None = None) -> PaginaMoodle:
+    """Página parseada del HTML recibido o, si es None, de la página actual.
+
+    Se reutiliza mientras el HTML sea el mismo objeto: los extractores
+    llamados en serie sobre una página la parsean una sola vez.
+    """
+    contenido = _contenido(html)
+    pagina = getattr(_estado, "pagina", None)
+    if pagina is None or pagina.html is not contenido:
+        pagina = PaginaMoodle(contenido)
+        _estado.pagina = pagina
+    return pagina
+
+
 # ---------------------------------------------------------------------------
 # Navegación básica
 # ---------------------------------------------------------------------------
 
 def navegar(url: str):
-    """Navega a URL usando requests.Session. Guarda contenido internamente."""
-    global _ultimo_url, _ultimo_contenido
-    _check_session()
-    resp = _session.get(url, timeout=60)
-    resp.raise_for_status()
-    _ultimo_url = resp.url
-    _ultimo_contenido = resp.text
+    """Navega a URL usando requests.Session. Guarda contenido del hilo actual."""
+    _estado.url, _estado.contenido = obtener_pagina(url)
+    _estado.pagina = PaginaMoodle(_estado.contenido, _estado.url)
+
+
+def obtener_pagina(url: str) -> tuple[str, str]:
+    """Descarga una página sin modificar la página actual.
+
+    Returns:
+        (url final tras redirecciones, HTML)
+    """
+    resp = _get(url, timeout=60)
+    return resp.url, resp.text
 
 
 def obtener_url_actual() -> str:
-    return _ultimo_url
+    return getattr(_estado, "url", "")
 
 
 def obtener_contenido() -> str:
-    return _ultimo_contenido
+    return _contenido()
 
 
 def obtener_cookies() -> str:
@@ -62,13 +260,24 @@ def obtener_cookies() -> str:
 
 
 def hacer_get(url: str, headers: dict | None = None) -> bytes:
+    req_headers = {"User-Agent": "Mozilla/5.0"}
+    if headers:
+        req_headers.update(headers)
+    return _get(url, headers=req_headers, verify=False, timeout=60).content
+
+
+def abrir_stream(url: str, headers: dict | None = None) -> requests.Response:
+    """GET en streaming (sin caché HTTP) para descargas grandes.
+
+    No lanza por status: quien llama maneja 206/304/416 y debe cerrar la
+    respuesta (store_materiales la lee por bloques con iter_content).
+    """
     _check_session()
     req_headers = {"User-Agent": "Mozilla/5.0"}
     if headers:
         req_headers.update(headers)
-    resp = _session.get(url, headers=req_headers, verify=False, timeout=60)
-    resp.raise_for_status()
-    return resp.content
+    with _turno_host(url):
+        return _session.get(url, headers=req_headers, verify=False, timeout=60, stream=True)
 
 
 # ---------------------------------------------------------------------------
@@ -85,9 +294,9 @@ def esperar_carga(timeout: int = 15):
     pass
 
 
-def esperar_selector(selector: str, timeout: int = 10):
+def esperar_selector(selector: str, timeout: int = 10, html: str | None = None):
     """Verifica que el selector exista en el contenido actual."""
-    soup = BeautifulSoup(_ultimo_contenido, "lxml")
+    soup = pagina_actual(html).soup
     deadline = time.time() + timeout
     while time.time() < deadline:
         if soup.select_one(selector):
@@ -96,15 +305,15 @@ def esperar_selector(selector: str, timeout: int = 10):
     # No raise — el contenido puede no tener el selector en requests mode
 
 
-def encontrar_elementos(selector: str) -> list:
-    soup = BeautifulSoup(_ultimo_contenido, "lxml")
+def encontrar_elementos(selector: str, html: str | None = None) -> list:
+    soup = pagina_actual(html).soup
     return soup.select(selector)
 
 
-def encontrar_menus_cerrados() -> list:
+def encontrar_menus_cerrados(html: str | None = None) -> list:
     """Encuentra secciones colapsadas de Moodle (aria-expanded=false)."""
     try:
-        soup = BeautifulSoup(_ultimo_contenido, "lxml")
+        soup = pagina_actual(html).soup
         return soup.select('[aria-expanded="false"]')
     except Exception:
         return []
@@ -194,8 +403,8 @@ def _normalizar_header(texto: str) -> str:
 # Extracción de sidebar (idéntica a navegador_cdp.py, salvo page_source)
 # ---------------------------------------------------------------------------
 
-def extraer_sidebar() -> list[dict]:
-    soup = BeautifulSoup(_ultimo_contenido, "lxml")
+def extraer_sidebar(html: str | None = None) -> list[dict]:
+    soup = pagina_actual(html).soup
     items: list[dict] = []
 
     try:
@@ -277,9 +486,9 @@ def extraer_sidebar() -> list[dict]:
 # Grid popup (degradado — sin click real)
 # ---------------------------------------------------------------------------
 
-def abrir_popup_grid_y_obtener_html(nombre_seccion: str) -> str:
+def abrir_popup_grid_y_obtener_html(nombre_seccion: str, html: str | None = None) -> str:
     """Busca popup en HTML actual sin click. Fallback: contenido completo."""
-    soup = BeautifulSoup(_ultimo_contenido, "lxml")
+    soup = pagina_actual(html).soup
 
     for sec in soup.select(".grid-section"):
         titulo = sec.get("title", "") or sec.get_text(strip=True).split("\n")[0]
@@ -292,76 +501,34 @@ def abrir_popup_grid_y_obtener_html(nombre_seccion: str) -> str:
             if popup:
                 return str(popup)
 
-    return _ultimo_contenido
+    return _contenido(html)
 
 
 # ---------------------------------------------------------------------------
 # Extractores de contenido (BS4 en vez de Selenium)
 # ---------------------------------------------------------------------------
 
-def extraer_texto_descripcion() -> str:
-    soup = BeautifulSoup(_ultimo_contenido, "lxml")
-    for selector in [
-        ".activity-description",
-        "#intro",
-        ".content",
-        ".description",
-        ".summary",
-    ]:
-        el = soup.select_one(selector)
-        if el:
-            return el.get_text(strip=True)
-    return ""
+def extraer_texto_descripcion(html: str | None = None) -> str:
+    return pagina_actual(html).descripcion()
 
 
-def extraer_instrucciones() -> str:
-    soup = BeautifulSoup(_ultimo_contenido, "lxml")
-    for selector in [
-        ".submissioninstructions",
-        ".generalbox",
-        ".instrucciones",
-        ".box.generalbox",
-    ]:
-        el = soup.select_one(selector)
-        if el:
-            return el.get_text(strip=True)
-    return ""
+def extraer_instrucciones(html: str | None = None) -> str:
+    return pagina_actual(html).instrucciones()
 
 
-def extraer_links_materiales() -> list[str]:
-    soup = BeautifulSoup(_ultimo_contenido, "lxml")
-    links = []
+def extraer_links_materiales(html: str | None = None) -> list[str]:
     try:
-        for a in soup.select('a[href*="pluginfile.php"]'):
-            href = a.get("href")
-            if href:
-                links.append(href)
+        return pagina_actual(html).links_materiales()
     except Exception:
-        pass
-    return links
+        return []
 
 
-def extraer_criterios() -> str:
-    soup = BeautifulSoup(_ultimo_contenido, "lxml")
-    for selector in [
-        ".gradingform",
-        ".criteria",
-        ".criterios",
-        ".grade-criteria",
-    ]:
-        el = soup.select_one(selector)
-        if el:
-            return el.get_text(strip=True)
-    return ""
+def extraer_criterios(html: str | None = None) -> str:
+    return pagina_actual(html).criterios()
 
 
-def extraer_nombre_unidad() -> str:
-    soup = BeautifulSoup(_ultimo_contenido, "lxml")
-    for selector in ["h1", ".sectionname", ".course-section-name", ".page-header-headings h1"]:
-        el = soup.select_one(selector)
-        if el:
-            return el.get_text(strip=True)
-    return "Unidad"
+def extraer_nombre_unidad(html: str | None = None) -> str:
+    return pagina_actual(html).nombre_unidad()
 
 
 # ---------------------------------------------------------------------------
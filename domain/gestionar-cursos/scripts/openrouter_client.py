@@ -12,27 +12,59 @@ Uso:
     result = completar("document_formatter", texto_crudo,
                        instruccion="Limpia este documento.")
     result = completar("youtube_summarizer", subtitulos)
+
+    # Varios prompts en paralelo (resultados en el orden de entrada)
+    results = completar_batch("document_formatter", [texto_1, texto_2],
+                              max_concurrency=4)
+
+Cada request al API y cada acierto de caché queda en el ledger de
+telemetría (`llm_ledger.jsonl`, ver llm_ledger.py).
 """
 
+import contextlib
+import contextvars
 import hashlib
 import json
 import os
 import random
+import threading
 import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import requests
+from chunking import cargar_context_length, planear_chunks, presupuesto_tokens
+from llm_cache import abrir_cache, normalizar_contenido
+from llm_ledger import LEDGER_FILENAME, registrar
+from rate_limiter import obtener_limiter, segundos_hasta_reset
+from requests.adapters import HTTPAdapter
 
 _CONFIG: dict | None = None
 _CONFIG_PATH: str | None = None
-_CACHE_DIR: str = ""
+# Por contexto: cursos simultáneos en hilos (cli_init --parallel) tienen
+# cada uno su caché; los pools internos copian el contexto al encolar.
+_CACHE_DIR: contextvars.ContextVar[str] = contextvars.ContextVar("cache_dir_llm", default="")
 
 API_URL = "https://openrouter.ai/api/v1/chat/completions"
 AUTH_URL = "https://openrouter.ai/api/v1/auth/key"
 RETRY_ATTEMPTS = 3
 RETRY_BASE_DELAY = 1.0  # segundos: 1s, 2s, 4s
 RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+DEFAULT_MAX_CONCURRENCY = 4
+GLOBAL_CACHE_DIRNAME = ".llm_cache_global"
 _CREDITOS_VERIFICADOS: dict[str, float] = {}
+_SESSION: requests.Session | None = None
+_SESSION_LOCK = threading.Lock()
+
+
+def _find_catalog() -> str:
+    """Ruta del catálogo de modelos de analyze-model (relativa a openrouter.json)."""
+    config = _load_config()
+    catalog = config.get("model_catalog") or ""
+    if not catalog or not _CONFIG_PATH:
+        return ""
+    return str((Path(_CONFIG_PATH).parent / catalog).resolve())
 
 
 def _find_config() -> str:
@@ -82,10 +114,23 @@ def _resolve_fallback(profile: dict) -> str:
     return fallback
 
 
+def _get_session() -> requests.Session:
+    """Sesión HTTP compartida con pool keep-alive (segura entre hilos)."""
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _SESSION = session
+    return _SESSION
+
+
 def set_cache_dir(path: str):
-    """Establece directorio para caché de respuestas LLM."""
-    global _CACHE_DIR
-    _CACHE_DIR = path
+    """Establece directorio para caché de respuestas LLM (contexto actual)."""
+    _CACHE_DIR.set(path)
     os.makedirs(path, exist_ok=True)
 
 
@@ -95,24 +140,113 @@ def _cache_key(profile_name: str, system: str, user_msg: str) -> str:
     return hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
 
-def _cache_get(key: str) -> str | None:
-    """Lee resultado cacheado si existe."""
-    if not _CACHE_DIR:
+def _content_key(profile_name: str, system: str, user_msg: str) -> str:
+    """Clave del caché global: perfil + system prompt + texto normalizado."""
+    raw = f"{profile_name}|{system}|{normalizar_contenido(user_msg)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _get_ledger_path() -> str:
+    """Ruta del ledger de telemetría ('' si ledger.enabled es false)."""
+    ledger_cfg = _load_config().get("ledger", {})
+    if not ledger_cfg.get("enabled", True):
+        return ""
+    skill_dir = Path(__file__).resolve().parent.parent
+    return str(skill_dir / ledger_cfg.get("path", LEDGER_FILENAME))
+
+
+def _registrar_ledger(profile_name: str, modelo: str, **campos):
+    """Agrega un registro al ledger con el curso del caché activo."""
+    ruta = _get_ledger_path()
+    if ruta:
+        registrar(ruta, perfil=profile_name, modelo=modelo, curso=_curso_actual(), **campos)
+
+
+def _campos_usage(usage: dict | None) -> dict:
+    """Tokens (y costo, si OpenRouter lo informa) del bloque `usage`."""
+    if not usage:
+        return {}
+    campos = {
+        "input_tokens": usage.get("prompt_tokens", 0),
+        "output_tokens": usage.get("completion_tokens", 0),
+    }
+    if usage.get("cost") is not None:
+        campos["costo_usd"] = float(usage["cost"])
+    return campos
+
+
+def opciones_cache(global_: bool = False) -> dict:
+    """Límites de openrouter.json para abrir un store (curso o global)."""
+    cache_cfg = _load_config().get("cache", {})
+    max_mb = cache_cfg.get("global_max_mb", 1024) if global_ else cache_cfg.get("max_mb", 256)
+    return {
+        "max_bytes": int(max_mb) * 1024 * 1024,
+        "compress_min_bytes": int(cache_cfg.get("compress_min_bytes", 4096)),
+    }
+
+
+def dir_cache_global() -> str | None:
+    """Directorio del caché global (None si cache.global está desactivado)."""
+    cache_cfg = _load_config().get("cache", {})
+    if not cache_cfg.get("global"):
         return None
-    cache_path = os.path.join(_CACHE_DIR, f"{key}.json")
-    if os.path.isfile(cache_path):
-        with open(cache_path, encoding="utf-8") as f:
-            return json.load(f).get("result")
-    return None
+    skill_dir = Path(__file__).resolve().parent.parent
+    return str(skill_dir / cache_cfg.get("global_dir", GLOBAL_CACHE_DIRNAME))
 
 
-def _cache_put(key: str, result: str):
-    """Guarda resultado en caché."""
-    if not _CACHE_DIR:
-        return
-    cache_path = os.path.join(_CACHE_DIR, f"{key}.json")
-    with open(cache_path, "w", encoding="utf-8") as f:
-        json.dump({"result": result}, f, ensure_ascii=False)
+def _get_store():
+    """Store SQLite del directorio de caché activo (None si no hay caché)."""
+    cache_dir = _CACHE_DIR.get()
+    if not cache_dir:
+        return None
+    return abrir_cache(cache_dir, **opciones_cache())
+
+
+def _get_global_store():
+    """Store global entre cursos (None si cache.global está desactivado)."""
+    global_dir = dir_cache_global()
+    if global_dir is None:
+        return None
+    return abrir_cache(global_dir, **opciones_cache(global_=True))
+
+
+def _curso_actual() -> str:
+    """Nombre de la carpeta de curso dueña del caché activo (procedencia)."""
+    cache_dir = _CACHE_DIR.get()
+    if not cache_dir:
+        return ""
+    return os.path.basename(os.path.dirname(os.path.abspath(cache_dir)))
+
+
+def _cache_get(key: str, content_key: str = "") -> str | None:
+    """Lee resultado cacheado: primero el caché global, luego el del curso.
+
+    Un acierto solo en el caché del curso se copia al global para que
+    otros cursos lo reutilicen.
+    """
+    global_store = _get_global_store() if content_key else None
+    if global_store is not None:
+        cached = global_store.get(content_key, origen=_curso_actual())
+        if cached is not None:
+            return cached
+
+    store = _get_store()
+    if store is None:
+        return None
+    cached = store.get(key)
+    if cached is not None and global_store is not None:
+        global_store.put(content_key, cached, origen=_curso_actual())
+    return cached
+
+
+def _cache_put(key: str, result: str, content_key: str = ""):
+    """Guarda resultado en el caché del curso y, si aplica, en el global."""
+    store = _get_store()
+    if store is not None:
+        store.put(key, result)
+    global_store = _get_global_store() if content_key else None
+    if global_store is not None:
+        global_store.put(content_key, result, origen=_curso_actual())
 
 
 def get_profile(profile_name: str) -> dict:
@@ -153,6 +287,34 @@ def _verificar_creditos(api_key: str, threshold: float) -> bool:
         return True  # Si no se puede verificar, permitir intentar
 
 
+class StreamLLM:
+    """Iterador de deltas de completar(stream=True).
+
+    `ttft` queda en los segundos desde la llamada hasta el primer delta
+    (None mientras no llegue ninguno).
+    """
+
+    def __init__(self, deltas):
+        self._deltas = iter(deltas)
+        self._inicio = time.monotonic()
+        self.ttft: float | None = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        delta = next(self._deltas)
+        if self.ttft is None:
+            self.ttft = time.monotonic() - self._inicio
+        return delta
+
+    def close(self) -> None:
+        """Abandona el stream (cierra la respuesta HTTP si sigue abierta)."""
+        close = getattr(self._deltas, "close", None)
+        if close:
+            close()
+
+
 def completar(
     profile_name: str,
     user_message: str,
@@ -163,7 +325,8 @@ def completar(
     temperature: float | None = None,
     max_tokens: int | None = None,
     timeout: int | None = None,
-) -> str | None:
+    stream: bool = False,
+) -> str | StreamLLM | None:
     """Envía mensaje a OpenRouter usando un perfil predefinido.
 
     Args:
@@ -175,9 +338,134 @@ def completar(
         temperature: Anula temperatura.
         max_tokens: Anula max_tokens.
         timeout: Anula timeout.
+        stream: Si True, devuelve un StreamLLM con los deltas de texto (SSE)
+            y el tiempo al primer token. Un acierto de caché se entrega como
+            un único delta; si el API falla, el iterador termina sin producir
+            texto.
+
+    Returns:
+        Respuesta del LLM o None si falla (iterador si stream=True; vacío
+        si no hay API key, perfil o créditos).
+    """
+    llamada = _preparar_llamada(
+        profile_name, user_message,
+        instruccion=instruccion, modelo=modelo, system_prompt=system_prompt,
+        temperature=temperature, max_tokens=max_tokens, timeout=timeout,
+    )
+    if llamada is None:
+        return StreamLLM(()) if stream else None
+
+    # Caché: verificar antes de llamar al API
+    cached = _cache_get(llamada["cache_key"], llamada["content_key"])
+    if cached is not None:
+        _registrar_ledger(profile_name, llamada["model_primary"], cache_hit=True)
+    if stream:
+        return StreamLLM(_stream_llamada(llamada, cached))
+    if cached is not None:
+        return cached
+    return _ejecutar_llamada(llamada)
+
+
+def completar_batch(
+    profile_name: str,
+    messages: list[str],
+    *,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    instruccion: str = "",
+    modelo: str = "",
+    system_prompt: str = "",
+    temperature: float | None = None,
+    max_tokens: int | None = None,
+    timeout: int | None = None,
+) -> list[str | None]:
+    """Envía varios mensajes con el mismo perfil de forma concurrente.
+
+    Los aciertos de caché se resuelven en el hilo llamador sin ocupar un
+    worker; solo los fallos se despachan al pool (un worker por prompt,
+    hasta max_concurrency) sobre la sesión HTTP compartida. Mensajes
+    idénticos dentro del lote se envían una sola vez.
+
+    Args:
+        profile_name: Nombre del perfil en openrouter.json.
+        messages: Textos a procesar.
+        max_concurrency: Máximo de llamadas simultáneas al API.
+        instruccion: Instrucción prefijada a cada mensaje.
+        modelo, system_prompt, temperature, max_tokens, timeout:
+            Mismos overrides que completar(), aplicados a todo el lote.
+
+    Returns:
+        Respuestas en el mismo orden que messages (None donde falló).
+    """
+    results: list[str | None] = [None] * len(messages)
+    if not messages:
+        return results
+
+    llamadas = []
+    for msg in messages:
+        llamada = _preparar_llamada(
+            profile_name, msg,
+            instruccion=instruccion, modelo=modelo, system_prompt=system_prompt,
+            temperature=temperature, max_tokens=max_tokens, timeout=timeout,
+        )
+        if llamada is None:
+            return results
+        llamadas.append(llamada)
+
+    pendientes: dict[str, list[int]] = {}
+    for i, llamada in enumerate(llamadas):
+        key = llamada["cache_key"]
+        if key in pendientes:
+            pendientes[key].append(i)
+            continue
+        cached = _cache_get(key, llamada["content_key"])
+        if cached is not None:
+            results[i] = cached
+            _registrar_ledger(profile_name, llamada["model_primary"], cache_hit=True)
+        else:
+            pendientes[key] = [i]
+
+    if not pendientes:
+        return results
+
+    hits = len(messages) - sum(len(v) for v in pendientes.values())
+    workers = max(1, min(max_concurrency, len(pendientes)))
+    print(f"[BATCH] {profile_name}: {len(messages)} prompts "
+          f"({hits} en caché, {len(pendientes)} al API, {workers} workers)")
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            key: pool.submit(contextvars.copy_context().run,
+                             _ejecutar_llamada, llamadas[indices[0]])
+            for key, indices in pendientes.items()
+        }
+        for key, future in futures.items():
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"[WARN] OpenRouter falló en lote ({profile_name}): {e}")
+                result = None
+            for i in pendientes[key]:
+                results[i] = result
+
+    return results
+
+
+def _preparar_llamada(
+    profile_name: str,
+    user_message: str,
+    *,
+    instruccion: str = "",
+    modelo: str = "",
+    system_prompt: str = "",
+    temperature: float | None = None,
+    max_tokens: int | None = None,
+    timeout: int | None = None,
+) -> dict | None:
+    """Resuelve perfil, overrides y cache key de una llamada.
 
     Returns:
-        Respuesta del LLM o None si falla.
+        Dict con los parámetros resueltos, o None si no hay API key,
+        el perfil no existe o los créditos no alcanzan.
     """
     api_key = os.environ.get("OPENROUTER_API_KEY")
     if not api_key:
@@ -199,36 +487,254 @@ def completar(
 
     default_timeout = api_cfg.get("timeout", 60)
 
-    model_primary = modelo or _resolve_model(profile)
-    model_fallback = _resolve_fallback(profile)
     system = system_prompt or profile.get("system_prompt", "")
-    temp = temperature if temperature is not None else profile.get("temperature", 0.3)
-    tokens = max_tokens if max_tokens is not None else profile.get("max_tokens", 2000)
-    t_out = timeout if timeout is not None else profile.get("timeout", default_timeout)
-
     user_msg = f"{instruccion}\n\n{user_message}" if instruccion else user_message
 
-    # Caché: verificar antes de llamar al API
-    cache_key = _cache_key(profile_name, system, user_msg)
-    cached = _cache_get(cache_key)
+    return {
+        "profile_name": profile_name,
+        "user_msg": user_msg,
+        "system": system,
+        "temp": temperature if temperature is not None else profile.get("temperature", 0.3),
+        "tokens": max_tokens if max_tokens is not None else profile.get("max_tokens", 2000),
+        "t_out": timeout if timeout is not None else profile.get("timeout", default_timeout),
+        "model_primary": modelo or _resolve_model(profile),
+        "model_fallback": _resolve_fallback(profile),
+        "chunking": profile.get("chunking", {}),
+        "cache_key": _cache_key(profile_name, system, user_msg),
+        "content_key": _content_key(profile_name, system, user_msg),
+    }
+
+
+def _ejecutar_llamada(llamada: dict) -> str | None:
+    """Ejecuta una llamada preparada (con chunking si aplica) y la cachea.
+
+    En modo chunked, _completar_chunked gestiona su propia caché (por
+    chunk y del documento completo solo si todos los chunks salieron bien).
+    """
+    if llamada["chunking"].get("enabled"):
+        plan = _planear_chunks(llamada)
+        if len(plan["chunks"]) > 1:
+            return _completar_chunked(
+                llamada["profile_name"], plan, llamada["system"],
+                llamada["temp"], llamada["tokens"], llamada["t_out"],
+                llamada["model_primary"], llamada["model_fallback"],
+                llamada["chunking"], cache_key=llamada["cache_key"],
+                content_key=llamada["content_key"],
+            )
+
+    result = _completar_single(
+        llamada["user_msg"], llamada["system"], llamada["temp"], llamada["tokens"],
+        llamada["t_out"], llamada["model_primary"], llamada["model_fallback"],
+        llamada["profile_name"],
+    )
+    if result is not None:
+        _cache_put(llamada["cache_key"], result, llamada["content_key"])
+    return result
+
+
+def _planear_chunks(llamada: dict) -> dict:
+    """Divide user_msg según el presupuesto de tokens del modelo resuelto.
+
+    Usa el menor context_length conocido entre modelo primario y fallback
+    (catálogo de analyze-model); si ninguno figura, chunking.context_length.
+    """
+    chunking = llamada["chunking"]
+    catalog = _find_catalog()
+    contextos = [
+        cargar_context_length(m, catalog)
+        for m in (llamada["model_primary"], llamada["model_fallback"]) if m
+    ]
+    conocidos = [c for c in contextos if c]
+    context_length = min(conocidos) if conocidos else chunking.get("context_length")
+
+    max_tokens = presupuesto_tokens(
+        context_length,
+        max_output=llamada["tokens"],
+        system_prompt=llamada["system"],
+        max_chunk_tokens=chunking.get("max_chunk_tokens"),
+    )
+    return planear_chunks(llamada["user_msg"], max_tokens=max_tokens)
+
+
+def _headers() -> dict:
+    return {
+        "Authorization": f"Bearer {os.environ.get('OPENROUTER_API_KEY', '')}",
+        "Content-Type": "application/json",
+    }
+
+
+def _payload(
+    model: str, system: str, user_msg: str, temp: float, tokens: int, *, stream: bool = False,
+) -> dict:
+    payload = {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": system},
+            {"role": "user", "content": user_msg},
+        ],
+        "temperature": temp,
+        "max_tokens": tokens,
+    }
+    if stream:
+        payload["stream"] = True
+    return payload
+
+
+def _stream_llamada(llamada: dict, cached: str | None) -> Iterator[str]:
+    """Generador de deltas para completar(stream=True).
+
+    Textos que requieren chunking se procesan sin streaming (fan-out en
+    paralelo) y se entregan como un único delta. La respuesta completa
+    se cachea solo si el stream terminó sin que el caller lo abandonara.
+    """
     if cached is not None:
-        return cached
+        yield cached
+        return
 
-    chunking = profile.get("chunking", {})
-    if chunking.get("enabled") and len(user_msg) > chunking.get("max_chars", 8000):
-        result = _completar_chunked(
-            profile_name, user_msg, system, temp, tokens, t_out,
-            model_primary, model_fallback, chunking,
-        )
-    else:
-        result = _completar_single(
-            user_msg, system, temp, tokens, t_out,
-            model_primary, model_fallback, profile_name,
+    if llamada["chunking"].get("enabled") and len(_planear_chunks(llamada)["chunks"]) > 1:
+        result = _ejecutar_llamada(llamada)
+        if result:
+            yield result
+        return
+
+    partes: list[str] = []
+    completo = False
+    try:
+        for delta in _stream_single(
+            llamada["user_msg"], llamada["system"], llamada["temp"], llamada["tokens"],
+            llamada["t_out"], llamada["model_primary"], llamada["model_fallback"],
+            llamada["profile_name"],
+        ):
+            partes.append(delta)
+            yield delta
+        completo = True
+    finally:
+        result = "".join(partes).strip()
+        if completo and result:
+            _cache_put(llamada["cache_key"], result, llamada["content_key"])
+
+
+def _stream_single(
+    user_msg: str,
+    system: str,
+    temp: float,
+    tokens: int,
+    t_out: int,
+    model_primary: str,
+    model_fallback: str,
+    profile_name: str,
+) -> Iterator[str]:
+    """Versión SSE de _completar_single: produce deltas de texto.
+
+    Reintentos y fallback de modelo solo antes del primer delta; un
+    error a mitad del stream lo corta (el texto parcial ya se entregó).
+    Informa el tiempo al primer token ([STREAM]). El `usage` del último
+    evento va al ledger.
+    """
+    models_to_try = [model_primary]
+    if model_fallback and model_fallback != model_primary:
+        models_to_try.append(model_fallback)
+
+    inicio_total = time.monotonic()
+    intentos = 0
+    usage = None
+
+    def _registrar(m: str, ok: bool):
+        _registrar_ledger(
+            profile_name, m, segundos=time.monotonic() - inicio_total,
+            reintentos=max(0, intentos - 1), fallback=m != model_primary, ok=ok,
+            **_campos_usage(usage),
         )
 
-    if result is not None:
-        _cache_put(cache_key, result)
-    return result
+    for m in models_to_try:
+        limiter = obtener_limiter(m, _load_config())
+        for attempt in range(1, RETRY_ATTEMPTS + 1):
+            emitido = False
+            inicio = time.monotonic()
+            intentos += 1
+            try:
+                with (
+                    limiter.slot() if limiter else contextlib.nullcontext(),
+                    _get_session().post(
+                        API_URL,
+                        headers=_headers(),
+                        json=_payload(m, system, user_msg, temp, tokens, stream=True),
+                        timeout=t_out,
+                        stream=True,
+                    ) as resp,
+                ):
+                    if limiter:
+                        espera_servidor = limiter.registrar_respuesta(
+                            resp.status_code, resp.headers,
+                        )
+                    else:
+                        espera_servidor = segundos_hasta_reset(resp.headers, status=resp.status_code)
+
+                    if resp.status_code in RETRYABLE_STATUSES and attempt < RETRY_ATTEMPTS:
+                        delay = RETRY_BASE_DELAY * (2 ** (attempt - 1))
+                        espera = max(delay + random.uniform(0, delay * 0.5), espera_servidor)
+                        print(f"[RETRY] {m} devolvió {resp.status_code}, "
+                              f"reintento {attempt}/{RETRY_ATTEMPTS} en {espera:.1f}s")
+                    else:
+                        resp.raise_for_status()
+
+                        for evento in _iter_sse(resp):
+                            if "error" in evento:
+                                raise requests.RequestException(
+                                    f"error en stream: {evento['error']}"
+                                )
+                            usage = evento.get("usage") or usage
+                            choices = evento.get("choices") or []
+                            delta = ((choices[0].get("delta") or {}).get("content")
+                                     if choices else None)
+                            if not delta:
+                                continue
+                            if not emitido:
+                                emitido = True
+                                print(f"[STREAM] {profile_name}/{m} primer token en "
+                                      f"{time.monotonic() - inicio:.2f}s")
+                            yield delta
+                        if emitido:
+                            _registrar(m, True)
+                            return
+                        print(f"[WARN] OpenRouter stream sin contenido ({profile_name}/{m})")
+                        break
+                # La espera va fuera del slot y con la respuesta cerrada
+                time.sleep(espera)
+
+            except requests.RequestException as e:
+                if emitido:
+                    print(f"[WARN] Stream interrumpido ({profile_name}/{m}): {e}")
+                    _registrar(m, False)
+                    return
+                if attempt < RETRY_ATTEMPTS:
+                    delay = RETRY_BASE_DELAY * (2 ** (attempt - 1))
+                    delay += random.uniform(0, delay * 0.5)
+                    print(f"[RETRY] {m} error de red ({e}), "
+                          f"reintento {attempt}/{RETRY_ATTEMPTS} en {delay:.1f}s")
+                    time.sleep(delay)
+                else:
+                    if m == models_to_try[-1]:
+                        print(f"[WARN] OpenRouter falló ({profile_name}/{m}): {e}")
+                    break
+
+    _registrar(models_to_try[-1], False)
+
+
+def _iter_sse(resp) -> Iterator[dict]:
+    """Eventos JSON de una respuesta SSE de OpenRouter (ignora comentarios)."""
+    for linea in resp.iter_lines(decode_unicode=True):
+        if not linea or linea.startswith(":"):
+            continue  # keep-alive / ": OPENROUTER PROCESSING"
+        if not linea.startswith("data:"):
+            continue
+        datos = linea[5:].strip()
+        if datos == "[DONE]":
+            return
+        try:
+            yield json.loads(datos)
+        except json.JSONDecodeError:
+            continue
 
 
 def _completar_single(
@@ -241,43 +747,52 @@ def _completar_single(
     model_fallback: str,
     profile_name: str,
 ) -> str | None:
-    """Envía un único mensaje con reintentos y fallback de modelo."""
+    """Envía un único mensaje con reintentos y fallback de modelo.
+
+    Registra en el ledger un único registro por mensaje: modelo que
+    respondió, tokens de `usage`, tiempo total y reintentos acumulados.
+    """
     models_to_try = [model_primary]
     if model_fallback and model_fallback != model_primary:
         models_to_try.append(model_fallback)
 
+    inicio = time.monotonic()
+    intentos = 0
     for m in models_to_try:
+        limiter = obtener_limiter(m, _load_config())
         for attempt in range(1, RETRY_ATTEMPTS + 1):
+            intentos += 1
             try:
-                resp = requests.post(
-                    API_URL,
-                    headers={
-                        "Authorization": f"Bearer {os.environ.get('OPENROUTER_API_KEY', '')}",
-                        "Content-Type": "application/json",
-                    },
-                    json={
-                        "model": m,
-                        "messages": [
-                            {"role": "system", "content": system},
-                            {"role": "user", "content": user_msg},
-                        ],
-                        "temperature": temp,
-                        "max_tokens": tokens,
-                    },
-                    timeout=t_out,
-                )
+                with limiter.slot() if limiter else contextlib.nullcontext():
+                    resp = _get_session().post(
+                        API_URL,
+                        headers=_headers(),
+                        json=_payload(m, system, user_msg, temp, tokens),
+                        timeout=t_out,
+                    )
+                if limiter:
+                    espera_servidor = limiter.registrar_respuesta(resp.status_code, resp.headers)
+                else:
+                    espera_servidor = segundos_hasta_reset(resp.headers, status=resp.status_code)
 
                 if resp.status_code in RETRYABLE_STATUSES and attempt < RETRY_ATTEMPTS:
                     delay = RETRY_BASE_DELAY * (2 ** (attempt - 1))
                     jitter = random.uniform(0, delay * 0.5)
+                    # Retry-After / X-RateLimit-Reset manda si pide esperar más
+                    delay = max(delay + jitter, espera_servidor)
                     print(f"[RETRY] {m} devolvió {resp.status_code}, "
-                          f"reintento {attempt}/{RETRY_ATTEMPTS} en {delay + jitter:.1f}s")
-                    time.sleep(delay + jitter)
+                          f"reintento {attempt}/{RETRY_ATTEMPTS} en {delay:.1f}s")
+                    time.sleep(delay)
                     continue
 
                 resp.raise_for_status()
                 data = resp.json()
                 if "choices" in data and data["choices"]:
+                    _registrar_ledger(
+                        profile_name, m, segundos=time.monotonic() - inicio,
+                        reintentos=intentos - 1, fallback=m != model_primary,
+                        **_campos_usage(data.get("usage")),
+                    )
                     return data["choices"][0]["message"]["content"].strip()
 
                 print(f"[WARN] OpenRouter respuesta sin choices ({profile_name}/{m})")
@@ -305,12 +820,16 @@ def _completar_single(
                         print(f"[WARN] OpenRouter falló ({profile_name}/{m}): {e}")
                     break
 
+    _registrar_ledger(
+        profile_name, models_to_try[-1], segundos=time.monotonic() - inicio,
+        reintentos=max(0, intentos - 1), fallback=len(models_to_try) > 1, ok=False,
+    )
     return None
 
 
 def _completar_chunked(
     profile_name: str,
-    user_msg: str,
+    plan: dict,
     system: str,
     temp: float,
     tokens: int,
@@ -318,40 +837,66 @@ def _completar_chunked(
     model_primary: str,
     model_fallback: str,
     chunking: dict,
+    *,
+    cache_key: str = "",
+    content_key: str = "",
 ) -> str | None:
-    """Divide texto largo en chunks con overlap y procesa secuencialmente."""
-    max_chars = chunking.get("max_chars", 8000)
-    overlap = chunking.get("overlap", 500)
+    """Procesa en paralelo los chunks de un plan de chunking.planear_chunks.
+
+    Cada chunk se cachea con su propia clave, así un reintento tras un
+    chunk fallido solo reenvía ese chunk. Hasta chunking.max_parallel
+    chunks en vuelo; el resultado se reensambla en el orden original.
+    El documento completo solo se cachea (cache_key) si ningún chunk falló.
+    """
+    max_parallel = max(1, int(chunking.get("max_parallel", 1)))
+
+    chunks = plan["chunks"]
+    print(f"[CHUNK] {profile_name}: ~{plan['tokens_estimados']} tokens → "
+          f"{len(chunks)} chunks (≤{plan['max_tokens']} tokens c/u; "
+          f"splitter por caracteres: {plan['chunks_legado']} chunks, "
+          f"~{plan['overlap_tokens_ahorrados']} tokens de overlap ahorrados)")
+
+    results: list[str | None] = [None] * len(chunks)
+    chunk_keys = [_cache_key(profile_name, system, chunk) for chunk in chunks]
+    chunk_content_keys = [_content_key(profile_name, system, chunk) for chunk in chunks]
+    pendientes = []
+    for i, key in enumerate(chunk_keys):
+        cached = _cache_get(key, chunk_content_keys[i])
+        if cached is not None:
+            results[i] = cached
+            _registrar_ledger(profile_name, model_primary, cache_hit=True)
+        else:
+            pendientes.append(i)
 
-    chunks = _split_chunks(user_msg, max_chars, overlap)
-    print(f"[CHUNK] {profile_name}: {len(user_msg)} chars → {len(chunks)} chunks "
-          f"(~{max_chars}c c/u, overlap {overlap})")
+    if len(pendientes) < len(chunks):
+        print(f"[CHUNK] {len(chunks) - len(pendientes)}/{len(chunks)} chunks "
+              f"desde caché")
 
-    results = []
-    for i, chunk in enumerate(chunks, 1):
-        print(f"[CHUNK] Procesando chunk {i}/{len(chunks)} "
+    def _procesar(i: int) -> str | None:
+        chunk = chunks[i]
+        print(f"[CHUNK] Procesando chunk {i + 1}/{len(chunks)} "
               f"({len(chunk)} chars)...")
         result = _completar_single(
             chunk, system, temp, tokens, t_out,
             model_primary, model_fallback, profile_name,
         )
         if result:
-            results.append(result)
-        else:
-            results.append(f"[CHUNK {i} FALLIDO]")
-
-    return "\n\n".join(results)
-
-
-def _split_chunks(text: str, max_chars: int, overlap: int) -> list[str]:
-    """Divide texto en chunks de max_chars con overlap entre ellos."""
-    chunks = []
-    start = 0
-    while start < len(text):
-        end = min(start + max_chars, len(text))
-        chunks.append(text[start:end])
-        start += max_chars - overlap
-    return chunks
+            _cache_put(chunk_keys[i], result, chunk_content_keys[i])
+        return result
+
+    if pendientes:
+        workers = min(max_parallel, len(pendientes))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(contextvars.copy_context().run, _procesar, i)
+                       for i in pendientes]
+            for i, future in zip(pendientes, futures, strict=True):
+                results[i] = future.result()
+
+    partes = [r if r else f"[CHUNK {i} FALLIDO]" for i, r in enumerate(results, 1)]
+    combinado = "\n\n".join(partes)
+    if cache_key and all(results):
+        _cache_put(cache_key, combinado, content_key)
+    return combinado
 
 
 def reload_config():
@@ -0,0 +1,175 @@
+"""
+Página Moodle parseada una sola vez, con los extractores como métodos.
+
+Antes, cada extractor de navegador_requests (descripción, instrucciones,
+criterios, materiales, nombre de unidad) construía su propio
+BeautifulSoup sobre el mismo HTML: una actividad se parseaba hasta cinco
+veces. `PaginaMoodle` parsea de forma perezosa y reutiliza el árbol:
+
+- Selectores calientes (`texto_primero`, `links_materiales`): con un
+  parser rápido. selectolax (lexbor) si está instalado; si no, lxml.html
+  con XPath traducido de los selectores simples que usa el skill.
+- Todo lo demás (`soup`): el BeautifulSoup de siempre, creado una vez.
+
+Los dos caminos devuelven el mismo texto que `get_text(strip=True)` de
+BS4 (sin el contenido de <script>, <style> y <template>).
+`bench_paginas.py` compara ambos sobre páginas Moodle guardadas.
+
+Uso:
+    pagina = PaginaMoodle(html, url)
+    pagina.detalle()  # descripción, instrucciones, materiales, criterios
+"""
+
+import importlib.util
+import re
+
+from bs4 import BeautifulSoup
+
+SELECTORES_DESCRIPCION = [".activity-description", "#intro", ".content", ".description",
+                          ".summary"]
+SELECTORES_INSTRUCCIONES = [".submissioninstructions", ".generalbox", ".instrucciones",
+                            ".box.generalbox"]
+SELECTORES_CRITERIOS = [".gradingform", ".criteria", ".criterios", ".grade-criteria"]
+SELECTORES_NOMBRE_UNIDAD = ["h1", ".sectionname", ".course-section-name",
+                            ".page-header-headings h1"]
+SELECTOR_MATERIALES = 'a[href*="pluginfile.php"]'
+
+# Texto que get_text() de BS4 no incluye
+_ETIQUETAS_SIN_TEXTO = ("script", "style", "template")
+
+# Selectores simples: tag, .clase, #id y [attr*="valor"], con descendientes
+_RE_PASO = re.compile(
+    r'^(?P<tag>[a-zA-Z][\w-]*)?(?P<resto>(?:[.#][\w-]+|\[[\w-]+\*="[^"]*"\])*)$'
+)
+_RE_FILTRO = re.compile(r'([.#])([\w-]+)|\[([\w-]+)\*="([^"]*)"\]')
+
+
+def parser_rapido() -> str:
+    """Parser de los selectores calientes: "selectolax" o "lxml"."""
+    return "selectolax" if importlib.util.find_spec("selectolax") else "lxml"
+
+
+def css_a_xpath(selector: str) -> str:
+    """Traduce un selector CSS simple a XPath (lxml sin cssselect).
+
+    Raises:
+        ValueError: si el selector usa algo fuera del subconjunto soportado.
+    """
+    pasos = []
+    for paso in selector.split():
+        m = _RE_PASO.match(paso)
+        if not m or not (m.group("tag") or m.group("resto")):
+            raise ValueError(f"Selector no soportado: {selector}")
+        condiciones = []
+        for punto, nombre, attr, valor in _RE_FILTRO.findall(m.group("resto")):
+            if punto == ".":
+                condiciones.append(
+                    f"contains(concat(' ', normalize-space(@class), ' '), ' {nombre} ')"
+                )
+            elif punto == "#":
+                condiciones.append(f"@id='{nombre}'")
+            elif "'" not in valor:
+                condiciones.append(f"contains(@{attr}, '{valor}')")
+            else:
+                raise ValueError(f"Selector no soportado: {selector}")
+        filtro = f"[{' and '.join(condiciones)}]" if condiciones else ""
+        pasos.append(f"{m.group('tag') or '*'}{filtro}")
+    return "//" + "//".join(pasos)
+
+
+class PaginaMoodle:
+    """HTML de una página de Moodle con parseo único y perezoso."""
+
+    def __init__(self, html: str, url: str = "", *, parser: str | None = None):
+        """
+        Args:
+            html: HTML de la página.
+            url: URL final (informativa).
+            parser: "selectolax", "lxml" o "bs4" para los selectores calientes
+                (default: parser_rapido()).
+        """
+        self.html = html
+        self.url = url
+        self.parser = parser or parser_rapido()
+        self._soup = None
+        self._arbol = None
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        """BeautifulSoup de la página, construido la primera vez que se pide."""
+        if self._soup is None:
+            self._soup = BeautifulSoup(self.html, "lxml")
+        return self._soup
+
+    def _arbol_rapido(self):
+        if self._arbol is None:
+            if self.parser == "selectolax":
+                from selectolax.lexbor import LexborHTMLParser
+                self._arbol = LexborHTMLParser(self.html)
+                self._arbol.strip_tags(list(_ETIQUETAS_SIN_TEXTO))
+            else:
+                import lxml.html
+                from lxml import etree
+                parser = lxml.html.HTMLParser(remove_comments=True, remove_pis=True)
+                html = self.html or "<html/>"
+                try:
+                    self._arbol = lxml.html.document_fromstring(html, parser=parser)
+                except ValueError:  # str con declaración de encoding XML
+                    self._arbol = lxml.html.document_fromstring(html.encode("utf-8"),
+                                                                parser=parser)
+                etree.strip_elements(self._arbol, *_ETIQUETAS_SIN_TEXTO, with_tail=False)
+        return self._arbol
+
+    def _seleccionar(self, selector: str, *, todos: bool = False) -> list:
+        if self.parser == "bs4":
+            return self.soup.select(selector) if todos else [self.soup.select_one(selector)]
+        arbol = self._arbol_rapido()
+        if self.parser == "selectolax":
+            return arbol.css(selector) if todos else [arbol.css_first(selector)]
+        nodos = arbol.xpath(css_a_xpath(selector))
+        return nodos if todos else nodos[:1]
+
+    def _texto(self, nodo) -> str:
+        if self.parser == "bs4":
+            return nodo.get_text(strip=True)
+        if self.parser == "selectolax":
+            return nodo.text(deep=True, separator="", strip=True)
+        return "".join(t.strip() for t in nodo.itertext())
+
+    def texto_primero(self, selectores: list[str], default: str = "") -> str:
+        """Texto del primer selector que exista en la página (orden de la lista)."""
+        for selector in selectores:
+            nodos = [n for n in self._seleccionar(selector) if n is not None]
+            if nodos:
+                return self._texto(nodos[0])
+        return default
+
+    def descripcion(self) -> str:
+        return self.texto_primero(SELECTORES_DESCRIPCION)
+
+    def instrucciones(self) -> str:
+        return self.texto_primero(SELECTORES_INSTRUCCIONES)
+
+    def criterios(self) -> str:
+        return self.texto_primero(SELECTORES_CRITERIOS)
+
+    def nombre_unidad(self) -> str:
+        return self.texto_primero(SELECTORES_NOMBRE_UNIDAD, default="Unidad")
+
+    def links_materiales(self) -> list[str]:
+        """hrefs de pluginfile.php en orden de aparición."""
+        links = []
+        for a in self._seleccionar(SELECTOR_MATERIALES, todos=True):
+            href = a.attributes.get("href") if self.parser == "selectolax" else a.get("href")
+            if href:
+                links.append(href)
+        return links
+
+    def detalle(self) -> dict:
+        """Descripción, instrucciones, materiales y criterios con un solo parseo."""
+        return {
+            "descripcion": self.descripcion(),
+            "instrucciones": self.instrucciones(),
+            "materiales": self.links_materiales(),
+            "criterios": self.criterios(),
+        }
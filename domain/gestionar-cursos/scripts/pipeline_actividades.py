@@ -0,0 +1,109 @@
+"""
+Pipeline concurrente de extracción de actividades (modo requests).
+
+Tres etapas por actividad:
+  1. descarga — pool de N workers de red; la cortesía por host la aplica
+     navegador_requests (configurar_cortesia).
+  2. parseo   — pool aparte para BS4 (extraer_modulo_*(url, html=...)).
+  3. escritura — hilo llamador, en el orden de entrada (_guardar_*), así
+     los archivos y el log quedan igual que en el recorrido secuencial.
+
+Cada tarea lleva su propio estado (URL, HTML, datos) en vez de depender
+de la "página actual" global del navegador, por eso las etapas pueden
+correr en paralelo. Los workers heredan el contexto del llamador (caché
+LLM del curso, salida por curso de scheduler_cursos). La escritura empieza en cuanto la primera tarea está
+lista, mientras el resto sigue descargándose.
+
+Uso:
+    from pipeline_actividades import ejecutar_pipeline
+
+    stats = ejecutar_pipeline(
+        tareas, descargar=fn_red, parsear=fn_bs4, escribir=fn_disco,
+        workers=4,
+    )
+"""
+
+import contextvars
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+
+DEFAULT_WORKERS = 4
+PARSE_WORKERS = 2
+
+
+def ejecutar_pipeline(
+    tareas: list[dict],
+    *,
+    descargar: Callable[[dict], object],
+    parsear: Callable[[dict, object], object],
+    escribir: Callable[[dict, object], None],
+    workers: int = DEFAULT_WORKERS,
+    al_fallar: Callable[[dict, Exception], None] | None = None,
+    abortar_en: tuple[type[BaseException], ...] = (),
+) -> dict:
+    """Ejecuta descarga → parseo → escritura para cada tarea.
+
+    Args:
+        tareas: Dicts de estado por tarea (se pasan tal cual a cada etapa).
+        descargar: Etapa de red; devuelve lo que necesita parsear (ej: HTML).
+        parsear: Etapa de CPU; recibe (tarea, descargado) y devuelve datos.
+        escribir: Etapa de disco; recibe (tarea, datos) en orden de entrada.
+        workers: Descargas simultáneas.
+        al_fallar: Callback para errores de una tarea (no detiene el resto).
+        abortar_en: Excepciones que cancelan las tareas pendientes y se
+            propagan (ej: SessionExpiredError).
+
+    Returns:
+        Dict con tareas, ok, fallidas, workers y segundos.
+    """
+    inicio = time.monotonic()
+    resultados: list[Future] = [Future() for _ in tareas]
+    stats = {"tareas": len(tareas), "ok": 0, "fallidas": 0,
+             "workers": max(1, workers), "segundos": 0.0}
+    if not tareas:
+        return stats
+
+    red = ThreadPoolExecutor(max_workers=stats["workers"], thread_name_prefix="descarga")
+    cpu = ThreadPoolExecutor(max_workers=PARSE_WORKERS, thread_name_prefix="parseo")
+
+    def _parsear(i: int, descargado) -> None:
+        try:
+            resultados[i].set_result(parsear(tareas[i], descargado))
+        except BaseException as e:
+            resultados[i].set_exception(e)
+
+    def _descargar(i: int) -> None:
+        try:
+            descargado = descargar(tareas[i])
+        except BaseException as e:
+            resultados[i].set_exception(e)
+            return
+        try:
+            cpu.submit(contextvars.copy_context().run, _parsear, i, descargado)
+        except RuntimeError as e:  # pool cerrado tras un abort
+            resultados[i].set_exception(e)
+
+    try:
+        for i in range(len(tareas)):
+            red.submit(contextvars.copy_context().run, _descargar, i)
+
+        for tarea, futuro in zip(tareas, resultados, strict=True):
+            try:
+                escribir(tarea, futuro.result())
+                stats["ok"] += 1
+            except abortar_en:
+                raise
+            except Exception as e:
+                stats["fallidas"] += 1
+                if al_fallar:
+                    al_fallar(tarea, e)
+    finally:
+        red.shutdown(wait=True, cancel_futures=True)
+        cpu.shutdown(wait=True, cancel_futures=True)
+        for futuro in resultados:
+            if not futuro.done():
+                futuro.cancel()
+
+    stats["segundos"] = round(time.monotonic() - inicio, 2)
+    return stats
@@ -0,0 +1,247 @@
+"""
+Rate limiter cliente para OpenRouter, compartido entre hilos y procesos.
+
+- Token bucket por modelo (requests por minuto + ráfaga), con estado en
+  `<skill>/.ratelimit/<modelo>.json` protegido por un lockfile, así los
+  subprocesos de `cli_init --parallel` comparten el mismo presupuesto.
+- Lee `Retry-After` y `X-RateLimit-Remaining`/`X-RateLimit-Reset` de cada
+  respuesta: un 429 o un remaining=0 bloquea el bucket hasta el reset.
+- Límite de concurrencia adaptativo AIMD: +1/límite por respuesta
+  exitosa, la mitad ante un 429. El límite vive en el mismo estado
+  compartido; cada proceso lo aplica a sus propias llamadas en vuelo.
+
+Con `rate_limit.debug: true` en openrouter.json (o OPENROUTER_DEBUG=1)
+cada evento se agrega a `<skill>/.ratelimit/ratelimit.log`.
+"""
+
+import contextlib
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+from file_lock import lockfile
+
+STATE_DIRNAME = ".ratelimit"
+MAX_ESPERA_BLOQUEO = 300.0  # nunca dormir más que esto por un header raro
+
+_LIMITERS: dict[str, "RateLimiter"] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+class RateLimiter:
+    """Token bucket + concurrencia AIMD para un modelo."""
+
+    def __init__(
+        self,
+        modelo: str,
+        *,
+        state_dir: str,
+        requests_per_minute: float = 20,
+        burst: int = 5,
+        max_concurrency: int = 8,
+        min_concurrency: int = 1,
+        debug: bool = False,
+    ):
+        os.makedirs(state_dir, exist_ok=True)
+        slug = re.sub(r"[^\w.-]+", "_", modelo)
+        self.modelo = modelo
+        self.state_path = os.path.join(state_dir, f"{slug}.json")
+        self.lock_path = self.state_path + ".lock"
+        self.log_path = os.path.join(state_dir, "ratelimit.log")
+        self.rate = requests_per_minute / 60.0
+        self.burst = max(1, burst)
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.debug = debug
+        self._en_vuelo = 0
+        self._cond = threading.Condition()
+
+    # -- API pública -------------------------------------------------------
+
+    @contextlib.contextmanager
+    def slot(self):
+        """Context manager: espera cupo de concurrencia y un token del bucket."""
+        self._entrar()
+        try:
+            self._consumir_token()
+            yield
+        finally:
+            self._salir()
+
+    def registrar_respuesta(self, status: int, headers) -> float:
+        """Actualiza estado según la respuesta; devuelve segundos a esperar (0 si nada).
+
+        Un 429 reduce a la mitad la concurrencia y bloquea el bucket hasta
+        Retry-After/X-RateLimit-Reset. Un 2xx suma 1/límite a la concurrencia.
+        """
+        ahora = time.time()
+        espera = segundos_hasta_reset(headers, ahora, status)
+        remaining = _header_int(headers, "X-RateLimit-Remaining")
+
+        with self._estado() as st:
+            if status == 429:
+                st["concurrency"] = max(self.min_concurrency, st["concurrency"] / 2)
+                st["tokens"] = 0.0
+                if not espera:
+                    espera = 1.0 / self.rate if self.rate > 0 else 1.0
+            elif 200 <= status < 300:
+                st["concurrency"] = min(
+                    self.max_concurrency, st["concurrency"] + 1.0 / st["concurrency"],
+                )
+            if remaining == 0 and espera == 0.0:
+                espera = 1.0 / self.rate if self.rate > 0 else 1.0
+            if espera:
+                espera = min(espera, MAX_ESPERA_BLOQUEO)
+                st["blocked_until"] = max(st["blocked_until"], ahora + espera)
+            self._log(
+                f"respuesta {status} remaining={remaining} espera={espera:.1f}s "
+                f"concurrency={st['concurrency']:.2f} tokens={st['tokens']:.2f}"
+            )
+        return espera
+
+    def limite_concurrencia(self) -> int:
+        """Límite AIMD actual (entero, al menos min_concurrency).
+
+        Solo lee: el estado se escribe con os.replace(), así que no hace
+        falta el lockfile ni reescribir el archivo.
+        """
+        return max(self.min_concurrency, int(self._leer_estado()["concurrency"]))
+
+    # -- Concurrencia local ------------------------------------------------
+
+    def _entrar(self) -> None:
+        with self._cond:
+            while True:
+                limite = self.limite_concurrencia()
+                if self._en_vuelo < limite:
+                    self._en_vuelo += 1
+                    return
+                self._log(f"concurrencia llena ({self._en_vuelo}/{limite}), esperando")
+                self._cond.wait(timeout=1.0)
+
+    def _salir(self) -> None:
+        with self._cond:
+            self._en_vuelo -= 1
+            self._cond.notify()
+
+    # -- Token bucket compartido -------------------------------------------
+
+    def _consumir_token(self) -> None:
+        while True:
+            ahora = time.time()
+            with self._estado() as st:
+                if ahora < st["blocked_until"]:
+                    espera = st["blocked_until"] - ahora
+                else:
+                    transcurrido = max(0.0, ahora - st["updated"])
+                    st["tokens"] = min(self.burst, st["tokens"] + transcurrido * self.rate)
+                    st["updated"] = ahora
+                    if st["tokens"] >= 1.0:
+                        st["tokens"] -= 1.0
+                        self._log(f"token concedido, quedan {st['tokens']:.2f}")
+                        return
+                    espera = (1.0 - st["tokens"]) / self.rate if self.rate > 0 else 1.0
+                self._log(f"bucket vacío/bloqueado, esperando {espera:.2f}s")
+            time.sleep(min(espera, MAX_ESPERA_BLOQUEO))
+
+    @contextlib.contextmanager
+    def _estado(self):
+        """Lee-modifica-escribe el estado compartido bajo el lockfile."""
+        with lockfile(self.lock_path):
+            st = self._leer_estado()
+            yield st
+            tmp = self.state_path + f".{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(st, f)
+            os.replace(tmp, self.state_path)
+
+    def _leer_estado(self) -> dict:
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                st = json.load(f)
+        except (OSError, ValueError):
+            st = {}
+        return {
+            "tokens": float(st.get("tokens", self.burst)),
+            "updated": float(st.get("updated", time.time())),
+            "blocked_until": float(st.get("blocked_until", 0.0)),
+            "concurrency": float(st.get("concurrency", self.min_concurrency + 1)),
+        }
+
+    def _log(self, mensaje: str) -> None:
+        if not self.debug:
+            return
+        linea = (f"{datetime.now().isoformat(timespec='milliseconds')} "
+                 f"pid={os.getpid()} {self.modelo}: {mensaje}\n")
+        with contextlib.suppress(OSError), open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(linea)
+
+
+def obtener_limiter(modelo: str, config: dict) -> RateLimiter | None:
+    """Limiter compartido para un modelo según `rate_limit` de openrouter.json.
+
+    Returns:
+        None si rate_limit.enabled es false.
+    """
+    cfg = config.get("rate_limit", {})
+    if not cfg.get("enabled", False):
+        return None
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(modelo)
+        if limiter is None:
+            skill_dir = Path(__file__).resolve().parent.parent
+            limiter = RateLimiter(
+                modelo,
+                state_dir=str(skill_dir / cfg.get("state_dir", STATE_DIRNAME)),
+                requests_per_minute=float(cfg.get("requests_per_minute", 20)),
+                burst=int(cfg.get("burst", 5)),
+                max_concurrency=int(cfg.get("max_concurrency", 8)),
+                min_concurrency=int(cfg.get("min_concurrency", 1)),
+                debug=bool(cfg.get("debug")) or bool(os.environ.get("OPENROUTER_DEBUG")),
+            )
+            _LIMITERS[modelo] = limiter
+        return limiter
+
+
+def _header_int(headers, nombre: str) -> int | None:
+    valor = headers.get(nombre) if headers else None
+    if valor is None:
+        return None
+    try:
+        return int(float(valor))
+    except (TypeError, ValueError):
+        return None
+
+
+def segundos_hasta_reset(headers, ahora: float | None = None,
+                         status: int | None = None) -> float:
+    """Segundos indicados por Retry-After o X-RateLimit-Reset (0 si ninguno).
+
+    Retry-After acepta segundos o fecha HTTP. X-RateLimit-Reset de
+    OpenRouter es epoch en milisegundos (se aceptan también segundos) y
+    solo obliga a esperar ante un 429 o con X-RateLimit-Remaining=0: en
+    una respuesta normal solo indica cuándo se renueva la ventana.
+    """
+    if not headers:
+        return 0.0
+    if ahora is None:
+        ahora = time.time()
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            with contextlib.suppress(TypeError, ValueError):
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - ahora)
+
+    reset = _header_int(headers, "X-RateLimit-Reset")
+    remaining = _header_int(headers, "X-RateLimit-Remaining")
+    if reset is not None and (status == 429 or remaining == 0):
+        reset_s = reset / 1000.0 if reset > 10_000_000_000 else float(reset)
+        return max(0.0, reset_s - ahora)
+    return 0.0
@@ -0,0 +1,159 @@
+"""
+Scheduler en proceso para inicializar varios cursos a la vez.
+
+Reemplaza el fan-out de subprocesos de `cli_init --parallel`: N cursos
+corren en hilos de un mismo proceso (máximo `max_concurrentes`), así
+comparten intérprete, imports y la sesión requests autenticada (un solo
+pool de conexiones y la misma cortesía por host).
+
+Cada curso corre en su propio contexto (contextvars):
+- Lo que escribe en stdout (console.print, print) va a su log, no se
+  mezcla con el de los demás; el hilo principal lo muestra al final.
+- La última línea que coincide con `patron_fase` queda como su fase
+  actual, para la tabla de progreso.
+
+Uso:
+    from scheduler_cursos import ejecutar_cursos
+
+    resultados = ejecutar_cursos(urls, lambda url: _init_curso(url, ...),
+                                 max_concurrentes=3)
+"""
+
+import contextlib
+import contextvars
+import io
+import re
+import sys
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_MAX_CURSOS = 3
+
+_RE_ANSI = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+
+_curso: contextvars.ContextVar[dict | None] = contextvars.ContextVar("curso_scheduler",
+                                                                    default=None)
+_salida_lock = threading.Lock()
+
+
+class _SalidaPorCurso(io.TextIOBase):
+    """stdout que reparte lo escrito al log del curso del contexto actual."""
+
+    def __init__(self, original, patron_fase: re.Pattern | None):
+        self.original = original
+        self.patron_fase = patron_fase
+
+    def write(self, texto: str) -> int:
+        estado = _curso.get()
+        if estado is None:
+            return self.original.write(texto)
+        estado["log"].write(texto)
+        if self.patron_fase is not None:
+            for linea in _RE_ANSI.sub("", texto).splitlines():
+                if self.patron_fase.search(linea):
+                    estado["fase"] = linea.strip()
+        return len(texto)
+
+    def flush(self):
+        self.original.flush()
+
+    def isatty(self) -> bool:
+        return self.original.isatty()
+
+    def fileno(self) -> int:
+        return self.original.fileno()
+
+    @property
+    def encoding(self):
+        return getattr(self.original, "encoding", "utf-8")
+
+
+@contextlib.contextmanager
+def _capturar_stdout(patron_fase: re.Pattern | None):
+    with _salida_lock:
+        original = sys.stdout
+        sys.stdout = _SalidaPorCurso(original, patron_fase)
+    try:
+        yield
+    finally:
+        with _salida_lock:
+            sys.stdout = original
+
+
+def curso_actual() -> dict | None:
+    """Estado del curso que corre en este contexto (None fuera del scheduler)."""
+    return _curso.get()
+
+
+def ejecutar_cursos(
+    urls: list[str],
+    ejecutar: Callable[[str], object],
+    *,
+    max_concurrentes: int = DEFAULT_MAX_CURSOS,
+    patron_fase: re.Pattern | None = None,
+    al_iniciar: Callable[[list[dict]], None] | None = None,
+) -> list[dict]:
+    """Corre `ejecutar(url)` para cada URL, como máximo N a la vez.
+
+    Args:
+        urls: Un curso por URL.
+        ejecutar: Inicialización de un curso. Un SystemExit (ej: sys.exit
+            en un error fatal) o una excepción marca solo ese curso.
+        max_concurrentes: Cursos simultáneos.
+        patron_fase: Regex de las líneas de progreso que se toman como fase.
+        al_iniciar: Recibe la lista de estados antes de arrancar (para una
+            tabla en vivo); los estados se actualizan en su lugar.
+
+    Returns:
+        Un estado por URL, en el orden de entrada: url, estado (en cola,
+        corriendo, ok, error), fase, error, segundos y log.
+    """
+    estados = [
+        {"url": url, "estado": "en cola", "fase": "", "error": "",
+         "inicio": 0.0, "segundos": 0.0, "log": io.StringIO()}
+        for url in urls
+    ]
+    if al_iniciar:
+        al_iniciar(estados)
+
+    def _correr(estado: dict) -> None:
+        _curso.set(estado)
+        estado["estado"] = "corriendo"
+        estado["inicio"] = time.monotonic()
+        try:
+            ejecutar(estado["url"])
+            estado["estado"] = "ok"
+        except SystemExit as e:
+            estado["estado"] = "error"
+            estado["error"] = f"salida {e.code}"
+        except Exception as e:
+            estado["estado"] = "error"
+            estado["error"] = f"{type(e).__name__}: {e}"
+        finally:
+            estado["segundos"] = round(time.monotonic() - estado["inicio"], 2)
+
+    with _capturar_stdout(patron_fase), ThreadPoolExecutor(
+        max_workers=max(1, max_concurrentes), thread_name_prefix="curso",
+    ) as pool:
+        futuros = [pool.submit(contextvars.copy_context().run, _correr, e) for e in estados]
+        for futuro in futuros:
+            futuro.result()
+
+    for estado in estados:
+        estado["log"] = estado["log"].getvalue()
+    return estados
+
+
+def resumen_tiempos(estados: list[dict], segundos_total: float) -> dict:
+    """Totales del lote: cursos ok/error, suma de tiempos y aceleración."""
+    suma = round(sum(e["segundos"] for e in estados), 2)
+    return {
+        "cursos": len(estados),
+        "ok": sum(1 for e in estados if e["estado"] == "ok"),
+        "errores": sum(1 for e in estados if e["estado"] == "error"),
+        "segundos_total": round(segundos_total, 2),
+        "segundos_suma": suma,
+        "aceleracion": round(suma / segundos_total, 2) if segundos_total > 0 else 0.0,
+    }
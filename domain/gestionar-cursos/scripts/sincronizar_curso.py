@@ -1,9 +1,30 @@
 """
 Compara estado de Moodle vs local y detecta cambios.
+
+Sync incremental: cada actividad guarda en `_cache/snapshot.json` la
+huella (sha256 del contenido normalizado de su página) con la que se
+extrajo por última vez, el tiempo que tomó y el archivo generado.
+`planear_sync()` separa las actividades sin cambios (se saltan) de las
+cambiadas y nuevas (se re-extraen, pasan por el LLM y se reescriben).
 """
 
+import hashlib
 import json
 import os
+from datetime import datetime
+
+from bs4 import BeautifulSoup
+from llm_cache import normalizar_contenido
+
+SNAPSHOT_RELPATH = os.path.join("_cache", "snapshot.json")
+
+# Bloques que cambian sin que cambie la actividad (conteos de envíos e
+# intentos, tiempo restante, scripts y tokens de formulario).
+_SELECTORES_VOLATILES = (
+    "script", "style", "noscript", "input[type=hidden]",
+    ".gradingsummary", ".gradingsummarytable", ".quizattemptcounts",
+    ".submissionstatustable", ".timeremaining", "[data-region='grading-navigation-panel']",
+)
 
 
 def sincronizar_curso(ruta_local: str) -> dict:
@@ -121,6 +142,99 @@ def extraer_datos_moodle(ruta_local: str) -> dict:
     }
 
 
+def huella_html(html: str) -> str:
+    """Huella del contenido de una página de actividad.
+
+    Se calcula sobre el texto normalizado de #region-main (sin bloques
+    volátiles) más las rutas de los archivos de pluginfile.php, así un
+    archivo reemplazado cambia la huella aunque el texto sea igual.
+    """
+    soup = BeautifulSoup(html or "", "lxml")
+    raiz = soup.select_one("#region-main") or soup.body or soup
+    for el in raiz.select(", ".join(_SELECTORES_VOLATILES)):
+        el.decompose()
+    texto = normalizar_contenido(raiz.get_text("\n"))
+    archivos = sorted({
+        a["href"].split("?")[0] for a in raiz.select('a[href*="pluginfile.php"]')
+    })
+    contenido = texto + "\n" + "\n".join(archivos)
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()[:32]
+
+
+def leer_snapshot(ruta_curso: str) -> dict:
+    """Snapshot del curso ({"actividades": {}} si no existe o está dañada)."""
+    path = os.path.join(ruta_curso, SNAPSHOT_RELPATH)
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {"timestamp": "", "actividades": {}}
+
+
+def planear_sync(actividades: list[dict], snapshot: dict) -> dict:
+    """Clasifica actividades según su huella actual contra la snapshot.
+
+    Args:
+        actividades: Dicts con `key` (clave de snapshot) y `huella` actual
+            ("" si no se pudo calcular: se re-extrae).
+        snapshot: Contenido de snapshot.json.
+
+    Returns:
+        {"sin_cambios", "cambiadas", "nuevas": listas de actividades,
+         "segundos_ahorrados": suma del último tiempo de extracción de
+         las actividades que se saltan}
+    """
+    previas = snapshot.get("actividades", {})
+    plan = {"sin_cambios": [], "cambiadas": [], "nuevas": [], "segundos_ahorrados": 0.0}
+    for act in actividades:
+        previa = previas.get(act["key"])
+        if previa is None:
+            plan["nuevas"].append(act)
+        elif act.get("huella") and previa.get("huella") == act["huella"]:
+            plan["sin_cambios"].append(act)
+            plan["segundos_ahorrados"] += float(previa.get("segundos", 0) or 0)
+        else:
+            plan["cambiadas"].append(act)
+    plan["segundos_ahorrados"] = round(plan["segundos_ahorrados"], 1)
+    return plan
+
+
+def registrar_extraccion(ruta_curso: str, act: dict, *, huella: str,
+                         segundos: float, archivo: str) -> None:
+    """Guarda en la snapshot la huella con la que se extrajo una actividad.
+
+    Conserva el resto de campos (fechas, calificación); una actividad que
+    aún no estaba en la snapshot se agrega con su nombre, tipo y sección.
+    """
+    registrar_extracciones(ruta_curso, [(act, huella, segundos, archivo)])
+
+
+def registrar_extracciones(ruta_curso: str,
+                           extracciones: list[tuple[dict, str, float, str]]) -> None:
+    """Como registrar_extraccion, para varias (act, huella, segundos, archivo)
+    con una sola lectura y escritura de la snapshot."""
+    if not extracciones:
+        return
+    snapshot = leer_snapshot(ruta_curso)
+    actividades = snapshot.setdefault("actividades", {})
+    for act, huella, segundos, archivo in extracciones:
+        entrada = actividades.setdefault(act["key"], {
+            "nombre": act.get("nombre", ""),
+            "tipo": act.get("tipo", "unknown"),
+            "seccion": act.get("seccion", ""),
+            "fecha_apertura": "",
+            "fecha_cierre": "",
+        })
+        entrada.update(huella=huella, segundos=round(segundos, 2), archivo=archivo)
+    snapshot["timestamp"] = datetime.now().isoformat()
+    path = os.path.join(ruta_curso, SNAPSHOT_RELPATH)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
 def get_timestamp() -> str:
     """Obtiene timestamp actual en formato ISO."""
     from datetime import datetime
@@ -0,0 +1,438 @@
+"""
+Store de materiales direccionado por contenido, compartido entre cursos.
+
+Los binarios de Moodle (PDF, PPTX, videos...) se descargan en streaming a
+disco por bloques y se guardan una sola vez en `blobs/<sha256[:2]>/<sha256>`;
+cada curso recibe un hardlink al blob (o una copia registrada si el
+sistema de archivos no permite hardlinks, ej: otro volumen).
+
+- Descarga reanudable: el archivo parcial queda en `parciales/` con sus
+  validadores; el siguiente intento pide `Range` + `If-Range` y continúa.
+  Si el servidor no dio ETag ni Last-Modified, el parcial se descarta.
+- Índice SQLite (`materiales.sqlite`, WAL):
+  - `urls`: URL → sha256 con ETag/Last-Modified; dentro del TTL se enlaza
+    sin request, después se revalida (un 304 enlaza el blob conocido).
+  - `referencias`: copias hechas sin hardlink, para que `gc()` sepa que
+    su blob sigue en uso.
+- `gc()` borra los blobs sin hardlinks ni referencias vivas y los
+  parciales abandonados.
+
+Los blobs quedan de solo lectura: editar la copia de un curso modificaría
+el mismo archivo en todos los cursos que lo enlazan.
+
+Uso:
+    from store_materiales import abrir_store_materiales
+
+    store = abrir_store_materiales()          # .materiales/ en la raíz del skill
+    store.descargar(url, "Unidad-1/materiales/guia.pdf")
+    store.gc()
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import stat
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+STORE_DIRNAME = ".materiales"
+DB_FILENAME = "materiales.sqlite"
+CHUNK_BYTES = 1024 * 1024
+TTL_URLS = 7 * 24 * 3600.0  # como TTL_PLUGINFILE de la caché HTTP
+MAX_EDAD_PARCIAL = 7 * 24 * 3600.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    etag TEXT NOT NULL DEFAULT '',
+    last_modified TEXT NOT NULL DEFAULT '',
+    bytes INTEGER NOT NULL,
+    validado REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS referencias (
+    ruta TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS contadores (
+    nombre TEXT PRIMARY KEY,
+    valor INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+_STORES: dict[str, "StoreMateriales"] = {}
+_STORES_LOCK = threading.Lock()
+_config = {"directorio": ""}
+
+
+class StoreMateriales:
+    """Blobs por sha256 + índice de URLs y referencias."""
+
+    def __init__(self, raiz: str, *, ttl: float = TTL_URLS):
+        self.raiz = raiz
+        self.ttl = ttl
+        self.dir_blobs = os.path.join(raiz, "blobs")
+        self.dir_parciales = os.path.join(raiz, "parciales")
+        os.makedirs(self.dir_blobs, exist_ok=True)
+        os.makedirs(self.dir_parciales, exist_ok=True)
+        self._lock = threading.Lock()
+        self._locks_url: dict[str, threading.Lock] = {}
+        self._conn = sqlite3.connect(os.path.join(raiz, DB_FILENAME), timeout=30,
+                                     check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    # -- API ---------------------------------------------------------------
+
+    def ruta_blob(self, sha256: str) -> str:
+        return os.path.join(self.dir_blobs, sha256[:2], sha256)
+
+    def descargar(self, url: str, destino: str, *,
+                  abrir: Callable | None = None,
+                  chunk_bytes: int = CHUNK_BYTES) -> dict:
+        """Descarga url (o reutiliza su blob) y la enlaza en destino.
+
+        Args:
+            url: URL del binario (pluginfile.php).
+            destino: Ruta del archivo dentro del curso.
+            abrir: `abrir(url, headers) -> Response` en streaming; por
+                defecto `browser_api.abrir_stream` (backend activo).
+            chunk_bytes: Tamaño de bloque de lectura/escritura.
+
+        Returns:
+            {sha256, bytes, origen: fresca|revalidada|descargada,
+             reanudado, dedup, enlace: hardlink|copia|existente}
+        """
+        if abrir is None:
+            from browser_api import abrir_stream as abrir
+        with self._lock_url(url):
+            entrada = self._url(url)
+            if entrada and os.path.isfile(self.ruta_blob(entrada["sha256"])):
+                if time.time() - entrada["validado"] < self.ttl:
+                    self._contar("frescas")
+                    self._contar("bytes_ahorrados", entrada["bytes"])
+                    return self._resultado(entrada, destino, "fresca")
+            else:
+                entrada = None
+            return self._descargar(url, destino, entrada, abrir, chunk_bytes)
+
+    def guardar_bytes(self, contenido: bytes, destino: str) -> dict:
+        """Guarda un contenido ya descargado en el store y lo enlaza en destino."""
+        sha256 = hashlib.sha256(contenido).hexdigest()
+        dedup = os.path.isfile(self.ruta_blob(sha256))
+        if not dedup:
+            tmp = os.path.join(self.dir_parciales, f"{sha256}.tmp")
+            with open(tmp, "wb") as f:
+                f.write(contenido)
+            self._importar(tmp, sha256)
+        return {"sha256": sha256, "bytes": len(contenido), "dedup": dedup,
+                "enlace": self.vincular(sha256, destino)}
+
+    def vincular(self, sha256: str, destino: str) -> str:
+        """Enlaza el blob en destino (hardlink; copia registrada si no se puede)."""
+        blob = self.ruta_blob(sha256)
+        destino = os.path.abspath(destino)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        if os.path.exists(destino):
+            if os.path.samefile(blob, destino):
+                return "existente"
+            _borrar(destino)
+        try:
+            os.link(blob, destino)
+            self._quitar_referencia(destino)
+            return "hardlink"
+        except OSError:
+            shutil.copyfile(blob, destino)
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO referencias (ruta, sha256) VALUES (?, ?)",
+                    (destino, sha256),
+                )
+                self._conn.commit()
+            return "copia"
+
+    def gc(self, *, dry_run: bool = False) -> dict:
+        """Borra blobs sin hardlinks ni copias vivas y parciales abandonados.
+
+        Una copia registrada sigue viva si su archivo existe y conserva el
+        tamaño del blob; las que no, se eliminan del índice.
+        """
+        vivas, podadas = set(), []
+        with self._lock:
+            refs = self._conn.execute("SELECT ruta, sha256 FROM referencias").fetchall()
+        for ruta, sha256 in refs:
+            blob = self.ruta_blob(sha256)
+            if (os.path.isfile(ruta) and os.path.isfile(blob)
+                    and os.path.getsize(ruta) == os.path.getsize(blob)):
+                vivas.add(sha256)
+            else:
+                podadas.append((ruta,))
+
+        borrados, liberados, total = [], 0, 0
+        for sub in _listar(self.dir_blobs):
+            for nombre in _listar(os.path.join(self.dir_blobs, sub)):
+                ruta = os.path.join(self.dir_blobs, sub, nombre)
+                total += 1
+                st = os.stat(ruta)
+                if st.st_nlink > 1 or nombre in vivas:
+                    continue
+                borrados.append(nombre)
+                liberados += st.st_size
+                if not dry_run:
+                    _borrar(ruta)
+
+        parciales = []
+        limite = time.time() - MAX_EDAD_PARCIAL
+        for nombre in _listar(self.dir_parciales):
+            ruta = os.path.join(self.dir_parciales, nombre)
+            if os.path.getmtime(ruta) < limite:
+                parciales.append(nombre)
+                if not dry_run:
+                    _borrar(ruta)
+
+        if not dry_run:
+            with self._lock:
+                self._conn.executemany("DELETE FROM referencias WHERE ruta = ?", podadas)
+                self._conn.executemany("DELETE FROM urls WHERE sha256 = ?",
+                                       [(s,) for s in borrados])
+                self._conn.commit()
+        return {"blobs": total, "borrados": len(borrados), "bytes_liberados": liberados,
+                "referencias_podadas": len(podadas), "parciales": len(parciales),
+                "dry_run": dry_run}
+
+    def stats(self) -> dict:
+        """Blobs, bytes en disco, enlaces por curso y contadores de uso."""
+        blobs, bytes_blobs, enlaces = 0, 0, 0
+        for sub in _listar(self.dir_blobs):
+            for nombre in _listar(os.path.join(self.dir_blobs, sub)):
+                st = os.stat(os.path.join(self.dir_blobs, sub, nombre))
+                blobs += 1
+                bytes_blobs += st.st_size
+                enlaces += st.st_nlink - 1
+        with self._lock:
+            (urls,) = self._conn.execute("SELECT COUNT(*) FROM urls").fetchone()
+            (copias,) = self._conn.execute("SELECT COUNT(*) FROM referencias").fetchone()
+            contadores = dict(self._conn.execute("SELECT nombre, valor FROM contadores"))
+        return {
+            "raiz": self.raiz, "blobs": blobs, "bytes": bytes_blobs, "urls": urls,
+            "hardlinks": enlaces, "copias": copias,
+            **{k: contadores.get(k, 0) for k in (
+                "frescas", "revalidadas", "descargadas", "reanudadas", "dedup",
+                "bytes_descargados", "bytes_ahorrados")},
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # -- Descarga ------------------------------------------------------------
+
+    def _descargar(self, url: str, destino: str, entrada: dict | None,
+                   abrir: Callable, chunk_bytes: int) -> dict:
+        parcial = os.path.join(self.dir_parciales,
+                               hashlib.sha256(url.encode("utf-8")).hexdigest()[:32] + ".part")
+        meta_path = parcial + ".json"
+        meta = _leer_json(meta_path)
+        validador = meta.get("etag") or meta.get("last_modified")
+        ya = os.path.getsize(parcial) if os.path.isfile(parcial) and validador else 0
+        if not ya:
+            # Sin ETag/Last-Modified no hay If-Range: un Range podría pegar
+            # bytes de otra versión del archivo. Se descarta y empieza de cero.
+            _borrar(parcial)
+            _borrar(meta_path)
+
+        headers = {}
+        if ya:
+            headers["Range"] = f"bytes={ya}-"
+            headers["If-Range"] = validador
+        elif entrada:
+            if entrada["etag"]:
+                headers["If-None-Match"] = entrada["etag"]
+            if entrada["last_modified"]:
+                headers["If-Modified-Since"] = entrada["last_modified"]
+
+        resp = abrir(url, headers)
+        try:
+            if resp.status_code == 304 and entrada:
+                self._tocar(url)
+                self._contar("revalidadas")
+                self._contar("bytes_ahorrados", entrada["bytes"])
+                return self._resultado(entrada, destino, "revalidada")
+            if resp.status_code == 416 and ya:
+                # el parcial ya no corresponde al archivo: empezar de cero
+                _borrar(parcial)
+                _borrar(meta_path)
+                return self._descargar(url, destino, entrada, abrir, chunk_bytes)
+            resp.raise_for_status()
+            if "login" in resp.url.lower():
+                raise RuntimeError("Moodle redirigió a login. Sesión expirada.")
+
+            reanudado = resp.status_code == 206 and ya > 0
+            etag = resp.headers.get("ETag", "")
+            last_modified = resp.headers.get("Last-Modified", "")
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump({"url": url, "etag": etag, "last_modified": last_modified}, f)
+
+            hasher = hashlib.sha256()
+            if reanudado:
+                with open(parcial, "rb") as f:
+                    for bloque in iter(lambda: f.read(chunk_bytes), b""):
+                        hasher.update(bloque)
+            descargados = 0
+            with open(parcial, "ab" if reanudado else "wb") as f:
+                for bloque in resp.iter_content(chunk_size=chunk_bytes):
+                    if bloque:
+                        f.write(bloque)
+                        hasher.update(bloque)
+                        descargados += len(bloque)
+        finally:
+            resp.close()
+
+        sha256 = hasher.hexdigest()
+        total = os.path.getsize(parcial)
+        dedup = os.path.isfile(self.ruta_blob(sha256))
+        if dedup:
+            _borrar(parcial)
+        else:
+            self._importar(parcial, sha256)
+        _borrar(meta_path)
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO urls (url, sha256, etag, last_modified, bytes, validado) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, sha256, etag, last_modified, total, time.time()),
+            )
+            self._incrementar("descargadas", 1)
+            self._incrementar("bytes_descargados", descargados)
+            if reanudado:
+                self._incrementar("reanudadas", 1)
+                self._incrementar("bytes_ahorrados", ya)
+            if dedup:
+                self._incrementar("dedup", 1)
+            self._conn.commit()
+        return {"sha256": sha256, "bytes": total, "origen": "descargada",
+                "reanudado": reanudado, "dedup": dedup,
+                "enlace": self.vincular(sha256, destino)}
+
+    def _resultado(self, entrada: dict, destino: str, origen: str) -> dict:
+        return {"sha256": entrada["sha256"], "bytes": entrada["bytes"], "origen": origen,
+                "reanudado": False, "dedup": True,
+                "enlace": self.vincular(entrada["sha256"], destino)}
+
+    def _importar(self, ruta_tmp: str, sha256: str) -> None:
+        blob = self.ruta_blob(sha256)
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        os.replace(ruta_tmp, blob)
+        os.chmod(blob, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+
+    # -- Índice --------------------------------------------------------------
+
+    def _lock_url(self, url: str) -> threading.Lock:
+        with self._lock:
+            return self._locks_url.setdefault(url, threading.Lock())
+
+    def _url(self, url: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sha256, etag, last_modified, bytes, validado FROM urls WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("sha256", "etag", "last_modified", "bytes", "validado"), row,
+                        strict=True))
+
+    def _tocar(self, url: str) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE urls SET validado = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+
+    def _quitar_referencia(self, ruta: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM referencias WHERE ruta = ?", (ruta,))
+            self._conn.commit()
+
+    def _contar(self, nombre: str, delta: int = 1) -> None:
+        with self._lock:
+            self._incrementar(nombre, delta)
+            self._conn.commit()
+
+    def _incrementar(self, nombre: str, delta: int) -> None:
+        self._conn.execute(
+            "INSERT INTO contadores (nombre, valor) VALUES (?, ?) "
+            "ON CONFLICT(nombre) DO UPDATE SET valor = valor + excluded.valor",
+            (nombre, delta),
+        )
+
+
+def configurar_store_materiales(directorio: str = "") -> None:
+    """Carpeta del store ("" = `.materiales/` en la raíz del skill).
+
+    Para que los cursos reciban hardlinks (y no copias) el store debe
+    estar en el mismo volumen que las carpetas de los cursos.
+    """
+    _config["directorio"] = directorio
+
+
+def abrir_store_materiales(directorio: str | None = None, **kwargs) -> StoreMateriales:
+    """Devuelve el store de directorio (uno por carpeta y proceso)."""
+    directorio = directorio if directorio is not None else _config["directorio"]
+    if not directorio:
+        directorio = str(Path(__file__).resolve().parent.parent / STORE_DIRNAME)
+    key = os.path.abspath(directorio)
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            store = StoreMateriales(key, **kwargs)
+            _STORES[key] = store
+        return store
+
+
+def resumen_materiales() -> str:
+    """Línea de resumen de los stores usados en este proceso ("" si ninguno)."""
+    with _STORES_LOCK:
+        stores = list(_STORES.values())
+    partes = []
+    for store in stores:
+        st = store.stats()
+        partes.append(
+            f"Materiales: {st['blobs']} archivos únicos ({st['bytes'] / 1024 / 1024:.1f} MB), "
+            f"{st['hardlinks']} hardlinks, {st['copias']} copias · "
+            f"{st['descargadas']} descargas, {st['reanudadas']} reanudadas, "
+            f"{st['dedup']} repetidas, "
+            f"{st['bytes_ahorrados'] / 1024 / 1024:.1f} MB no transferidos"
+        )
+    return "\n".join(partes)
+
+
+def _listar(ruta: str) -> list[str]:
+    try:
+        return sorted(os.listdir(ruta))
+    except OSError:
+        return []
+
+
+def _leer_json(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _borrar(ruta: str) -> None:
+    """Borra un archivo aunque sea de solo lectura (Windows no deja si no)."""
+    try:
+        os.remove(ruta)
+    except FileNotFoundError:
+        pass
+    except PermissionError:
+        os.chmod(ruta, stat.S_IWRITE | stat.S_IREAD)
+        os.remove(ruta)
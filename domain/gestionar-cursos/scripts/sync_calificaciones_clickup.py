@@ -9,7 +9,14 @@ y nota numérica:
   2. POST /task/{id}/comment con detalle de la nota.
 
 Si la tarea ya está en status "calificado" y ya tiene un comentario de
-esta sync, la salta (idempotencia).
+esta sync, la salta (idempotencia). El comentario solo se deja una vez.
+
+El estado actual se trae por adelantado (tareas de la lista en pocas
+páginas, comentarios en paralelo solo para tareas sin registro en
+`_cache/clickup_comentarios.json`), el diff se calcula localmente y las
+mutaciones se aplican en paralelo bajo el rate limiter (ver
+clickup_batch.py). Al final se imprimen las llamadas API hechas frente a
+las que habría hecho el flujo en serie.
 
 Uso:
     uv run python sync_calificaciones_clickup.py <CARPETA_CURSO>
@@ -19,14 +26,15 @@ Parámetros:
     CARPETA_CURSO    Carpeta raíz del curso (con _cache/snapshot.json
                      y clickup.json arriba en 2 niveles)
     --dry-run        Solo listar las tareas que se actualizarían
+    --workers N      Llamadas concurrentes a la API (default: 4)
 
 Notas:
 - La API de PUT /task/{id} acepta el NOMBRE del status (case-insensitive),
   NO el status_id. El script resuelve el nombre vía GET /space/{id}.
 - El status "calificado" existe solo en spaces donde el docente lo creó.
   Si no existe, se reporta con lista de statuses disponibles.
-- El comentario lleva el tag [calificaciones-auto] para que `tiene_comentario_sync`
-  detecte re-sincronizaciones sin duplicar.
+- El comentario lleva el tag [calificaciones-auto] para que
+  `clickup_batch.prefetch_comentarios` detecte re-sincronizaciones sin duplicar.
 """
 import argparse
 import json
@@ -35,6 +43,20 @@ import re
 import sys
 from datetime import datetime
 
+from clickup_batch import (
+    DEFAULT_WORKERS,
+    ClienteContado,
+    aplicar_plan,
+    cargar_registro,
+    crear_limiter,
+    guardar_registro,
+    llamadas_flujo_anterior,
+    planear_sync,
+    prefetch_comentarios,
+    prefetch_tareas,
+    prefetch_tareas_sueltas,
+    registrar_comentarios,
+)
 from rich.console import Console
 
 # Resolver el path a use-clickup/scripts dinámicamente: probamos varias
@@ -106,44 +128,6 @@ def resolver_paths(ruta_curso: str) -> tuple[str, str, str]:
     return curso_key, snapshot_path, clickup_json
 
 
-def tarea_ya_calificada(client, task_id: str) -> bool:
-    """Verifica si la tarea ya está en status 'calificado'."""
-    resp = client.get(f"/task/{task_id}")
-    task = resp.json()
-    status = task.get("status", {}).get("status", "").lower()
-    return status == STATUS_CALIFICADO
-
-
-def tiene_comentario_sync(client, task_id: str) -> bool:
-    """Verifica si ya dejamos un comentario automático en la tarea."""
-    resp = client.get(f"/task/{task_id}/comment")
-    comments = resp.json().get("comments", [])
-    return any(COMMENT_TAG in (c.get("comment_text", "") or "") for c in comments)
-
-
-def update_status(client, task_id: str, status_name: str) -> dict:
-    """Actualiza el status de la tarea (usa el NOMBRE del status)."""
-    resp = client.put(f"/task/{task_id}", json={"status": status_name})
-    if resp.status_code != 200:
-        raise RuntimeError(
-            f"Error actualizando status de {task_id}: {resp.status_code} {resp.text[:200]}"
-        )
-    return resp.json()
-
-
-def post_comentario(client, task_id: str, texto: str) -> dict:
-    """Deja un comentario en la tarea."""
-    resp = client.post(
-        f"/task/{task_id}/comment",
-        json={"comment_text": texto, "notify_all": False},
-    )
-    if resp.status_code not in (200, 201):
-        raise RuntimeError(
-            f"Error dejando comentario en {task_id}: {resp.status_code} {resp.text[:200]}"
-        )
-    return resp.json()
-
-
 def format_comentario(actividad: dict, curso_nombre: str) -> str:
     """Formatea el comentario con la calificación."""
     c = actividad["calificacion"]
@@ -164,6 +148,37 @@ def format_comentario(actividad: dict, curso_nombre: str) -> str:
     )
 
 
+def tareas_candidatas(snapshot: dict, tasks_map: dict) -> tuple[list[dict], list[str]]:
+    """Cruza por nombre snapshot ↔ clickup.json las actividades calificadas.
+
+    Returns:
+        ([{"nombre", "task_id", "actividad"}], nombres sin task_id)
+    """
+    candidatas, sin_tarea = [], []
+    for act in snapshot["actividades"].values():
+        cal = act.get("calificacion")
+        if not cal or not cal.get("nota"):
+            continue  # sin calificación numérica → no tocar
+        if cal.get("estado") not in ("Aprobado", "Calificado", "Reprobado"):
+            continue  # pendiente → no tocar
+
+        nombre = act.get("nombre", "")
+        # Resolver task_id por nombre exacto
+        task_id = tasks_map.get(nombre, {}).get("id") if isinstance(tasks_map.get(nombre), dict) else None
+        if not task_id:
+            # buscar por match flexible
+            for task_name, task_info in tasks_map.items():
+                if task_name.lower() in nombre.lower() or nombre.lower() in task_name.lower():
+                    task_id = task_info.get("id") if isinstance(task_info, dict) else None
+                    if task_id:
+                        break
+        if not task_id:
+            sin_tarea.append(nombre)
+            continue
+        candidatas.append({"nombre": nombre, "task_id": task_id, "actividad": act})
+    return candidatas, sin_tarea
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Sincronizar calificaciones Moodle → ClickUp"
@@ -177,6 +192,12 @@ def main():
         action="store_true",
         help="Solo listar las tareas que se actualizarían, sin hacer cambios",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Llamadas concurrentes a la API de ClickUp (default: {DEFAULT_WORKERS})",
+    )
     args = parser.parse_args()
 
     ruta_curso = os.path.abspath(args.ruta_curso)
@@ -196,7 +217,8 @@ def main():
     if args.dry_run:
         console.print("[bold yellow]MODO DRY-RUN — sin cambios en ClickUp[/bold yellow]\n")
 
-    client = get_client()
+    workers = max(1, args.workers)
+    client = ClienteContado(get_client(), crear_limiter(workers))
 
     # 1) Cargar clickup.json para resolver list + tareas
     with open(clickup_json) as f:
@@ -216,70 +238,76 @@ def main():
     print(f"Status '{STATUS_CALIFICADO}' → '{status_name}'\n")
 
     # 4) Encontrar tareas calificadas: cruzar por nombre snapshot ↔ clickup
-    actualizadas = []
-    saltadas = []
-
-    for key, act in snapshot["actividades"].items():
-        cal = act.get("calificacion")
-        if not cal or not cal.get("nota"):
-            continue  # sin calificación numérica → no tocar
-        if cal.get("estado") not in ("Aprobado", "Calificado", "Reprobado"):
-            continue  # pendiente → no tocar
-
-        nombre = act.get("nombre", "")
-        # Resolver task_id por nombre exacto
-        task_id = tasks_map.get(nombre, {}).get("id") if isinstance(tasks_map.get(nombre), dict) else None
-        if not task_id:
-            # buscar por match flexible
-            for task_name, task_info in tasks_map.items():
-                if task_name.lower() in nombre.lower() or nombre.lower() in task_name.lower():
-                    task_id = task_info.get("id") if isinstance(task_info, dict) else None
-                    if task_id:
-                        break
-        if not task_id:
-            print(f"⚠ No se encontró task_id para: {nombre}")
-            continue
+    candidatas, sin_tarea = tareas_candidatas(snapshot, tasks_map)
+    for nombre in sin_tarea:
+        print(f"⚠ No se encontró task_id para: {nombre}")
+
+    # 5) Prefetch: tareas de la lista + comentarios de las no registradas
+    ids = [c["task_id"] for c in candidatas]
+    tareas = prefetch_tareas(client, curso["list_id"]) if curso.get("list_id") and ids else {}
+    faltantes = [t for t in ids if t not in tareas]
+    tareas.update(prefetch_tareas_sueltas(client, faltantes, workers))
+    registro = cargar_registro(ruta_curso)
+    comentarios = prefetch_comentarios(
+        client, [t for t in ids if t not in registro], COMMENT_TAG, workers
+    )
 
-        # Verificar estado actual
-        ya_calificada = tarea_ya_calificada(client, task_id)
-        ya_comentario = tiene_comentario_sync(client, task_id)
+    # 6) Diff local
+    plan = planear_sync(candidatas, tareas, comentarios, registro, status_name)
+    for entrada in plan:
+        if entrada["comentar"]:
+            entrada["texto"] = format_comentario(entrada["actividad"], list_name)
+    saltadas = [e["nombre"] for e in plan
+                if not (e["cambiar_status"] or e["comentar"] or e["comentarios_desconocidos"])]
+    for nombre in saltadas:
+        print(f"= {nombre:35s}  ya calificada y con comentario — skip")
+    sin_verificar = [e["nombre"] for e in plan if e["comentarios_desconocidos"]]
+    for nombre in sin_verificar:
+        print(f"? {nombre:35s}  comentarios no disponibles — comentario omitido")
 
-        if ya_calificada and ya_comentario:
-            print(f"= {nombre:35s}  ya calificada y con comentario — skip")
-            saltadas.append(nombre)
-            continue
-
-        if args.dry_run:
+    if args.dry_run:
+        for e in plan:
             accion = []
-            if not ya_calificada:
+            if e["cambiar_status"]:
                 accion.append(f"status → {status_name}")
-            if not ya_comentario:
+            if e["comentar"]:
                 accion.append("comentario")
-            print(f"· {nombre:35s}  DRY: {', '.join(accion) or 'noop'}")
-            continue
-
-        # 5a) Actualizar status si no está ya
-        if not ya_calificada:
-            update_status(client, task_id, status_name)
-            print(f"✓ {nombre:35s}  status → {status_name}")
-        else:
-            print(f"= {nombre:35s}  status ya era {status_name}")
-
-        # 5b) Dejar comentario
-        texto = format_comentario(act, list_name)
-        post_comentario(client, task_id, texto)
-        print(f"  + comentario: nota={cal.get('nota')}, aporte={cal.get('aporte_curso')}")
-
-        actualizadas.append(nombre)
-
+            if accion:
+                print(f"· {e['nombre']:35s}  DRY: {', '.join(accion)}")
+        resultados = []
+    else:
+        # 7) Solo las mutaciones necesarias, en paralelo bajo el rate limiter
+        resultados = aplicar_plan(client, plan, status_name, workers)
+        cal_por_id = {e["task_id"]: e["actividad"]["calificacion"] for e in plan}
+        for r in resultados:
+            if r["status"]:
+                print(f"✓ {r['nombre']:35s}  status → {status_name}")
+            if r["comentario"]:
+                cal = cal_por_id[r["task_id"]]
+                print(f"  + comentario: nota={cal.get('nota')}, aporte={cal.get('aporte_curso')}")
+            if r["error"]:
+                print(f"✗ {r['nombre']:35s}  {r['error']}")
+        guardar_registro(ruta_curso, registrar_comentarios(registro, plan, comentarios, resultados))
+
+    actualizadas = [r["nombre"] for r in resultados if not r["error"]]
+    errores = [r for r in resultados if r["error"]]
     print()
     print(f"Actualizadas: {len(actualizadas)}")
     print(f"Saltadas (ya sincronizadas): {len(saltadas)}")
+    if errores:
+        print(f"Con error: {len(errores)}")
+    if sin_verificar:
+        print(f"Sin comentario (no se pudieron leer los existentes): {len(sin_verificar)}")
+    detalle = ", ".join(f"{m} {n}" for m, n in sorted(client.llamadas.items()))
+    print(f"Llamadas API: {client.total} ({detalle or 'ninguna'}) — "
+          f"flujo anterior: {llamadas_flujo_anterior(plan)}")
     if actualizadas:
         print()
         print("Tareas actualizadas en ClickUp:")
         for n in actualizadas:
             print(f"  - {n}")
+    if errores:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
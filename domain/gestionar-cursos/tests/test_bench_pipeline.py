@@ -0,0 +1,69 @@
+"""Tests del benchmark offline (bench_pipeline + moodle_falso): el pipeline
+real en modo requests corre completo contra el Moodle local y la
+comparación contra baseline marca regresiones.
+"""
+import bench_pipeline
+import browser_api
+import navegador_requests
+import pytest
+import store_materiales
+
+_PARAMETROS = {
+    "unidades": 1,
+    "actividades_por_unidad": 5,
+    "hilos_por_foro": 4,
+    "hilos_por_pagina": 3,
+    "kb_por_binario": 4,
+    "latencia": 0.0,
+    "workers": 2,
+    "intervalo_host": 0.0,
+}
+
+
+@pytest.fixture
+def estado_global(monkeypatch, tmp_path):
+    """Restaura backend, sesión, cortesía, caché HTTP y store al terminar."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("OPENROUTER_API_KEY", raising=False)
+    monkeypatch.setattr(browser_api, "_use_requests", browser_api._use_requests)
+    monkeypatch.setattr(navegador_requests, "_session", navegador_requests._session)
+    monkeypatch.setitem(navegador_requests._cache_http, "store",
+                        navegador_requests._cache_http["store"])
+    monkeypatch.setitem(store_materiales._config, "directorio",
+                        store_materiales._config["directorio"])
+    yield
+    navegador_requests.configurar_cortesia(0, 0.0)
+
+
+def test_pipeline_completo_contra_moodle_local(estado_global, tmp_path):
+    resultado = bench_pipeline.ejecutar(_PARAMETROS, str(tmp_path / "bench"))
+
+    fases = resultado["fases"]
+    assert list(fases) == list(bench_pipeline.FASES)
+    assert {f: m["error"] for f, m in fases.items()} == dict.fromkeys(bench_pipeline.FASES, "")
+    assert all(m["requests"] > 0 for m in fases.values())
+    assert fases["init"]["por_tipo"]["binario"] > 0
+    assert fases["calificaciones"]["por_tipo"] == {"grade": 1}
+    assert resultado["no_encontradas"] == {}
+
+
+def _resultado(segundos, requests, rss):
+    return {"fases": {"init": {"segundos": segundos, "requests": requests,
+                               "rss_pico_mb": rss}}}
+
+
+def test_comparar_marca_regresiones():
+    baseline = _resultado(1.0, 40, 60.0)
+
+    filas = bench_pipeline.comparar(_resultado(1.1, 41, 62.0), baseline, tolerancia=0.2)
+    assert {f["metrica"]: f["regresion"] for f in filas} == {
+        "segundos": False, "requests": True, "rss_pico_mb": False}
+
+    filas = bench_pipeline.comparar(_resultado(1.5, 38, 90.0), baseline, tolerancia=0.2)
+    assert {f["metrica"]: f["regresion"] for f in filas} == {
+        "segundos": True, "requests": False, "rss_pico_mb": True}
+
+    # Aumento relativo grande pero por debajo del mínimo absoluto: ruido
+    filas = bench_pipeline.comparar(_resultado(0.03, 40, None), _resultado(0.01, 40, None))
+    assert [(f["metrica"], f["regresion"]) for f in filas] == [
+        ("segundos", False), ("requests", False)]
@@ -0,0 +1,102 @@
+"""Tests de la caché HTTP condicional (cache_http + navegador_requests._get).
+Sin red: la sesión es un fake que responde 304 si el validador coincide.
+"""
+import pytest
+import requests
+from cache_http import CacheHTTP
+from requests.structures import CaseInsensitiveDict
+
+
+def _resp(url, status, body=b"", headers=None):
+    r = requests.Response()
+    r.status_code = status
+    r.url = url
+    r._content = body
+    r.headers = CaseInsensitiveDict(headers or {})
+    r.encoding = "utf-8"
+    return r
+
+
+class _SesionCondicional:
+    """ETag en /mod/ y pluginfile; /sin-validador sin ETag; /login simula sesión expirada."""
+
+    def __init__(self):
+        self.version = 1
+        self.pedidos = []
+
+    def get(self, url, headers=None, **kwargs):
+        headers = headers or {}
+        self.pedidos.append((url, dict(headers)))
+        etag = f'"v{self.version}"'
+        if "sin-validador" in url:
+            return _resp(url, 200, b"<html>dinamica</html>",
+                         {"Cache-Control": "no-store, no-cache"})
+        if "expirada" in url:
+            return _resp("https://moodle.test/login/index.php", 200, b"login", {"ETag": '"l"'})
+        if headers.get("If-None-Match") == etag:
+            return _resp(url, 304)
+        body = f"<html>version {self.version}</html>".encode()
+        return _resp(url, 200, body, {"ETag": etag, "Content-Type": "text/html; charset=utf-8"})
+
+    def mount(self, *args):
+        pass
+
+
+@pytest.fixture
+def navegador(monkeypatch, tmp_path):
+    import navegador_requests
+
+    sesion = _SesionCondicional()
+    monkeypatch.setattr(navegador_requests, "_session", sesion)
+    navegador_requests.configurar_cortesia(0, 0.0)
+    navegador_requests.configurar_cache_http(str(tmp_path / "http"))
+    yield navegador_requests, sesion
+    navegador_requests.configurar_cache_http(None)
+
+
+def test_store_deduplica_cuerpos_por_hash(tmp_path):
+    cache = CacheHTTP(str(tmp_path))
+    sha_a = cache.put("https://m/a", url_final="https://m/a", body=b"igual", etag='"1"')
+    sha_b = cache.put("https://m/b", url_final="https://m/b", body=b"igual")
+    assert sha_a == sha_b
+    assert cache.stats()["cuerpos"] == 1
+    assert cache.get("https://m/a")["body"] == b"igual"
+
+    cache.put("https://m/a", url_final="https://m/a", body=b"otro")
+    cache.put("https://m/b", url_final="https://m/b", body=b"otro mas")
+    assert cache.stats()["cuerpos"] == 2  # el cuerpo huérfano se borra
+
+
+def test_revalida_con_etag_y_reutiliza_cuerpo_en_304(navegador):
+    nav, sesion = navegador
+    url = "https://moodle.test/mod/quiz/view.php?id=1"
+
+    assert "version 1" in nav.obtener_pagina(url)[1]
+    assert "version 1" in nav.obtener_pagina(url)[1]
+    assert sesion.pedidos[1][1]["If-None-Match"] == '"v1"'
+
+    sesion.version = 2
+    assert "version 2" in nav.obtener_pagina(url)[1]
+
+    stats = nav.stats_cache_http()
+    assert (stats["descargadas"], stats["revalidadas"]) == (2, 1)
+    assert "1 con 304" in nav.resumen_cache_http()
+
+
+def test_pluginfile_se_sirve_sin_request_dentro_del_ttl(navegador):
+    nav, sesion = navegador
+    url = "https://moodle.test/pluginfile.php/9/mod_resource/content/1/guia.pdf"
+
+    assert nav.hacer_get(url) == b"<html>version 1</html>"
+    assert nav.hacer_get(url) == b"<html>version 1</html>"
+    assert len(sesion.pedidos) == 1
+    assert nav.stats_cache_http()["frescas"] == 1
+
+
+def test_no_guarda_paginas_sin_validador_ni_redirect_a_login(navegador):
+    nav, sesion = navegador
+    for url in ("https://moodle.test/sin-validador", "https://moodle.test/mod/expirada"):
+        nav.obtener_pagina(url)
+        nav.obtener_pagina(url)
+    assert all(not h for _, h in sesion.pedidos)
+    assert nav.stats_cache_http()["respuestas"] == 0
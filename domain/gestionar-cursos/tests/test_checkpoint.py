@@ -0,0 +1,86 @@
+"""Tests del checkpoint con journal: reanudar sin reescribir `.progress.json`,
+workers concurrentes sobre el mismo curso, fallos y compactación.
+"""
+import json
+import threading
+
+import checkpoint as cp
+import pytest
+
+
+def _acts(n):
+    return [{"nombre": f"Act {i}", "url": f"https://m.test/mod/page/view.php?id={i}",
+             "tipo": "page"} for i in range(n)]
+
+
+@pytest.fixture
+def curso(tmp_path):
+    yield str(tmp_path)
+    cp._close_all()
+
+
+def test_reanuda_desde_journal_sin_reescribir_base(curso, tmp_path):
+    acts = _acts(4)
+    estado = cp.create_checkpoint("https://m.test/course/view.php?id=1", "C1", acts)
+    cp.save_checkpoint(curso, estado)
+    base = (tmp_path / cp.CHECKPOINT_FILENAME).read_bytes()
+
+    cp.record_done(curso, estado, acts[0], "Unidad-1/a0.md")
+    cp.record_done(curso, estado, acts[2], "Unidad-1/a2.md")
+    cp._close_all()
+    with open(next(tmp_path.glob(cp.JOURNAL_GLOB)), "a", encoding="utf-8") as f:
+        f.write('{"evento": "done", "activity": {"url": "https://m.te')  # corte a mitad
+
+    assert (tmp_path / cp.CHECKPOINT_FILENAME).read_bytes() == base
+    cargado = cp.load_checkpoint(curso)
+    assert [a["url"] for a in cargado["pending"]] == [acts[1]["url"], acts[3]["url"]]
+    assert [a["result_path"] for a in cargado["completed"]] == ["Unidad-1/a0.md",
+                                                               "Unidad-1/a2.md"]
+
+
+def test_workers_concurrentes_no_se_pisan(curso, tmp_path):
+    acts = _acts(60)
+    cp.save_checkpoint(curso, cp.create_checkpoint("u", "C", acts))
+    otro_proceso = cp.Journal(curso, worker="otro", fsync_cada=1)
+
+    def _worker(lote):
+        estado = cp.load_checkpoint(curso)
+        for act in lote:
+            cp.record_done(curso, estado, act, act["nombre"])
+
+    hilos = [threading.Thread(target=_worker, args=(acts[i:40:4],)) for i in range(4)]
+    for h in hilos:
+        h.start()
+    for act in acts[40:]:
+        otro_proceso.done(act, act["nombre"])
+    for h in hilos:
+        h.join()
+    otro_proceso.close()
+
+    cargado = cp.load_checkpoint(curso)
+    assert cargado["pending"] == []
+    assert sorted(a["url"] for a in cargado["completed"]) == sorted(a["url"] for a in acts)
+    assert len(list(tmp_path.glob(cp.JOURNAL_GLOB))) == 2
+
+
+def test_fallidas_se_reintentan_y_compactacion(curso, tmp_path):
+    acts = _acts(3)
+    estado = cp.create_checkpoint("u", "C", acts)
+    cp.save_checkpoint(curso, estado)
+    cp.record_failed(curso, estado, acts[0], "HTTP 500")
+    cp.record_done(curso, estado, acts[1], "a1.md")
+    assert [a["url"] for a in estado["pending"]] == [acts[2]["url"]]
+    cp.save_checkpoint(curso, estado)  # base sin acts[0] en pending: sigue en failed
+
+    compactado = cp.compact_checkpoint(curso)
+
+    assert list(tmp_path.glob(cp.JOURNAL_GLOB)) == []
+    assert {a["url"] for a in compactado["pending"]} == {acts[0]["url"], acts[2]["url"]}
+    assert compactado["failed"][acts[0]["url"]]["intentos"] == 1
+    base = json.loads((tmp_path / cp.CHECKPOINT_FILENAME).read_text(encoding="utf-8"))
+    assert [a["result_path"] for a in base["completed"]] == ["a1.md"]
+
+    cp.record_done(curso, compactado, acts[0], "a0.md")
+    assert cp.load_checkpoint(curso)["failed"] == {}
+    cp.clear_checkpoint(curso)
+    assert not cp.has_checkpoint(curso) and list(tmp_path.glob(".progress*")) == []
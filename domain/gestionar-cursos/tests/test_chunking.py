@@ -0,0 +1,52 @@
+"""Tests de chunking: fronteras naturales y presupuesto por tokens."""
+import pytest
+from chunking import dividir_texto, estimar_tokens, planear_chunks, presupuesto_tokens
+
+
+def test_dividir_texto_no_corta_palabras_ni_pierde_texto():
+    """Los chunks reconstruyen el texto original y terminan en frontera de palabra."""
+    texto = " ".join(f"palabra{i}" for i in range(2000))
+    chunks = dividir_texto(texto, max_tokens=200)
+    assert len(chunks) > 1
+    assert "".join(chunks) == texto
+    for c in chunks[:-1]:
+        assert c.endswith(" ")
+        assert estimar_tokens(c) <= 200
+
+
+def test_dividir_texto_prefiere_headings_y_respeta_tablas():
+    """Cada seccion markdown queda en su chunk; una tabla nunca se parte."""
+    tabla = "| A | B |\n|---|---|\n" + "".join(f"| {i} | x |\n" for i in range(20))
+    seccion_1 = "# Unidad 1\n\n" + "Texto de la unidad uno. " * 20 + "\n\n" + tabla
+    seccion_2 = "# Unidad 2\n\n" + "Texto de la unidad dos. " * 20 + "\n"
+    texto = seccion_1 + "\n" + seccion_2
+    chunks = dividir_texto(texto, max_tokens=estimar_tokens(seccion_1) + 5)
+    assert len(chunks) == 2
+    assert chunks[0].startswith("# Unidad 1")
+    assert tabla in chunks[0]
+    assert chunks[1].startswith("# Unidad 2")
+
+
+def test_dividir_texto_baja_a_oraciones_si_el_parrafo_no_cabe():
+    """Un parrafo gigante se parte por oraciones, no a mitad de oracion."""
+    texto = "Esta es una oracion completa. " * 100
+    chunks = dividir_texto(texto, max_tokens=50)
+    for c in chunks:
+        assert c.rstrip().endswith(".")
+
+
+def test_presupuesto_tokens_descuenta_salida_y_aplica_tope():
+    """El presupuesto descuenta max_output y respeta max_chunk_tokens."""
+    assert presupuesto_tokens(10000, max_output=2000) == 7500
+    assert presupuesto_tokens(10000, max_output=2000, max_chunk_tokens=3000) == 3000
+    assert presupuesto_tokens(None, max_output=2000, max_chunk_tokens=3000) == 3000
+
+
+def test_planear_chunks_reporta_ahorro_frente_al_splitter_por_caracteres():
+    """Con presupuesto mayor que 8000 chars hay menos requests y 0 overlap enviado."""
+    texto = "Parrafo de prueba con contenido academico.\n\n" * 3000  # ~132k chars
+    plan = planear_chunks(texto, max_tokens=7000)
+    assert plan["chunks_legado"] == pytest.approx(18, abs=1)
+    assert len(plan["chunks"]) < plan["chunks_legado"]
+    assert plan["overlap_tokens_ahorrados"] > 0
+    assert "".join(plan["chunks"]) == texto
@@ -236,3 +236,80 @@ def test_orden_persistencia_antes_de_resumen_b2(mock_rich_console, tmp_path, mon
     # El snapshot.json quedo actualizado
     snap = json.loads(snap_path.read_text(encoding="utf-8"))
     assert "calificaciones_capturadas" in snap
+
+
+_GRADEBOOK = """<table class="user-grade"><tr>
+<th class="level2 item b1b column-itemname" id="row_1">
+<a class="gradeitemheader" href="https://moodle/mod/quiz/view.php?id={mod}">Quiz 1</a>
+<span class="dimmed_text" title="Cuestionario"></span></th>
+<td class="column-weight">10,00 %</td>
+<td class="column-grade"><div class="d-flex">4,50<i class="fa fa-check text-success"></i></div></td>
+<td class="column-range">0&ndash;5</td><td class="column-percentage">90,00 %</td>
+<td class="column-contributiontocoursetotal">9,00 %</td><td class="column-feedback"></td>
+</tr></table>"""
+
+
+def _curso_fake(periodo, nombre, courseid, mod_id):
+    curso = periodo / nombre
+    (curso / "_cache").mkdir(parents=True)
+    (curso / "AGENTS.md").write_text(
+        f"[URL](https://moodle/course/view.php?id={courseid})\n", encoding="utf-8")
+    (curso / "_cache" / "snapshot.json").write_text(json.dumps({"actividades": {
+        f"Quiz 1 (https://moodle/mod/quiz/view.php?id={mod_id})": {"nombre": "Quiz 1"},
+    }}), encoding="utf-8")
+    return curso
+
+
+def test_sincronizar_periodo_en_modo_requests(mock_rich_console, tmp_path, monkeypatch):
+    """Varios cursos del periodo: gradebook por requests, JSON + snapshot por
+    curso, y un curso con la sesión vencida no tumba a los demás."""
+    import cli_calificaciones
+    import navegador_requests
+
+    a = _curso_fake(tmp_path, "2607A-curso-a", "101", "11")
+    b = _curso_fake(tmp_path, "2607B-curso-b", "202", "22")
+    _curso_fake(tmp_path, "2607C-curso-c", "303", "33")
+    (tmp_path / "notas-sueltas").mkdir()
+
+    def _obtener(url):
+        courseid = url.rsplit("=", 1)[1]
+        if courseid == "303":
+            return "https://moodle/login/index.php", "<html>login</html>"
+        return url, _GRADEBOOK.format(mod={"101": "11", "202": "22"}[courseid])
+
+    monkeypatch.setattr(navegador_requests, "obtener_pagina", _obtener)
+    rutas = cli_calificaciones._cursos_del_periodo(str(tmp_path))
+    assert [os.path.basename(r) for r in rutas] == [
+        "2607A-curso-a", "2607B-curso-b", "2607C-curso-c"]
+
+    resultados = cli_calificaciones.sincronizar_calificaciones(rutas, workers=3)
+
+    assert [r["courseid"] for r in resultados] == ["101", "202", "303"]
+    assert "Sesión expirada" in resultados[2]["error"]
+    for curso, courseid in ((a, "101"), (b, "202")):
+        items = json.loads((curso / "_cache" / f"calificaciones_{courseid}.json")
+                           .read_text(encoding="utf-8"))
+        assert [(i["nombre"], i["calificacion"], i["estado"]) for i in items] == [
+            ("Quiz 1", "4,50", "Aprobado")]
+        snap = json.loads((curso / "_cache" / "snapshot.json").read_text(encoding="utf-8"))
+        assert next(iter(snap["actividades"].values()))["calificacion"]["nota"] == "4,50"
+    assert all(r["segundos_descarga"] >= 0 for r in resultados)
+    cli_calificaciones._imprimir_resumen_periodo(resultados, 0.5)
+
+
+def test_main_con_carpeta_de_periodo_usa_requests(mock_rich_console, tmp_path, monkeypatch):
+    """Una carpeta sin AGENTS.md se trata como periodo y no abre Chrome."""
+    import cli_calificaciones
+
+    _curso_fake(tmp_path, "2607A-curso-a", "101", "11")
+    llamadas = []
+    monkeypatch.setattr(cli_calificaciones, "_abrir_driver_cdp",
+                        lambda: pytest.fail("no debe abrir Chrome"))
+    monkeypatch.setattr(cli_calificaciones, "_main_requests",
+                        lambda rutas, workers, dry_run: llamadas.append((rutas, workers, dry_run)))
+    monkeypatch.setattr(sys, "argv", ["cli_calificaciones.py", str(tmp_path), "--workers", "2",
+                                      "--dry-run"])
+
+    cli_calificaciones.main()
+
+    assert llamadas == [([str(tmp_path / "2607A-curso-a")], 2, True)]
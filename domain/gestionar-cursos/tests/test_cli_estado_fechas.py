@@ -0,0 +1,186 @@
+"""Tests de cli_estado.extraer_fechas_paralelo: descargas requests
+concurrentes y Chrome solo como fallback. Sin red: sesión fake.
+"""
+import json
+import threading
+import time
+
+import pytest
+from sincronizar_curso import huella_html
+
+_HTML_FECHAS = """<html><div id="region-main">
+<div data-region="activity-dates">
+  <div><strong>Abrió:</strong> lunes, 6 de julio de 2026, 00:00</div>
+  <div><strong>Cierra:</strong> domingo, 19 de julio de 2026, 23:59</div>
+</div></div></html>"""
+
+
+class _Resp:
+    def __init__(self, url, text):
+        self.url = url
+        self.text = text
+
+    def raise_for_status(self):
+        pass
+
+
+class _SesionMoodle:
+    """Fechas en cada actividad; /js redirige a login (página sin SSR)."""
+
+    def __init__(self):
+        self.en_vuelo = 0
+        self.max_en_vuelo = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        with self._lock:
+            self.en_vuelo += 1
+            self.max_en_vuelo = max(self.max_en_vuelo, self.en_vuelo)
+        time.sleep(0.02)
+        with self._lock:
+            self.en_vuelo -= 1
+        if "js=1" in url:
+            return _Resp("https://moodle.test/login/index.php", "<html>login</html>")
+        return _Resp(url, _HTML_FECHAS)
+
+    def mount(self, *args):
+        pass
+
+
+@pytest.fixture
+def sesion(monkeypatch):
+    import navegador_requests
+
+    sesion = _SesionMoodle()
+    monkeypatch.setattr(navegador_requests, "_session", sesion)
+    navegador_requests.configurar_cortesia(0, 0.0)
+    return sesion
+
+
+def _actividades(n, extra=()):
+    acts = [{"nombre": f"Quiz {i}", "url": f"https://moodle.test/mod/quiz/view.php?id={i}",
+             "tipo": "quiz", "seccion": f"Unidad {i % 3 + 1}"} for i in range(n)]
+    acts.append({"nombre": "Recurso", "url": "https://moodle.test/mod/resource/view.php?id=99",
+                 "tipo": "resource", "seccion": "Unidad 1"})
+    return acts + list(extra)
+
+
+def test_fechas_de_todas_las_unidades_en_paralelo(sesion, monkeypatch):
+    import cli_estado
+
+    monkeypatch.setattr(cli_estado, "_fechas_navegador",
+                        lambda act: pytest.fail("no debía abrir Chrome"))
+    fechas = cli_estado.extraer_fechas_paralelo(_actividades(9), workers=4)
+
+    assert len(fechas) == 9  # el resource no se visita
+    assert fechas["/mod/quiz/view.php?id=3"] == {
+        "fecha_apertura": "2026-07-06T00:00",
+        "fecha_cierre": "2026-07-19T23:59",
+        "huella": huella_html(_HTML_FECHAS),
+        "nombre": "Quiz 3",
+    }
+    assert sesion.max_en_vuelo == 4
+
+
+def test_chrome_solo_para_paginas_que_necesitan_js(sesion, monkeypatch):
+    import cli_estado
+
+    con_js = {"nombre": "Taller", "url": "https://moodle.test/mod/workshop/view.php?id=7&js=1",
+              "tipo": "workshop", "seccion": "Unidad 2"}
+    abiertas = []
+
+    def _chrome(act):
+        abiertas.append(act["url"])
+        return {"fecha_apertura": "2026-08-01", "fecha_cierre": ""}
+
+    monkeypatch.setattr(cli_estado, "_fechas_navegador", _chrome)
+    fechas = cli_estado.extraer_fechas_paralelo(_actividades(3, [con_js]), workers=4)
+
+    assert abiertas == [con_js["url"]]
+    assert fechas["/mod/workshop/view.php?id=7&js=1"]["fecha_apertura"] == "2026-08-01"
+    assert len(fechas) == 4
+
+    # --requests: sin Chrome, la página con JS queda sin fechas
+    abiertas.clear()
+    fechas = cli_estado.extraer_fechas_paralelo(_actividades(3, [con_js]), workers=4,
+                                                usar_navegador=False)
+    assert abiertas == [] and len(fechas) == 3
+
+
+class _SesionPeriodo:
+    """Dos cursos: página del curso con Unidad 1 (quiz + foro evaluable)."""
+
+    def __init__(self):
+        self.cursos_en_vuelo = 0
+        self.max_cursos_en_vuelo = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        if "/course/view.php" in url:
+            with self._lock:
+                self.cursos_en_vuelo += 1
+                self.max_cursos_en_vuelo = max(self.max_cursos_en_vuelo, self.cursos_en_vuelo)
+            time.sleep(0.05)
+            with self._lock:
+                self.cursos_en_vuelo -= 1
+            c = url.rsplit("=", 1)[1]
+            return _Resp(url, f"""<ul><li class="section main" id="section-1">
+<h3 class="sectionname">Unidad 1</h3><ul>
+<li class="activity"><a href="https://moodle.test/mod/quiz/view.php?id={c}1">Quiz {c}</a></li>
+<li class="activity"><a href="https://moodle.test/mod/forum/view.php?id={c}2">Foro (10%)</a></li>
+</ul></li></ul>""")
+        return _Resp(url, _HTML_FECHAS)
+
+    def mount(self, *args):
+        pass
+
+
+def _curso_estado(periodo, nombre, c):
+    curso = periodo / nombre
+    (curso / "_cache").mkdir(parents=True)
+    (curso / "AGENTS.md").write_text(
+        f"- **URL**: https://moodle.test/course/view.php?id={c}\n", encoding="utf-8")
+    quiz = f"/mod/quiz/view.php?id={c}1"
+    (curso / "_cache" / "snapshot.json").write_text(json.dumps({"actividades": {
+        quiz: {"nombre": f"Quiz {c}", "tipo": "quiz", "seccion": "Unidad 1",
+               "fecha_apertura": "2026-07-06T00:00", "fecha_cierre": "2026-07-12T23:59",
+               "calificacion": {"nota": "4,0"}},
+        "/mod/page/view.php?id=9": {"nombre": "Vieja", "tipo": "page", "seccion": "Unidad 1"},
+    }}), encoding="utf-8")
+    return curso
+
+
+def test_periodo_revisa_cursos_a_la_vez(monkeypatch, tmp_path):
+    import browser_api
+    import cli_estado
+    import navegador_requests
+
+    sesion = _SesionPeriodo()
+    monkeypatch.setattr(navegador_requests, "_session", sesion)
+    monkeypatch.setattr(browser_api, "_use_requests", True)
+    navegador_requests.configurar_cortesia(0, 0.0)
+    a = _curso_estado(tmp_path, "2607A-curso-a", "1")
+    _curso_estado(tmp_path, "2607B-curso-b", "2")
+    (tmp_path / "2607B-curso-b" / "_cache" / "foros_cache.json").write_text(
+        json.dumps({"55": {"url": "https://moodle.test/mod/forum/discuss.php?d=55"}}),
+        encoding="utf-8")
+    (tmp_path / "sin-agents").mkdir()
+
+    rutas = cli_estado.cursos_del_periodo(str(tmp_path))
+    resultados = cli_estado.revisar_periodo(rutas, workers=2)
+
+    assert [r["curso"] for r in resultados] == ["2607A-curso-a", "2607B-curso-b"]
+    assert sesion.max_cursos_en_vuelo == 2
+    assert all(not r["error"] for r in resultados)
+    r = resultados[0]
+    assert [n["nombre"] for n in r["diff"]["nuevas"]] == ["Foro (10%)"]
+    assert [e["nombre"] for e in r["diff"]["eliminadas"]] == ["Vieja"]
+    assert {c["nombre"]: c["fecha_cierre_nueva"] for c in r["cambios_fecha"]}["Quiz 1"] == (
+        "2026-07-19T23:59")
+    assert resultados[0]["foros"] == []
+    assert resultados[1]["foros"] == ["### Foros evaluables\n- **Hilos removidos (1):** 55"]
+
+    snap = json.loads((a / "_cache" / "snapshot.json").read_text(encoding="utf-8"))
+    assert snap["actividades"]["/mod/quiz/view.php?id=11"]["fecha_cierre"] == "2026-07-19T23:59"
+    assert snap["actividades"]["/mod/quiz/view.php?id=11"]["calificacion"] == {"nota": "4,0"}
+    cli_estado.reporte_periodo(resultados, 0.1)
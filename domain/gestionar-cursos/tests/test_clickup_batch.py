@@ -0,0 +1,192 @@
+"""Tests del sync por lotes calificaciones → ClickUp (clickup_batch): prefetch
+por lista, plan local, mutaciones concurrentes y conteo de llamadas.
+Sin red: un ClickUp fake en memoria.
+"""
+import threading
+
+import clickup_batch as cb
+import pytest
+from rate_limiter import RateLimiter
+
+_TAG = "[calificaciones-auto]"
+
+
+class _Resp:
+    def __init__(self, data, status_code=200):
+        self._data = data
+        self.status_code = status_code
+        self.headers = {}
+        self.text = ""
+
+    def json(self):
+        return self._data
+
+
+class _ClickUpFake:
+    """Lista L1 con tareas t0..t{n-1}; t0 ya calificada y comentada."""
+
+    def __init__(self, n, por_pagina=cb.TAREAS_POR_PAGINA):
+        self.tareas = {f"t{i}": {"id": f"t{i}", "status": {"status": "to do"}} for i in range(n)}
+        self.tareas["t0"]["status"]["status"] = "Calificado"
+        self.comentarios = {t: [] for t in self.tareas}
+        self.comentarios["t0"].append({"comment_text": f"{_TAG} nota"})
+        self.por_pagina = por_pagina
+        self.lock = threading.Lock()
+
+    def get(self, endpoint, params=None):
+        if endpoint.endswith("/comment"):
+            return _Resp({"comments": self.comentarios[endpoint.split("/")[2]]})
+        if endpoint.startswith("/list/"):
+            ids = sorted(self.tareas)
+            i = params["page"] * self.por_pagina
+            return _Resp({"tasks": [self.tareas[t] for t in ids[i:i + self.por_pagina]],
+                          "last_page": i + self.por_pagina >= len(ids)})
+        return _Resp(self.tareas[endpoint.split("/")[2]])
+
+    def put(self, endpoint, json):
+        self.tareas[endpoint.split("/")[2]]["status"]["status"] = json["status"]
+        return _Resp({})
+
+    def post(self, endpoint, json):
+        task_id = endpoint.split("/")[2]
+        if task_id == "t3":
+            return _Resp({}, status_code=500)
+        self.comentarios[task_id].append(json)
+        return _Resp({})
+
+
+def _candidatas(n):
+    return [{"nombre": f"Act {i}", "task_id": f"t{i}", "texto": f"{_TAG} {i}"}
+            for i in range(n)]
+
+
+def _sync(cliente, candidatas, registro, workers=4):
+    tareas = cb.prefetch_tareas(cliente, "L1")
+    ids = [c["task_id"] for c in candidatas]
+    comentarios = cb.prefetch_comentarios(cliente, [t for t in ids if t not in registro],
+                                          _TAG, workers)
+    plan = cb.planear_sync(candidatas, tareas, comentarios, registro, "calificado")
+    resultados = cb.aplicar_plan(cliente, plan, "calificado", workers)
+    return plan, comentarios, resultados
+
+
+def test_plan_local_y_solo_mutaciones_necesarias(monkeypatch):
+    monkeypatch.setattr(cb, "TAREAS_POR_PAGINA", 4)
+    fake = _ClickUpFake(6, por_pagina=4)
+    cliente = cb.ClienteContado(fake)
+    candidatas = _candidatas(5)  # t5 está en la lista pero no tiene nota
+
+    plan, comentarios, resultados = _sync(cliente, candidatas, registro={})
+
+    assert [(e["cambiar_status"], e["comentar"]) for e in plan] == [
+        (False, False), (True, True), (True, True), (True, True), (True, True)]
+    assert [r["task_id"] for r in resultados] == ["t1", "t2", "t3", "t4"]
+    assert resultados[2]["status"] and not resultados[2]["comentario"]
+    assert "comentario 500" in resultados[2]["error"]
+    assert fake.tareas["t5"]["status"]["status"] == "to do"
+    # 2 páginas de lista + 5 comentarios + 4 PUT + 4 POST
+    assert dict(cliente.llamadas) == {"GET": 7, "PUT": 4, "POST": 4}
+    assert cb.llamadas_flujo_anterior(plan) == 1 + 2 * 5 + 4 + 4
+
+    registro = cb.registrar_comentarios({}, plan, comentarios, resultados)
+    assert sorted(registro) == ["t0", "t1", "t2", "t4"]
+
+
+def test_registro_evita_releer_comentarios(tmp_path):
+    fake = _ClickUpFake(12)
+    candidatas = _candidatas(12)
+    cliente = cb.ClienteContado(fake)
+    plan, comentarios, resultados = _sync(cliente, candidatas, registro={})
+    cb.guardar_registro(str(tmp_path), cb.registrar_comentarios({}, plan, comentarios, resultados))
+
+    cliente = cb.ClienteContado(fake)
+    plan, _, resultados = _sync(cliente, candidatas, cb.cargar_registro(str(tmp_path)))
+
+    # Solo t3 (cuyo comentario falló) vuelve a pedir comentarios y a comentar
+    assert [(r["task_id"], r["status"], r["comentario"]) for r in resultados] == [
+        ("t3", False, False)]
+    assert dict(cliente.llamadas) == {"GET": 2, "POST": 1}
+    assert cb.llamadas_flujo_anterior(plan) == 1 + 2 * 12 + 1
+
+
+def test_limiter_acota_concurrencia(tmp_path):
+    fake = _ClickUpFake(8)
+    activas, maximo = [0], [0]
+    post_original = fake.post
+
+    def _post(endpoint, json):
+        with fake.lock:
+            activas[0] += 1
+            maximo[0] = max(maximo[0], activas[0])
+        try:
+            threading.Event().wait(0.02)
+            return post_original(endpoint, json)
+        finally:
+            with fake.lock:
+                activas[0] -= 1
+
+    fake.post = _post
+    limiter = RateLimiter("clickup-test", state_dir=str(tmp_path), requests_per_minute=6000,
+                          burst=50, max_concurrency=2)
+    cliente = cb.ClienteContado(fake, limiter)
+    plan = cb.planear_sync(_candidatas(8), {}, {}, {"t0": {}}, "calificado")
+
+    resultados = cb.aplicar_plan(cliente, plan, "calificado", workers=8)
+
+    assert len(resultados) == 8
+    assert maximo[0] <= 2
+    assert cliente.llamadas["PUT"] == 8
+
+
+@pytest.mark.parametrize("respuesta", [{"comments": []}, {}])
+def test_prefetch_comentarios_sin_tag(respuesta):
+    class _Cliente:
+        def get(self, endpoint):
+            return _Resp(respuesta)
+
+    assert cb.prefetch_comentarios(_Cliente(), ["a", "b"], _TAG) == {"a": False, "b": False}
+
+
+def test_prefetch_comentarios_no_200_no_comenta(capsys):
+    class _Cliente:
+        def get(self, endpoint):
+            if endpoint == "/task/b/comment":
+                return _Resp({"err": "Team not authorized"}, status_code=401)
+            return _Resp({"comments": []})
+
+    comentarios = cb.prefetch_comentarios(_Cliente(), ["a", "b"], _TAG)
+    assert comentarios == {"a": False, "b": None}
+    assert "HTTP 401" in capsys.readouterr().out
+
+    plan = cb.planear_sync(_candidatas(3)[1:], {}, {"t1": False, "t2": None}, {}, "calificado")
+    assert [(e["comentar"], e["comentarios_desconocidos"]) for e in plan] == [
+        (True, False), (False, True)]
+    assert cb.registrar_comentarios({}, plan, {"t1": False, "t2": None}, []) == {}
+
+
+def test_429_se_reintenta_acotado(monkeypatch):
+    esperas = []
+    monkeypatch.setattr(cb.time, "sleep", esperas.append)
+
+    class _Limitado:
+        def __init__(self, fallos):
+            self.fallos = fallos
+
+        def get(self, endpoint):
+            if self.fallos:
+                self.fallos -= 1
+                resp = _Resp({}, status_code=429)
+                resp.headers = {"Retry-After": "3"}
+                return resp
+            return _Resp({"ok": True})
+
+    cliente = cb.ClienteContado(_Limitado(fallos=2))
+    assert cliente.get("/task/t1").status_code == 200
+    assert esperas == [3.0, 3.0]
+    assert cliente.llamadas["GET"] == 3
+
+    esperas.clear()
+    cliente = cb.ClienteContado(_Limitado(fallos=99))
+    assert cliente.get("/task/t1").status_code == 429
+    assert len(esperas) == cb.REINTENTOS_429
+    assert cliente.llamadas["GET"] == cb.REINTENTOS_429 + 1
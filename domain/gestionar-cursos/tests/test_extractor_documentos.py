@@ -0,0 +1,83 @@
+"""Tests de extractor_documentos: tipo por magic bytes, lote en pool de
+procesos con PDF repartido por páginas y caché por sha256. Archivos generados.
+"""
+import io
+from pathlib import Path
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+docx = pytest.importorskip("docx")
+
+import extractor_documentos  # noqa: E402
+from extractor_documentos import detectar_tipo, extraer_textos_archivos  # noqa: E402
+
+
+def _pdf(ruta, paginas):
+    doc = fitz.open()
+    for i in range(paginas):
+        doc.new_page().insert_text((72, 72), f"Pagina {i} del syllabus")
+    doc.save(str(ruta))
+    doc.close()
+    return str(ruta)
+
+
+def _docx(ruta, texto):
+    d = docx.Document()
+    d.add_paragraph(texto)
+    d.save(str(ruta))
+    return str(ruta)
+
+
+def test_detectar_tipo_por_magic_bytes(tmp_path):
+    pdf = _pdf(tmp_path / "sin_extension", 1)
+    word = _docx(tmp_path / "archivo.pdf", "No soy PDF")
+
+    assert detectar_tipo(Path(pdf).read_bytes()[:8], pdf) == "pdf"
+    assert detectar_tipo(b"PK\x03\x04\x14\x00\x06\x00", word) == "docx"
+    assert detectar_tipo(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", io.BytesIO(b"")) is None
+    assert extraer_textos_archivos([word], workers=1, cache_dir=None) == ["No soy PDF"]
+
+
+def test_lote_en_pool_igual_a_extraccion_serial(tmp_path):
+    grande = _pdf(tmp_path / "grande.pdf", 45)  # 3 tareas de 20 páginas
+    chico = _pdf(tmp_path / "chico.pdf", 2)
+    word = _docx(tmp_path / "guia.docx", "Guía de la unidad")
+    copia = _pdf(tmp_path / "copia.pdf", 2)  # mismo contenido que chico
+
+    textos = extraer_textos_archivos([grande, chico, word, copia], workers=2, cache_dir=None)
+
+    serial = extractor_documentos._extraer_pdf(io.BytesIO(Path(grande).read_bytes()))
+    assert textos[0] == serial
+    assert "Pagina 44" in textos[0]
+    assert textos[1] == textos[3] and "Pagina 1" in textos[1]
+    assert textos[2] == "Guía de la unidad"
+
+
+def test_cache_por_contenido_no_reparsea(tmp_path, monkeypatch):
+    cache = str(tmp_path / "cache")
+    pdf = _pdf(tmp_path / "a.pdf", 3)
+    primero = extraer_textos_archivos([pdf], workers=1, cache_dir=cache)
+
+    renombrado = tmp_path / "otro_curso" / "b.pdf"
+    renombrado.parent.mkdir()
+    renombrado.write_bytes(Path(pdf).read_bytes())
+    monkeypatch.setattr(extractor_documentos, "_ejecutar_tarea",
+                        lambda t: pytest.fail("no debía reparsear"))
+
+    assert extraer_textos_archivos([str(renombrado)], workers=1, cache_dir=cache) == primero
+
+
+def test_pdf_truncado_falla_solo_ese_documento(tmp_path, capsys):
+    entero = _pdf(tmp_path / "entero.pdf", 2)
+    truncado = tmp_path / "truncado.pdf"
+    truncado.write_bytes(b"%PDF-1.4 garbage")
+    cache = str(tmp_path / "cache")
+
+    textos = extraer_textos_archivos([str(truncado), entero], workers=1, cache_dir=cache)
+
+    assert textos[0] is None
+    assert "Pagina 1" in textos[1]
+    assert "[WARN] Error extrayendo" in capsys.readouterr().out
+    assert extractor_documentos._leer_cache(
+        cache, extractor_documentos._hash_archivo(str(truncado))[0]) is None
@@ -0,0 +1,116 @@
+"""Tests del crawler de foros (extractor_foro): paginación del listado,
+filtro por autor, descarga de discusiones y corte por marca de agua.
+Sin red: páginas fake servidas por obtener_pagina en modo requests.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import extractor_foro
+import pytest
+from extractor_foro import (
+    cargar_estado_foros,
+    extraer_discusiones_foro,
+    extraer_discusiones_foro_incremental,
+)
+
+_FORO = "https://m.test/mod/forum/view.php?id=7"
+_PROFESOR = "Ana María Rojas"
+
+
+def _listado(discusiones, pagina, total_paginas):
+    filas = "".join(
+        f'<tr class="discussion{" pinned" if fijada else ""}">'
+        f'<td><a href="https://m.test/mod/forum/discuss.php?d={d}">Tema {d}</a></td>'
+        f'<td class="author">{autor}</td><td>0</td><td>1 mar 2026</td></tr>'
+        for d, autor, fijada in discusiones
+    )
+    paginas = "".join(f'<li><a href="{_FORO}&amp;p={n}">{n + 1}</a></li>'
+                      for n in range(total_paginas) if n != pagina)
+    return (f'<table class="forumheaderlist">{filas}</table>'
+            f'<nav class="pagination"><ul>{paginas}</ul></nav>')
+
+
+@pytest.fixture
+def foro(monkeypatch):
+    """Foro con 3 páginas de 3 discusiones (ids 9..1, creación descendente);
+    el profesor abrió las de id par. Registra las URLs pedidas."""
+    import browser_api
+
+    ids = list(range(9, 0, -1))
+    paginas = [ids[i:i + 3] for i in range(0, len(ids), 3)]
+    pedidas = []
+    fallan = set()
+
+    def _obtener(url):
+        pedidas.append(url)
+        if "discuss.php" in url:
+            d = int(url.rsplit("=", 1)[1])
+            if d in fallan:
+                raise ConnectionError("HTTP 503")
+            return url, (f'<article class="forum-post-container"><div class="post-message">'
+                         f'<p>Aviso {d}</p></div></article><div class="forumpost">réplica</div>')
+        n = extractor_foro._numero_pagina(url)
+        filas = [(d, _PROFESOR if d % 2 == 0 else f"Estudiante {d}", False)
+                 for d in paginas[n]]
+        if n == 0:
+            filas.insert(0, (2, _PROFESOR, True))  # fijada: siempre arriba
+        return url, _listado(filas, n, len(paginas))
+
+    monkeypatch.setattr(browser_api, "_use_requests", True)
+    monkeypatch.setattr(extractor_foro, "obtener_pagina", _obtener)
+    return pedidas, fallan
+
+
+def test_recorre_paginas_y_abre_solo_discusiones_del_profesor(foro):
+    pedidas, _ = foro
+
+    discusiones = extraer_discusiones_foro(_FORO, _PROFESOR, workers=3)
+
+    assert [d["id"] for d in discusiones] == [2, 8, 6, 4]
+    assert discusiones[1]["contenido"] == "Aviso 8"
+    assert discusiones[1]["autor"] == _PROFESOR
+    listados = [u for u in pedidas if "view.php" in u]
+    assert [extractor_foro._numero_pagina(u) for u in listados] == [0, 1, 2]
+    assert sorted(u for u in pedidas if "discuss.php" in u) == [
+        f"https://m.test/mod/forum/discuss.php?d={d}" for d in (2, 4, 6, 8)]
+
+
+def test_marca_de_agua_corta_paginacion_y_acumula(foro, tmp_path):
+    pedidas, _ = foro
+    previas = extraer_discusiones_foro_incremental(_FORO, _PROFESOR, str(tmp_path))
+    assert cargar_estado_foros(str(tmp_path))[_FORO]["marca_agua"] == 8
+    pedidas.clear()
+
+    discusiones = extraer_discusiones_foro_incremental(_FORO, _PROFESOR, str(tmp_path))
+
+    assert pedidas == [_FORO + "&o=3"]  # primera página, sin abrir discusiones
+    assert discusiones == previas
+
+    discusiones = extraer_discusiones_foro(_FORO, _PROFESOR, marca_agua=5)
+    assert [d["id"] for d in discusiones] == [8, 6]
+
+
+def test_fallo_no_adelanta_marca_de_agua(foro, tmp_path):
+    _, fallan = foro
+    fallan.add(6)
+
+    discusiones = extraer_discusiones_foro_incremental(_FORO, _PROFESOR, str(tmp_path))
+    assert [d["id"] for d in discusiones] == [2, 8, 4]
+    assert cargar_estado_foros(str(tmp_path))[_FORO]["marca_agua"] == 5
+
+    fallan.clear()
+    discusiones = extraer_discusiones_foro_incremental(_FORO, _PROFESOR, str(tmp_path))
+    assert [d["id"] for d in discusiones] == [8, 6, 2, 4]
+    assert cargar_estado_foros(str(tmp_path))[_FORO]["marca_agua"] == 8
+
+
+def test_foros_concurrentes_no_se_pisan_el_estado(foro, tmp_path):
+    """El pipeline extrae varios foros del curso a la vez: ninguno pierde su marca."""
+    foros = [f"https://m.test/mod/forum/view.php?id={i}" for i in range(6)]
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        list(pool.map(lambda url: extraer_discusiones_foro_incremental(
+            url, _PROFESOR, str(tmp_path), workers=1), foros))
+
+    estado = cargar_estado_foros(str(tmp_path))
+    assert sorted(estado) == sorted(foros)
+    assert {e["marca_agua"] for e in estado.values()} == {8}
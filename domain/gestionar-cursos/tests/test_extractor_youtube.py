@@ -0,0 +1,96 @@
+"""Tests del lote YouTube (extractor_youtube): yt-dlp en proceso, caché de
+transcripciones por id y resúmenes en un solo batch. Sin red: YoutubeDL fake.
+"""
+import json
+import threading
+import types
+
+import extractor_youtube
+import pytest
+
+_JSON3 = json.dumps({"events": [
+    {"segs": [{"utf8": "Hola "}, {"utf8": "clase"}]},
+    {"segs": [{"utf8": "[Música]"}]},
+    {"segs": [{"utf8": "tema uno"}]},
+]})
+
+
+class _YoutubeDL:
+    """Un video con subtítulos automáticos en español y otro sin pistas."""
+
+    llamadas = []
+    lock = threading.Lock()
+
+    def __init__(self, opciones):
+        self.opciones = opciones
+
+    def extract_info(self, url, download=False):
+        assert not download
+        with self.lock:
+            self.llamadas.append(url)
+        if url.endswith("AAAAAAAAAAA"):
+            return {"title": "Video A", "language": "es",
+                    "automatic_captions": {"es": [
+                        {"ext": "vtt", "url": "https://yt.test/a.vtt"},
+                        {"ext": "json3", "url": "https://yt.test/a.json3"},
+                    ]}}
+        return {"title": "Video B", "language": "es", "automatic_captions": {}}
+
+    def urlopen(self, url):
+        assert url == "https://yt.test/a.json3"
+        return types.SimpleNamespace(read=lambda: _JSON3.encode())
+
+
+@pytest.fixture
+def yt(tmp_path, monkeypatch):
+    _YoutubeDL.llamadas = []
+    monkeypatch.setattr(extractor_youtube, "_yt_dlp",
+                        lambda: types.SimpleNamespace(YoutubeDL=_YoutubeDL))
+    extractor_youtube.configurar_cache_youtube(str(tmp_path / "cache"))
+    lotes = []
+
+    def _completar_batch(perfil, mensajes, **kwargs):
+        lotes.append((perfil, list(mensajes)))
+        return [f"Resumen: {m}" for m in mensajes]
+
+    import llm_api
+    monkeypatch.setattr(llm_api, "completar_batch", _completar_batch)
+    yield lotes
+    extractor_youtube.configurar_cache_youtube("")
+
+
+def test_lote_deduplica_y_resume_en_un_batch(yt, tmp_path):
+    a = "https://www.youtube.com/watch?v=AAAAAAAAAAA"
+    b = "https://youtu.be/BBBBBBBBBBB"
+    rutas = extractor_youtube.procesar_videos_youtube([
+        (a, str(tmp_path / "u1"), "Lectura 1"),
+        (b, str(tmp_path / "u1"), "Lectura 2"),
+        ("https://youtu.be/AAAAAAAAAAA", str(tmp_path / "u2"), "Repaso"),
+    ])
+
+    assert len(_YoutubeDL.llamadas) == 2
+    assert yt == [("youtube_summarizer", ["Hola clase tema uno"])]
+    assert rutas[1] is None
+    assert rutas[0].endswith("Lectura_1_YouTube.md") and rutas[2].endswith("Repaso_YouTube.md")
+    with open(rutas[2], encoding="utf-8") as f:
+        assert "Resumen: Hola clase tema uno" in f.read()
+
+
+def test_cache_por_id_evita_yt_dlp(yt):
+    urls = ["https://youtu.be/AAAAAAAAAAA", "https://youtu.be/BBBBBBBBBBB"]
+    primero = extractor_youtube.obtener_transcripciones(urls)
+    segundo = extractor_youtube.obtener_transcripciones(urls)
+
+    assert len(_YoutubeDL.llamadas) == 2  # el video sin subtítulos también se recuerda
+    assert segundo == primero
+    assert segundo["AAAAAAAAAAA"]["idioma"] == "es"
+    assert extractor_youtube.extraer_subtitulos(urls[0]) == "Hola clase tema uno"
+
+
+def test_pista_manual_antes_que_automatica_y_vtt():
+    info = {"subtitles": {"en": [{"ext": "vtt", "url": "m"}]},
+            "automatic_captions": {"es": [{"ext": "json3", "url": "a"}]}}
+    assert extractor_youtube._elegir_pista(info, "es-419") == ("en", {"ext": "vtt", "url": "m"})
+
+    vtt = "WEBVTT\nKind: captions\n\n00:00.000 --> 00:01.000\nhola\n\n00:01.000 --> 00:02.000\nhola\nmundo\n"
+    assert extractor_youtube._texto_vtt(vtt) == "hola mundo"
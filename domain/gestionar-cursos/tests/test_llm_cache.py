@@ -0,0 +1,92 @@
+"""Tests de llm_cache: store SQLite con import de .json heredados y LRU."""
+import json
+import os
+
+import llm_cache
+from llm_cache import DB_FILENAME, CacheLLM, abrir_cache_lectura
+
+
+def test_importa_json_heredados_y_los_elimina(tmp_path):
+    """Los `<sha256>.json` del formato anterior quedan accesibles por su clave."""
+    key = "a" * 64
+    (tmp_path / f"{key}.json").write_text(json.dumps({"result": "hola"}), encoding="utf-8")
+    (tmp_path / "snapshot.json").write_text("{}", encoding="utf-8")  # no es del cache LLM
+
+    cache = CacheLLM(str(tmp_path))
+    assert cache.get(key) == "hola"
+    assert not (tmp_path / f"{key}.json").exists()
+    assert (tmp_path / "snapshot.json").exists()
+    assert (tmp_path / DB_FILENAME).exists()
+
+
+def test_comprime_resultados_grandes_sin_perder_contenido(tmp_path):
+    """Resultados sobre el umbral se guardan comprimidos y se leen intactos."""
+    cache = CacheLLM(str(tmp_path), compress_min_bytes=100)
+    texto = "# Unidad\n\n" + "contenido repetido " * 500
+    cache.put("k", texto)
+    assert cache.get("k") == texto
+    st = cache.stats()
+    assert st["bytes_guardado"] < st["bytes_original"]
+    assert st["bytes_ahorrados_compresion"] > 0
+
+
+def test_expulsa_lru_al_superar_max_bytes(tmp_path):
+    """Al pasar max_bytes se expulsa la entrada menos usada recientemente."""
+    cache = CacheLLM(str(tmp_path), max_bytes=2500, compress_min_bytes=0)
+    cache.put("vieja", "x" * 1000)
+    cache.put("usada", "y" * 1000)
+    cache.get("vieja")  # 'usada' pasa a ser la menos reciente
+    cache.put("nueva", "z" * 1000)
+    assert cache.get("usada") is None
+    assert cache.get("vieja") == "x" * 1000
+    assert cache.get("nueva") == "z" * 1000
+    assert cache.stats()["expulsadas"] == 1
+
+
+def test_stats_hit_ratio_persiste_entre_aperturas(tmp_path):
+    """Hits/misses se guardan en el archivo y sobreviven a reabrir el store."""
+    cache = CacheLLM(str(tmp_path))
+    cache.put("k", "valor")
+    cache.get("k")
+    cache.get("no-existe")
+    cache.close()
+
+    st = CacheLLM(str(tmp_path)).stats()
+    assert (st["hits"], st["misses"]) == (1, 1)
+    assert st["hit_ratio"] == 0.5
+    assert st["bytes_servidos"] == len("valor")
+    assert os.path.basename(st["path"]) == DB_FILENAME
+
+
+def test_solo_lectura_no_importa_ni_expulsa(tmp_path):
+    """El store de reportes no toca los .json heredados ni expulsa entradas."""
+    cache = CacheLLM(str(tmp_path), compress_min_bytes=0)
+    cache.put("a", "x" * 1000)
+    cache.put("b", "y" * 1000)
+    cache.close()
+    legado = tmp_path / f"{'c' * 64}.json"
+    legado.write_text(json.dumps({"result": "z" * 1000}), encoding="utf-8")
+
+    lectura = abrir_cache_lectura(str(tmp_path), max_bytes=1500)
+    assert lectura.get("a") == "x" * 1000
+    st = lectura.stats()
+    lectura.close()
+
+    assert (st["entradas"], st["expulsadas"], st["hits"]) == (2, 0, 0)
+    assert legado.exists()
+    assert abrir_cache_lectura(str(tmp_path / "vacio")).stats()["entradas"] == 0
+
+
+def test_lecturas_se_guardan_por_lotes(tmp_path, monkeypatch):
+    """Los aciertos no escriben en cada get(): se vuelcan cada N lecturas."""
+    monkeypatch.setattr(llm_cache, "LECTURAS_POR_COMMIT", 3)
+    cache = CacheLLM(str(tmp_path))
+    cache.put("k", "valor")
+    otro = CacheLLM(str(tmp_path))
+
+    cache.get("k")
+    cache.get("k")
+    assert otro.stats()["hits"] == 0
+    cache.get("falta")
+    st = otro.stats()
+    assert (st["hits"], st["misses"]) == (2, 1)
@@ -0,0 +1,108 @@
+"""Tests del ledger de telemetría LLM (llm_ledger + openrouter_client).
+
+Sin red: la sesión HTTP se reemplaza por un fake que responde con un
+bloque `usage` como el de OpenRouter.
+"""
+import json
+
+from llm_ledger import leer, registrar, resumir
+
+
+class _Resp:
+    def __init__(self, status, data=None):
+        self.status_code = status
+        self.headers = {}
+        self._data = data or {}
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+            raise requests.HTTPError(f"{self.status_code}")
+
+
+class _Session:
+    def __init__(self, respuestas):
+        self.respuestas = list(respuestas)
+        self.modelos = []
+
+    def post(self, url, **kwargs):
+        self.modelos.append(kwargs["json"]["model"])
+        return self.respuestas.pop(0)
+
+
+def test_registrar_usa_claves_del_formato_analyze_model(tmp_path):
+    ruta = str(tmp_path / "ledger" / "llm_ledger.jsonl")
+    registrar(ruta, perfil="document_formatter", modelo="prov/m",
+              input_tokens=120, output_tokens=30, segundos=1.23456, curso="curso-a")
+    registrar(ruta, perfil="document_formatter", modelo="prov/m", cache_hit=True)
+
+    registros = leer(ruta)
+    assert len(registros) == 2
+    r = registros[0]
+    assert r["model_id"] == "prov/m"
+    assert (r["input_tokens"], r["output_tokens"]) == (120, 30)
+    assert r["task_id"] == r["profile"] == "document_formatter"
+    assert r["session_id"] == r["course"] == "curso-a"
+    assert r["wall_s"] == 1.235
+    assert r["timestamp"].endswith("Z")
+
+
+def test_leer_ignora_lineas_truncadas(tmp_path):
+    ruta = tmp_path / "llm_ledger.jsonl"
+    ruta.write_text('{"profile": "a", "model_id": "m"}\n{"profile": "b", "mod\n', encoding="utf-8")
+    assert [r["profile"] for r in leer(str(ruta))] == ["a"]
+    assert leer(str(tmp_path / "no-existe.jsonl")) == []
+
+
+def test_resumir_agrupa_y_excluye_cache_de_latencias():
+    registros = [
+        {"profile": "doc", "input_tokens": 100, "output_tokens": 50, "wall_s": 2.0, "retries": 1},
+        {"profile": "doc", "input_tokens": 100, "output_tokens": 50, "wall_s": 4.0, "fallback": True},
+        {"profile": "doc", "cache_hit": True, "wall_s": 0.0},
+        {"profile": "yt", "input_tokens": 10, "output_tokens": 5, "wall_s": 1.0, "ok": False},
+    ]
+    doc, yt = resumir(registros)
+    assert doc["grupo"] == "doc"
+    assert (doc["llamadas"], doc["cache_hits"], doc["reintentos"], doc["fallbacks"]) == (3, 1, 1, 1)
+    assert (doc["input_tokens"], doc["output_tokens"]) == (200, 100)
+    assert (doc["p50_s"], doc["p95_s"]) == (2.0, 4.0)
+    assert yt["fallidas"] == 1
+
+
+def test_completar_registra_usage_reintentos_fallback_y_cache(monkeypatch, tmp_path):
+    import openrouter_client
+
+    monkeypatch.setenv("OPENROUTER_API_KEY", "sk-test")
+    monkeypatch.setattr(openrouter_client, "_verificar_creditos", lambda k, t: True)
+    monkeypatch.setattr(openrouter_client, "_get_global_store", lambda: None)
+    monkeypatch.setattr(openrouter_client, "obtener_limiter", lambda m, c: None)
+    monkeypatch.setattr(openrouter_client, "RETRY_BASE_DELAY", 0.0)
+    monkeypatch.setattr(openrouter_client.time, "sleep", lambda s: None)
+    openrouter_client.set_cache_dir(str(tmp_path / "curso-a" / "_cache"))
+    ledger = tmp_path / "llm_ledger.jsonl"
+    monkeypatch.setattr(openrouter_client, "_get_ledger_path", lambda: str(ledger))
+
+    ok = {"choices": [{"message": {"content": " hola "}}],
+          "usage": {"prompt_tokens": 42, "completion_tokens": 7, "cost": 0.0001}}
+    # Primario: 3 x 503 agota reintentos; fallback responde al primer intento
+    session = _Session([_Resp(503), _Resp(503), _Resp(503), _Resp(200, ok)])
+    monkeypatch.setattr(openrouter_client, "_get_session", lambda: session)
+
+    assert openrouter_client.completar("youtube_summarizer", "texto",
+                                       modelo="prov/primario") == "hola"
+    assert openrouter_client.completar("youtube_summarizer", "texto",
+                                       modelo="prov/primario") == "hola"
+
+    llamada, hit = [json.loads(linea) for linea in ledger.read_text(encoding="utf-8").splitlines()]
+    assert llamada["model_id"] == session.modelos[-1] != "prov/primario"
+    assert llamada["fallback"] is True
+    assert llamada["retries"] == 3
+    assert (llamada["input_tokens"], llamada["output_tokens"]) == (42, 7)
+    assert llamada["cost_usd"] == 0.0001
+    assert llamada["course"] == "curso-a"
+    assert llamada["cache_hit"] is False
+    assert hit["cache_hit"] is True
+    assert hit["input_tokens"] == 0
@@ -0,0 +1,90 @@
+"""Tests del backend async (navegador_async) y su selección en browser_api.
+Sin red: el cliente httpx usa un MockTransport.
+"""
+import asyncio
+
+import pytest
+import requests
+
+httpx = pytest.importorskip("httpx")
+
+import navegador_async  # noqa: E402
+
+
+class _Servidor:
+    """Handler async: <h1>path</h1>, 404 en /falla, cuenta requests en vuelo."""
+
+    def __init__(self, demora=0.02):
+        self.demora = demora
+        self.en_vuelo = 0
+        self.max_en_vuelo = 0
+
+    async def __call__(self, request):
+        self.en_vuelo += 1
+        self.max_en_vuelo = max(self.max_en_vuelo, self.en_vuelo)
+        await asyncio.sleep(self.demora)
+        self.en_vuelo -= 1
+        if request.url.path == "/falla":
+            return httpx.Response(404, request=request)
+        html = (f"<html><h1>{request.url.path}</h1><div class='generalbox'>"
+                f"<p>Instrucciones {request.url.path}</p></div></html>")
+        return httpx.Response(200, text=html, request=request)
+
+
+@pytest.fixture
+def servidor():
+    sesion = requests.Session()
+    sesion.cookies.set("MoodleSession", "abc", domain="moodle.test", path="/")
+    navegador_async.configurar(sesion, max_en_vuelo=3)
+    srv = _Servidor()
+
+    async def _mock():
+        return httpx.AsyncClient(transport=httpx.MockTransport(srv),
+                                 cookies=navegador_async._cliente.cookies)
+
+    navegador_async._cliente = navegador_async._correr(_mock())
+    yield srv
+    navegador_async.cerrar()
+
+
+def test_obtener_paginas_orden_y_errores(servidor):
+    urls = [f"https://moodle.test/p{i}" for i in range(10)] + ["https://moodle.test/falla"]
+    resultados = navegador_async.obtener_paginas(urls)
+
+    assert [r[0] for r in resultados[:10]] == urls[:10]
+    assert "<h1>/p3</h1>" in resultados[3][1]
+    assert isinstance(resultados[10], httpx.HTTPStatusError)
+
+
+def test_semaforo_acota_requests_en_vuelo(servidor):
+    navegador_async.obtener_paginas([f"https://moodle.test/p{i}" for i in range(12)])
+    assert servidor.max_en_vuelo == 3
+    assert navegador_async.en_vuelo_maximo() == 3
+
+
+def test_cookies_de_la_sesion_requests(servidor):
+    assert "MoodleSession=abc" in navegador_async.obtener_cookies()
+
+
+def test_navegar_y_extractores_con_html(servidor):
+    navegador_async.navegar("https://moodle.test/a")
+    assert navegador_async.obtener_url_actual() == "https://moodle.test/a"
+    assert "Instrucciones /a" in navegador_async.extraer_instrucciones()
+
+    _, html = navegador_async.obtener_pagina("https://moodle.test/b")
+    assert "Instrucciones /b" in navegador_async.extraer_instrucciones(html)
+    assert navegador_async.obtener_url_actual() == "https://moodle.test/a"
+
+
+def test_browser_api_selecciona_backend_async(monkeypatch, servidor):
+    import browser_api
+
+    monkeypatch.setattr(browser_api, "_use_async", True)
+    assert browser_api.esta_usando_requests()
+    assert not browser_api.esta_usando_selenium()
+    assert browser_api.get_navegador() is navegador_async.navegar
+
+    browser_api.get_navegador()("https://moodle.test/c")
+    assert browser_api.get_current_url() == "https://moodle.test/c"
+    assert "Instrucciones /c" in browser_api.extraer_instrucciones()
+    assert browser_api.obtener_pagina("https://moodle.test/d")[0] == "https://moodle.test/d"
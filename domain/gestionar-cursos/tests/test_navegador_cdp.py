@@ -0,0 +1,101 @@
+"""Tests del modo rápido de navegador_cdp: bloqueo de recursos por pestaña,
+carga en pestañas simultáneas y registro de tiempos. Sin Chrome: driver fake.
+"""
+import navegador_cdp
+import pytest
+
+
+class _SwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def new_window(self, tipo):
+        assert tipo == "tab"
+        if self.driver.actual not in self.driver.pestanas:
+            raise navegador_cdp.WebDriverException("no such window")
+        self.driver.n += 1
+        handle = f"tab-{self.driver.n}"
+        self.driver.pestanas[handle] = {"href": "about:blank"}
+        self.driver.actual = handle
+
+    def window(self, handle):
+        assert handle in self.driver.pestanas
+        self.driver.actual = handle
+
+
+class _Driver:
+    """Chrome con una pestaña original; las nuevas navegan al pedirlo por JS."""
+
+    def __init__(self, fallan=()):
+        self.n = 0
+        self.pestanas = {"original": {"href": "https://m.test/my/"}}
+        self.actual = "original"
+        self.switch_to = _SwitchTo(self)
+        self.fallan = set(fallan)
+        self.abiertas_max = 0
+        self.cdp = []  # (pestaña, comando, href al momento del comando)
+
+    @property
+    def current_window_handle(self):
+        return self.actual
+
+    @property
+    def current_url(self):
+        return self.pestanas[self.actual]["href"]
+
+    @property
+    def page_source(self):
+        return f"<html>{self.current_url}</html>"
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp.append((self.actual, cmd, self.current_url))
+
+    def execute_script(self, js, *args):
+        pestana = self.pestanas[self.actual]
+        if js.startswith("window.location.href"):
+            pestana["href"] = args[0]
+            self.abiertas_max = max(self.abiertas_max, len(self.pestanas) - 1)
+            return None
+        if "performance" in js:
+            return 0.25
+        if pestana["href"] in self.fallan:
+            raise navegador_cdp.WebDriverException("net::ERR_CONNECTION_RESET")
+        return pestana["href"] != "about:blank" and "interactive"
+
+    def close(self):
+        del self.pestanas[self.actual]
+
+
+@pytest.fixture
+def rapido(monkeypatch):
+    monkeypatch.setattr(navegador_cdp, "_cargas", [])
+    navegador_cdp.configurar_modo_rapido(pestanas=2)
+    yield
+    navegador_cdp.configurar_modo_rapido(False)
+    navegador_cdp._driver = None
+
+
+def test_pestanas_simultaneas_con_bloqueo(rapido):
+    driver = navegador_cdp._driver = _Driver(fallan={"https://m.test/c"})
+    urls = ["https://m.test/a", "https://m.test/b", "https://m.test/c"]
+
+    r = navegador_cdp.obtener_paginas(urls)
+
+    assert r["https://m.test/a"] == ("https://m.test/a", "<html>https://m.test/a</html>")
+    assert r["https://m.test/b"][0] == "https://m.test/b"
+    assert isinstance(r["https://m.test/c"], navegador_cdp.WebDriverException)
+    assert driver.abiertas_max == 2
+    assert list(driver.pestanas) == ["original"] and driver.actual == "original"
+    assert all(pestana != "original" for pestana, _, _ in driver.cdp)
+
+
+def test_bloqueo_antes_de_navegar_y_resumen(rapido):
+    driver = navegador_cdp._driver = _Driver()
+    navegador_cdp.obtener_paginas(["https://m.test/a", "https://m.test/b"])
+
+    bloqueos = [(p, href) for p, cmd, href in driver.cdp if cmd == "Network.setBlockedURLs"]
+    assert bloqueos == [("tab-1", "about:blank"), ("tab-2", "about:blank")]
+    st = navegador_cdp.stats_cargas()
+    assert st["paginas"] == 2 and st["dcl_media"] == 0.25 and st["modo_rapido"]
+    assert navegador_cdp.resumen_cargas().startswith("CDP (rápido): 2 páginas")
+
@@ -0,0 +1,171 @@
+"""Tests de openrouter_client.completar_batch.
+
+Verifica orden de resultados, que los aciertos de cache no ocupan un
+worker y que mensajes repetidos en el lote se envian una sola vez.
+Sin red: _completar_single se reemplaza por un fake.
+"""
+import contextvars
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def cliente(monkeypatch, tmp_path):
+    """openrouter_client con API key fake, sin verificacion de creditos."""
+    import openrouter_client
+
+    monkeypatch.setenv("OPENROUTER_API_KEY", "sk-test")
+    monkeypatch.setattr(openrouter_client, "_verificar_creditos", lambda k, t: True)
+    monkeypatch.setattr(openrouter_client, "_CACHE_DIR",
+                        contextvars.ContextVar("cache_dir_test", default=""))
+    openrouter_client.set_cache_dir(str(tmp_path / "curso-a" / "_cache"))
+    # Cache global aislado por test (nunca el del skill)
+    from llm_cache import CacheLLM
+    global_store = CacheLLM(str(tmp_path / "global"))
+    monkeypatch.setattr(openrouter_client, "_get_global_store", lambda: global_store)
+    ledger = str(tmp_path / "llm_ledger.jsonl")
+    monkeypatch.setattr(openrouter_client, "_get_ledger_path", lambda: ledger)
+    return openrouter_client
+
+
+def test_completar_batch_respeta_orden_de_entrada(cliente, monkeypatch):
+    """Las respuestas salen alineadas con los mensajes aunque terminen en otro orden."""
+    import time
+
+    def fake_single(user_msg, *args):
+        # Los primeros mensajes tardan mas: terminan despues que los ultimos.
+        time.sleep(0.01 * (5 - int(user_msg[-1])))
+        return f"R:{user_msg}"
+
+    monkeypatch.setattr(cliente, "_completar_single", fake_single)
+    mensajes = [f"msg{i}" for i in range(5)]
+    resultados = cliente.completar_batch("youtube_summarizer", mensajes, max_concurrency=5)
+    assert resultados == [f"R:msg{i}" for i in range(5)]
+
+
+def test_completar_batch_cache_hits_no_ocupan_worker(cliente, monkeypatch):
+    """Un acierto de cache se devuelve sin llegar a _completar_single."""
+    llamados = []
+    hilos = set()
+
+    def fake_single(user_msg, *args):
+        llamados.append(user_msg)
+        hilos.add(threading.current_thread().name)
+        return f"R:{user_msg}"
+
+    monkeypatch.setattr(cliente, "_completar_single", fake_single)
+    # Pre-poblar cache con la misma clave que usaria completar()
+    llamada = cliente._preparar_llamada("youtube_summarizer", "cacheado")
+    cliente._cache_put(llamada["cache_key"], "desde-cache")
+
+    resultados = cliente.completar_batch(
+        "youtube_summarizer", ["cacheado", "nuevo"], max_concurrency=4,
+    )
+    assert resultados == ["desde-cache", "R:nuevo"]
+    assert llamados == ["nuevo"]
+    assert threading.main_thread().name not in hilos
+
+    # La respuesta nueva quedo en cache con la clave de completar()
+    assert cliente.completar("youtube_summarizer", "nuevo") == "R:nuevo"
+    assert llamados == ["nuevo"]
+
+
+def test_completar_batch_deduplica_mensajes_repetidos(cliente, monkeypatch):
+    """Mensajes identicos dentro del lote generan una sola llamada."""
+    llamados = []
+
+    def fake_single(user_msg, *args):
+        llamados.append(user_msg)
+        return f"R:{user_msg}"
+
+    monkeypatch.setattr(cliente, "_completar_single", fake_single)
+    resultados = cliente.completar_batch("youtube_summarizer", ["a", "b", "a"])
+    assert resultados == ["R:a", "R:b", "R:a"]
+    assert sorted(llamados) == ["a", "b"]
+
+
+def test_completar_batch_sin_api_key_devuelve_nones(cliente, monkeypatch):
+    """Sin OPENROUTER_API_KEY el lote no falla: todo None."""
+    monkeypatch.delenv("OPENROUTER_API_KEY")
+    assert cliente.completar_batch("youtube_summarizer", ["a", "b"]) == [None, None]
+
+
+def test_chunked_reintento_solo_reenvia_chunk_fallido(cliente, monkeypatch):
+    """Tras un chunk fallido, la re-ejecucion solo envia ese chunk."""
+    llamados = []
+    falla = {"chunk": "B" * 10}
+
+    def fake_single(user_msg, *args):
+        llamados.append(user_msg)
+        if user_msg == falla["chunk"]:
+            return None
+        return user_msg.lower()
+
+    monkeypatch.setattr(cliente, "_completar_single", fake_single)
+    chunking = {"enabled": True, "max_parallel": 3}
+    plan = {
+        "chunks": ["A" * 10, "B" * 10, "C" * 10],
+        "tokens_estimados": 9, "max_tokens": 3,
+        "chunks_legado": 1, "overlap_tokens_ahorrados": 0,
+    }
+
+    def correr():
+        return cliente._completar_chunked(
+            "document_formatter", plan, "sys", 0.3, 100, 10,
+            "m", "m", chunking, cache_key="doc",
+        )
+
+    primero = correr()
+    assert primero == "a" * 10 + "\n\n[CHUNK 2 FALLIDO]\n\n" + "c" * 10
+    assert len(llamados) == 3
+    # Documento incompleto: no se cachea como un todo
+    assert cliente._cache_get("doc") is None
+
+    llamados.clear()
+    falla["chunk"] = None
+    segundo = correr()
+    assert llamados == ["B" * 10]
+    assert segundo == "\n\n".join(["a" * 10, "b" * 10, "c" * 10])
+    assert cliente._cache_get("doc") == segundo
+
+
+def test_planear_chunks_usa_context_length_del_catalogo(cliente, monkeypatch, tmp_path):
+    """El presupuesto sale del context_length del catalogo, no de max_chars."""
+    import json
+
+    catalogo = tmp_path / "catalog.json"
+    catalogo.write_text(json.dumps([
+        {"id": "prov/chico", "context_length": 3000},
+        {"id": "prov/grande", "context_length": 200000},
+    ]), encoding="utf-8")
+    monkeypatch.setattr(cliente, "_find_catalog", lambda: str(catalogo))
+
+    llamada = cliente._preparar_llamada("document_formatter", "Hola. " * 4000)
+    llamada.update(model_primary="prov/chico:free", model_fallback="prov/grande",
+                   tokens=1000, system="")
+    plan = cliente._planear_chunks(llamada)
+    # 3000 * 0.95 - 1000 de salida = 1850 tokens por chunk (el modelo chico manda)
+    assert plan["max_tokens"] == 1850
+    assert len(plan["chunks"]) > 1
+    assert "".join(plan["chunks"]) == llamada["user_msg"]
+
+
+def test_cache_global_reutiliza_documento_entre_cursos(cliente, monkeypatch, tmp_path):
+    """El mismo documento en otro curso (con distinto espaciado) no llama al API."""
+    llamados = []
+
+    def fake_single(user_msg, *args):
+        llamados.append(user_msg)
+        return "resumen"
+
+    monkeypatch.setattr(cliente, "_completar_single", fake_single)
+    assert cliente.completar("youtube_summarizer", "Sílabo  del curso\r\n\n\n\nUnidad 1") == "resumen"
+
+    cliente.set_cache_dir(str(tmp_path / "curso-b" / "_cache"))
+    assert cliente.completar("youtube_summarizer", "Sílabo del curso\n\nUnidad 1 ") == "resumen"
+    assert len(llamados) == 1
+
+    llamada = cliente._preparar_llamada("youtube_summarizer", "Sílabo del curso\n\nUnidad 1")
+    procedencia = cliente._get_global_store().procedencia(llamada["content_key"])
+    assert [(p["curso"], p["usos"]) for p in procedencia] == [("curso-a", 0), ("curso-b", 1)]
@@ -0,0 +1,83 @@
+"""Tests de pagina_moodle: un parseo por página, mismos textos que BS4 con
+los parsers rápidos y reutilización en navegador_requests. HTML sintético.
+"""
+import bench_paginas
+import navegador_requests
+import pagina_moodle
+import pytest
+from pagina_moodle import PaginaMoodle, css_a_xpath
+
+_ASSIGN = """<!DOCTYPE html>
+<html><head><title>Tarea</title><style>h1 { color: red }</style></head>
+<body>
+<div class="page-header-headings"><h1> Unidad 2: Tarea &nbsp;colaborativa </h1></div>
+<div id="region-main">
+  <div class="activity-description" id="intro">
+    <p>Lean el <b>caso</b>   y respondan.</p><!-- comentario del editor -->
+    <script>var no = "texto de script";</script>
+    <p>Entrega en PDF.<br>Máximo 5 páginas.</p>
+    <a href="https://m.test/pluginfile.php/12/mod_assign/intro/caso.pdf">caso.pdf</a>
+  </div>
+  <div class="box generalbox submissionsummary">Estado: sin entrega</div>
+  <div class="gradingform rubric"><table><tr><td>Claridad</td><td>40%</td></tr></table></div>
+  <a href="/mod/forum/view.php?id=3">Foro</a>
+  <a class="x" href="https://m.test/pluginfile.php/13/mod_assign/introattachment/0/plantilla.docx">plantilla</a>
+</div>
+</body></html>"""
+
+_PARSERS = ["bs4", "lxml"] + (
+    ["selectolax"] if pagina_moodle.parser_rapido() == "selectolax" else [])
+
+
+@pytest.mark.parametrize("parser", _PARSERS)
+def test_parsers_rapidos_igual_que_bs4(parser):
+    pagina = PaginaMoodle(_ASSIGN, parser=parser)
+
+    assert pagina.detalle() == {
+        "descripcion": "Lean elcasoy respondan.Entrega en PDF.Máximo 5 páginas.caso.pdf",
+        "instrucciones": "Estado: sin entrega",
+        "materiales": [
+            "https://m.test/pluginfile.php/12/mod_assign/intro/caso.pdf",
+            "https://m.test/pluginfile.php/13/mod_assign/introattachment/0/plantilla.docx",
+        ],
+        "criterios": "Claridad40%",
+    }
+    assert pagina.nombre_unidad() == "Unidad 2: Tarea \xa0colaborativa"
+    assert PaginaMoodle("", parser=parser).nombre_unidad() == "Unidad"
+
+
+def test_css_a_xpath_subconjunto():
+    assert css_a_xpath("#intro") == "//*[@id='intro']"
+    assert css_a_xpath(".page-header-headings h1") == (
+        "//*[contains(concat(' ', normalize-space(@class), ' '), ' page-header-headings ')]//h1"
+    )
+    with pytest.raises(ValueError):
+        css_a_xpath("div > p")
+
+
+def test_extractores_parsean_una_vez_por_pagina(monkeypatch):
+    parseos = []
+    original = pagina_moodle.BeautifulSoup
+    monkeypatch.setattr(pagina_moodle, "BeautifulSoup",
+                        lambda *a, **kw: parseos.append(1) or original(*a, **kw))
+    monkeypatch.setattr(pagina_moodle, "parser_rapido", lambda: "bs4")
+    html = _ASSIGN + " "  # objeto nuevo: no reutiliza la página de otro test
+
+    navegador_requests.extraer_texto_descripcion(html)
+    navegador_requests.extraer_instrucciones(html)
+    navegador_requests.extraer_links_materiales(html)
+    navegador_requests.extraer_criterios(html)
+    navegador_requests.extraer_nombre_unidad(html)
+    assert len(parseos) == 1
+
+    navegador_requests.extraer_criterios(html.strip())
+    assert len(parseos) == 2
+
+
+def test_bench_sin_diferencias(tmp_path):
+    (tmp_path / "assign.html").write_text(_ASSIGN, encoding="utf-8")
+    resultados = bench_paginas.medir(bench_paginas.cargar_paginas([str(tmp_path)]),
+                                     repeticiones=1)
+
+    assert [r["modo"] for r in resultados][:3] == ["bs4 x5", "bs4 x1", "lxml"]
+    assert all(r["diferencias"] == [] for r in resultados)
@@ -0,0 +1,205 @@
+"""Tests del pipeline concurrente de actividades y del estado por hilo
+de navegador_requests. Sin red: la sesión requests es un fake.
+"""
+import threading
+import time
+
+import pytest
+
+
+class _Resp:
+    def __init__(self, url, text):
+        self.url = url
+        self.text = text
+        self.content = text.encode("utf-8")
+
+    def raise_for_status(self):
+        pass
+
+
+class _SesionFake:
+    """Devuelve <h1>url</h1> y registra el máximo de requests simultáneos."""
+
+    def __init__(self, demora=0.02):
+        self.demora = demora
+        self.en_vuelo = 0
+        self.max_en_vuelo = 0
+        self.inicios = []
+        self._lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        with self._lock:
+            self.en_vuelo += 1
+            self.max_en_vuelo = max(self.max_en_vuelo, self.en_vuelo)
+            self.inicios.append(time.monotonic())
+        time.sleep(self.demora)
+        with self._lock:
+            self.en_vuelo -= 1
+        return _Resp(url, f"<html><h1>{url}</h1><div id='region-main'>x</div></html>")
+
+    def mount(self, *args):
+        pass
+
+
+@pytest.fixture
+def navegador(monkeypatch):
+    import navegador_requests
+
+    sesion = _SesionFake()
+    monkeypatch.setattr(navegador_requests, "_session", sesion)
+    navegador_requests.configurar_cortesia(0, 0.0)
+    yield navegador_requests, sesion
+    navegador_requests.configurar_cortesia(0, 0.0)
+
+
+def test_pipeline_escribe_en_orden_de_entrada():
+    from pipeline_actividades import ejecutar_pipeline
+
+    tareas = [{"i": i} for i in range(6)]
+    escritos = []
+
+    def descargar(t):
+        time.sleep(0.01 * (6 - t["i"]))  # las primeras terminan de últimas
+        return t["i"]
+
+    stats = ejecutar_pipeline(
+        tareas, descargar=descargar, parsear=lambda t, d: d * 10,
+        escribir=lambda t, data: escritos.append(data), workers=6,
+    )
+    assert escritos == [0, 10, 20, 30, 40, 50]
+    assert (stats["ok"], stats["fallidas"]) == (6, 0)
+
+
+def test_pipeline_error_de_una_tarea_no_detiene_el_resto():
+    from pipeline_actividades import ejecutar_pipeline
+
+    fallos = []
+
+    def parsear(t, d):
+        if d == 1:
+            raise ValueError("html roto")
+        return d
+
+    escritos = []
+    stats = ejecutar_pipeline(
+        [{"i": i} for i in range(3)], descargar=lambda t: t["i"], parsear=parsear,
+        escribir=lambda t, data: escritos.append(data),
+        al_fallar=lambda t, e: fallos.append((t["i"], str(e))),
+    )
+    assert escritos == [0, 2]
+    assert fallos == [(1, "html roto")]
+    assert stats["fallidas"] == 1
+
+
+def test_pipeline_aborta_y_propaga_sesion_expirada():
+    from pipeline_actividades import ejecutar_pipeline
+
+    class ExpiradaError(RuntimeError):
+        pass
+
+    def descargar(t):
+        if t["i"] == 0:
+            raise ExpiradaError("login")
+        time.sleep(0.01)
+        return t["i"]
+
+    escritos = []
+    with pytest.raises(ExpiradaError):
+        ejecutar_pipeline(
+            [{"i": i} for i in range(20)], descargar=descargar, parsear=lambda t, d: d,
+            escribir=lambda t, data: escritos.append(data), workers=2,
+            abortar_en=(ExpiradaError,),
+        )
+    assert escritos == []
+
+
+def test_pagina_actual_es_por_hilo(navegador):
+    nav, _ = navegador
+    nav.navegar("https://moodle/a")
+    vistos = {}
+
+    def otro_hilo():
+        nav.navegar("https://moodle/b")
+        vistos["b"] = nav.obtener_url_actual()
+
+    t = threading.Thread(target=otro_hilo)
+    t.start()
+    t.join()
+    assert vistos["b"] == "https://moodle/b"
+    assert nav.obtener_url_actual() == "https://moodle/a"
+    assert "https://moodle/a" in nav.obtener_contenido()
+
+
+def test_cortesia_limita_requests_por_host(navegador):
+    nav, sesion = navegador
+    nav.configurar_cortesia(2, 0.0)
+    hilos = [threading.Thread(target=nav.obtener_pagina, args=(f"https://moodle/{i}",))
+             for i in range(8)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    assert sesion.max_en_vuelo <= 2
+    assert len(sesion.inicios) == 8
+
+
+def test_cortesia_respeta_intervalo_entre_inicios(navegador):
+    nav, sesion = navegador
+    sesion.demora = 0.0
+    nav.configurar_cortesia(4, 0.05)
+    hilos = [threading.Thread(target=nav.obtener_pagina, args=(f"https://moodle/{i}",))
+             for i in range(4)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    inicios = sorted(sesion.inicios)
+    assert all(b - a >= 0.04 for a, b in zip(inicios, inicios[1:], strict=False))
+
+
+def test_extractor_parsea_html_descargado_sin_navegar(monkeypatch):
+    import extractor_modulos
+
+    def no_navegar():
+        raise AssertionError("no debe navegar cuando recibe html")
+
+    monkeypatch.setattr(extractor_modulos, "get_navegador", no_navegar)
+    html = "<h1>Tarea 1</h1><table><tr><th>Cierre</th><td>8 mar 2026</td></tr></table>"
+    data = extractor_modulos.extraer_modulo_assign("https://moodle/mod/assign/view.php?id=1",
+                                                   html=html)
+    assert data["titulo"] == "Tarea 1"
+    assert data["fecha_cierre"] == "8 mar 2026"
+
+
+def test_pipeline_genera_los_mismos_archivos_que_el_recorrido_secuencial(
+    navegador, monkeypatch, tmp_path,
+):
+    import browser_api
+    import cli_init
+
+    monkeypatch.setattr(browser_api, "_use_requests", True)
+    monkeypatch.setattr(cli_init, "console", type("C", (), {"print": lambda *a, **k: None})())
+    sidebar = [
+        {"tipo": "seccion", "nombre": "Unidad 1"},
+        {"tipo": "page", "nombre": "Lectura", "url": "https://moodle/mod/page/view.php?id=1"},
+        {"tipo": "quiz", "nombre": "Primer parcial (Calificable 20%)",
+         "url": "https://moodle/mod/quiz/view.php?id=2"},
+        {"tipo": "seccion", "nombre": "Unidad 2"},
+        {"tipo": "assign", "nombre": "Taller", "url": "https://moodle/mod/assign/view.php?id=3"},
+        {"tipo": "label", "nombre": "Etiqueta", "url": "https://moodle/mod/label/view.php?id=4"},
+    ]
+
+    def generar(destino, workers):
+        destino.mkdir()
+        cli_init._procesar_actividades_unidades(
+            [dict(i) for i in sidebar], str(destino), None, workers=workers,
+        )
+        return {
+            str(p.relative_to(destino)): p.read_text(encoding="utf-8")
+            for p in sorted(destino.rglob("*")) if p.is_file()
+        }
+
+    secuencial = generar(tmp_path / "secuencial", 1)
+    paralelo = generar(tmp_path / "paralelo", 4)
+    assert secuencial == paralelo
+    assert len(secuencial) == 3
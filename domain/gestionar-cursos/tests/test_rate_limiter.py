@@ -0,0 +1,82 @@
+"""Tests de rate_limiter: token bucket compartido, headers y AIMD."""
+import time
+
+import pytest
+from rate_limiter import RateLimiter, segundos_hasta_reset
+
+
+@pytest.fixture
+def limiter(tmp_path):
+    return RateLimiter(
+        "google/gemma-4-31b-it:free", state_dir=str(tmp_path),
+        requests_per_minute=600, burst=2, max_concurrency=4,
+    )
+
+
+def test_retry_after_y_reset_en_milisegundos():
+    """Retry-After en segundos manda; si no, X-RateLimit-Reset (epoch ms)."""
+    ahora = 1_780_000_000.0
+    assert segundos_hasta_reset({"Retry-After": "7"}, ahora) == 7.0
+    headers = {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int((ahora + 3) * 1000))}
+    assert segundos_hasta_reset(headers, ahora) == pytest.approx(3.0)
+    # Con cupo restante el reset no obliga a esperar
+    headers["X-RateLimit-Remaining"] = "5"
+    assert segundos_hasta_reset(headers, ahora) == 0.0
+    assert segundos_hasta_reset({}, ahora) == 0.0
+    # Sin remaining, el reset solo cuenta en un 429
+    solo_reset = {"X-RateLimit-Reset": str(int((ahora + 120) * 1000))}
+    assert segundos_hasta_reset(solo_reset, ahora, 200) == 0.0
+    assert segundos_hasta_reset(solo_reset, ahora, 429) == pytest.approx(120.0)
+
+
+def test_2xx_con_solo_reset_no_bloquea(limiter):
+    """Un 2xx que solo trae X-RateLimit-Reset no detiene el bucket."""
+    reset = str(int((time.time() + 120) * 1000))
+    assert limiter.registrar_respuesta(200, {"X-RateLimit-Reset": reset}) == 0.0
+    inicio = time.monotonic()
+    with limiter.slot():
+        pass
+    assert time.monotonic() - inicio < 1.0
+
+
+def test_bucket_espera_al_agotar_la_rafaga(limiter):
+    """Tras consumir el burst, el siguiente token espera ~1/rate."""
+    inicio = time.monotonic()
+    for _ in range(3):
+        with limiter.slot():
+            pass
+    # 600 rpm = 10 rps: el 3er token tarda ~0.1s
+    assert time.monotonic() - inicio >= 0.08
+
+
+def test_aimd_sube_con_exitos_y_baja_a_la_mitad_con_429(limiter):
+    """+1/límite por 2xx, /2 ante 429 (acotado por min/max)."""
+    for _ in range(20):
+        limiter.registrar_respuesta(200, {})
+    assert limiter.limite_concurrencia() == 4
+    espera = limiter.registrar_respuesta(429, {"Retry-After": "0.2"})
+    assert espera == pytest.approx(0.2)
+    assert limiter.limite_concurrencia() == 2
+
+
+def test_estado_compartido_entre_instancias(tmp_path):
+    """Dos limiters (p.ej. dos procesos) sobre el mismo estado comparten el bloqueo."""
+    a = RateLimiter("m", state_dir=str(tmp_path), requests_per_minute=6000, burst=5)
+    b = RateLimiter("m", state_dir=str(tmp_path), requests_per_minute=6000, burst=5)
+    a.registrar_respuesta(429, {"Retry-After": "0.15"})
+    inicio = time.monotonic()
+    with b.slot():
+        pass
+    assert time.monotonic() - inicio >= 0.1
+
+
+def test_limite_concurrencia_no_reescribe_estado(limiter, monkeypatch):
+    """Consultar el límite (en cada vuelta de espera) solo lee el estado."""
+    limiter.registrar_respuesta(200, {})
+    escrituras = []
+    monkeypatch.setattr("rate_limiter.os.replace", lambda *a: escrituras.append(a))
+    monkeypatch.setattr("rate_limiter.lockfile",
+                        lambda path: pytest.fail("no debía tomar el lockfile"))
+
+    assert limiter.limite_concurrencia() == 2
+    assert escrituras == []
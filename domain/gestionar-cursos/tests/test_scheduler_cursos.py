@@ -0,0 +1,91 @@
+"""Tests del scheduler en proceso de cli_init --parallel (scheduler_cursos).
+Sin red: cada "curso" es una función que imprime y duerme.
+"""
+import re
+import threading
+import time
+
+from scheduler_cursos import ejecutar_cursos, resumen_tiempos
+
+
+def test_acota_cursos_simultaneos_y_respeta_orden():
+    lock = threading.Lock()
+    en_curso = {"n": 0, "max": 0}
+
+    def curso(url):
+        with lock:
+            en_curso["n"] += 1
+            en_curso["max"] = max(en_curso["max"], en_curso["n"])
+        time.sleep(0.03)
+        with lock:
+            en_curso["n"] -= 1
+
+    urls = [f"https://moodle.test/course/view.php?id={i}" for i in range(7)]
+    estados = ejecutar_cursos(urls, curso, max_concurrentes=3)
+
+    assert en_curso["max"] == 3
+    assert [e["url"] for e in estados] == urls
+    assert all(e["estado"] == "ok" and e["segundos"] > 0 for e in estados)
+
+
+def test_log_por_curso_incluye_hilos_hijos():
+    from pipeline_actividades import ejecutar_pipeline
+
+    def curso(url):
+        print(f"[1/6] inicio {url}")
+        ejecutar_pipeline(
+            [{"n": i} for i in range(3)],
+            descargar=lambda t: print(f"descarga {url} {t['n']}"),
+            parsear=lambda t, d: t["n"],
+            escribir=lambda t, d: None,
+            workers=2,
+        )
+        print(f"[2/6] fin {url}")
+
+    estados = ejecutar_cursos(["a", "b"], curso, max_concurrentes=2,
+                              patron_fase=re.compile(r"\[\d/6\]"))
+
+    for e in estados:
+        otro = "b" if e["url"] == "a" else "a"
+        assert e["log"].count(f"descarga {e['url']} ") == 3
+        assert f" {otro}" not in e["log"]
+        assert e["fase"] == f"[2/6] fin {e['url']}"
+
+
+def test_error_o_sys_exit_solo_marcan_su_curso():
+    import sys
+
+    def curso(url):
+        if url == "exit":
+            sys.exit(1)
+        if url == "boom":
+            raise ValueError("sin sidebar")
+
+    estados = ejecutar_cursos(["ok", "exit", "boom"], curso, max_concurrentes=3)
+
+    assert [e["estado"] for e in estados] == ["ok", "error", "error"]
+    assert estados[1]["error"] == "salida 1"
+    assert "sin sidebar" in estados[2]["error"]
+
+    resumen = resumen_tiempos(estados, 0.5)
+    assert resumen["ok"] == 1 and resumen["errores"] == 2
+
+
+def test_cache_llm_por_curso(tmp_path, monkeypatch):
+    import contextvars
+
+    import openrouter_client
+
+    monkeypatch.setattr(openrouter_client, "_CACHE_DIR",
+                        contextvars.ContextVar("cache_dir_test", default=""))
+    vistos = {}
+
+    def curso(url):
+        openrouter_client.set_cache_dir(str(tmp_path / url / "_cache"))
+        time.sleep(0.02)
+        vistos[url] = openrouter_client._curso_actual()
+
+    ejecutar_cursos(["curso-a", "curso-b", "curso-c"], curso, max_concurrentes=3)
+
+    assert vistos == {"curso-a": "curso-a", "curso-b": "curso-b", "curso-c": "curso-c"}
+    assert openrouter_client._curso_actual() == ""
@@ -0,0 +1,142 @@
+"""Tests del store de materiales (store_materiales): streaming por bloques,
+reanudación con Range, deduplicación entre cursos y gc. Sin red: respuestas fake.
+"""
+import os
+
+import pytest
+from store_materiales import StoreMateriales
+
+_PDF = b"%PDF-1.7 " + bytes(range(256)) * 40
+
+
+class _Resp:
+    def __init__(self, url, status, body=b"", headers=None, corte=None):
+        self.url = url
+        self.status_code = status
+        self.headers = headers or {}
+        self._body = body
+        self._corte = corte
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self._body), chunk_size):
+            if self._corte is not None and i >= self._corte:
+                raise ConnectionError("conexión cortada")
+            yield self._body[i:i + chunk_size]
+
+    def close(self):
+        pass
+
+
+class _Servidor:
+    """pluginfile con ETag, Range/If-Range y 304; `cortar_en` corta la 1ra descarga."""
+
+    def __init__(self, cuerpos, cortar_en=None, etag=True):
+        self.cuerpos = cuerpos
+        self.cortar_en = cortar_en
+        self.etag = etag
+        self.pedidos = []
+
+    def __call__(self, url, headers):
+        self.pedidos.append(dict(headers))
+        body = self.cuerpos[url]
+        etag = f'"{len(body)}"'
+        if headers.get("If-None-Match") == etag:
+            return _Resp(url, 304)
+        rango = headers.get("Range")
+        if rango and headers.get("If-Range", etag) == etag:
+            desde = int(rango.split("=")[1].rstrip("-"))
+            return _Resp(url, 206, body[desde:], {"ETag": etag})
+        corte, self.cortar_en = self.cortar_en, None
+        return _Resp(url, 200, body, {"ETag": etag} if self.etag else {}, corte=corte)
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = StoreMateriales(str(tmp_path / "store"), ttl=0)
+    yield s
+    s.close()
+
+
+def test_mismo_archivo_en_dos_cursos_un_solo_blob(store, tmp_path):
+    srv = _Servidor({"https://m.test/pluginfile.php/1/guia.pdf": _PDF,
+                     "https://m.test/pluginfile.php/2/guia.pdf": _PDF})
+    a = store.descargar("https://m.test/pluginfile.php/1/guia.pdf",
+                        str(tmp_path / "cursoA" / "guia.pdf"), abrir=srv, chunk_bytes=1000)
+    b = store.descargar("https://m.test/pluginfile.php/2/guia.pdf",
+                        str(tmp_path / "cursoB" / "guia.pdf"), abrir=srv, chunk_bytes=1000)
+
+    assert a["sha256"] == b["sha256"] and b["dedup"]
+    assert (tmp_path / "cursoB" / "guia.pdf").read_bytes() == _PDF
+    assert os.path.samefile(tmp_path / "cursoA" / "guia.pdf", tmp_path / "cursoB" / "guia.pdf")
+    assert store.stats()["blobs"] == 1 and store.stats()["hardlinks"] == 2
+
+
+def test_reanuda_con_range_tras_corte(store, tmp_path):
+    url = "https://m.test/pluginfile.php/1/video.mp4"
+    srv = _Servidor({url: _PDF}, cortar_en=4000)
+    destino = tmp_path / "curso" / "video.mp4"
+
+    with pytest.raises(ConnectionError):
+        store.descargar(url, str(destino), abrir=srv, chunk_bytes=1000)
+    r = store.descargar(url, str(destino), abrir=srv, chunk_bytes=1000)
+
+    assert srv.pedidos[1]["Range"] == "bytes=4000-"
+    assert srv.pedidos[1]["If-Range"] == f'"{len(_PDF)}"'
+    assert r["reanudado"] and r["bytes"] == len(_PDF)
+    assert destino.read_bytes() == _PDF
+    assert os.listdir(store.dir_parciales) == []
+
+
+def test_sin_validadores_no_reanuda(store, tmp_path):
+    """Sin ETag ni Last-Modified no hay If-Range: el parcial se descarta."""
+    url = "https://m.test/pluginfile.php/1/video.mp4"
+    srv = _Servidor({url: _PDF}, cortar_en=4000, etag=False)
+    destino = tmp_path / "curso" / "video.mp4"
+
+    with pytest.raises(ConnectionError):
+        store.descargar(url, str(destino), abrir=srv, chunk_bytes=1000)
+    r = store.descargar(url, str(destino), abrir=srv, chunk_bytes=1000)
+
+    assert "Range" not in srv.pedidos[1]
+    assert not r["reanudado"] and r["bytes"] == len(_PDF)
+    assert destino.read_bytes() == _PDF
+
+
+def test_revalida_con_304_sin_descargar(store, tmp_path):
+    url = "https://m.test/pluginfile.php/1/guia.pdf"
+    srv = _Servidor({url: _PDF})
+    store.descargar(url, str(tmp_path / "a.pdf"), abrir=srv)
+    r = store.descargar(url, str(tmp_path / "b.pdf"), abrir=srv)
+
+    assert r["origen"] == "revalidada"
+    assert srv.pedidos[1]["If-None-Match"] == f'"{len(_PDF)}"'
+    assert (tmp_path / "b.pdf").read_bytes() == _PDF
+
+
+def test_gc_borra_solo_blobs_sin_referencias(store, tmp_path, monkeypatch):
+    srv = _Servidor({"https://m.test/pluginfile.php/1/a.pdf": _PDF,
+                     "https://m.test/pluginfile.php/1/b.pdf": _PDF[::-1]})
+    store.descargar("https://m.test/pluginfile.php/1/a.pdf", str(tmp_path / "c1" / "a.pdf"),
+                    abrir=srv)
+    store.descargar("https://m.test/pluginfile.php/1/b.pdf", str(tmp_path / "c1" / "b.pdf"),
+                    abrir=srv)
+
+    # sin hardlinks (otro volumen): copia registrada
+    monkeypatch.setattr(os, "link", lambda *a: (_ for _ in ()).throw(OSError("EXDEV")))
+    copia = store.guardar_bytes(_PDF, str(tmp_path / "c2" / "a.pdf"))
+    assert copia["enlace"] == "copia" and copia["dedup"]
+
+    os.remove(tmp_path / "c1" / "a.pdf")
+    os.remove(tmp_path / "c1" / "b.pdf")
+    assert store.gc(dry_run=True)["borrados"] == 1
+    r = store.gc()
+
+    assert r["borrados"] == 1 and store.stats()["blobs"] == 1  # la copia de c2 sostiene a.pdf
+    os.remove(tmp_path / "c2" / "a.pdf")
+    r = store.gc()
+    assert r["borrados"] == 1 and r["referencias_podadas"] == 1
+    assert store.stats()["blobs"] == 0
@@ -0,0 +1,195 @@
+"""Tests del modo stream: parseo SSE, reintentos y escritura incremental de formatear_llm."""
+import json
+
+
+class _RespSSE:
+    """Respuesta fake con iter_lines() al estilo requests."""
+
+    def __init__(self, lineas):
+        self._lineas = lineas
+
+    def iter_lines(self, decode_unicode=True):
+        yield from self._lineas
+
+
+def test_iter_sse_ignora_comentarios_y_termina_en_done():
+    """Comentarios ': OPENROUTER PROCESSING' y lineas vacias no son eventos."""
+    from openrouter_client import _iter_sse
+
+    resp = _RespSSE([
+        ": OPENROUTER PROCESSING",
+        "",
+        'data: {"choices": [{"delta": {"content": "Hola"}}]}',
+        'data: {"choices": [{"delta": {"content": " mundo"}}]}',
+        "data: [DONE]",
+        'data: {"choices": [{"delta": {"content": "ignorado"}}]}',
+    ])
+    deltas = [e["choices"][0]["delta"]["content"] for e in _iter_sse(resp)]
+    assert deltas == ["Hola", " mundo"]
+
+
+def test_formatear_stream_escribe_clean_text_y_acumula_metadata(monkeypatch, tmp_path):
+    """El markdown llega a disco decodificado y la metadata se acumula al final."""
+    import formatear_llm
+
+    respuesta = json.dumps({
+        "clean_text": "# Módulo 1\n\nObjetivo: \"aprender\".",
+        "metadata": {"objetivos": ["aprender"]},
+    }, ensure_ascii=False)
+    deltas = [respuesta[i:i + 5] for i in range(0, len(respuesta), 5)]
+    monkeypatch.setattr(formatear_llm, "completar", lambda *a, **k: iter(deltas))
+    formatear_llm.obtener_metadatos()
+
+    ruta = tmp_path / "MATERIA" / "modulo.md"
+    texto = formatear_llm.formatear_texto_llm_stream("crudo", str(ruta))
+
+    assert texto == "# Módulo 1\n\nObjetivo: \"aprender\"."
+    assert ruta.read_text(encoding="utf-8") == texto
+    assert formatear_llm.obtener_metadatos() == [{"objetivos": ["aprender"]}]
+
+
+def test_formatear_stream_aborta_si_el_sobre_json_es_invalido(monkeypatch, tmp_path):
+    """Si la respuesta no abre con '{', se corta el stream y queda el texto crudo."""
+    import formatear_llm
+
+    consumidos = []
+
+    def stream_infinito():
+        for i in range(1000):
+            consumidos.append(i)
+            yield "# Esto no es JSON " if i == 0 else "mas texto "
+
+    monkeypatch.setattr(formatear_llm, "completar", lambda *a, **k: stream_infinito())
+    ruta = tmp_path / "doc.md"
+    texto = formatear_llm.formatear_texto_llm_stream("texto crudo", str(ruta))
+
+    assert texto == "texto crudo"
+    assert ruta.read_text(encoding="utf-8") == "texto crudo"
+    assert len(consumidos) == 1
+
+
+class _RespStream(_RespSSE):
+    """Respuesta de post(stream=True): context manager que registra el cierre."""
+
+    def __init__(self, status_code, lineas=()):
+        super().__init__(list(lineas))
+        self.status_code = status_code
+        self.headers = {}
+        self.cerrada = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrada = True
+
+    def raise_for_status(self):
+        assert self.status_code == 200
+
+
+def test_stream_reintento_espera_sin_slot_ni_conexion(monkeypatch):
+    """El backoff ante un 429 no retiene el slot del limiter ni la respuesta abierta."""
+    import contextlib
+
+    import openrouter_client
+
+    respuestas = [
+        _RespStream(429),
+        _RespStream(200, ['data: {"choices": [{"delta": {"content": "ok"}}]}', "data: [DONE]"]),
+    ]
+    enviadas = list(respuestas)
+    en_slot = [False]
+
+    class _Limiter:
+        @contextlib.contextmanager
+        def slot(self):
+            en_slot[0] = True
+            try:
+                yield
+            finally:
+                en_slot[0] = False
+
+        def registrar_respuesta(self, status, headers):
+            return 0.0
+
+    class _Sesion:
+        def post(self, *a, **k):
+            return enviadas.pop(0)
+
+    esperas = []
+
+    def _sleep(segundos):
+        assert not en_slot[0]
+        assert respuestas[0].cerrada
+        esperas.append(segundos)
+
+    monkeypatch.setattr(openrouter_client, "obtener_limiter", lambda m, cfg: _Limiter())
+    monkeypatch.setattr(openrouter_client, "_get_session", lambda: _Sesion())
+    monkeypatch.setattr(openrouter_client, "_registrar_ledger", lambda *a, **k: None)
+    monkeypatch.setattr(openrouter_client.time, "sleep", _sleep)
+
+    deltas = list(openrouter_client._stream_single(
+        "msg", "sys", 0.1, 100, 10, "modelo/a", "", "document_formatter"))
+
+    assert deltas == ["ok"]
+    assert len(esperas) == 1
+
+
+def test_stream_sin_api_key_es_iterador_vacio(monkeypatch):
+    """Sin API key (o perfil) completar(stream=True) no devuelve None."""
+    import openrouter_client
+
+    monkeypatch.delenv("OPENROUTER_API_KEY", raising=False)
+    assert list(openrouter_client.completar("document_formatter", "x", stream=True)) == []
+    assert list(openrouter_client.completar("no-existe", "x", stream=True)) == []
+    assert openrouter_client.completar("document_formatter", "x") is None
+
+
+def test_stream_llm_informa_tiempo_al_primer_token():
+    """StreamLLM mide desde la llamada hasta el primer delta."""
+    import time
+
+    from openrouter_client import StreamLLM
+
+    def deltas():
+        time.sleep(0.05)
+        yield "a"
+        yield "b"
+
+    stream = StreamLLM(deltas())
+    assert stream.ttft is None
+    assert list(stream) == ["a", "b"]
+    assert stream.ttft >= 0.04
+
+
+def test_formatear_lote_stream_un_md_por_documento_y_metadata_en_orden(monkeypatch, tmp_path):
+    """Cada documento escribe su .md; la metadata sigue el orden de entrada aunque
+    el primer stream termine último."""
+    import threading
+
+    import formatear_llm
+    from openrouter_client import StreamLLM
+
+    segundo_listo = threading.Event()
+
+    def completar(perfil, texto, **kwargs):
+        respuesta = json.dumps({"clean_text": f"# {texto}", "metadata": {"doc": texto}})
+
+        def deltas():
+            if texto == "uno":
+                segundo_listo.wait(2)
+            yield from (respuesta[i:i + 4] for i in range(0, len(respuesta), 4))
+            if texto == "dos":
+                segundo_listo.set()
+        return StreamLLM(deltas())
+
+    monkeypatch.setattr(formatear_llm, "completar", completar)
+    formatear_llm.obtener_metadatos()
+    rutas = [str(tmp_path / "MATERIA" / "uno.md"), str(tmp_path / "MATERIA" / "dos.md")]
+
+    resultado = formatear_llm.formatear_textos_llm_stream(["uno", "dos"], rutas)
+
+    assert [texto for texto, _ in resultado] == ["# uno", "# dos"]
+    assert all(ttft is not None for _, ttft in resultado)
+    assert (tmp_path / "MATERIA" / "dos.md").read_text(encoding="utf-8") == "# dos"
+    assert formatear_llm.obtener_metadatos() == [{"doc": "uno"}, {"doc": "dos"}]
@@ -0,0 +1,137 @@
+"""Tests del sync incremental por huella de contenido (sincronizar_curso +
+cli_init._plan_sync_incremental). Sin red: páginas fake.
+"""
+import json
+
+import pytest
+from sincronizar_curso import (
+    huella_html,
+    leer_snapshot,
+    planear_sync,
+    registrar_extraccion,
+    registrar_extracciones,
+)
+
+_PAGINA = """<html><body><div id="region-main">
+<h2>Taller 1</h2><p>Entregar   el informe.</p>
+<a href="https://moodle.test/pluginfile.php/12/mod_assign/intro/guia.pdf?forcedownload=1">Guía</a>
+<div class="gradingsummary">Enviados: {enviados}</div>
+<input type="hidden" name="sesskey" value="{sesskey}">
+</div></body></html>"""
+
+
+def test_huella_ignora_bloques_volatiles_y_espacios():
+    a = huella_html(_PAGINA.format(enviados=3, sesskey="x1"))
+    b = huella_html(_PAGINA.format(enviados=9, sesskey="y2").replace("el informe", "el  informe"))
+    assert a == b
+
+    otro_archivo = _PAGINA.replace("/12/", "/13/").format(enviados=3, sesskey="x1")
+    assert huella_html(otro_archivo) != a
+    assert huella_html(_PAGINA.replace("Taller 1", "Taller 2").format(enviados=3, sesskey="")) != a
+
+
+def test_planear_sync_clasifica_y_suma_ahorro():
+    snapshot = {"actividades": {
+        "a": {"huella": "h1", "segundos": 4.0},
+        "b": {"huella": "h2", "segundos": 6.0},
+        "c": {"nombre": "sin huella"},
+    }}
+    plan = planear_sync([
+        {"key": "a", "huella": "h1"},
+        {"key": "b", "huella": "otra"},
+        {"key": "c", "huella": "h3"},
+        {"key": "d", "huella": "h4"},
+    ], snapshot)
+
+    assert [a["key"] for a in plan["sin_cambios"]] == ["a"]
+    assert [a["key"] for a in plan["cambiadas"]] == ["b", "c"]
+    assert [a["key"] for a in plan["nuevas"]] == ["d"]
+    assert plan["segundos_ahorrados"] == 4.0
+
+
+def test_registrar_extraccion_conserva_campos(tmp_path):
+    (tmp_path / "_cache").mkdir()
+    (tmp_path / "_cache" / "snapshot.json").write_text(json.dumps({"actividades": {
+        "/mod/assign/view.php?id=1": {"nombre": "Taller", "fecha_cierre": "2026-07-19",
+                                      "calificacion": {"nota": 4.5}},
+    }}), encoding="utf-8")
+
+    registrar_extraccion(str(tmp_path), {"key": "/mod/assign/view.php?id=1"},
+                         huella="h1", segundos=2.345, archivo="Unidad-1/taller.md")
+    registrar_extraccion(str(tmp_path), {"key": "/mod/page/view.php?id=2", "nombre": "Nueva",
+                                         "tipo": "page"},
+                         huella="h2", segundos=1.0, archivo="Unidad-1/nueva.md")
+
+    act = leer_snapshot(str(tmp_path))["actividades"]
+    assert act["/mod/assign/view.php?id=1"] == {
+        "nombre": "Taller", "fecha_cierre": "2026-07-19", "calificacion": {"nota": 4.5},
+        "huella": "h1", "segundos": 2.35, "archivo": "Unidad-1/taller.md",
+    }
+    assert act["/mod/page/view.php?id=2"]["tipo"] == "page"
+
+
+
+def test_huellas_se_escriben_por_lote(tmp_path, monkeypatch):
+    """El bucle de extracción no reescribe la snapshot por actividad; lo pendiente
+    se vuelca al salir aunque el bloque se corte."""
+    import cli_init
+
+    escrituras = []
+    monkeypatch.setattr(cli_init, "registrar_extracciones",
+                        lambda ruta, ext: (escrituras.append(len(ext)),
+                                           registrar_extracciones(ruta, ext)))
+    extraidas = []
+    with pytest.raises(RuntimeError), cli_init._volcar_huellas(str(tmp_path), extraidas):
+        for i in range(3):
+            extraidas.append(({"key": f"/mod/page/view.php?id={i}"}, f"h{i}", 1.0, f"p{i}.md"))
+        raise RuntimeError("sesión expirada")
+
+    assert escrituras == [3] and extraidas == []
+    act = leer_snapshot(str(tmp_path))["actividades"]
+    assert [act[f"/mod/page/view.php?id={i}"]["huella"] for i in range(3)] == ["h0", "h1", "h2"]
+
+@pytest.fixture
+def modo_requests(monkeypatch):
+    import browser_api
+
+    paginas = {}
+    monkeypatch.setattr(browser_api, "_use_requests", True)
+    monkeypatch.setattr(browser_api, "obtener_pagina", lambda url: (url, paginas[url]))
+    return paginas
+
+
+def test_plan_salta_actividades_sin_cambios(tmp_path, modo_requests):
+    import cli_init
+    from checkpoint import create_checkpoint
+
+    acts = [{"nombre": f"Página {i}", "url": f"https://moodle.test/mod/page/view.php?id={i}",
+             "tipo": "page"} for i in range(3)]
+    for act in acts:
+        modo_requests[act["url"]] = _PAGINA.format(enviados=0, sesskey="")
+    registrar_extraccion(str(tmp_path), {"key": "/mod/page/view.php?id=0"},
+                         huella=huella_html(modo_requests[acts[0]["url"]]),
+                         segundos=3.0, archivo="Unidad-1/p0.md")
+    registrar_extraccion(str(tmp_path), {"key": "/mod/page/view.php?id=1"},
+                         huella="vieja", segundos=2.0, archivo="Unidad-1/p1.md")
+
+    checkpoint = create_checkpoint("https://moodle.test/course/view.php?id=5", "C5", acts)
+    paginas, huellas, ahorro = cli_init._plan_sync_incremental(checkpoint, str(tmp_path))
+
+    assert [a["url"] for a in checkpoint["pending"]] == [acts[1]["url"], acts[2]["url"]]
+    assert checkpoint["completed"][0]["result_path"] == "Unidad-1/p0.md"
+    assert set(paginas) == {acts[1]["url"], acts[2]["url"]}
+    assert len(huellas) == 3 and ahorro == 3.0
+
+
+def test_plan_sesion_expirada(tmp_path, monkeypatch, modo_requests):
+    import browser_api
+    import cli_init
+    from checkpoint import create_checkpoint
+
+    monkeypatch.setattr(browser_api, "obtener_pagina",
+                        lambda url: ("https://moodle.test/login/index.php", "<html></html>"))
+    checkpoint = create_checkpoint("https://moodle.test/course/view.php?id=5", "C5", [
+        {"nombre": "P", "url": "https://moodle.test/mod/page/view.php?id=1", "tipo": "page"},
+    ])
+    with pytest.raises(cli_init.SessionExpiredError):
+        cli_init._plan_sync_incremental(checkpoint, str(tmp_path))
@@ -7,6 +7,7 @@ import hashlib
 import json
 import os
 import re
+import threading
 import time
 from pathlib import Path
 from typing import Optional, Dict, Any
@@ -48,6 +49,8 @@ class ClickUpCache:
     def __init__(self):
         self.CACHE_DIR.mkdir(parents=True, exist_ok=True)
         self._data: Dict[str, Dict[str, Any]] = self._load()
+        # Callers may share one client across threads (batch syncs)
+        self._lock = threading.RLock()
 
     def _load(self) -> dict:
         """Load cache from file, return empty dict on any error."""
@@ -84,29 +87,32 @@ class ClickUpCache:
     def get(self, method: str, endpoint: str, params: Optional[dict] = None) -> Optional[dict]:
         """Return cached response if valid, else None."""
         key = self._cache_key(method, endpoint, params)
-        entry = self._data.get(key)
-        if not entry:
-            return None
-        ttl = self._ttl_for(endpoint)
-        if time.time() - entry["ts"] > ttl:
-            del self._data[key]
-            return None
-        return entry["response"]
+        with self._lock:
+            entry = self._data.get(key)
+            if not entry:
+                return None
+            ttl = self._ttl_for(endpoint)
+            if time.time() - entry["ts"] > ttl:
+                del self._data[key]
+                return None
+            return entry["response"]
 
     def set(self, method: str, endpoint: str, response: dict, params: Optional[dict] = None):
         """Store a response in the cache."""
         key = self._cache_key(method, endpoint, params)
-        self._data[key] = {
-            "ts": time.time(),
-            "response": response,
-        }
-        self._save()
+        with self._lock:
+            self._data[key] = {
+                "ts": time.time(),
+                "response": response,
+            }
+            self._save()
 
     def invalidate(self):
         """Clear the entire cache."""
-        self._data = {}
-        if self.CACHE_FILE.exists():
-            self.CACHE_FILE.unlink(missing_ok=True)
+        with self._lock:
+            self._data = {}
+            if self.CACHE_FILE.exists():
+                self.CACHE_FILE.unlink(missing_ok=True)
 
 class CachedResponse:
     """Minimal response-like object for cached data."""